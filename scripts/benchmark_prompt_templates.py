@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark prompt template rendering: per-variable replacement vs. compiled templates.
+
+build_langchain_messages used to run two str.replace passes over the whole
+instructions string per context variable, and format_messages ran two regex
+substitutions per message. Both now render a template compiled once
+(src/utils/prompt_template.py) in a single pass. This script renders a
+multi-KB prompt with a ~50-key user profile both ways, checks the outputs
+match and reports the time per render. No model or AWS calls are made.
+
+Usage:
+    python scripts/benchmark_prompt_templates.py --iterations 2000
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.prompt_template import compile_template, render_template
+from src.utils.user_profile import create_user_profile
+
+_PARAGRAPH = (
+    "You are the policy specialist for ToggleHealth. Answer using only the retrieved plan documents, "
+    "quote the relevant coverage terms, and say clearly when something is not covered or needs prior "
+    "authorization. Keep answers specific to the member's plan and avoid speculation. "
+)
+
+
+def _context_vars(extra_keys: int) -> dict:
+    """A user profile padded to a realistic number of context variables."""
+    context = create_user_profile(name="Sam Lee", location="Boston, MA", policy_id="TH-HMO-GOLD-2024", coverage_type="HMO")
+    for index in range(extra_keys):
+        context[f"profile_attribute_{index}"] = f"value {index}"
+    context["query"] = "Is physical therapy covered by my plan?"
+    context["conversation_history"] = "Customer: Hi\nAssistant: Hello, how can I help?"
+    return context
+
+
+def _instructions(paragraphs: int) -> str:
+    """Multi-KB instructions with placeholders spread through the text."""
+    sections = []
+    for index in range(paragraphs):
+        sections.append(_PARAGRAPH * 3)
+        if index % 4 == 0:
+            sections.append("Member: {{ldctx.name}} ({{coverage_type}}, policy {{policy_id}}) in {{location}}.")
+    sections.append("Question: {{query}}\n\n{{conversation_history}}\n\nUnknown stays: {{not_in_context}}")
+    return "\n\n".join(sections)
+
+
+def legacy_render_instructions(instructions: str, context_vars: dict) -> str:
+    """Instructions rendering before compiled templates (two replace passes per variable)."""
+    for key, value in context_vars.items():
+        instructions = instructions.replace(f"{{{{{key}}}}}", str(value))
+        instructions = instructions.replace(f"{{{{ldctx.{key}}}}}", str(value))
+    return instructions
+
+
+def legacy_format_messages(messages: list[dict], context_vars: dict) -> list[dict]:
+    """format_messages before compiled templates (two regex substitutions per message)."""
+    formatted = []
+    for msg in messages:
+        content = msg.get("content", "")
+        content = re.sub(
+            r"\{\{ldctx\.(\w+)\}\}",
+            lambda m: str(context_vars.get(m.group(1), f"{{{{ldctx.{m.group(1)}}}}}")),
+            content,
+        )
+        content = re.sub(r"\{\{(\w+)\}\}", lambda m: str(context_vars.get(m.group(1), f"{{{{{m.group(1)}}}}}")), content)
+        formatted.append({"role": msg.get("role", "user"), "content": content})
+    return formatted
+
+
+def compiled_format_messages(messages: list[dict], context_vars: dict) -> list[dict]:
+    return [{"role": m.get("role", "user"), "content": render_template(m.get("content", ""), context_vars)} for m in messages]
+
+
+def _time_calls(fn, iterations: int) -> list[float]:
+    """Call fn repeatedly and return per-call durations in microseconds."""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1_000_000)
+    return durations
+
+
+def _summarize(label: str, durations: list[float]) -> float:
+    ordered = sorted(durations)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    mean = statistics.mean(durations)
+    print(f"{label:<34} mean={mean:9.1f}us  p50={statistics.median(durations):9.1f}us  p95={p95:9.1f}us")
+    return mean
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt template rendering")
+    parser.add_argument("--iterations", type=int, default=1000, help="Renders per scenario")
+    parser.add_argument("--context-keys", type=int, default=40, help="Extra context variables on top of the profile")
+    parser.add_argument("--paragraphs", type=int, default=16, help="Instruction paragraphs (~700 chars each)")
+    args = parser.parse_args()
+
+    context_vars = _context_vars(args.context_keys)
+    instructions = _instructions(args.paragraphs)
+    messages = [
+        {"role": "system", "content": instructions},
+        {"role": "user", "content": "{{query}}\n\nPlan: {{ldctx.coverage_type}} / {{policy_id}}"},
+    ]
+
+    print(f"\n{'='*80}")
+    print(
+        f"📊 PROMPT TEMPLATE BENCHMARK ({args.iterations} iterations, {len(context_vars)} context variables, "
+        f"{len(instructions) / 1024:.1f} KB instructions)"
+    )
+    print(f"{'='*80}")
+
+    if legacy_render_instructions(instructions, context_vars) != render_template(instructions, context_vars):
+        raise SystemExit("❌ Instructions render differently")
+    if legacy_format_messages(messages, context_vars) != compiled_format_messages(messages, context_vars):
+        raise SystemExit("❌ Messages render differently")
+
+    start = time.perf_counter()
+    compile_template.cache_clear()
+    compile_template(instructions)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    legacy_instructions = _summarize(
+        "instructions: replace per variable", _time_calls(lambda: legacy_render_instructions(instructions, context_vars), args.iterations)
+    )
+    compiled_instructions = _summarize(
+        "instructions: compiled", _time_calls(lambda: render_template(instructions, context_vars), args.iterations)
+    )
+    legacy_messages = _summarize(
+        "messages: regex per message", _time_calls(lambda: legacy_format_messages(messages, context_vars), args.iterations)
+    )
+    compiled_messages = _summarize(
+        "messages: compiled", _time_calls(lambda: compiled_format_messages(messages, context_vars), args.iterations)
+    )
+    print(f"{'compile (once per template)':<34} {compile_ms * 1000:9.1f}us")
+
+    print(f"\n✅ Instructions: {legacy_instructions / compiled_instructions:.1f}x faster, messages: {legacy_messages / compiled_messages:.1f}x faster")
+    print(f"{'='*80}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark LangGraph workflow compilation vs. cached reuse.
+
+Measures the per-request overhead that run_workflow paid when it rebuilt and
+compiled the StateGraph on every call, and compares it with fetching the
+shared compiled graph from get_workflow(). No model or AWS calls are made.
+
+Usage:
+    python scripts/benchmark_workflow_compile.py --iterations 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.graph.workflow import clear_workflow_cache, create_workflow, get_workflow
+
+
+def _time_calls(fn, iterations: int) -> list[float]:
+    """Call fn repeatedly and return per-call durations in milliseconds."""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def _summarize(label: str, durations: list[float]) -> None:
+    ordered = sorted(durations)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    print(
+        f"{label:<24} mean={statistics.mean(durations):8.3f}ms  "
+        f"p50={statistics.median(durations):8.3f}ms  p95={p95:8.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workflow graph compilation")
+    parser.add_argument("--iterations", type=int, default=100, help="Calls per scenario")
+    args = parser.parse_args()
+
+    print(f"\n{'='*80}")
+    print(f"📊 WORKFLOW COMPILE BENCHMARK ({args.iterations} iterations)")
+    print(f"{'='*80}")
+
+    compile_each_time = _time_calls(create_workflow, args.iterations)
+
+    clear_workflow_cache()
+    start = time.perf_counter()
+    get_workflow()
+    first_call_ms = (time.perf_counter() - start) * 1000
+    cached = _time_calls(get_workflow, args.iterations)
+
+    _summarize("compile per request", compile_each_time)
+    _summarize("cached graph", cached)
+    print(f"{'first (cold) call':<24} {first_call_ms:8.3f}ms")
+
+    saved = statistics.mean(compile_each_time) - statistics.mean(cached)
+    print(f"\n✅ Saved per request: {saved:.3f}ms")
+    print(f"{'='*80}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Evaluate the local triage fast path against labelled questions.
+
+Reports how often the local classifier is confident enough to skip the triage
+LLM (hit rate) and how accurate those fast-path routes are against
+expected_route. The naive Bayes model is trained with k-fold cross-validation
+so no question is scored by a model that saw it. No model or AWS calls are made.
+
+Usage:
+    python scripts/evaluate_triage_fast_path.py
+    python scripts/evaluate_triage_fast_path.py --threshold 0.85 --folds 10
+    python scripts/evaluate_triage_fast_path.py --dataset test_data/qa_dataset_demo.json
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import src.graph  # noqa: F401 - loads src.agents in dependency order (graph <-> agents imports)
+from src.agents.triage_classifier import (
+    DEFAULT_TRAINING_DATA,
+    NaiveBayesTriage,
+    classify_query,
+    load_training_examples,
+    triage_fast_path_threshold,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the triage fast path")
+    parser.add_argument("--dataset", default=str(DEFAULT_TRAINING_DATA), help="QA dataset with expected_route labels")
+    parser.add_argument("--threshold", type=float, default=triage_fast_path_threshold(), help="Fast-path confidence threshold")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds (1 = train and score on all)")
+    args = parser.parse_args()
+
+    examples = load_training_examples(args.dataset)
+    folds = max(1, min(args.folds, len(examples)))
+
+    print(f"\n{'='*80}")
+    print(f"📊 TRIAGE FAST PATH EVALUATION ({len(examples)} questions, threshold {args.threshold}, {folds}-fold)")
+    print(f"{'='*80}")
+
+    hits = 0
+    correct = 0
+    per_route = Counter()
+    per_route_hits = Counter()
+    per_route_correct = Counter()
+    methods = Counter()
+    misroutes = []
+
+    for fold in range(folds):
+        if folds == 1:
+            train, test = examples, examples
+        else:
+            train = [e for i, e in enumerate(examples) if i % folds != fold]
+            test = [e for i, e in enumerate(examples) if i % folds == fold]
+        model = NaiveBayesTriage(train)
+        for question, expected in test:
+            per_route[expected] += 1
+            result = classify_query(question, model=model)
+            if not result.is_confident(args.threshold):
+                continue
+            hits += 1
+            per_route_hits[expected] += 1
+            methods[result.method] += 1
+            if result.query_type == expected:
+                correct += 1
+                per_route_correct[expected] += 1
+            else:
+                misroutes.append((question, expected, result.query_type, result.confidence))
+
+    total = len(examples)
+    print(f"\nFast-path hit rate:  {hits}/{total} ({hits / total:.1%}) — no triage LLM call")
+    print(f"Fast-path accuracy:  {correct}/{hits} ({(correct / hits if hits else 0):.1%})")
+    print(f"LLM fallback:        {total - hits}/{total}")
+    print(f"Methods:             {dict(methods)}")
+
+    print(f"\n{'Route':<20} {'Questions':>9} {'Hits':>6} {'Correct':>8}")
+    for route in sorted(per_route):
+        print(f"{route:<20} {per_route[route]:>9} {per_route_hits[route]:>6} {per_route_correct[route]:>8}")
+
+    if misroutes:
+        print("\n⚠️  Misrouted on the fast path:")
+        for question, expected, got, confidence in misroutes:
+            print(f"    {question!r}: expected {expected}, got {got} ({confidence:.2f})")
+    print(f"{'='*80}\n")
+
+
+if __name__ == "__main__":
+    main()
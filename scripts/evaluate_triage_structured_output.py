@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compare triage model output before and after structured output.
+
+Runs the labelled questions through the triage model twice: once waiting for
+the full completion and parsing it with json.loads ("completion", the old
+behavior), and once with schema-constrained JSON streamed until the object
+closes ("structured"). Reports parse-failure rate, output tokens, latency and
+routing accuracy per mode. The local fast path is disabled so every question
+reaches the model.
+
+Needs the LaunchDarkly triage_agent AI Config and Bedrock access, or
+BEDROCK_FAKE=true for a local run without Bedrock.
+
+Usage:
+    python scripts/evaluate_triage_structured_output.py
+    python scripts/evaluate_triage_structured_output.py --limit 20
+    BEDROCK_FAKE=true python scripts/evaluate_triage_structured_output.py
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import src.graph  # noqa: F401 - loads src.agents in dependency order (graph <-> agents imports)
+from langchain_core.messages import HumanMessage
+from src.agents.triage_classifier import DEFAULT_TRAINING_DATA, load_training_examples
+from src.agents.triage_output import get_triage_output_stats
+from src.agents.triage_router import triage_node
+
+MODES = {"completion": "false", "structured": "true"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare triage output modes")
+    parser.add_argument("--dataset", default=str(DEFAULT_TRAINING_DATA), help="QA dataset with expected_route labels")
+    parser.add_argument("--limit", type=int, default=0, help="Questions to run (0 = all)")
+    args = parser.parse_args()
+
+    examples = load_training_examples(args.dataset)
+    if args.limit:
+        examples = examples[: args.limit]
+    os.environ["TRIAGE_FAST_PATH"] = "false"
+
+    print(f"\n{'='*80}")
+    print(f"📊 TRIAGE STRUCTURED OUTPUT EVALUATION ({len(examples)} questions per mode)")
+    print(f"{'='*80}")
+
+    correct = {}
+    for mode, flag in MODES.items():
+        os.environ["TRIAGE_STRUCTURED_OUTPUT"] = flag
+        correct[mode] = 0
+        for question, expected in examples:
+            with contextlib.redirect_stdout(io.StringIO()):
+                updates = triage_node({"messages": [HumanMessage(content=question)], "user_context": {}})
+            correct[mode] += updates["query_type"].value == expected
+        print(f"  {mode}: done")
+
+    stats = get_triage_output_stats()
+    print(f"\n{'Mode':<12} {'Calls':>6} {'Parse fail':>11} {'Out tokens':>11} {'Latency':>9} {'Early stop':>11} {'Accuracy':>9}")
+    for mode in MODES:
+        s = stats.get(mode, {})
+        calls = s.get("calls", 0)
+        print(
+            f"{mode:<12} {calls:>6} {s.get('parse_failure_rate', 0):>11.1%} {s.get('mean_output_tokens', 0):>11.1f} "
+            f"{s.get('mean_duration_ms', 0):>7.0f}ms {s.get('early_stops', 0):>11} "
+            f"{(correct[mode] / calls if calls else 0):>9.1%}"
+        )
+    print(f"{'='*80}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
 """Agent modules."""
 
-from .brand_voice_agent import brand_voice_node
-from .policy_specialist import policy_specialist_node
-from .provider_specialist import provider_specialist_node
-from .scheduler_specialist import scheduler_specialist_node
-from .triage_router import triage_node
+from .brand_voice_agent import abrand_voice_node, brand_voice_node, wait_for_background_evaluations
+from .policy_specialist import apolicy_specialist_node, policy_specialist_node
+from .provider_specialist import aprovider_specialist_node, provider_specialist_node
+from .scheduler_specialist import ascheduler_specialist_node, scheduler_specialist_node
+from .triage_router import atriage_node, triage_node
 
 __all__ = [
     "brand_voice_node",
@@ -12,4 +12,10 @@ __all__ = [
     "provider_specialist_node",
     "scheduler_specialist_node",
     "triage_node",
+    "abrand_voice_node",
+    "apolicy_specialist_node",
+    "aprovider_specialist_node",
+    "ascheduler_specialist_node",
+    "atriage_node",
+    "wait_for_background_evaluations",
 ]
@@ -1,16 +1,28 @@
 """Brand voice synthesis agent for customer-facing responses."""
 
 import asyncio
-from typing import Any
-import ldclient
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from ldai.client import ModelConfig, ProviderConfig, LDMessage
 from ldai.models import AICompletionConfig
 
-from ..graph.state import AgentState
-from ..utils.llm_config import get_model_invoker
+from ..graph.session import conversation_vars
+from ..graph.state import AgentState, get_rag_documents
+from ..utils.deadline import (
+    MIN_MODEL_CALL_S,
+    DeadlineExceeded,
+    is_timeout_error,
+    model_call_budget,
+    record_deadline_decision,
+)
+from ..utils.bedrock_limiter import is_overload_error
+from ..utils.llm_config import get_model_invoker, token_usage_from_response
 from ..utils.launchdarkly_config import get_ld_client
+from ..utils.metrics_emitter import get_metrics_emitter
 from ..evaluation.judge import evaluate_brand_voice_async
 
 
@@ -51,14 +63,30 @@ DEFAULT_BRAND_AGENT_CONFIG = AICompletionConfig(
     messages=[LDMessage(role="system", content=DEFAULT_BRAND_VOICE_SYSTEM_PROMPT)]
 )
 
+# Last-resort reply when no model can answer (fallbacks failed or Bedrock is overloaded)
+SAFE_FALLBACK_MESSAGE = "I apologize, but I'm unable to provide a response at this time. Please contact our support team for assistance."
+
+
+# Prompt-cache pricing relative to the model's input rate
+_CACHE_READ_RATE = 0.1
+_CACHE_WRITE_RATE = 1.25
+
 
-def calculate_model_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
+def calculate_model_cost(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
     """Calculate cost for a model based on token usage.
     
     Args:
         model_id: The model identifier (e.g., 'us.anthropic.claude-haiku-4-5-20251001-v1:0')
-        input_tokens: Number of input tokens
+        input_tokens: Number of input tokens (including prompt-cache tokens)
         output_tokens: Number of output tokens
+        cache_read_tokens: Input tokens read from the prompt cache
+        cache_write_tokens: Input tokens written to the prompt cache
     
     Returns:
         Total cost in dollars
@@ -86,14 +114,65 @@ def calculate_model_cost(model_id: str, input_tokens: int, output_tokens: int) -
         print(f"  Unknown model for cost calculation: {model_id}")
         return 0.0
     
-    # Calculate cost (pricing is per 1000 tokens)
-    input_cost = (input_tokens / 1000.0) * rates["input"]
+    # Calculate cost (pricing is per 1000 tokens). Cache reads are billed at
+    # 10% of the input rate and cache writes at 125%.
+    uncached_tokens = max(0, input_tokens - cache_read_tokens - cache_write_tokens)
+    input_cost = (
+        uncached_tokens * rates["input"]
+        + cache_read_tokens * rates["input"] * _CACHE_READ_RATE
+        + cache_write_tokens * rates["input"] * _CACHE_WRITE_RATE
+    ) / 1000.0
     output_cost = (output_tokens / 1000.0) * rates["output"]
     total_cost = input_cost + output_cost
     
     return total_cost
 
 
+# Brand agent variations that should trigger simulated guardrail intervention
+_GUARDRAIL_VARIATIONS = {
+    "llama-4-toxic-prompt": {
+        "policy_type": "Content Policy",
+        "filter_type": "MISCONDUCT",
+        "description": "The model generated content that violates health safety guidelines",
+    },
+    "llama-4-cost-cutting-prompt": {
+        "policy_type": "Topic Policy",
+        "filter_type": "OFF_TOPIC",
+        "description": "The model answered a question outside the bot's supported scope",
+    },
+}
+
+# Strong references to in-flight evaluation tasks; the event loop only keeps
+# weak references, so fire-and-forget tasks could otherwise be collected mid-run.
+_background_evaluations: set[asyncio.Task] = set()
+
+# Brand voice instructions appended to a specialist prompt in fused mode, where
+# one call answers from the RAG context directly in ToggleHealth's voice
+FUSED_BRAND_VOICE_INSTRUCTIONS = """**Respond directly to the customer in ToggleHealth's brand voice.**
+Your answer is shown to the customer as-is; no other agent will rewrite it.
+- **Friendly & Warm**: Use a conversational tone that makes customers feel valued
+- **Empathetic**: Acknowledge customer concerns and emotions
+- **Clear & Simple**: Avoid jargon; explain complex terms in plain language
+- **Helpful**: Provide actionable next steps when appropriate
+- **Professional**: Maintain trust while being approachable
+
+Customer Name: {customer_name}
+Query Type: {query_type}
+
+Address the customer by name (if appropriate), answer their question using only the
+documentation provided, and end with a helpful closing. Provide ONLY the final
+customer-facing response. Do not include meta-commentary."""
+
+# Recent two-hop brand voice calls (tokens, duration), the baseline that fused
+# mode savings are reported against
+_TWO_HOP_BASELINE: deque = deque(maxlen=50)
+_TWO_HOP_BASELINE_LOCK = threading.Lock()
+
+# Brand voice is optional polish: with less budget than this left, the
+# specialist's answer is sent as-is instead
+_BRAND_VOICE_MIN_S = 2 * MIN_MODEL_CALL_S
+
+
 def brand_voice_node(state: AgentState) -> dict[str, Any]:
     """Brand voice synthesis agent node.
 
@@ -107,6 +186,216 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
     Returns:
         Updated state with brand-voiced customer response
     """
+    deadline = state.get("deadline")
+    if _deadline_too_close(state):
+        return _skip_brand_voice(state, "skipped")
+    prepared = _prepare_brand_voice(state)
+    stream = _should_stream(state, prepared)
+    try:
+        call_kwargs = model_call_budget(deadline, prepared["model_invoker"].model, "brand_voice")
+    except DeadlineExceeded:
+        return _skip_brand_voice(state, "skipped")
+
+    # Track start time for duration measurement
+    start_time = time.time()
+    
+    emitted: list[str] = []
+    try:
+        if stream:
+            response = stream_customer_response(
+                prepared["model_invoker"], prepared["messages"], emitted=emitted, **call_kwargs
+            )
+        else:
+            response = prepared["model_invoker"].invoke(prepared["messages"], **call_kwargs)
+    except Exception as e:
+        if deadline is None or not is_timeout_error(e):
+            raise
+        return _skip_brand_voice(state, "timeout_fallback", streamed=bool(emitted))
+    
+    # Calculate duration
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    outcome = _apply_guardrail(prepared, response, duration_ms)
+    if state.get("stream_tokens") and not stream:
+        _emit_text(outcome["final_response"])
+    return _finish_brand_voice(state, prepared, outcome)
+
+
+async def abrand_voice_node(state: AgentState) -> dict[str, Any]:
+    """Async brand voice synthesis agent node (same behavior as ``brand_voice_node``).
+
+    Args:
+        state: Current agent state with specialist response
+
+    Returns:
+        Updated state with brand-voiced customer response
+    """
+    deadline = state.get("deadline")
+    if _deadline_too_close(state):
+        return _skip_brand_voice(state, "skipped")
+    prepared = _prepare_brand_voice(state)
+    stream = _should_stream(state, prepared)
+    try:
+        call_kwargs = model_call_budget(deadline, prepared["model_invoker"].model, "brand_voice")
+    except DeadlineExceeded:
+        return _skip_brand_voice(state, "skipped")
+
+    start_time = time.time()
+    emitted: list[str] = []
+    try:
+        if stream:
+            response = await astream_customer_response(
+                prepared["model_invoker"], prepared["messages"], emitted=emitted, **call_kwargs
+            )
+        else:
+            response = await prepared["model_invoker"].ainvoke(prepared["messages"], **call_kwargs)
+    except Exception as e:
+        if deadline is None or not is_timeout_error(e):
+            raise
+        return _skip_brand_voice(state, "timeout_fallback", streamed=bool(emitted))
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    if _guardrail_blocks(prepared):
+        # Self-healing re-invokes the model synchronously; this path is rare
+        # (blocked demo variations only), so run it off the event loop.
+        outcome = await asyncio.to_thread(_apply_guardrail, prepared, response, duration_ms)
+    else:
+        outcome = _apply_guardrail(prepared, response, duration_ms)
+    if state.get("stream_tokens") and not stream:
+        _emit_text(outcome["final_response"])
+    return _finish_brand_voice(state, prepared, outcome)
+
+
+def _specialist_answer(state: AgentState) -> str:
+    """The specialist's raw answer (last message), or "" if there is none."""
+    messages = state.get("messages") or []
+    if messages and isinstance(messages[-1], AIMessage):
+        return messages[-1].content or ""
+    return ""
+
+
+def _deadline_too_close(state: AgentState) -> bool:
+    """Whether to skip brand voice and send the specialist's answer as-is."""
+    deadline = state.get("deadline")
+    return deadline is not None and deadline.remaining() < _BRAND_VOICE_MIN_S and bool(_specialist_answer(state))
+
+
+def _skip_brand_voice(state: AgentState, decision: str, streamed: bool = False) -> dict[str, Any]:
+    """Send the specialist's answer unchanged when the deadline leaves no time for brand voice.
+
+    Args:
+        state: Current agent state with specialist response
+        decision: Deadline decision to record ("skipped" or "timeout_fallback")
+        streamed: Whether part of the brand voice reply already reached the
+            client; a reset event is sent first so it replaces that text
+
+    Raises:
+        DeadlineExceeded: If there is no specialist answer to fall back to
+    """
+    deadline = state.get("deadline")
+    specialist_response = _specialist_answer(state)
+    if not specialist_response:
+        raise DeadlineExceeded("brand_voice: no time left and no specialist answer to send")
+
+    record_deadline_decision(deadline, decision)
+    print(f"  BRAND VOICE AGENT: {decision}, sending the specialist's answer unchanged")
+    if state.get("stream_tokens"):
+        if streamed:
+            _emit_reset()
+        _emit_text(specialist_response)
+
+    brand_data = {
+        "model": None,
+        "response": specialist_response,
+        "original_specialist_response": specialist_response[:500] + "..." if len(specialist_response) > 500 else specialist_response,
+        "final_customer_response": specialist_response[:500] + "..." if len(specialist_response) > 500 else specialist_response,
+        "brand_voice_applied": False,
+        "skipped": True,
+        "reason": "deadline",
+        "deadline_decision": decision,
+        "deadline_remaining_ms": deadline.remaining_ms() if deadline else None,
+        "tokens": {"input": 0, "output": 0},
+        "cost_usd": 0.0,
+        "cost_cents": 0.0,
+        "duration_ms": 0,
+    }
+    return {
+        "messages": [AIMessage(content=specialist_response)],
+        "final_response": specialist_response,
+        "agent_data": {"brand_voice": brand_data},
+        "next_agent": "END",
+    }
+
+
+def _guardrail_blocks(prepared: dict[str, Any]) -> bool:
+    """Whether the simulated guardrail will block the served variation's output."""
+    return prepared["guardrail_violation"] is not None and prepared["guardrail_enabled"]
+
+
+def _should_stream(state: AgentState, prepared: dict[str, Any]) -> bool:
+    """Stream tokens to the client unless the guardrail would block them.
+
+    Output from a variation the guardrail blocks must never reach the
+    customer, so that path runs unstreamed and only the self-healed response
+    is emitted (in one piece).
+    """
+    return bool(state.get("stream_tokens")) and not _guardrail_blocks(prepared)
+
+
+def _emit_text(text: str) -> None:
+    """Send brand voice text to the graph's custom stream (stream_workflow)."""
+    from langgraph.config import get_stream_writer
+
+    if text:
+        get_stream_writer()({"type": "token", "agent": "brand_voice", "content": text})
+
+
+def _emit_reset() -> None:
+    """Tell the client to discard the brand voice text streamed so far."""
+    from langgraph.config import get_stream_writer
+
+    get_stream_writer()({"type": "reset", "agent": "brand_voice"})
+
+
+def _emit_chunk(response: Any, chunk: Any, emitted: Optional[list[str]]) -> Any:
+    """Forward a streamed chunk to the client and merge it into the full response."""
+    if isinstance(chunk.content, str):
+        _emit_text(chunk.content)
+        if emitted is not None and chunk.content:
+            emitted.append(chunk.content)
+    return chunk if response is None else response + chunk
+
+
+def stream_customer_response(
+    model_invoker: Any, messages: list, emitted: Optional[list[str]] = None, **kwargs: Any
+) -> Any:
+    """Stream a customer-facing response to the client and return the merged message.
+
+    Args:
+        model_invoker: ModelInvoker of the responding agent
+        messages: Model messages
+        emitted: Optional list that collects the text sent to the client, so a
+            caller can tell whether a failed stream already reached it
+        **kwargs: Passed to the model call (e.g. a deadline ``timeout``)
+    """
+    response = None
+    for chunk in model_invoker.stream(messages, **kwargs):
+        response = _emit_chunk(response, chunk, emitted)
+    return response
+
+
+async def astream_customer_response(
+    model_invoker: Any, messages: list, emitted: Optional[list[str]] = None, **kwargs: Any
+) -> Any:
+    """Async variant of stream_customer_response."""
+    response = None
+    async for chunk in model_invoker.astream(messages, **kwargs):
+        response = _emit_chunk(response, chunk, emitted)
+    return response
+
+
+def _prepare_brand_voice(state: AgentState) -> dict[str, Any]:
+    """Resolve the brand AI Config and build the model messages."""
     # Get the specialist's raw response (last message)
     messages = state["messages"]
     specialist_response = messages[-1].content if messages else ""
@@ -129,9 +418,6 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
     # Get request_id from state for tracking
     request_id = state.get("request_id")
     
-    # Initialize agent_data early (may be populated during fallback)
-    agent_data = state.get("agent_data", {})
-    
     # Get LLM and messages from LaunchDarkly AI Config (with fallback)
     print(f"\n{'─'*80}")
     print(f"  BRAND VOICE AGENT: Crafting response")
@@ -141,27 +427,14 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
         default_temperature=0.7,  # Slightly creative for natural language
         default_config=DEFAULT_BRAND_AGENT_CONFIG,  # Fallback if LaunchDarkly unavailable
         override_guardrail_enabled=guardrail_enabled,  # Pass UI toggle
+        config_context=state.get("config_context"),
     )
     variation_name = ld_config.get("_variation", "unknown")
     model_id = ld_config.get("model", {}).get("name", "unknown")
     provider = ld_config.get("provider", "")
     print(f"  Brand Voice Agent pulled from LaunchDarkly — using {model_id}" + (f" ({provider})" if provider else ""))
     
-    # Variations that should trigger simulated guardrail intervention
-    GUARDRAIL_VARIATIONS = {
-        "llama-4-toxic-prompt": {
-            "policy_type": "Content Policy",
-            "filter_type": "MISCONDUCT",
-            "description": "The model generated content that violates health safety guidelines",
-        },
-        "llama-4-cost-cutting-prompt": {
-            "policy_type": "Topic Policy",
-            "filter_type": "OFF_TOPIC",
-            "description": "The model answered a question outside the bot's supported scope",
-        },
-    }
-    guardrail_violation = GUARDRAIL_VARIATIONS.get(variation_name)
-    should_simulate_guardrail = guardrail_violation is not None
+    guardrail_violation = _GUARDRAIL_VARIATIONS.get(variation_name)
     
     # Extract guardrail ID from custom parameters (if present)
     custom_params = ld_config.get("_custom", {}) or ld_config.get("model", {}).get("custom", {})
@@ -180,30 +453,48 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
         "original_query": original_query,
         "query_type": str(query_type),
         "specialist_response": specialist_response,
+        **conversation_vars(state),
     }
     langchain_messages = ld_client.build_langchain_messages(ld_config, context_vars)
 
-    # Track start time for duration measurement
-    import time
-    start_time = time.time()
-    
-    response = model_invoker.invoke(langchain_messages)
-    
-    # Calculate duration
-    duration_ms = int((time.time() - start_time) * 1000)
+    return {
+        "specialist_response": specialist_response,
+        "user_context": user_context,
+        "customer_name": customer_name,
+        "query_type": query_type,
+        "original_query": original_query,
+        "guardrail_enabled": guardrail_enabled,
+        "request_id": request_id,
+        "model_invoker": model_invoker,
+        "variation_name": variation_name,
+        "model_id": model_id,
+        "guardrail_violation": guardrail_violation,
+        "guardrail_id": guardrail_id,
+        "context_vars": context_vars,
+        "messages": langchain_messages,
+    }
+
+
+def _apply_guardrail(prepared: dict[str, Any], response: Any, duration_ms: int) -> dict[str, Any]:
+    """Apply the simulated guardrail and self-heal with a fallback variation if it intervenes."""
+    user_context = prepared["user_context"]
+    guardrail_enabled = prepared["guardrail_enabled"]
+    request_id = prepared["request_id"]
+    variation_name = prepared["variation_name"]
+    guardrail_violation = prepared["guardrail_violation"]
+    should_simulate_guardrail = guardrail_violation is not None
+    guardrail_id = prepared["guardrail_id"]
+    context_vars = prepared["context_vars"]
+
+    # Fallback metadata merged into agent_data for observability
+    fallback_metadata: dict[str, Any] = {}
 
     # Extract token usage and TTFT if available
-    tokens = {"input": 0, "output": 0}
+    tokens = token_usage_from_response(response)
     ttft_ms = None
     guardrail_action = None
     guardrail_trace = None
     
-    if hasattr(response, "usage_metadata") and response.usage_metadata:
-        tokens = {
-            "input": response.usage_metadata.get("input_tokens", 0),
-            "output": response.usage_metadata.get("output_tokens", 0)
-        }
-    
     # Extract Time to First Token (TTFT) from response metadata
     if hasattr(response, "response_metadata") and isinstance(response.response_metadata, dict):
         ttft_ms = response.response_metadata.get("ttft_ms")
@@ -273,7 +564,7 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
             fallback_variation = fallback_ld_config.get("_variation", "unknown")
             
             # Safety check: Ensure we didn't get a blocked variation again
-            if fallback_variation in GUARDRAIL_VARIATIONS:
+            if fallback_variation in _GUARDRAIL_VARIATIONS:
                 raise ValueError(
                     f"Fallback targeting failed: Still received blocked variation '{fallback_variation}'. "
                     f"Check LaunchDarkly targeting rules - 'is_fallback' rule must be FIRST."
@@ -310,9 +601,9 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
                 ttft_ms = fallback_response.response_metadata.get("ttft_ms")
             
             # Store fallback metadata in agent_data for observability
-            agent_data["guardrail_intervention"] = True
-            agent_data["fallback_variation"] = fallback_variation
-            agent_data["blocked_variation"] = variation_name
+            fallback_metadata["guardrail_intervention"] = True
+            fallback_metadata["fallback_variation"] = fallback_variation
+            fallback_metadata["blocked_variation"] = variation_name
             
             # IMPORTANT: Update user_context to fallback_context so is_fallback=True flows to evaluation
             user_context = fallback_context
@@ -320,102 +611,129 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
             print(f"{'='*80}\n")
             
         except Exception as e:
-            # If LaunchDarkly fallback fails, use hardcoded default as last resort
-            print(f"  LaunchDarkly fallback strategy failed: {e}")
-            print(f"  Possible causes:")
-            print(f"      LaunchDarkly unavailable")
-            print(f"      'is_fallback' targeting rule not configured")
-            print(f"      'is_fallback' rule not first in targeting order")
-            print(f"")
-            print(f"  Falling back to hardcoded safe default as last resort...")
-            print(f"{'='*80}\n")
+            if is_overload_error(e):
+                # Another model call would only add load; answer with the safe message
+                print(f"  LaunchDarkly fallback failed because Bedrock is overloaded: {e}")
+                print("  Skipping the hardcoded fallback model, using generic safe message.")
+                print(f"{'='*80}\n")
+                final_response = SAFE_FALLBACK_MESSAGE
+                user_context = fallback_context
+            else:
+                # If LaunchDarkly fallback fails, use hardcoded default as last resort
+                print(f"  LaunchDarkly fallback strategy failed: {e}")
+                print(f"  Possible causes:")
+                print(f"      LaunchDarkly unavailable")
+                print(f"      'is_fallback' targeting rule not configured")
+                print(f"      'is_fallback' rule not first in targeting order")
+                print(f"")
+                print(f"  Falling back to hardcoded safe default as last resort...")
+                print(f"{'='*80}\n")
             
-            try:
-                from ..utils.bedrock_llm import BedrockConverseLLM, get_bedrock_model_id
-                import os
+                try:
+                    from ..utils.bedrock_llm import BedrockConverseLLM, get_bedrock_model_id
+                    import os
                 
-                # Use safe hardcoded defaults
-                default_model = "us.anthropic.claude-haiku-4-5-20251001-v1:0"
-                default_temp = 0.7
-                default_max_tokens = 2000
+                    # Use safe hardcoded defaults
+                    default_model = "us.anthropic.claude-haiku-4-5-20251001-v1:0"
+                    default_temp = 0.7
+                    default_max_tokens = 2000
                 
-                # Create Bedrock LLM with default settings
-                model_id = get_bedrock_model_id(default_model)
-                region = os.getenv("AWS_REGION", "us-east-1")
-                profile = os.getenv("AWS_PROFILE")
+                    # Create Bedrock LLM with default settings
+                    model_id = get_bedrock_model_id(default_model)
+                    region = os.getenv("AWS_REGION", "us-east-1")
+                    profile = os.getenv("AWS_PROFILE")
                 
-                fallback_llm = BedrockConverseLLM(
-                    model_id=model_id,
-                    temperature=default_temp,
-                    max_tokens=default_max_tokens,
-                    region=region,
-                    profile_name=profile,
-                )
+                    fallback_llm = BedrockConverseLLM(
+                        model_id=model_id,
+                        temperature=default_temp,
+                        max_tokens=default_max_tokens,
+                        region=region,
+                        profile_name=profile,
+                    )
                 
-                # Build messages from hardcoded default config
-                fallback_messages = []
-                for msg in DEFAULT_BRAND_AGENT_CONFIG.messages:
-                    content = msg.content
-                    # Replace template variables
-                    for key, value in context_vars.items():
-                        content = content.replace(f"{{{key}}}", str(value))
+                    # Build messages from hardcoded default config
+                    fallback_messages = []
+                    for msg in DEFAULT_BRAND_AGENT_CONFIG.messages:
+                        content = msg.content
+                        # Replace template variables
+                        for key, value in context_vars.items():
+                            content = content.replace(f"{{{key}}}", str(value))
                     
-                    if msg.role == "system":
-                        fallback_messages.append(SystemMessage(content=content))
-                    else:
-                        fallback_messages.append(HumanMessage(content=content))
+                        if msg.role == "system":
+                            fallback_messages.append(SystemMessage(content=content))
+                        else:
+                            fallback_messages.append(HumanMessage(content=content))
                 
-                # Invoke with hardcoded default
-                fallback_start = time.time()
-                fallback_response = fallback_llm.invoke(fallback_messages)
-                fallback_duration = int((time.time() - fallback_start) * 1000)
+                    # Invoke with hardcoded default
+                    fallback_start = time.time()
+                    fallback_response = fallback_llm.invoke(fallback_messages)
+                    fallback_duration = int((time.time() - fallback_start) * 1000)
                 
-                final_response = fallback_response.content
-                print(f"  Hardcoded fallback succeeded.")
-                print(f"  Duration: {fallback_duration}ms")
+                    final_response = fallback_response.content
+                    print(f"  Hardcoded fallback succeeded.")
+                    print(f"  Duration: {fallback_duration}ms")
                 
-                # Update tokens and duration
-                if hasattr(fallback_response, "usage_metadata") and fallback_response.usage_metadata:
-                    tokens = {
-                        "input": fallback_response.usage_metadata.get("input_tokens", 0),
-                        "output": fallback_response.usage_metadata.get("output_tokens", 0)
-                    }
-                duration_ms = fallback_duration
+                    # Update tokens and duration
+                    if hasattr(fallback_response, "usage_metadata") and fallback_response.usage_metadata:
+                        tokens = {
+                            "input": fallback_response.usage_metadata.get("input_tokens", 0),
+                            "output": fallback_response.usage_metadata.get("output_tokens", 0)
+                        }
+                    duration_ms = fallback_duration
                 
-                if hasattr(fallback_response, "response_metadata") and isinstance(fallback_response.response_metadata, dict):
-                    ttft_ms = fallback_response.response_metadata.get("ttft_ms")
+                    if hasattr(fallback_response, "response_metadata") and isinstance(fallback_response.response_metadata, dict):
+                        ttft_ms = fallback_response.response_metadata.get("ttft_ms")
                 
-                # IMPORTANT: Update user_context to fallback_context so is_fallback=True flows to evaluation
-                user_context = fallback_context
+                    # IMPORTANT: Update user_context to fallback_context so is_fallback=True flows to evaluation
+                    user_context = fallback_context
                 
-                print(f"{'='*80}\n")
+                    print(f"{'='*80}\n")
                 
-            except Exception as e2:
-                print(f"  Hardcoded fallback also failed: {e2}")
-                print(f"  Using generic safe message.")
-                print(f"{'='*80}\n")
-                final_response = "I apologize, but I'm unable to provide a response at this time. Please contact our support team for assistance."
+                except Exception as e2:
+                    print(f"  Hardcoded fallback also failed: {e2}")
+                    print(f"  Using generic safe message.")
+                    print(f"{'='*80}\n")
+                    final_response = SAFE_FALLBACK_MESSAGE
                 
-                # IMPORTANT: Update user_context to fallback_context so is_fallback=True flows to evaluation
-                user_context = fallback_context
+                    # IMPORTANT: Update user_context to fallback_context so is_fallback=True flows to evaluation
+                    user_context = fallback_context
     else:
         # No guardrail intervention, use original response
         final_response = response.content
-    
+
+    return {
+        "final_response": final_response,
+        "user_context": user_context,
+        "tokens": tokens,
+        "ttft_ms": ttft_ms,
+        "duration_ms": duration_ms,
+        "guardrail_action": guardrail_action,
+        "guardrail_trace": guardrail_trace,
+        "fallback_metadata": fallback_metadata,
+    }
+
+
+def _finish_brand_voice(state: AgentState, prepared: dict[str, Any], outcome: dict[str, Any]) -> dict[str, Any]:
+    """Track cost, start background evaluation and build the final state updates."""
+    specialist_response = prepared["specialist_response"]
+    customer_name = prepared["customer_name"]
+    query_type = prepared["query_type"]
+    original_query = prepared["original_query"]
+    model_invoker = prepared["model_invoker"]
+    model_id = prepared["model_id"]
+    final_response = outcome["final_response"]
+    user_context = outcome["user_context"]
+    tokens = outcome["tokens"]
+    ttft_ms = outcome["ttft_ms"]
+    duration_ms = outcome["duration_ms"]
+    guardrail_action = outcome["guardrail_action"]
+    guardrail_trace = outcome["guardrail_trace"]
+
     # Start async evaluation without blocking (fire-and-forget)
     # This evaluates GLOBAL SYSTEM ACCURACY against RAG documents
     try:
-        # Get RAG documents from agent_data (stored by specialist)
-        agent_data = state.get("agent_data", {})
-        rag_documents = []
-        
-        # Extract RAG docs from whichever specialist ran
-        for specialist in ["policy_specialist", "provider_specialist"]:
-            if specialist in agent_data:
-                rag_docs = agent_data[specialist].get("rag_documents", [])
-                if rag_docs:
-                    rag_documents = rag_docs
-                    break
+        # Get RAG documents from whichever specialist ran (request store)
+        rag_documents = get_rag_documents(state)
         
         # Get request_id and results_store from state for evaluation tracking
         request_id = state.get("request_id")
@@ -432,72 +750,32 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
         brand_cost_usd = calculate_model_cost(
             model_id=model_id,
             input_tokens=tokens["input"],
-            output_tokens=tokens["output"]
+            output_tokens=tokens["output"],
+            cache_read_tokens=tokens.get("cache_read", 0),
+            cache_write_tokens=tokens.get("cache_write", 0),
         )
         
         # Convert to cents for better precision in LaunchDarkly metrics
         # Round to 2 decimal places (LaunchDarkly only accepts 2 decimal places)
         brand_cost_cents = round(brand_cost_usd * 100.0, 2)
         
-        # Send cost metric to LaunchDarkly (in cents, rounded to 2 decimal places)
+        # Send cost metric to LaunchDarkly (in cents, rounded to 2 decimal places; queued, sent by the metrics emitter)
         try:
-            from ldclient import Context
-            ld_client = ldclient.get()
-            
-            # Build context from user_context
-            user_key = user_context.get("user_key", "anonymous")
-            context_builder = Context.builder(user_key).kind("user")
-            if user_context.get("name"):
-                context_builder.set("name", user_context["name"])
-            ld_context = context_builder.build()
-            
-            # Send cost metric in cents (rounded to 2 decimal places)
-            ld_client.track(
-                event_name="$ld:ai:tokens:costmanual",
-                context=ld_context,
-                metric_value=float(brand_cost_cents)
-            )
+            get_metrics_emitter().track("$ld:ai:tokens:costmanual", user_context, metric_value=float(brand_cost_cents))
             
             print(f"  Brand agent cost: {brand_cost_cents:.2f}¢ (${brand_cost_usd:.6f}) [in={tokens['input']}, out={tokens['output']}, model={model_id.split(':')[0].split('.')[-1]}]")
         except Exception as e:
             print(f"  Failed to send cost metric: {e}")
         
-        # Handle both sync and async contexts
-        try:
-            # Try to get the current event loop
-            loop = asyncio.get_running_loop()
-            # If we have a running loop, use create_task
-            asyncio.create_task(
-                evaluate_brand_voice_async(
-                    original_query=original_query,
-                    rag_documents=rag_documents,
-                    brand_voice_output=final_response,
-                    user_context=user_context,
-                    brand_tracker=model_invoker,  # Pass full ModelInvoker (contains tracker + context)
-                    request_id=request_id,
-                    results_store=results_store
-                )
-            )
-        except RuntimeError:
-            # No running loop - we're in a sync context
-            # Run evaluation in a background thread to avoid blocking
-            import threading
-            
-            def run_eval_in_thread():
-                asyncio.run(
-                    evaluate_brand_voice_async(
-                        original_query=original_query,
-                        rag_documents=rag_documents,
-                        brand_voice_output=final_response,
-                        user_context=user_context,
-                        brand_tracker=model_invoker,  # Pass full ModelInvoker (contains tracker + context)
-                        request_id=request_id,
-                        results_store=results_store
-                    )
-                )
-            
-            thread = threading.Thread(target=run_eval_in_thread, daemon=True)
-            thread.start()
+        _start_background_evaluation(
+            original_query=original_query,
+            rag_documents=rag_documents,
+            brand_voice_output=final_response,
+            user_context=user_context,
+            brand_tracker=model_invoker,  # Pass full ModelInvoker (contains tracker + context)
+            request_id=request_id,
+            results_store=results_store
+        )
         
         print(f"  Background evaluation started (evaluating against {len(rag_documents)} RAG documents) - request_id: {request_id[:8] if request_id else 'N/A'}...")
     except Exception as e:
@@ -532,9 +810,12 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
         } if guardrail_action == "GUARDRAIL_INTERVENED" else None,
     }
 
-    # Update agent_data
-    updated_agent_data = state.get("agent_data", {}).copy()
-    updated_agent_data["brand_voice"] = brand_data
+    if not guardrail_action:
+        with _TWO_HOP_BASELINE_LOCK:
+            _TWO_HOP_BASELINE.append((tokens["input"], tokens["output"], duration_ms))
+
+    # agent_data entries to merge into the state
+    updated_agent_data = {**outcome["fallback_metadata"], "brand_voice": brand_data}
 
     # Create the final customer message
     final_message = AIMessage(content=final_response)
@@ -545,3 +826,193 @@ def brand_voice_node(state: AgentState) -> dict[str, Any]:
         "agent_data": updated_agent_data,
         "next_agent": "END",
     }
+
+
+def fused_brand_voice_enabled(ld_config: dict[str, Any], state: AgentState) -> bool:
+    """Whether a specialist should answer in brand voice itself (skipping brand_voice).
+
+    Selected per variation with the ``fuse_brand_voice`` custom parameter on the
+    specialist's AI Config. Never used in evaluation mode, which needs the
+    specialist and brand agent outputs separately.
+    """
+    if state.get("evaluate_agent"):
+        return False
+    custom_params = ld_config.get("_custom", {}) or ld_config.get("model", {}).get("custom", {})
+    value = (custom_params or {}).get("fuse_brand_voice", False)
+    if isinstance(value, str):
+        return value.lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+def fused_brand_voice_instructions(state: AgentState) -> str:
+    """Brand voice instructions to append to a fused specialist prompt."""
+    user_context = state.get("user_context", {})
+    return FUSED_BRAND_VOICE_INSTRUCTIONS.format(
+        customer_name=user_context.get("name", "there"),
+        query_type=str(state.get("query_type", "unknown")),
+    )
+
+
+def _approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for savings estimates."""
+    return len(text) // 4
+
+
+def _estimate_fusion_savings(
+    instructions: str,
+    response_text: str,
+    tokens: dict[str, int],
+    duration_ms: int,
+) -> dict[str, Any]:
+    """Estimate what the skipped brand voice hop would have cost.
+
+    Uses the rolling mean of recent two-hop brand voice calls when there are
+    any; otherwise estimates the hop from the default brand prompt plus the
+    answer (as its input) and the fused answer (as its output).
+    """
+    with _TWO_HOP_BASELINE_LOCK:
+        baseline = list(_TWO_HOP_BASELINE)
+
+    if baseline:
+        basis = "rolling_two_hop_mean"
+        hop_input = int(sum(b[0] for b in baseline) / len(baseline))
+        hop_output = int(sum(b[1] for b in baseline) / len(baseline))
+        hop_ms = int(sum(b[2] for b in baseline) / len(baseline))
+    else:
+        basis = "estimate"
+        hop_input = _approx_tokens(DEFAULT_BRAND_VOICE_SYSTEM_PROMPT) + _approx_tokens(response_text)
+        hop_output = tokens["output"] or _approx_tokens(response_text)
+        hop_ms = duration_ms
+
+    # The brand instructions now ride along in the specialist call
+    added_input = _approx_tokens(instructions)
+    return {
+        "basis": basis,
+        "llm_calls_saved": 1,
+        "duration_ms_saved": hop_ms,
+        "tokens_saved": {"input": max(0, hop_input - added_input), "output": hop_output},
+        "added_input_tokens": added_input,
+        "total_tokens_saved": max(0, hop_input + hop_output - added_input),
+    }
+
+
+def finish_fused_brand_voice(
+    state: AgentState,
+    specialist: str,
+    model_invoker: Any,
+    model_id: str,
+    response_text: str,
+    rag_documents: list[dict[str, Any]],
+    tokens: dict[str, int],
+    ttft_ms: Any,
+    duration_ms: int,
+    instructions: str,
+) -> dict[str, Any]:
+    """Brand voice bookkeeping for a specialist that answered in fused mode.
+
+    Stores the specialist's model invoker for feedback, starts the background
+    evaluation and builds the ``brand_voice`` agent_data entry (including the
+    estimated savings), exactly as brand_voice_node would for its own call.
+
+    Args:
+        state: Current agent state
+        specialist: Name of the specialist that produced the answer
+        model_invoker: The specialist's ModelInvoker (tracks feedback)
+        model_id: Model used by the fused call
+        response_text: The customer-facing answer
+        rag_documents: Documents the answer was grounded on
+        tokens: Token usage of the fused call
+        ttft_ms: Time to first token of the fused call
+        duration_ms: Duration of the fused call
+        instructions: Brand voice instructions added to the specialist prompt
+
+    Returns:
+        The ``brand_voice`` agent_data entry
+    """
+    user_context = state.get("user_context", {})
+    request_id = state.get("request_id")
+    original_query = ""
+    for msg in state["messages"]:
+        if isinstance(msg, HumanMessage):
+            original_query = msg.content
+            break
+
+    try:
+        trackers_store = state.get("brand_trackers_store")
+        if request_id and trackers_store is not None:
+            trackers_store[request_id] = model_invoker
+        _start_background_evaluation(
+            original_query=original_query,
+            rag_documents=rag_documents,
+            brand_voice_output=response_text,
+            user_context=user_context,
+            brand_tracker=model_invoker,
+            request_id=request_id,
+            results_store=state.get("evaluation_results_store"),
+        )
+        print(f"  Background evaluation started (evaluating against {len(rag_documents)} RAG documents) - request_id: {request_id[:8] if request_id else 'N/A'}...")
+    except Exception as e:
+        # Never let evaluation errors affect the main flow
+        print(f"  Failed to start background evaluation: {e}")
+
+    savings = _estimate_fusion_savings(instructions, response_text, tokens, duration_ms)
+    print(f"  Fused brand voice: skipped brand hop (~{savings['duration_ms_saved']}ms, ~{savings['total_tokens_saved']} tokens saved, {savings['basis']})")
+
+    return {
+        "model": model_id,
+        "response": response_text,
+        "final_customer_response": response_text[:500] + "..." if len(response_text) > 500 else response_text,
+        "brand_voice_applied": True,
+        "fused": True,
+        "fused_with": specialist,
+        "tokens": {"input": 0, "output": 0},  # No separate brand voice call
+        "cost_usd": 0.0,
+        "cost_cents": 0.0,
+        "ttft_ms": ttft_ms,
+        "duration_ms": 0,
+        "fusion_savings": savings,
+        "personalization": {
+            "customer_name": user_context.get("name", "there"),
+            "query_type": str(state.get("query_type", "unknown")),
+        },
+        "guardrail": None,
+        "self_healing": None,
+    }
+
+
+def _start_background_evaluation(**kwargs: Any) -> None:
+    """Run the brand voice evaluation without blocking the response.
+
+    Scheduled on the running event loop when called from async code, otherwise
+    run on a daemon thread with its own loop.
+    """
+    try:
+        # If we have a running loop, use create_task
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No running loop - we're in a sync context
+        # Run evaluation in a background thread to avoid blocking
+        thread = threading.Thread(
+            target=lambda: asyncio.run(evaluate_brand_voice_async(**kwargs)),
+            daemon=True,
+        )
+        thread.start()
+        return
+
+    task = loop.create_task(evaluate_brand_voice_async(**kwargs))
+    _background_evaluations.add(task)
+    task.add_done_callback(_background_evaluations.discard)
+
+
+async def wait_for_background_evaluations(timeout: float | None = None) -> None:
+    """Wait for evaluations scheduled on the current event loop to finish.
+
+    Useful for short-lived async callers (scripts, tests) that would otherwise
+    exit before fire-and-forget evaluations complete.
+
+    Args:
+        timeout: Maximum seconds to wait (None waits indefinitely)
+    """
+    pending = [t for t in _background_evaluations if t.get_loop() is asyncio.get_running_loop()]
+    if pending:
+        await asyncio.wait(pending, timeout=timeout)
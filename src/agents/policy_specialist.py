@@ -1,14 +1,48 @@
 """Policy specialist agent for answering policy-related questions."""
 
 import json
+import time
 from typing import Any
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
-from ..graph.state import AgentState
-from ..tools.bedrock_rag import retrieve_policy_documents
-from ..utils.llm_config import get_model_invoker
+from ..graph.session import cache_session_documents, cached_session_documents, conversation_vars
+from ..graph.state import AgentState, store_rag_documents
+from ..tools.bedrock_rag import aretrieve_policy_documents, resolve_kb_id, retrieve_policy_documents
+from ..tools.rag_prefetch import policy_prefetch_key
+from ..utils.bedrock_llm import add_cache_point
+from ..utils.config_context import ConfigContext
+from ..utils.llm_config import get_model_invoker, token_usage_from_response
+from ..utils.deadline import check_deadline, model_call_budget, retrieval_timeout
 from ..utils.launchdarkly_config import get_ld_client
+from ..utils.metrics_emitter import get_metrics_emitter
+from ..utils.prompt_budget import assemble_prompt, prompt_budget_tokens, prompt_template_text, record_prompt_budget
+from .brand_voice_agent import (
+    astream_customer_response,
+    finish_fused_brand_voice,
+    fused_brand_voice_enabled,
+    fused_brand_voice_instructions,
+    stream_customer_response,
+)
+
+# User context the policy agent needs, most important first (the rest of the profile is left out)
+POLICY_CONTEXT_KEYS = [
+    "policy_id",
+    "coverage_type",
+    "plan_tier",
+    "network",
+    "network_type",
+    "policy_status",
+    "name",
+    "renewal_date",
+    "member_since",
+    "family_size",
+    "has_dependents",
+    "primary_care_assigned",
+    "has_chronic_conditions",
+    "state",
+    "preferred_language",
+]
 
 
 def policy_specialist_node(state: AgentState) -> dict[str, Any]:
@@ -23,6 +57,90 @@ def policy_specialist_node(state: AgentState) -> dict[str, Any]:
     Returns:
         Updated state with agent response
     """
+    request = _resolve_policy_request(state)
+    deadline = state.get("deadline")
+
+    # Retrieve from Bedrock Knowledge Base via RAG (ONLY source),
+    # reusing the speculative prefetch when it ran with the same arguments
+    rag_documents = cached_session_documents(state, "policy", _session_key(request), request["query"])
+    prefetch = state.get("rag_prefetch")
+    if prefetch is not None and rag_documents is None:
+        rag_documents = prefetch.take(
+            "policy", _prefetch_key(request), timeout=retrieval_timeout(deadline, "policy_specialist")
+        )
+    if rag_documents is None:
+        rag_documents = retrieve_policy_documents(
+            request["query"],
+            request["policy_id"],
+            ld_config=request["ld_config"],
+            domain=request["domain"],
+            timeout=retrieval_timeout(deadline, "policy_specialist"),
+        )
+    if not rag_documents:
+        check_deadline(deadline, "policy_specialist retrieval")
+    cache_session_documents(state, "policy", _session_key(request), request["query"], rag_documents)
+    prepared = _prepare_policy_invocation(request, rag_documents)
+    call_kwargs = model_call_budget(deadline, prepared["model_invoker"].model, "policy_specialist")
+
+    # Track start time for duration measurement
+    start_time = time.time()
+    
+    if prepared["fusion_instructions"] and state.get("stream_tokens"):
+        # Fused mode: this answer goes straight to the customer
+        response = stream_customer_response(prepared["model_invoker"], prepared["messages"], **call_kwargs)
+    else:
+        response = prepared["model_invoker"].invoke(prepared["messages"], **call_kwargs)
+    
+    # Calculate duration
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    return _finish_policy(state, prepared, response, duration_ms)
+
+
+async def apolicy_specialist_node(state: AgentState) -> dict[str, Any]:
+    """Async policy specialist agent node (same behavior as ``policy_specialist_node``).
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Updated state with agent response
+    """
+    request = _resolve_policy_request(state)
+    deadline = state.get("deadline")
+
+    rag_documents = cached_session_documents(state, "policy", _session_key(request), request["query"])
+    prefetch = state.get("rag_prefetch")
+    if prefetch is not None and rag_documents is None:
+        rag_documents = await prefetch.atake(
+            "policy", _prefetch_key(request), timeout=retrieval_timeout(deadline, "policy_specialist")
+        )
+    if rag_documents is None:
+        rag_documents = await aretrieve_policy_documents(
+            request["query"],
+            request["policy_id"],
+            ld_config=request["ld_config"],
+            domain=request["domain"],
+            timeout=retrieval_timeout(deadline, "policy_specialist"),
+        )
+    if not rag_documents:
+        check_deadline(deadline, "policy_specialist retrieval")
+    cache_session_documents(state, "policy", _session_key(request), request["query"], rag_documents)
+    prepared = _prepare_policy_invocation(request, rag_documents)
+    call_kwargs = model_call_budget(deadline, prepared["model_invoker"].model, "policy_specialist")
+
+    start_time = time.time()
+    if prepared["fusion_instructions"] and state.get("stream_tokens"):
+        response = await astream_customer_response(prepared["model_invoker"], prepared["messages"], **call_kwargs)
+    else:
+        response = await prepared["model_invoker"].ainvoke(prepared["messages"], **call_kwargs)
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    return _finish_policy(state, prepared, response, duration_ms)
+
+
+def _resolve_policy_request(state: AgentState) -> dict[str, Any]:
+    """Extract the query and resolve the policy AI Config (for the KB ID)."""
     # Get the original user query
     messages = state["messages"]
     user_message = None
@@ -45,16 +163,48 @@ def policy_specialist_node(state: AgentState) -> dict[str, Any]:
     # Get LaunchDarkly config (including messages and KB ID)
     print(f"\n{'─'*80}")
     print(f"  POLICY SPECIALIST: Retrieving policy information")
-    ld_client = get_ld_client()
-    ld_config, _, _ = ld_client.get_ai_config("policy_agent", user_context)
+    # Resolved once per request: the model invocation below reuses this config
+    config_context = state.get("config_context") or ConfigContext()
+    ld_config = config_context.resolve("policy_agent", user_context).config
     model_id = ld_config.get("model", {}).get("name", "unknown")
     provider = ld_config.get("provider", "")
     print(f"  Policy Agent pulled from LaunchDarkly — using {model_id}" + (f" ({provider})" if provider else ""))
+    fusion_instructions = None
+    if fused_brand_voice_enabled(ld_config, state):
+        fusion_instructions = fused_brand_voice_instructions(state)
+        print("  Fused brand voice mode: answering the customer directly")
     print(f"{'─'*80}")
-    
-    # Retrieve from Bedrock Knowledge Base via RAG (ONLY source)
-    domain = user_context.get("domain")
-    rag_documents = retrieve_policy_documents(query, policy_id, ld_config=ld_config, domain=domain)
+
+    return {
+        "query": query,
+        "user_context": user_context,
+        "policy_id": policy_id,
+        "coverage_type": coverage_type,
+        "ld_config": ld_config,
+        "domain": user_context.get("domain"),
+        "fusion_instructions": fusion_instructions,
+        "conversation_vars": conversation_vars(state),
+        "config_context": config_context,
+    }
+
+
+def _prefetch_key(request: dict[str, Any]) -> tuple:
+    """Key a speculative policy retrieval must match to be reused."""
+    return policy_prefetch_key(request["query"], request["policy_id"], request["ld_config"], request["domain"])
+
+
+def _session_key(request: dict[str, Any]) -> tuple:
+    """Scope a policy retrieval is cached under in the conversation session (the plan, not the question)."""
+    return (request["policy_id"], request["domain"], resolve_kb_id("policy", request["ld_config"], request["domain"]))
+
+
+def _prepare_policy_invocation(request: dict[str, Any], rag_documents: list[dict[str, Any]]) -> dict[str, Any]:
+    """Format retrieved documents and build the model messages."""
+    query = request["query"]
+    user_context = request["user_context"]
+    policy_id = request["policy_id"]
+    coverage_type = request["coverage_type"]
+    ld_client = get_ld_client()
 
     # Format RAG documents from Bedrock Knowledge Base
     if not rag_documents:
@@ -68,23 +218,39 @@ def policy_specialist_node(state: AgentState) -> dict[str, Any]:
             f"  3. The KB is not properly configured"
         )
     
-    print(f"  Retrieved {len(rag_documents)} policy documents from Bedrock KB")
-    policy_info_str = "\n\n=== POLICY DOCUMENTATION (from Bedrock Knowledge Base) ===\n"
-    for i, doc in enumerate(rag_documents, 1):
-        score = doc.get("score", 0.0)
-        content = doc.get("content", "")
-        print(f"    Doc {i}: Score {score:.3f}, Length {len(content)} chars")
-        policy_info_str += f"\n[Document {i} - Relevance: {score:.2f}]\n{content}\n"
-
     # Get LLM and messages from LaunchDarkly AI Config
     model_invoker, ld_config = get_model_invoker(
         config_key="policy_agent",
         context=user_context,
         default_temperature=0.7,
+        config_context=request["config_context"],
     )
     
     # Extract model ID from config for tracking
     model_id = ld_config.get("model", {}).get("name", "unknown")
+
+    # Fill the prompt budget: instructions and query, best documents, then the context the agent needs
+    assembled = assemble_prompt(
+        prompt_budget_tokens(ld_config),
+        required=[
+            prompt_template_text(ld_config),
+            query,
+            request["conversation_vars"].get("conversation_history", ""),
+            request["fusion_instructions"] or "",
+        ],
+        documents=rag_documents,
+        context={**user_context, "policy_id": policy_id, "coverage_type": coverage_type},
+        context_keys=POLICY_CONTEXT_KEYS,
+    )
+    record_prompt_budget(assembled, "Policy specialist")
+
+    print(f"  Retrieved {len(rag_documents)} policy documents from Bedrock KB")
+    policy_info_str = "\n\n=== POLICY DOCUMENTATION (from Bedrock Knowledge Base) ===\n"
+    for i, doc in enumerate(assembled.documents, 1):
+        score = doc.get("score", 0.0)
+        content = doc.get("content", "")
+        print(f"    Doc {i}: Score {score:.3f}, Length {len(content)} chars")
+        policy_info_str += f"\n[Document {i} - Relevance: {score:.2f}]\n{content}\n"
     
     # Build LangChain messages from LaunchDarkly config (supports both agent-based and completion-based)
     context_vars = {
@@ -93,31 +259,47 @@ def policy_specialist_node(state: AgentState) -> dict[str, Any]:
         "policy_id": policy_id or "Not provided",
         "coverage_type": coverage_type,
         "policy_info": policy_info_str,
+        **request["conversation_vars"],
     }
-    langchain_messages = ld_client.build_langchain_messages(ld_config, context_vars)
+    langchain_messages = ld_client.build_langchain_messages(
+        ld_config, context_vars, context_keys=assembled.context_keys
+    )
 
     if langchain_messages and policy_info_str:
         langchain_messages[0].content += f"\n\n{policy_info_str}"
+        # Instructions + plan documents form a cacheable prefix on repeat prompts
+        add_cache_point(langchain_messages[0])
+    if langchain_messages and request["fusion_instructions"]:
+        langchain_messages[0].content += f"\n\n{request['fusion_instructions']}"
+
+    return {
+        **request,
+        # Documents the model actually saw (what its answer is evaluated against)
+        "rag_documents": assembled.documents,
+        "rag_documents_retrieved": len(rag_documents),
+        "model_invoker": model_invoker,
+        "model_id": model_id,
+        "messages": langchain_messages,
+    }
+
+
+def _finish_policy(
+    state: AgentState,
+    prepared: dict[str, Any],
+    response: Any,
+    duration_ms: int,
+) -> dict[str, Any]:
+    """Track cost/duration metrics and build the policy state updates."""
+    query = prepared["query"]
+    user_context = prepared["user_context"]
+    policy_id = prepared["policy_id"]
+    rag_documents = prepared["rag_documents"]
+    model_id = prepared["model_id"]
 
-    # Track start time for duration measurement
-    import time
-    start_time = time.time()
-    
-    response = model_invoker.invoke(langchain_messages)
-    
-    # Calculate duration
-    duration_ms = int((time.time() - start_time) * 1000)
-    
     # Extract token usage and TTFT if available
-    tokens = {"input": 0, "output": 0}
+    tokens = token_usage_from_response(response)
     ttft_ms = None
     
-    if hasattr(response, "usage_metadata") and response.usage_metadata:
-        tokens = {
-            "input": response.usage_metadata.get("input_tokens", 0),
-            "output": response.usage_metadata.get("output_tokens", 0)
-        }
-    
     # Extract Time to First Token (TTFT) from response metadata
     if hasattr(response, "response_metadata") and isinstance(response.response_metadata, dict):
         ttft_ms = response.response_metadata.get("ttft_ms")
@@ -126,42 +308,27 @@ def policy_specialist_node(state: AgentState) -> dict[str, Any]:
 
     # Calculate and send cost metric for policy agent
     from .brand_voice_agent import calculate_model_cost
-    import ldclient
-    from ldclient import Context
     import os
     import random
     
     policy_cost_usd = calculate_model_cost(
         model_id=model_id,
         input_tokens=tokens["input"],
-        output_tokens=tokens["output"]
+        output_tokens=tokens["output"],
+        cache_read_tokens=tokens.get("cache_read", 0),
+        cache_write_tokens=tokens.get("cache_write", 0),
     )
     policy_cost_cents = round(policy_cost_usd * 100.0, 2)
     
-    # Send cost and duration metrics to LaunchDarkly
+    # Send cost and duration metrics to LaunchDarkly (queued, sent by the metrics emitter)
     try:
-        ld_client_raw = ldclient.get()
-        
-        # Build context from user_context
-        user_key = user_context.get("user_key", "anonymous")
-        context_builder = Context.builder(user_key).kind("user")
-        if user_context.get("name"):
-            context_builder.set("name", user_context["name"])
-        ld_context = context_builder.build()
+        metrics = get_metrics_emitter()
         
         # Send cost metric in cents
-        ld_client_raw.track(
-            event_name="$ld:ai:tokens:costmanual",
-            context=ld_context,
-            metric_value=float(policy_cost_cents)
-        )
+        metrics.track("$ld:ai:tokens:costmanual", user_context, metric_value=float(policy_cost_cents))
         
         # Send duration metric in milliseconds (actual duration, no jitter)
-        ld_client_raw.track(
-            event_name="$ld:ai:duration:total",
-            context=ld_context,
-            metric_value=float(duration_ms)
-        )
+        metrics.track("$ld:ai:duration:total", user_context, metric_value=float(duration_ms))
         
         print(f"  Policy agent cost: {policy_cost_cents:.2f}¢ (${policy_cost_usd:.6f}) [in={tokens['input']}, out={tokens['output']}, model={model_id.split(':')[0].split('.')[-1]}]")
         print(f"  Policy agent duration: {duration_ms}ms")
@@ -170,25 +337,41 @@ def policy_specialist_node(state: AgentState) -> dict[str, Any]:
 
     # Update state
     updates: dict[str, Any] = {
-        "messages": messages + [AIMessage(content=response_text)],
+        "messages": [AIMessage(content=response_text)],
         "final_response": response_text,
         "next_agent": "END",
         "agent_data": {
-            **state.get("agent_data", {}),
             "policy_specialist": {
                 "model": model_id,  # Track which model was used
                 "source": "bedrock_kb_only",
                 "rag_enabled": True,
-                "rag_documents_retrieved": len(rag_documents),
-                "rag_documents": rag_documents,  # Store actual documents for evaluation
+                "rag_documents_retrieved": prepared["rag_documents_retrieved"],
+                "rag_documents_in_prompt": len(rag_documents),
+                "rag_documents_key": store_rag_documents(state, "policy_specialist", rag_documents),  # Documents for evaluation (request store)
                 "query": query,
                 "policy_id": policy_id,
                 "response": response_text,  # Store raw specialist output for debugging/testing
                 "tokens": tokens,
                 "ttft_ms": ttft_ms,  # Time to first token from Bedrock streaming
                 "duration_ms": duration_ms,  # Total time to generate response
+                "fused_brand_voice": bool(prepared["fusion_instructions"]),
             },
         },
     }
 
+    if prepared["fusion_instructions"]:
+        # The answer is already customer-facing; record brand voice here since its node is skipped
+        updates["agent_data"]["brand_voice"] = finish_fused_brand_voice(
+            state,
+            specialist="policy_specialist",
+            model_invoker=prepared["model_invoker"],
+            model_id=model_id,
+            response_text=response_text,
+            rag_documents=rag_documents,
+            tokens=tokens,
+            ttft_ms=ttft_ms,
+            duration_ms=duration_ms,
+            instructions=prepared["fusion_instructions"],
+        )
+
     return updates
@@ -1,13 +1,16 @@
 """Live agent scheduler specialist."""
 
 import json
+import time
 from typing import Any
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from ..graph.session import conversation_vars
 from ..graph.state import AgentState
 from ..tools.calendar import get_available_slots
-from ..utils.llm_config import get_model_invoker
+from ..utils.llm_config import get_model_invoker, token_usage_from_response
+from ..utils.deadline import model_call_budget
 from ..utils.launchdarkly_config import get_ld_client
 
 
@@ -23,6 +26,41 @@ def scheduler_specialist_node(state: AgentState) -> dict[str, Any]:
     Returns:
         Updated state with scheduling information
     """
+    prepared = _prepare_scheduler(state)
+    call_kwargs = model_call_budget(state.get("deadline"), prepared["model_invoker"].model, "scheduler_specialist")
+
+    # Track start time for duration measurement
+    start_time = time.time()
+    
+    response = prepared["model_invoker"].invoke(prepared["messages"], **call_kwargs)
+    
+    # Calculate duration
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    return _finish_scheduler(state, prepared, response, duration_ms)
+
+
+async def ascheduler_specialist_node(state: AgentState) -> dict[str, Any]:
+    """Async scheduler specialist agent node (same behavior as ``scheduler_specialist_node``).
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Updated state with scheduling information
+    """
+    prepared = _prepare_scheduler(state)
+    call_kwargs = model_call_budget(state.get("deadline"), prepared["model_invoker"].model, "scheduler_specialist")
+
+    start_time = time.time()
+    response = await prepared["model_invoker"].ainvoke(prepared["messages"], **call_kwargs)
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    return _finish_scheduler(state, prepared, response, duration_ms)
+
+
+def _prepare_scheduler(state: AgentState) -> dict[str, Any]:
+    """Load available slots, resolve the scheduler AI Config and build the model messages."""
     # Get the original user query
     messages = state["messages"]
     user_message = None
@@ -59,6 +97,7 @@ def scheduler_specialist_node(state: AgentState) -> dict[str, Any]:
         config_key="scheduler_agent",
         context=user_context,
         default_temperature=0.7,
+        config_context=state.get("config_context"),
     )
     model_id = ld_config.get("model", {}).get("name", "unknown")
     provider = ld_config.get("provider", "")
@@ -72,28 +111,32 @@ def scheduler_specialist_node(state: AgentState) -> dict[str, Any]:
         "query": query,
         "policy_id": policy_id,
         "available_slots": slots_str,
+        **conversation_vars(state),
     }
     langchain_messages = ld_client.build_langchain_messages(ld_config, context_vars)
 
-    # Track start time for duration measurement
-    import time
-    start_time = time.time()
-    
-    response = model_invoker.invoke(langchain_messages)
-    
-    # Calculate duration
-    duration_ms = int((time.time() - start_time) * 1000)
-    
+    return {
+        "available_slots": available_slots,
+        "model_invoker": model_invoker,
+        "model_id": model_id,
+        "messages": langchain_messages,
+    }
+
+
+def _finish_scheduler(
+    state: AgentState,
+    prepared: dict[str, Any],
+    response: Any,
+    duration_ms: int,
+) -> dict[str, Any]:
+    """Build the scheduler state updates from the model response."""
+    available_slots = prepared["available_slots"]
+    model_id = prepared["model_id"]
+
     # Extract token usage and TTFT if available
-    tokens = {"input": 0, "output": 0}
+    tokens = token_usage_from_response(response)
     ttft_ms = None
     
-    if hasattr(response, "usage_metadata") and response.usage_metadata:
-        tokens = {
-            "input": response.usage_metadata.get("input_tokens", 0),
-            "output": response.usage_metadata.get("output_tokens", 0)
-        }
-    
     # Extract Time to First Token (TTFT) from response metadata
     if hasattr(response, "response_metadata") and isinstance(response.response_metadata, dict):
         ttft_ms = response.response_metadata.get("ttft_ms")
@@ -111,11 +154,10 @@ def scheduler_specialist_node(state: AgentState) -> dict[str, Any]:
 
     # Update state
     updates: dict[str, Any] = {
-        "messages": messages + [AIMessage(content=response_text)],
+        "messages": [AIMessage(content=response_text)],
         "final_response": response_text,
         "next_agent": "END",
         "agent_data": {
-            **state.get("agent_data", {}),
             "scheduler_specialist": {
                 "model": model_id,  # Track which model was used
                 "available_slots": available_slots[:10],
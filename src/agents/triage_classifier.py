@@ -0,0 +1,237 @@
+"""Local triage classifier: keyword rules plus a tiny naive Bayes model.
+
+Runs in front of the triage LLM call. Obvious queries ("Can I speak with a
+representative?", "What's my copay...") are routed locally with no network
+call; anything the classifier is not confident about falls back to the
+LaunchDarkly-configured triage model.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+# Labelled questions the naive Bayes model is trained on (expected_route labels)
+DEFAULT_TRAINING_DATA = Path(__file__).resolve().parents[2] / "test_data" / "qa_dataset.json"
+
+# Rules: (route, confidence, patterns). Any pattern matching votes for the route.
+_RULES: list[tuple[str, float, list[re.Pattern]]] = [
+    (
+        "schedule_agent",
+        0.95,
+        [
+            re.compile(r"\b(speak|talk|connect|transfer|chat)\b.*\b(human|agent|representative|someone|person|nurse|customer service|support|staff)\b"),
+            re.compile(r"\b(live|real|human) (agent|person)\b"),
+            re.compile(r"\bcustomer (service|support)\b"),
+            re.compile(r"\b(call ?back|call me)\b"),
+        ],
+    ),
+    (
+        "general_question",
+        0.95,
+        [
+            re.compile(r"^\s*(hi|hello|hey|thanks|thank you|good (morning|afternoon|evening))\b[\s!.,]*(there)?[\s!.,]*$"),
+        ],
+    ),
+    (
+        "provider_lookup",
+        0.92,
+        [
+            re.compile(
+                r"\b(find|looking for|need an?|recommend|search for|locate)\b.*"
+                r"\b(doctor|physician|specialist|surgeon|therapist|dentist|pediatrician|provider|clinic"
+                r"|\w+ologist|\w+iatrist|ob/?gyn|ent)s?\b"
+            ),
+            re.compile(r"\bin[- ]network (doctor|provider|specialist)s?\b"),
+        ],
+    ),
+    (
+        "policy_question",
+        0.92,
+        [
+            re.compile(
+                r"\b(copay|co-pay|coinsurance|deductible|out[- ]of[- ]pocket|premium|covered|cover|coverage"
+                r"|claim|pre-?auth\w*|prior authorization|referral|formulary|tier|benefits?)\b"
+            ),
+            re.compile(r"\b(how much|cost|price)\b"),
+            re.compile(r"\b(program|programs|prescription|medication|refill|mail order)\b"),
+        ],
+    ),
+]
+
+# Routes that win outright when their rule matches (explicit requests for a person, greetings)
+_PRIORITY_ROUTES = ("schedule_agent", "general_question")
+
+# Naive Bayes-only predictions are capped: 100 training questions make the
+# posterior overconfident on wording it has never seen
+_NAIVE_BAYES_MAX_CONFIDENCE = 0.9
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9/]+")
+_STOPWORDS = {"a", "an", "the", "my", "me", "i", "is", "for", "to", "of", "in", "do", "does", "can", "you", "what", "s"}
+
+_STATS_LOCK = threading.Lock()
+_STATS = {"classified": 0, "fast_path": 0, "fallback": 0}
+
+
+@dataclass
+class TriageClassification:
+    """Result of local triage classification."""
+
+    query_type: Optional[str]  # Route value (e.g. "policy_question"), None if undecided
+    confidence: float
+    method: str  # "rules", "naive_bayes", "rules+naive_bayes" or "none"
+    scores: dict[str, float] = field(default_factory=dict)  # Naive Bayes posteriors
+
+    def is_confident(self, threshold: float) -> bool:
+        return self.query_type is not None and self.confidence >= threshold
+
+
+def triage_fast_path_enabled() -> bool:
+    """Whether triage tries the local classifier first (TRIAGE_FAST_PATH env var)."""
+    return os.getenv("TRIAGE_FAST_PATH", "false").lower() in ("1", "true", "yes")
+
+
+def triage_fast_path_threshold() -> float:
+    """Minimum classifier confidence to skip the triage LLM (TRIAGE_FAST_PATH_THRESHOLD)."""
+    return float(os.getenv("TRIAGE_FAST_PATH_THRESHOLD", "0.9"))
+
+
+def _tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def route_from_label(label: str) -> str:
+    """Convert a dataset label ("POLICY_QUESTION") to a route value ("policy_question")."""
+    return label.strip().lower()
+
+
+class NaiveBayesTriage:
+    """Multinomial naive Bayes over question words (Laplace smoothing)."""
+
+    def __init__(self, examples: Iterable[tuple[str, str]]):
+        """
+        Args:
+            examples: (question, route) pairs
+        """
+        self.class_counts: Counter = Counter()
+        self.word_counts: dict[str, Counter] = defaultdict(Counter)
+        self.vocabulary: set[str] = set()
+        for question, route in examples:
+            self.class_counts[route] += 1
+            tokens = _tokenize(question)
+            self.word_counts[route].update(tokens)
+            self.vocabulary.update(tokens)
+        self._totals = {route: sum(counts.values()) for route, counts in self.word_counts.items()}
+
+    def predict_proba(self, text: str) -> dict[str, float]:
+        """Posterior probability of each route for a query."""
+        if not self.class_counts:
+            return {}
+        total_examples = sum(self.class_counts.values())
+        vocab_size = len(self.vocabulary) or 1
+        tokens = [t for t in _tokenize(text) if t in self.vocabulary]
+        log_scores = {}
+        for route, count in self.class_counts.items():
+            score = math.log(count / total_examples)
+            denominator = self._totals[route] + vocab_size
+            for token in tokens:
+                score += math.log((self.word_counts[route][token] + 1) / denominator)
+            log_scores[route] = score
+        # Normalize in log space
+        top = max(log_scores.values())
+        exp_scores = {route: math.exp(s - top) for route, s in log_scores.items()}
+        norm = sum(exp_scores.values())
+        return {route: s / norm for route, s in exp_scores.items()}
+
+
+def load_training_examples(path: Optional[Path] = None) -> list[tuple[str, str]]:
+    """Load (question, route) pairs from a QA dataset with expected_route labels."""
+    path = Path(path or os.getenv("TRIAGE_TRAINING_DATA", DEFAULT_TRAINING_DATA))
+    with open(path) as f:
+        data = json.load(f)
+    questions = data.get("questions", []) if isinstance(data, dict) else data
+    return [
+        (q["question"], route_from_label(q["expected_route"]))
+        for q in questions
+        if q.get("question") and q.get("expected_route")
+    ]
+
+
+@lru_cache(maxsize=1)
+def get_naive_bayes_model() -> Optional[NaiveBayesTriage]:
+    """Naive Bayes model trained once per process (None if training data is unavailable)."""
+    try:
+        return NaiveBayesTriage(load_training_examples())
+    except (OSError, ValueError, KeyError) as e:
+        print(f"  ⚠️  Triage classifier training data unavailable, using rules only: {e}")
+        return None
+
+
+def match_rules(query: str) -> dict[str, float]:
+    """Routes whose keyword rules match the query, with the rule confidence."""
+    text = query.lower()
+    return {
+        route: confidence
+        for route, confidence, patterns in _RULES
+        if any(p.search(text) for p in patterns)
+    }
+
+
+def classify_query(query: str, model: Optional[NaiveBayesTriage] = None) -> TriageClassification:
+    """Classify a query with the rules and the naive Bayes model.
+
+    Args:
+        query: The customer's query
+        model: Naive Bayes model (default: the process-wide trained model)
+
+    Returns:
+        Classification; query_type is None when rules and model disagree
+    """
+    model = model or get_naive_bayes_model()
+    rule_matches = match_rules(query)
+    scores = model.predict_proba(query) if model else {}
+    nb_route = max(scores, key=scores.get) if scores else None
+    nb_confidence = scores.get(nb_route, 0.0) if nb_route else 0.0
+
+    # Explicit requests for a person (or a bare greeting) win outright
+    for route in _PRIORITY_ROUTES:
+        if route in rule_matches:
+            return TriageClassification(route, rule_matches[route], "rules", scores)
+
+    if len(rule_matches) == 1:
+        route, rule_confidence = next(iter(rule_matches.items()))
+        if nb_route is None:
+            return TriageClassification(route, rule_confidence, "rules", scores)
+        if nb_route == route:
+            return TriageClassification(route, max(rule_confidence, nb_confidence), "rules+naive_bayes", scores)
+        # Rules and model disagree: let the LLM decide
+        return TriageClassification(None, 0.0, "none", scores)
+
+    if nb_route is None:
+        return TriageClassification(None, 0.0, "none", scores)
+
+    # Several (or no) rules matched: the model breaks the tie among them
+    if rule_matches and nb_route not in rule_matches:
+        return TriageClassification(None, 0.0, "none", scores)
+    return TriageClassification(nb_route, min(nb_confidence, _NAIVE_BAYES_MAX_CONFIDENCE), "naive_bayes", scores)
+
+
+def record_fast_path(hit: bool) -> None:
+    """Count a triage decision for the process-wide fast-path hit rate."""
+    with _STATS_LOCK:
+        _STATS["classified"] += 1
+        _STATS["fast_path" if hit else "fallback"] += 1
+
+
+def get_triage_fast_path_stats() -> dict[str, Any]:
+    """Process-wide fast-path counters and hit rate."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    stats["hit_rate"] = stats["fast_path"] / stats["classified"] if stats["classified"] else 0.0
+    return stats
@@ -0,0 +1,213 @@
+"""Structured, early-terminating triage model output.
+
+Instead of waiting for the full completion and running ``json.loads`` on it,
+the triage model is asked for a JSON object matching ``TRIAGE_OUTPUT_SCHEMA``
+(a forced Converse tool call on Bedrock models that support one, JSON mode on
+OpenAI) with a tight ``maxTokens`` (TRIAGE_MAX_TOKENS), and the response is
+streamed only until the JSON object closes. Triage latency is then bounded by the few tokens the
+route actually needs, and trailing prose can no longer break parsing.
+
+Parse failures and output tokens are counted per mode ("structured" or
+"completion", see TRIAGE_STRUCTURED_OUTPUT) so both can be compared with
+``get_triage_output_stats``.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from ..utils.bedrock_llm import is_tool_choice_error, reject_forced_tool_choice
+from ..utils.prompt_budget import count_tokens
+
+TRIAGE_OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query_type": {
+            "type": "string",
+            "enum": ["policy_question", "provider_lookup", "schedule_agent", "general_question"],
+        },
+        "confidence_score": {"type": "number", "minimum": 0, "maximum": 1},
+        "escalation_needed": {"type": "boolean"},
+        "extracted_context": {"type": "object"},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["query_type", "confidence_score"],
+}
+
+_STATS_LOCK = threading.Lock()
+_STATS: dict[str, dict[str, int]] = {}
+
+
+def triage_structured_output_enabled() -> bool:
+    """Whether triage streams structured output and stops at the end of the JSON (TRIAGE_STRUCTURED_OUTPUT)."""
+    return os.getenv("TRIAGE_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+
+
+def triage_max_tokens() -> int:
+    """Output token cap for structured triage calls (TRIAGE_MAX_TOKENS)."""
+    return int(os.getenv("TRIAGE_MAX_TOKENS", "200"))
+
+
+def json_object_end(text: str) -> Optional[int]:
+    """Index just past the first complete top-level JSON object in ``text`` (None if not closed yet)."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = depth > 0
+        elif char == "{":
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return None
+
+
+class _JsonStream:
+    """Accumulates streamed chunks until the JSON object closes."""
+
+    def __init__(self, messages: list[BaseMessage]):
+        self.messages = messages
+        self.text = ""
+        self.ttft_ms: Optional[int] = None
+        self.usage: Optional[dict[str, Any]] = None
+        self.end: Optional[int] = None
+
+    def add(self, chunk: Any) -> bool:
+        """Add a chunk; True once the JSON object is complete."""
+        metadata = getattr(chunk, "response_metadata", None) or {}
+        if self.ttft_ms is None and metadata.get("ttft_ms") is not None:
+            self.ttft_ms = metadata["ttft_ms"]
+        if getattr(chunk, "usage_metadata", None):
+            self.usage = chunk.usage_metadata
+        if isinstance(chunk.content, str) and chunk.content:
+            self.text += chunk.content
+            self.end = json_object_end(self.text)
+        return self.end is not None
+
+    def message(self) -> AIMessage:
+        """The JSON object as a response message.
+
+        When the stream was cut before the provider reported usage, token
+        counts are estimated locally (``tokens_estimated`` in the metadata).
+        """
+        content = self.text[: self.end] if self.end is not None else self.text
+        usage = self.usage
+        estimated = usage is None
+        if estimated:
+            input_tokens = sum(count_tokens(str(message.content)) for message in self.messages)
+            output_tokens = count_tokens(content)
+            usage = {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+        return AIMessage(
+            content=content,
+            response_metadata={
+                "ttft_ms": self.ttft_ms,
+                "early_stop": self.end is not None and estimated,
+                "tokens_estimated": estimated,
+            },
+            usage_metadata=usage,
+        )
+
+
+def stream_json_object(model_invoker: Any, messages: list[BaseMessage], call_kwargs: dict[str, Any]) -> AIMessage:
+    """Stream a model response and stop as soon as its JSON object closes.
+
+    If the model rejects the forced structured output tool (``json_schema``),
+    the call is retried once as plain JSON output.
+    """
+    collected = _JsonStream(messages)
+    stream = model_invoker.stream(messages, **call_kwargs)
+    retry = False
+    try:
+        for chunk in stream:
+            if collected.add(chunk):
+                break
+    except Exception as e:
+        if not _tool_choice_rejected(model_invoker, call_kwargs, collected, e):
+            raise
+        retry = True
+    finally:
+        stream.close()
+    if retry:
+        return stream_json_object(model_invoker, messages, _without_json_schema(call_kwargs))
+    return collected.message()
+
+
+async def astream_json_object(model_invoker: Any, messages: list[BaseMessage], call_kwargs: dict[str, Any]) -> AIMessage:
+    """Async variant of ``stream_json_object``."""
+    collected = _JsonStream(messages)
+    stream = model_invoker.astream(messages, **call_kwargs)
+    retry = False
+    try:
+        async for chunk in stream:
+            if collected.add(chunk):
+                break
+    except Exception as e:
+        if not _tool_choice_rejected(model_invoker, call_kwargs, collected, e):
+            raise
+        retry = True
+    finally:
+        await stream.aclose()
+    if retry:
+        return await astream_json_object(model_invoker, messages, _without_json_schema(call_kwargs))
+    return collected.message()
+
+
+def _tool_choice_rejected(model_invoker: Any, call_kwargs: dict[str, Any], collected: _JsonStream, error: Exception) -> bool:
+    """Whether a failed call should be retried without ``json_schema`` (the model rejected the forced tool)."""
+    if "json_schema" not in call_kwargs or collected.text or not is_tool_choice_error(error):
+        return False
+    model_id = getattr(model_invoker.model, "model_id", "")
+    reject_forced_tool_choice(model_id)
+    print(f"⚠️  {model_id} rejected forced tool choice, retrying triage without the output schema")
+    return True
+
+
+def _without_json_schema(call_kwargs: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in call_kwargs.items() if key != "json_schema"}
+
+
+def parse_triage_output(content: Any) -> Optional[dict[str, Any]]:
+    """The triage decision in a model response (None if it is not a JSON object)."""
+    try:
+        result = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def record_triage_output(mode: str, parsed: bool, output_tokens: int, duration_ms: int, early_stop: bool) -> None:
+    """Count a triage model call for the per-mode parse-failure and token stats."""
+    with _STATS_LOCK:
+        stats = _STATS.setdefault(
+            mode, {"calls": 0, "parse_failures": 0, "output_tokens": 0, "duration_ms": 0, "early_stops": 0}
+        )
+        stats["calls"] += 1
+        stats["parse_failures"] += not parsed
+        stats["output_tokens"] += output_tokens
+        stats["duration_ms"] += duration_ms
+        stats["early_stops"] += early_stop
+
+
+def get_triage_output_stats() -> dict[str, dict[str, Any]]:
+    """Per-mode triage call counters with parse-failure rate and mean output tokens and duration."""
+    with _STATS_LOCK:
+        snapshot = {mode: dict(stats) for mode, stats in _STATS.items()}
+    for stats in snapshot.values():
+        calls = stats["calls"]
+        stats["parse_failure_rate"] = stats["parse_failures"] / calls if calls else 0.0
+        stats["mean_output_tokens"] = stats["output_tokens"] / calls if calls else 0.0
+        stats["mean_duration_ms"] = stats["duration_ms"] / calls if calls else 0.0
+    return snapshot
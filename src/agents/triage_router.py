@@ -1,13 +1,31 @@
 """Triage router agent for query classification."""
 
-import json
+import time
 from typing import Any
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from ..graph.session import conversation_vars
 from ..graph.state import AgentState, QueryType
-from ..utils.llm_config import get_model_invoker
+from ..utils.deadline import DeadlineExceeded, is_timeout_error, model_call_budget, record_deadline_decision
+from ..utils.llm_config import get_model_invoker, token_usage_from_response
+from ..utils.bedrock_llm import BedrockConverseLLM, forced_tool_choice_supported
 from ..utils.launchdarkly_config import get_ld_client
+from .triage_classifier import (
+    classify_query,
+    record_fast_path,
+    triage_fast_path_enabled,
+    triage_fast_path_threshold,
+)
+from .triage_output import (
+    TRIAGE_OUTPUT_SCHEMA,
+    astream_json_object,
+    parse_triage_output,
+    record_triage_output,
+    stream_json_object,
+    triage_max_tokens,
+    triage_structured_output_enabled,
+)
 
 
 def triage_node(state: AgentState) -> dict[str, Any]:
@@ -22,14 +40,169 @@ def triage_node(state: AgentState) -> dict[str, Any]:
     Returns:
         Updated state with routing information
     """
-    # Get the last message (user query)
-    messages = state["messages"]
-    last_message = messages[-1]
+    fast_path = _try_fast_path(state)
+    if fast_path is not None:
+        return fast_path
 
+    prepared = _prepare_triage(state)
+    try:
+        call_kwargs = {
+            **prepared["call_kwargs"],
+            **model_call_budget(state.get("deadline"), prepared["model_invoker"].model, "triage"),
+        }
+    except DeadlineExceeded:
+        return _deadline_fallback(state, "forced_fast_path")
+
+    # Track start time for duration measurement
+    start_time = time.time()
+    
+    try:
+        if prepared["structured"]:
+            response = stream_json_object(prepared["model_invoker"], prepared["messages"], call_kwargs)
+        else:
+            response = prepared["model_invoker"].invoke(prepared["messages"], **call_kwargs)
+    except Exception as e:
+        if state.get("deadline") is None or not is_timeout_error(e):
+            raise
+        return _deadline_fallback(state, "timeout_fallback")
+    
+    # Calculate duration
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    return _finish_triage(state, prepared, response, duration_ms)
+
+
+async def atriage_node(state: AgentState) -> dict[str, Any]:
+    """Async triage router agent node (same behavior as ``triage_node``).
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Updated state with routing information
+    """
+    fast_path = _try_fast_path(state)
+    if fast_path is not None:
+        return fast_path
+
+    prepared = _prepare_triage(state)
+    try:
+        call_kwargs = {
+            **prepared["call_kwargs"],
+            **model_call_budget(state.get("deadline"), prepared["model_invoker"].model, "triage"),
+        }
+    except DeadlineExceeded:
+        return _deadline_fallback(state, "forced_fast_path")
+
+    start_time = time.time()
+    try:
+        if prepared["structured"]:
+            response = await astream_json_object(prepared["model_invoker"], prepared["messages"], call_kwargs)
+        else:
+            response = await prepared["model_invoker"].ainvoke(prepared["messages"], **call_kwargs)
+    except Exception as e:
+        if state.get("deadline") is None or not is_timeout_error(e):
+            raise
+        return _deadline_fallback(state, "timeout_fallback")
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    return _finish_triage(state, prepared, response, duration_ms)
+
+
+def _get_query(state: AgentState) -> str:
+    """The user query (last message)."""
+    last_message = state["messages"][-1]
     if isinstance(last_message, HumanMessage):
-        query = last_message.content
+        return last_message.content
+    return str(last_message.content)
+
+
+def _try_fast_path(state: AgentState) -> dict[str, Any] | None:
+    """Route locally when the triage classifier is confident (no LLM call).
+
+    Returns:
+        Routing state updates, or None to fall back to the triage model
+    """
+    if not triage_fast_path_enabled():
+        return None
+
+    query = _get_query(state)
+    start_time = time.time()
+    classification = classify_query(query)
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    threshold = triage_fast_path_threshold()
+    hit = classification.is_confident(threshold)
+    record_fast_path(hit)
+    if not hit:
+        print(f"  Triage fast path: not confident ({classification.confidence:.2f} < {threshold}), using triage model")
+        return None
+
+    print(f"\n{'─'*80}")
+    print(f"  TRIAGE AGENT: Fast path ({classification.method}) → {classification.query_type} ({classification.confidence:.2f})")
+    print(f"{'─'*80}")
+
+    result = {
+        "query_type": classification.query_type,
+        "confidence_score": classification.confidence,
+        "extracted_context": {},
+        "escalation_needed": False,
+        "reasoning": f"Local classifier ({classification.method})",
+    }
+    triage_data = {
+        "model": "local-classifier",
+        "tokens": {"input": 0, "output": 0},
+        "ttft_ms": None,
+        "duration_ms": duration_ms,
+        "fast_path": True,
+        "classifier_method": classification.method,
+    }
+    return _routing_updates(query, state.get("user_context", {}), result, triage_data)
+
+
+def _deadline_fallback(state: AgentState, decision: str) -> dict[str, Any]:
+    """Route with the local classifier's best guess when the deadline rules out the triage model.
+
+    Unlike the fast path there is no confidence threshold; an undecided
+    classifier routes to a human agent.
+    """
+    query = _get_query(state)
+    classification = classify_query(query)
+    record_deadline_decision(state.get("deadline"), decision, route=classification.query_type)
+
+    if classification.query_type is not None:
+        result = {
+            "query_type": classification.query_type,
+            "confidence_score": classification.confidence,
+            "extracted_context": {},
+            "escalation_needed": False,
+            "reasoning": f"Deadline: local classifier ({classification.method})",
+        }
     else:
-        query = str(last_message.content)
+        result = {
+            "query_type": "schedule_agent",
+            "confidence_score": 0.5,
+            "extracted_context": {},
+            "escalation_needed": True,
+            "reasoning": "Deadline: classifier undecided, routing to human agent for safety",
+        }
+    print(f"  TRIAGE AGENT: {decision} → {result['query_type']} ({result['confidence_score']:.2f})")
+
+    triage_data = {
+        "model": "local-classifier",
+        "tokens": {"input": 0, "output": 0},
+        "ttft_ms": None,
+        "duration_ms": 0,
+        "fast_path": False,
+        "classifier_method": classification.method,
+        "deadline_decision": decision,
+    }
+    return _routing_updates(query, state.get("user_context", {}), result, triage_data)
+
+
+def _prepare_triage(state: AgentState) -> dict[str, Any]:
+    """Resolve the triage AI Config and build the model messages."""
+    query = _get_query(state)
 
     # Get user context
     user_context = state.get("user_context", {})
@@ -41,6 +214,7 @@ def triage_node(state: AgentState) -> dict[str, Any]:
         config_key="triage_agent",
         context=user_context,
         default_temperature=0.0,
+        config_context=state.get("config_context"),
     )
     model_id = ld_config.get("model", {}).get("name", "unknown")
     provider = ld_config.get("provider", "")
@@ -49,41 +223,66 @@ def triage_node(state: AgentState) -> dict[str, Any]:
     
     # Build LangChain messages from LaunchDarkly config (supports both agent-based and completion-based)
     ld_client = get_ld_client()
-    context_vars = {**user_context, "query": query}
+    context_vars = {**user_context, "query": query, **conversation_vars(state)}
     langchain_messages = ld_client.build_langchain_messages(ld_config, context_vars)
     
-    # Configure for JSON output if OpenAI
+    # Configure for JSON output if OpenAI (per call: the model instance is shared)
     from langchain_openai import ChatOpenAI
+    call_kwargs = {}
     if isinstance(model_invoker.model, ChatOpenAI):
-        model_invoker.model.model_kwargs = {"response_format": {"type": "json_object"}}
+        call_kwargs["response_format"] = {"type": "json_object"}
 
-    # Track start time for duration measurement
-    import time
-    start_time = time.time()
-    
-    response = model_invoker.invoke(langchain_messages)
-    
-    # Calculate duration
-    duration_ms = int((time.time() - start_time) * 1000)
+    # Structured output: schema-constrained JSON, a tight output cap, streamed until the object closes
+    structured = triage_structured_output_enabled()
+    if structured:
+        max_tokens = triage_max_tokens()
+        model_max_tokens = getattr(model_invoker.model, "max_tokens", None)
+        call_kwargs["max_tokens"] = min(max_tokens, model_max_tokens) if model_max_tokens else max_tokens
+        model = model_invoker.model
+        if isinstance(model, BedrockConverseLLM) and forced_tool_choice_supported(model.model_id):
+            call_kwargs["json_schema"] = TRIAGE_OUTPUT_SCHEMA
+
+    return {
+        "query": query,
+        "user_context": user_context,
+        "model_invoker": model_invoker,
+        "model_id": model_id,
+        "messages": langchain_messages,
+        "call_kwargs": call_kwargs,
+        "structured": structured,
+    }
+
+
+def _finish_triage(
+    state: AgentState,
+    prepared: dict[str, Any],
+    response: Any,
+    duration_ms: int,
+) -> dict[str, Any]:
+    """Parse the triage response into routing state updates."""
+    model_id = prepared["model_id"]
 
     # Extract token usage and TTFT if available
-    tokens = {"input": 0, "output": 0}
+    tokens = token_usage_from_response(response)
     ttft_ms = None
     
-    if hasattr(response, "usage_metadata") and response.usage_metadata:
-        tokens = {
-            "input": response.usage_metadata.get("input_tokens", 0),
-            "output": response.usage_metadata.get("output_tokens", 0)
-        }
-    
     # Extract Time to First Token (TTFT) from response metadata
     if hasattr(response, "response_metadata") and isinstance(response.response_metadata, dict):
         ttft_ms = response.response_metadata.get("ttft_ms")
 
     # Parse the JSON response
-    try:
-        result = json.loads(response.content)
-    except json.JSONDecodeError:
+    result = parse_triage_output(response.content)
+    response_metadata = getattr(response, "response_metadata", None) or {}
+    early_stop = bool(response_metadata.get("early_stop"))
+    record_triage_output(
+        "structured" if prepared["structured"] else "completion",
+        parsed=result is not None,
+        output_tokens=tokens.get("output", 0),
+        duration_ms=duration_ms,
+        early_stop=early_stop,
+    )
+    if result is None:
+        print(f"  Triage output is not a JSON object, routing to human agent: {str(response.content)[:120]!r}")
         # Fallback if JSON parsing fails
         result = {
             "query_type": "schedule_agent",
@@ -93,6 +292,25 @@ def triage_node(state: AgentState) -> dict[str, Any]:
             "reasoning": "Failed to parse query, routing to human agent for safety",
         }
 
+    triage_data = {
+        "model": model_id,  # Track which model was used
+        "tokens": tokens,
+        "ttft_ms": ttft_ms,  # Time to first token from Bedrock streaming
+        "duration_ms": duration_ms,  # Total time to generate response
+        "fast_path": False,
+        "structured_output": prepared["structured"],
+        "early_stop": early_stop,
+    }
+    return _routing_updates(prepared["query"], prepared["user_context"], result, triage_data)
+
+
+def _routing_updates(
+    query: str,
+    user_context: dict[str, Any],
+    result: dict[str, Any],
+    triage_data: dict[str, Any],
+) -> dict[str, Any]:
+    """Build routing state updates from a triage decision (model or local classifier)."""
     # Map query type to enum
     query_type_str = result.get("query_type", "schedule_agent")
     query_type_map = {
@@ -133,20 +351,15 @@ def triage_node(state: AgentState) -> dict[str, Any]:
         "next_agent": next_agent,
         "confidence_score": confidence_score,
         "escalation_needed": escalation_needed,
-        "messages": messages
-        + [
+        "messages": [
             AIMessage(
                 content=triage_content,
                 additional_kwargs={"reasoning": result.get("reasoning", "")},
             )
         ],
         "agent_data": {
-            **state.get("agent_data", {}),
             "triage_router": {
-                "model": model_id,  # Track which model was used
-                "tokens": tokens,
-                "ttft_ms": ttft_ms,  # Time to first token from Bedrock streaming
-                "duration_ms": duration_ms,  # Total time to generate response
+                **triage_data,
                 "confidence": confidence_score,
                 "query_type": str(query_type)
             }
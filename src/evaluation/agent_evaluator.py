@@ -6,11 +6,10 @@ on individual agent prompts/models.
 """
 
 import asyncio
-import ldclient
-from ldclient import Context
 from typing import Any, Dict, List
 
 from ..utils.llm_config import get_model_invoker
+from ..utils.metrics_emitter import get_metrics_emitter
 
 
 async def evaluate_agent_accuracy(
@@ -18,7 +17,8 @@ async def evaluate_agent_accuracy(
     original_query: str,
     rag_documents: List[Dict[str, Any]],
     agent_output: str,
-    user_context: Dict[str, Any]
+    user_context: Dict[str, Any],
+    config_context: Any = None,
 ) -> Dict[str, Any]:
     """Evaluate a specific agent's accuracy.
     
@@ -28,6 +28,8 @@ async def evaluate_agent_accuracy(
         rag_documents: Retrieved RAG documents (source of truth for accuracy)
         agent_output: The agent's raw output before brand voice
         user_context: User context for LaunchDarkly targeting
+        config_context: The run's ConfigContext (final_state["config_context"]);
+            reuses the agent's AI Config resolved during the run
     
     Returns:
         Dict with accuracy result (evaluator only sends accuracy metrics)
@@ -45,7 +47,8 @@ async def evaluate_agent_accuracy(
         # Get model invoker for evaluation (using LaunchDarkly config)
         model_invoker, eval_config = get_model_invoker(
             config_key=evaluator_config_key,
-            context=user_context
+            context=user_context,
+            config_context=config_context,
         )
         
         # Get the prompt template from LaunchDarkly config
@@ -86,7 +89,7 @@ async def evaluate_agent_accuracy(
         from langchain_core.messages import HumanMessage
         messages = [HumanMessage(content=evaluation_prompt)]
         
-        response = model_invoker.model.invoke(messages)
+        response = await model_invoker.model.ainvoke(messages)
         response_text = response.content
         
         # Debug: Print response to help diagnose JSON parsing issues
@@ -162,38 +165,35 @@ async def evaluate_agent_accuracy(
             config_key = config_key_map.get(agent_name, agent_name)
             
             # Get the agent's config and tracker (this ensures metrics go to the right place)
-            _, agent_tracker, ld_context = ld_full_client.get_ai_config(config_key, user_context)
+            if config_context is not None:
+                resolved = config_context.resolve(config_key, user_context)
+                agent_tracker, ld_context = resolved.tracker, resolved.ld_context
+            else:
+                _, agent_tracker, ld_context = ld_full_client.get_ai_config(config_key, user_context)
+            
+            # Send accuracy metrics with the agent's LD context (queued, sent by the metrics emitter)
+            # This ensures they are associated with the agent's config via context
+            metrics = get_metrics_emitter()
             
-            # Send accuracy metric using track method directly on full LaunchDarkly client
-            # This ensures it's associated with the agent's config via context
-            try:
-                # Use the raw ldclient to send events with proper context
-                raw_ld_client = ldclient.get()
-                
-                # Send as generation feedback event tied to the config
-                raw_ld_client.track(
-                    event_name="$ld:ai:generation:feedback",
-                    context=ld_context,
-                    data={
-                        "config_key": config_key,
-                        "accuracy": float(result["score"]),
-                        "passed": result["passed"]
-                    },
-                    metric_value=float(result["score"])
-                )
-            except Exception as track_err:
-                print(f"⚠️  Failed to send accuracy metric: {track_err}")
+            # Send as generation feedback event tied to the config
+            metrics.track(
+                "$ld:ai:generation:feedback",
+                ld_context,
+                metric_value=float(result["score"]),
+                data={
+                    "config_key": config_key,
+                    "accuracy": float(result["score"]),
+                    "passed": result["passed"]
+                },
+            )
             
             # Also send as hallucination metric with config context
-            try:
-                raw_ld_client.track(
-                    event_name="$ld:ai:hallucinations",
-                    context=ld_context,
-                    data={"config_key": config_key},
-                    metric_value=float(result["score"])
-                )
-            except Exception as track_err:
-                print(f"⚠️  Failed to send hallucination metric: {track_err}")
+            metrics.track(
+                "$ld:ai:hallucinations",
+                ld_context,
+                metric_value=float(result["score"]),
+                data={"config_key": config_key},
+            )
             
             print(f"📊 Sent {agent_name} accuracy metric: {result['score']:.2f} (config: {config_key})")
             print(f"💰 Evaluation cost: {eval_cost_cents:.2f}¢ (${eval_cost_usd:.6f}) [in={tokens['input']}, out={tokens['output']}, model={eval_model_id}]")
@@ -236,7 +236,7 @@ class BrandVoiceEvaluator:
         langchain_messages = self.ld_client.build_langchain_messages(judge_config, context_vars)
         
         # Run evaluation
-        response = model_invoker.invoke(langchain_messages)
+        response = await model_invoker.ainvoke(langchain_messages)
         
         # Extract tokens from response
         tokens = {"input": 0, "output": 0}
@@ -285,7 +285,7 @@ class BrandVoiceEvaluator:
         langchain_messages = self.ld_client.build_langchain_messages(judge_config, context_vars)
         
         # Run evaluation
-        response = model_invoker.invoke(langchain_messages)
+        response = await model_invoker.ainvoke(langchain_messages)
         
         # Extract tokens from response
         tokens = {"input": 0, "output": 0}
@@ -373,9 +373,9 @@ class BrandVoiceEvaluator:
             # Use brand_tracker (ModelInvoker) to send metrics with AI config metadata
             # This ensures metrics show up on the brand_agent's monitoring page
             
-            # Get the raw LaunchDarkly client for sending numeric metrics
-            import ldclient
-            raw_ld_client = ldclient.get()
+            # Numeric metrics are queued and sent by the metrics emitter
+            from ..utils.metrics_emitter import get_metrics_emitter
+            metrics = get_metrics_emitter()
             
             # Get the context from the ModelInvoker (which wraps the tracker)
             # This context has the AI Config metadata that associates metrics with the brand_agent config
@@ -386,26 +386,14 @@ class BrandVoiceEvaluator:
             
             # 1. Hallucinations metric (accuracy score: higher = fewer hallucinations)
             hallucinations_score = float(accuracy_result["score"])
-            raw_ld_client.track(
-                event_name="$ld:ai:hallucinations",
-                context=ld_context,
-                metric_value=hallucinations_score
-            )
+            metrics.track("$ld:ai:hallucinations", ld_context, metric_value=hallucinations_score)
             
             # 1b. Also send to judge-specific accuracy metric (duplicate)
-            raw_ld_client.track(
-                event_name="$ld:ai:judge:accuracy",
-                context=ld_context,
-                metric_value=hallucinations_score
-            )
+            metrics.track("$ld:ai:judge:accuracy", ld_context, metric_value=hallucinations_score)
             
             # 2. Coherence metric
             coherence_score = float(coherence_result["score"])
-            raw_ld_client.track(
-                event_name="$ld:ai:coherence",
-                context=ld_context,
-                metric_value=coherence_score
-            )
+            metrics.track("$ld:ai:coherence", ld_context, metric_value=coherence_score)
             
             print(f"📊 Sent judgment metrics to brand_agent AI config:")
             print(f"   - $ld:ai:hallucinations: {hallucinations_score:.2f}")
@@ -1,13 +1,33 @@
 """Graph module for workflow orchestration."""
 
 from .state import AgentState, QueryType
-from .workflow import create_workflow
+from .workflow import (
+    BatchItemResult,
+    BatchSummary,
+    arun_workflow,
+    arun_workflow_batch,
+    astream_workflow,
+    create_workflow,
+    get_workflow,
+    run_workflow,
+    run_workflow_batch,
+    stream_workflow,
+)
 from .agent_graph_runner import AgentGraphResult, run_agent_graph
 
 __all__ = [
     "AgentState",
     "QueryType",
     "create_workflow",
+    "get_workflow",
+    "run_workflow",
+    "arun_workflow",
+    "stream_workflow",
+    "astream_workflow",
+    "run_workflow_batch",
+    "arun_workflow_batch",
+    "BatchItemResult",
+    "BatchSummary",
     "AgentGraphResult",
     "run_agent_graph",
 ]
@@ -0,0 +1,258 @@
+"""Conversation sessions for multi-turn chats.
+
+A session keeps a short window of recent turns plus a rolling summary of
+older ones, so the history added to each prompt stays within a fixed token
+budget however long the conversation gets. Sessions also cache Knowledge
+Base results per plan (and, for providers, per specialty, location and
+network), so a related follow-up question in a later turn reuses them instead
+of retrieving again. A follow-up is related when most of its content words
+appear in the question that retrieved the documents.
+
+Sessions live in process memory (like the evaluation stores in the API
+server) and expire after SESSION_TTL_S of inactivity.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
+
+# Recent turns kept verbatim (older turns are folded into the summary)
+SESSION_WINDOW_TURNS = int(os.getenv("SESSION_WINDOW_TURNS", "3"))
+
+# Token cap for the history added to each prompt (summary + recent turns)
+SESSION_CONTEXT_MAX_TOKENS = int(os.getenv("SESSION_CONTEXT_MAX_TOKENS", "600"))
+
+# Characters of each side of a turn kept verbatim / in the summary
+_TURN_CHARS = 600
+_SUMMARY_LINE_CHARS = 160
+
+# Share of a follow-up's content words that must appear in the earlier
+# question for its retrieval to be reused (0 reuses it for any question)
+SESSION_RAG_REUSE_OVERLAP = float(os.getenv("SESSION_RAG_REUSE_OVERLAP", "0.5"))
+
+# Cached retrievals per session (oldest evicted first)
+_RAG_CACHE_SIZE = 16
+
+# Words that say nothing about what to retrieve
+_STOPWORDS = frozenset({
+    "about", "also", "and", "any", "are", "can", "could", "does", "for", "from", "have", "how", "many", "much",
+    "not", "that", "the", "their", "them", "there", "these", "they", "this", "what", "when", "where", "which",
+    "who", "why", "will", "with", "would", "you", "your",
+})
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def query_terms(text: str) -> frozenset[str]:
+    """Content words of a question, used to match follow-ups to earlier retrievals."""
+    return frozenset(word for word in re.findall(r"[a-z0-9]+", text.lower()) if len(word) > 2 and word not in _STOPWORDS)
+
+
+def is_follow_up(terms: frozenset[str], earlier_terms: frozenset[str]) -> bool:
+    """Whether a question asks about the same things as an earlier one.
+
+    A question with no content words of its own ("and for that one?") is
+    always a follow-up.
+    """
+    if not terms:
+        return True
+    return len(terms & earlier_terms) / len(terms) >= SESSION_RAG_REUSE_OVERLAP
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+@dataclass
+class ConversationTurn:
+    """One question and the answer the customer received."""
+
+    user: str
+    assistant: str
+    query_type: str = "unknown"
+
+
+@dataclass
+class CachedRetrieval:
+    """Documents retrieved in an earlier turn and the question they answered."""
+
+    documents: list[dict[str, Any]]
+    terms: frozenset[str]
+
+
+@dataclass
+class ConversationSession:
+    """History and cached retrievals for one conversation."""
+
+    session_id: str
+    summary_lines: list[str] = field(default_factory=list)
+    turns: deque = field(default_factory=lambda: deque(maxlen=SESSION_WINDOW_TURNS))
+    turn_count: int = 0
+    rag_cache: "OrderedDict[tuple, CachedRetrieval]" = field(default_factory=OrderedDict)
+    updated_at: float = field(default_factory=time.time)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def context(self, max_tokens: int = SESSION_CONTEXT_MAX_TOKENS) -> str:
+        """History for the next prompt: summary of older turns, then recent turns.
+
+        Recent turns win over the summary when the budget is tight; the
+        oldest summary lines are dropped first.
+        """
+        with self._lock:
+            recent = [
+                f"Customer: {_clip(turn.user, _TURN_CHARS)}\nAssistant: {_clip(turn.assistant, _TURN_CHARS)}"
+                for turn in self.turns
+            ]
+            summary_lines = list(self.summary_lines)
+
+        # Newest turns first until the budget runs out
+        kept: list[str] = []
+        used = 0
+        for block in reversed(recent):
+            cost = approx_tokens(block)
+            if used + cost > max_tokens:
+                break
+            kept.insert(0, block)
+            used += cost
+
+        summary: list[str] = []
+        for line in reversed(summary_lines):
+            cost = approx_tokens(line)
+            if used + cost > max_tokens:
+                break
+            summary.insert(0, line)
+            used += cost
+
+        parts = []
+        if summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(summary))
+        if kept:
+            parts.append("Recent turns:\n" + "\n\n".join(kept))
+        return "\n\n".join(parts)
+
+    def record_turn(self, user: str, assistant: str, query_type: str = "unknown") -> None:
+        """Add a finished turn, folding the turn that leaves the window into the summary."""
+        with self._lock:
+            if self.turns.maxlen and len(self.turns) == self.turns.maxlen:
+                oldest = self.turns[0]
+                self.summary_lines.append(
+                    f"- ({oldest.query_type}) {_clip(oldest.user, _SUMMARY_LINE_CHARS // 2)}"
+                    f" → {_clip(oldest.assistant, _SUMMARY_LINE_CHARS)}"
+                )
+                # The summary never needs more lines than fit in the prompt budget
+                max_lines = max(1, SESSION_CONTEXT_MAX_TOKENS // approx_tokens("x" * _SUMMARY_LINE_CHARS))
+                del self.summary_lines[:-max_lines]
+            self.turns.append(ConversationTurn(user, assistant, query_type))
+            self.turn_count += 1
+            self.updated_at = time.time()
+
+    def cached_documents(self, key: tuple, query: str) -> Optional[list[dict[str, Any]]]:
+        """Documents an earlier turn retrieved for the same scope, if ``query`` follows up on it.
+
+        Args:
+            key: Retrieval scope (KB, plan and filters; not the question)
+            query: This turn's question
+        """
+        with self._lock:
+            cached = self.rag_cache.get(key)
+            if cached is None or not is_follow_up(query_terms(query), cached.terms):
+                return None
+            self.rag_cache.move_to_end(key)
+            return cached.documents
+
+    def cache_documents(self, key: tuple, query: str, documents: list[dict[str, Any]]) -> None:
+        """Remember a retrieval for later turns (empty results are not cached).
+
+        A newer retrieval for the same scope replaces the older one. Documents
+        a follow-up reused stay keyed by the question that retrieved them.
+        """
+        if not documents:
+            return
+        with self._lock:
+            cached = self.rag_cache.get(key)
+            if cached is None or cached.documents is not documents:
+                self.rag_cache[key] = CachedRetrieval(documents, query_terms(query))
+            self.rag_cache.move_to_end(key)
+            while len(self.rag_cache) > _RAG_CACHE_SIZE:
+                self.rag_cache.popitem(last=False)
+
+
+class SessionStore:
+    """In-memory sessions with LRU eviction and an inactivity TTL."""
+
+    def __init__(self, max_sessions: int = 10000, ttl_s: float = 1800):
+        """
+        Args:
+            max_sessions: Sessions kept before the least recently used is evicted
+            ttl_s: Seconds of inactivity after which a session is dropped
+        """
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> ConversationSession:
+        """Return the session, creating it (or replacing an expired one)."""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or now - session.updated_at > self.ttl_s:
+                session = ConversationSession(session_id)
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+@lru_cache(maxsize=1)
+def get_session_store() -> SessionStore:
+    """Process-wide session store (SESSION_MAX / SESSION_TTL_S env vars)."""
+    return SessionStore(
+        max_sessions=int(os.getenv("SESSION_MAX", "10000")),
+        ttl_s=float(os.getenv("SESSION_TTL_S", "1800")),
+    )
+
+
+def conversation_vars(state: dict[str, Any]) -> dict[str, Any]:
+    """Prompt variables for the conversation history ({} for single-turn requests)."""
+    history = state.get("conversation_history")
+    return {"conversation_history": history} if history else {}
+
+
+def cached_session_documents(
+    state: dict[str, Any], kind: str, key: tuple, query: str
+) -> Optional[list[dict[str, Any]]]:
+    """RAG documents the request's session retrieved for the same scope, if the query follows up on them."""
+    session = state.get("session")
+    if session is None:
+        return None
+    documents = session.cached_documents((kind, *key), query)
+    if documents is not None:
+        print(f"  Reusing {len(documents)} {kind} documents from earlier in session {session.session_id[:8]}")
+    return documents
+
+
+def cache_session_documents(
+    state: dict[str, Any], kind: str, key: tuple, query: str, documents: list[dict[str, Any]]
+) -> None:
+    """Keep a retrieval in the request's session for later turns."""
+    session = state.get("session")
+    if session is not None:
+        session.cache_documents((kind, *key), query, documents)
@@ -4,8 +4,12 @@ from enum import Enum
 from typing import Annotated, Any, Sequence
 
 from langchain_core.messages import BaseMessage
+from langgraph.graph.message import add_messages
 from typing_extensions import TypedDict
 
+# Agents that store RAG documents in the request store, in lookup order
+RAG_AGENTS = ("policy_specialist", "provider_specialist")
+
 
 class QueryType(str, Enum):
     """Types of customer queries."""
@@ -17,15 +21,28 @@ class QueryType(str, Enum):
     UNKNOWN = "unknown"
 
 
+def merge_agent_data(left: dict[str, Any] | None, right: dict[str, Any] | None) -> dict[str, Any]:
+    """Reducer for agent_data: merge each node's entries into the state by key."""
+    if not left:
+        return right or {}
+    if not right:
+        return left
+    return {**left, **right}
+
+
 class AgentState(TypedDict):
     """State for the agent graph.
 
     This state is passed between nodes in the LangGraph workflow.
     Each agent can read from and write to this state.
+
+    ``messages`` and ``agent_data`` have reducers, so nodes return only what
+    they add (new messages, their own agent_data entry) instead of copying
+    the existing values.
     """
 
-    # Conversation messages
-    messages: Annotated[Sequence[BaseMessage], "The conversation messages"]
+    # Conversation messages (append-only)
+    messages: Annotated[Sequence[BaseMessage], "The conversation messages", add_messages]
 
     # Routing information
     next_agent: Annotated[str, "The name of the next agent to route to"]
@@ -39,7 +56,10 @@ class AgentState(TypedDict):
     escalation_needed: Annotated[bool, "Whether query needs human escalation"]
 
     # Agent-specific data
-    agent_data: Annotated[dict[str, Any], "Data collected by specialist agents"]
+    agent_data: Annotated[dict[str, Any], "Data collected by specialist agents", merge_agent_data]
+
+    # Large per-request payloads (RAG documents), referenced from agent_data
+    request_store: Annotated[dict[str, Any], "Request-scoped store for large payloads, shared by reference"]
 
     # Final response
     final_response: Annotated[str | None, "The final response to the user"]
@@ -55,6 +75,22 @@ class AgentState(TypedDict):
     # Guardrail settings
     guardrail_enabled: Annotated[bool, "Whether to use guardrails on brand agent (default True)"]
 
+    # Speculative retrieval
+    rag_prefetch: Annotated[Any | None, "RAGPrefetch handles started alongside triage (None when disabled)"]
+
+    # Token streaming
+    stream_tokens: Annotated[bool, "Whether brand voice streams tokens via the graph's custom stream"]
+
+    # Time budget
+    deadline: Annotated[Any | None, "Request Deadline (src/utils/deadline.py); None means no budget"]
+
+    # Multi-turn conversations
+    session: Annotated[Any | None, "ConversationSession (src/graph/session.py); None for single-turn requests"]
+    conversation_history: Annotated[str, "Token-capped summary and recent turns added to agent prompts"]
+
+    # AI Config resolution
+    config_context: Annotated[Any | None, "ConfigContext (src/utils/config_context.py) resolving each AI Config once per request"]
+
 
 def create_initial_state(
     user_message: str,
@@ -64,6 +100,11 @@ def create_initial_state(
     brand_trackers_store: dict[str, Any] | None = None,
     evaluate_agent: str | None = None,
     guardrail_enabled: bool = True,
+    rag_prefetch: Any | None = None,
+    stream_tokens: bool = False,
+    deadline: Any | None = None,
+    session: Any | None = None,
+    config_context: Any | None = None,
 ) -> dict[str, Any]:
     """Create an initial state for the workflow.
 
@@ -75,6 +116,11 @@ def create_initial_state(
         brand_trackers_store: Optional shared dict for storing brand voice trackers
         evaluate_agent: Optional agent to evaluate (stops after this agent executes)
         guardrail_enabled: Whether to use guardrails on brand agent (default True)
+        rag_prefetch: Optional speculative retrieval handles (see src/tools/rag_prefetch.py)
+        stream_tokens: Whether brand voice should stream tokens (stream_workflow)
+        deadline: Optional request deadline shared by all nodes
+        session: Optional conversation session; its history is added to the prompts
+        config_context: Optional request-scoped ConfigContext shared by all nodes
 
     Returns:
         Initial state dictionary
@@ -89,10 +135,61 @@ def create_initial_state(
         "confidence_score": 0.0,
         "escalation_needed": False,
         "agent_data": {},
+        "request_store": {},
         "final_response": None,
         "request_id": request_id,
         "evaluation_results_store": evaluation_results_store,
         "brand_trackers_store": brand_trackers_store,
         "evaluate_agent": evaluate_agent,
         "guardrail_enabled": guardrail_enabled,
+        "rag_prefetch": rag_prefetch,
+        "stream_tokens": stream_tokens,
+        "deadline": deadline,
+        "session": session,
+        "conversation_history": session.context() if session is not None else "",
+        "config_context": config_context,
     }
+
+
+def _rag_documents_key(agent: str) -> str:
+    return f"{agent}.rag_documents"
+
+
+def store_rag_documents(state: AgentState, agent: str, documents: list[dict[str, Any]]) -> str:
+    """Keep an agent's RAG documents in the request store.
+
+    The store is shared by reference between nodes, so the documents are never
+    copied between steps. agent_data records the returned key instead.
+
+    Args:
+        state: Current agent state
+        agent: Agent that retrieved the documents
+        documents: Retrieved documents
+
+    Returns:
+        Key of the documents in the request store
+    """
+    key = _rag_documents_key(agent)
+    store = state.get("request_store")
+    if store is not None:
+        store[key] = documents
+    return key
+
+
+def get_rag_documents(state: dict[str, Any], agent: str | None = None) -> list[dict[str, Any]]:
+    """RAG documents retrieved during a request.
+
+    Args:
+        state: Agent state or final workflow result
+        agent: Agent whose documents to return (default: the first
+            specialist in RAG_AGENTS that retrieved any)
+
+    Returns:
+        Retrieved documents (empty if none)
+    """
+    store = state.get("request_store") or {}
+    for name in (agent,) if agent else RAG_AGENTS:
+        documents = store.get(_rag_documents_key(name))
+        if documents:
+            return documents
+    return []
@@ -1,52 +1,95 @@
 """Workflow graph for the multi-agent system."""
 
+import asyncio
 import functools
-from typing import Any, Callable, Literal
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Literal
 
 from langgraph.graph import END, StateGraph
 from opentelemetry import trace
 from opentelemetry.trace import StatusCode
 
 from ..agents import (
+    apolicy_specialist_node,
+    aprovider_specialist_node,
+    ascheduler_specialist_node,
+    atriage_node,
+    abrand_voice_node,
     policy_specialist_node,
     provider_specialist_node,
     scheduler_specialist_node,
     triage_node,
     brand_voice_node,
 )
+from ..tools.rag_prefetch import speculative_rag_enabled, start_rag_prefetch
+from ..utils.config_context import ConfigContext
+from ..utils.deadline import resolve_deadline
+from .session import approx_tokens, get_session_store
 from .state import AgentState
 
 _tracer = trace.get_tracer("togglehealth.workflow", "1.0.0")
 
+# Process-wide cache of compiled graphs, keyed by the options that change the
+# graph topology. Compiled graphs hold no per-request state, so a single
+# instance can be invoked concurrently from any number of threads.
+_WORKFLOW_CACHE: dict[tuple, Any] = {}
+_WORKFLOW_CACHE_LOCK = threading.Lock()
+
 
 def _traced_node(name: str, fn: Callable) -> Callable:
-    """Wrap a LangGraph node function with an OpenTelemetry span."""
+    """Wrap a LangGraph node function (sync or async) with an OpenTelemetry span."""
 
-    @functools.wraps(fn)
-    def wrapper(state: AgentState) -> dict[str, Any]:
+    def start_span(state: AgentState):
         user_context = state.get("user_context", {})
-        with _tracer.start_as_current_span(
+        return _tracer.start_as_current_span(
             f"agent.{name}",
             attributes={
                 "agent.name": name,
                 "agent.user_key": user_context.get("user_key", ""),
             },
-        ) as span:
+        )
+
+    def record_result(span, result: dict[str, Any]) -> None:
+        agent_data = result.get("agent_data", {}).get(name, {})
+        if agent_data:
+            model = agent_data.get("model", "")
+            if model:
+                span.set_attribute("agent.model", model)
+            tokens = agent_data.get("tokens", {})
+            if tokens:
+                span.set_attribute("agent.tokens.input", tokens.get("input", 0))
+                span.set_attribute("agent.tokens.output", tokens.get("output", 0))
+            duration = agent_data.get("duration_ms")
+            if duration is not None:
+                span.set_attribute("agent.duration_ms", duration)
+        span.set_status(StatusCode.OK)
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(state: AgentState) -> dict[str, Any]:
+            with start_span(state) as span:
+                try:
+                    result = await fn(state)
+                    record_result(span, result)
+                    return result
+                except Exception as e:
+                    span.set_status(StatusCode.ERROR, str(e))
+                    span.record_exception(e)
+                    raise
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state: AgentState) -> dict[str, Any]:
+        with start_span(state) as span:
             try:
                 result = fn(state)
-                agent_data = result.get("agent_data", {}).get(name, {})
-                if agent_data:
-                    model = agent_data.get("model", "")
-                    if model:
-                        span.set_attribute("agent.model", model)
-                    tokens = agent_data.get("tokens", {})
-                    if tokens:
-                        span.set_attribute("agent.tokens.input", tokens.get("input", 0))
-                        span.set_attribute("agent.tokens.output", tokens.get("output", 0))
-                    duration = agent_data.get("duration_ms")
-                    if duration is not None:
-                        span.set_attribute("agent.duration_ms", duration)
-                span.set_status(StatusCode.OK)
+                record_result(span, result)
                 return result
             except Exception as e:
                 span.set_status(StatusCode.ERROR, str(e))
@@ -85,6 +128,8 @@ def route_after_specialist(state: AgentState) -> Literal["brand_voice", "__end__
     - Specific agent name: Terminate after that specific agent (except brand_agent)
     - "brand_agent": Proceed to brand_voice (to evaluate brand agent)
     - None: Proceed to brand_voice (normal flow)
+
+    Also terminates when the specialist ran in fused brand voice mode.
     
     Args:
         state: Current agent state
@@ -101,23 +146,45 @@ def route_after_specialist(state: AgentState) -> Literal["brand_voice", "__end__
         
         # Otherwise, terminate after specialist to evaluate that agent only
         return "__end__"  # type: ignore
+
+    # Fused mode: the specialist already answered in brand voice
+    agent_data = state.get("agent_data", {})
+    if any(data.get("fused_brand_voice") for data in agent_data.values() if isinstance(data, dict)):
+        return "__end__"  # type: ignore
     
     return "brand_voice"  # type: ignore
 
 
-def create_workflow() -> StateGraph:
+def create_workflow(asynchronous: bool = False) -> StateGraph:
     """Create the LangGraph workflow for the multi-agent system.
 
+    Args:
+        asynchronous: Use the async agent nodes (for ``ainvoke``) instead of
+            the sync ones. Both graphs have the same topology.
+
     Returns:
         Compiled workflow graph
     """
     workflow = StateGraph(AgentState)
 
-    workflow.add_node("triage", _traced_node("triage", triage_node))
-    workflow.add_node("policy_specialist", _traced_node("policy_specialist", policy_specialist_node))
-    workflow.add_node("provider_specialist", _traced_node("provider_specialist", provider_specialist_node))
-    workflow.add_node("scheduler_specialist", _traced_node("scheduler_specialist", scheduler_specialist_node))
-    workflow.add_node("brand_voice", _traced_node("brand_voice", brand_voice_node))
+    if asynchronous:
+        nodes = {
+            "triage": atriage_node,
+            "policy_specialist": apolicy_specialist_node,
+            "provider_specialist": aprovider_specialist_node,
+            "scheduler_specialist": ascheduler_specialist_node,
+            "brand_voice": abrand_voice_node,
+        }
+    else:
+        nodes = {
+            "triage": triage_node,
+            "policy_specialist": policy_specialist_node,
+            "provider_specialist": provider_specialist_node,
+            "scheduler_specialist": scheduler_specialist_node,
+            "brand_voice": brand_voice_node,
+        }
+    for name, node in nodes.items():
+        workflow.add_node(name, _traced_node(name, node))
 
     # Set entry point
     workflow.set_entry_point("triage")
@@ -168,31 +235,46 @@ def create_workflow() -> StateGraph:
     return workflow.compile()
 
 
-def run_workflow(
-    user_message: str,
-    user_context: dict | None = None,
-    request_id: str | None = None,
-    evaluation_results_store: dict | None = None,
-    brand_trackers_store: dict | None = None,
-    evaluate_agent: str | None = None,
-    guardrail_enabled: bool = True
-) -> dict:
-    """Run the workflow with a user message.
+def get_workflow(**options: Any) -> Any:
+    """Get the compiled workflow graph, compiling it on first use.
+
+    The graph is built once per distinct set of topology options and reused
+    for every subsequent request. Evaluation mode is not part of the key:
+    ``route_after_specialist`` reads ``evaluate_agent`` from the state at run
+    time, so the same compiled graph serves both normal and evaluation runs.
 
     Args:
-        user_message: The user's query
-        user_context: Optional user context (policy_id, location, etc.)
-        request_id: Optional request ID for tracking evaluation results
-        evaluation_results_store: Optional shared dict for storing evaluation results
-        brand_trackers_store: Optional shared dict for storing brand voice trackers
-        evaluate_agent: Optional agent to evaluate (stops workflow after this agent)
-        guardrail_enabled: Whether to use guardrails (default True)
+        **options: Topology options forwarded to ``create_workflow``
 
     Returns:
-        Final state after workflow execution
+        Compiled workflow graph shared across requests
     """
-    from .state import create_initial_state
+    key = tuple(sorted(options.items()))
+    workflow = _WORKFLOW_CACHE.get(key)
+    if workflow is None:
+        with _WORKFLOW_CACHE_LOCK:
+            # Re-check under the lock so concurrent first callers compile once
+            workflow = _WORKFLOW_CACHE.get(key)
+            if workflow is None:
+                workflow = create_workflow(**options)
+                _WORKFLOW_CACHE[key] = workflow
+    return workflow
+
+
+def clear_workflow_cache() -> None:
+    """Drop all cached compiled graphs (e.g. after patching node functions in tests)."""
+    with _WORKFLOW_CACHE_LOCK:
+        _WORKFLOW_CACHE.clear()
+
 
+def _workflow_span_attributes(
+    user_message: str,
+    user_context: dict | None,
+    request_id: str | None,
+    evaluate_agent: str | None,
+    guardrail_enabled: bool,
+) -> dict[str, Any]:
+    """Build the attributes for the top-level workflow span."""
     span_attributes = {
         "workflow.user_message": user_message[:200],
         "workflow.guardrail_enabled": guardrail_enabled,
@@ -204,35 +286,461 @@ def run_workflow(
     if user_context:
         span_attributes["workflow.user_key"] = user_context.get("user_key", "")
         span_attributes["workflow.coverage_type"] = user_context.get("coverage_type", "")
+    return span_attributes
+
+
+def _finish_run(span, final_state: dict) -> None:
+    """Annotate the workflow span with the outcome of a run and record the session turn."""
+    query_type = final_state.get("query_type", "unknown")
+    span.set_attribute("workflow.query_type", str(query_type))
+    span.set_attribute("workflow.next_agent", final_state.get("next_agent", ""))
+    final_response = final_state.get("final_response", "")
+    span.set_attribute("workflow.response_length", len(final_response))
+    triage_data = final_state.get("agent_data", {}).get("triage_router", {})
+    span.set_attribute("workflow.triage_fast_path", bool(triage_data.get("fast_path")))
+    config_context = final_state.get("config_context")
+    if config_context is not None:
+        config_stats = config_context.stats()
+        span.set_attribute("workflow.config_lookups", config_stats["lookups"])
+        span.set_attribute("workflow.config_resolutions", config_stats["resolutions"])
+    session = final_state.get("session")
+    if session is not None and final_response:
+        session.record_turn(_first_user_message(final_state), final_response, getattr(query_type, "value", str(query_type)))
+    span.set_status(StatusCode.OK)
+
+
+def _first_user_message(state: dict) -> str:
+    """The customer's message for this turn."""
+    from langchain_core.messages import HumanMessage
+
+    for message in state.get("messages", []):
+        if isinstance(message, HumanMessage):
+            return message.content
+    return ""
+
+
+def _create_run_state(
+    span,
+    user_message: str,
+    user_context: dict | None,
+    request_id: str | None,
+    evaluation_results_store: dict | None,
+    brand_trackers_store: dict | None,
+    evaluate_agent: str | None,
+    guardrail_enabled: bool,
+    speculative_rag: bool | None,
+    deadline_s: float | None = None,
+    session_id: str | None = None,
+    stream_tokens: bool = False,
+) -> dict:
+    """Build the initial state for a run, starting speculative retrieval if enabled.
 
+    If building the state fails after retrieval has started, the retrieval is
+    discarded and the error is recorded on ``span`` before it is re-raised.
+    """
+    from .state import create_initial_state
+
+    # Start the clock before any work (including speculative retrieval)
+    deadline = resolve_deadline(deadline_s)
+    if deadline is not None:
+        span.set_attribute("workflow.deadline_ms", int(deadline.budget_s * 1000))
+
+    config_context = ConfigContext()
+    rag_prefetch = None
+    if speculative_rag_enabled(speculative_rag):
+        rag_prefetch = start_rag_prefetch(user_message, user_context or {}, config_context)
+    span.set_attribute("workflow.speculative_rag", rag_prefetch is not None)
+    span.set_attribute("workflow.stream_tokens", stream_tokens)
+
+    # Retrieval is already in flight, so a failure from here on must still
+    # discard it and mark the run as failed
+    try:
+        session = None
+        if session_id:
+            session = get_session_store().get(session_id)
+            span.set_attribute("workflow.session_id", session_id)
+            span.set_attribute("workflow.session_turn", session.turn_count + 1)
+
+        initial_state = create_initial_state(
+            user_message,
+            user_context,
+            request_id,
+            evaluation_results_store,
+            brand_trackers_store,
+            evaluate_agent,
+            guardrail_enabled,
+            rag_prefetch,
+            stream_tokens,
+            deadline,
+            session,
+            config_context,
+        )
+    except Exception as e:
+        span.set_status(StatusCode.ERROR, str(e))
+        span.record_exception(e)
+        if rag_prefetch is not None:
+            span.set_attributes(rag_prefetch.finish())
+        raise
+    if session is not None:
+        span.set_attribute("workflow.session_history_tokens", approx_tokens(initial_state["conversation_history"]))
+    return initial_state
+
+
+@contextmanager
+def _prepare_run(
+    user_message: str,
+    user_context: dict | None,
+    request_id: str | None,
+    evaluation_results_store: dict | None,
+    brand_trackers_store: dict | None,
+    evaluate_agent: str | None,
+    guardrail_enabled: bool,
+    speculative_rag: bool | None,
+    deadline_s: float | None,
+    session_id: str | None,
+    stream_tokens: bool,
+) -> Iterator[tuple[Any, dict]]:
+    """Open the workflow span and build the initial state of a run.
+
+    Yields ``(span, initial_state)``. An error raised in the block is recorded
+    on the span, and speculative retrieval stats are added when it exits.
+    """
     with _tracer.start_as_current_span(
         "multi-agent-workflow",
-        attributes=span_attributes,
+        attributes=_workflow_span_attributes(
+            user_message, user_context, request_id, evaluate_agent, guardrail_enabled
+        ),
     ) as span:
-        initial_state = create_initial_state(
+        initial_state = _create_run_state(
+            span,
             user_message,
             user_context,
             request_id,
             evaluation_results_store,
             brand_trackers_store,
             evaluate_agent,
-            guardrail_enabled
+            guardrail_enabled,
+            speculative_rag,
+            deadline_s,
+            session_id,
+            stream_tokens,
         )
-
-        workflow = create_workflow()
-
+        rag_prefetch = initial_state["rag_prefetch"]
         try:
-            final_state = workflow.invoke(initial_state)
+            yield span, initial_state
         except Exception as e:
             span.set_status(StatusCode.ERROR, str(e))
             span.record_exception(e)
             raise
+        finally:
+            if rag_prefetch is not None:
+                span.set_attributes(rag_prefetch.finish())
+
+
+def run_workflow(
+    user_message: str,
+    user_context: dict | None = None,
+    request_id: str | None = None,
+    evaluation_results_store: dict | None = None,
+    brand_trackers_store: dict | None = None,
+    evaluate_agent: str | None = None,
+    guardrail_enabled: bool = True,
+    speculative_rag: bool | None = None,
+    deadline_s: float | None = None,
+    session_id: str | None = None,
+) -> dict:
+    """Run the workflow with a user message.
+
+    Args:
+        user_message: The user's query
+        user_context: Optional user context (policy_id, location, etc.)
+        request_id: Optional request ID for tracking evaluation results
+        evaluation_results_store: Optional shared dict for storing evaluation results
+        brand_trackers_store: Optional shared dict for storing brand voice trackers
+        evaluate_agent: Optional agent to evaluate (stops workflow after this agent)
+        guardrail_enabled: Whether to use guardrails (default True)
+        speculative_rag: Start KB retrieval in parallel with triage
+            (None defers to the SPECULATIVE_RAG env var)
+        deadline_s: Time budget for the whole request in seconds
+            (None defers to the WORKFLOW_DEADLINE_S env var; 0 disables)
+        session_id: Conversation to continue; its summarized history is
+            added to the prompts and this turn is recorded in it
+
+    Returns:
+        Final state after workflow execution
+    """
+    with _prepare_run(
+        user_message, user_context, request_id, evaluation_results_store, brand_trackers_store,
+        evaluate_agent, guardrail_enabled, speculative_rag, deadline_s, session_id, stream_tokens=False,
+    ) as (span, initial_state):
+        final_state = get_workflow().invoke(initial_state)
+        _finish_run(span, final_state)
+    return final_state
 
-        query_type = final_state.get("query_type", "unknown")
-        span.set_attribute("workflow.query_type", str(query_type))
-        span.set_attribute("workflow.next_agent", final_state.get("next_agent", ""))
-        final_response = final_state.get("final_response", "")
-        span.set_attribute("workflow.response_length", len(final_response))
-        span.set_status(StatusCode.OK)
 
-        return final_state
+async def arun_workflow(
+    user_message: str,
+    user_context: dict | None = None,
+    request_id: str | None = None,
+    evaluation_results_store: dict | None = None,
+    brand_trackers_store: dict | None = None,
+    evaluate_agent: str | None = None,
+    guardrail_enabled: bool = True,
+    speculative_rag: bool | None = None,
+    deadline_s: float | None = None,
+    session_id: str | None = None,
+) -> dict:
+    """Run the workflow asynchronously with a user message.
+
+    Drives the async graph with ``ainvoke`` so many conversations can share
+    one event loop instead of holding an OS thread each. Arguments and return
+    value are the same as ``run_workflow``.
+    """
+    with _prepare_run(
+        user_message, user_context, request_id, evaluation_results_store, brand_trackers_store,
+        evaluate_agent, guardrail_enabled, speculative_rag, deadline_s, session_id, stream_tokens=False,
+    ) as (span, initial_state):
+        final_state = await get_workflow(asynchronous=True).ainvoke(initial_state)
+        _finish_run(span, final_state)
+    return final_state
+
+
+def _stream_event(mode: str, chunk: Any) -> dict[str, Any] | None:
+    """Convert a LangGraph (mode, chunk) pair into a workflow stream event."""
+    if mode == "custom":
+        # Emitted by nodes via get_stream_writer(), e.g. brand voice tokens
+        return chunk
+    if mode == "updates":
+        for node_name, update in chunk.items():
+            return {"type": "node", "agent": node_name, "update": update or {}}
+    return None
+
+
+def stream_workflow(
+    user_message: str,
+    user_context: dict | None = None,
+    request_id: str | None = None,
+    evaluation_results_store: dict | None = None,
+    brand_trackers_store: dict | None = None,
+    evaluate_agent: str | None = None,
+    guardrail_enabled: bool = True,
+    speculative_rag: bool | None = None,
+    deadline_s: float | None = None,
+    session_id: str | None = None,
+):
+    """Run the workflow and yield events as they happen.
+
+    The brand voice agent streams its tokens through the graph, so the first
+    token event arrives as soon as the brand model produces it. Arguments are
+    the same as ``run_workflow``.
+
+    Yields:
+        ``{"type": "node", "agent", "update"}`` when an agent finishes,
+        ``{"type": "token", "agent", "content"}`` for each streamed token,
+        ``{"type": "reset", "agent"}`` when the agent's streamed text so far is
+        discarded (a deadline fallback replaces it), and finally
+        ``{"type": "final", "state"}`` with the complete final state
+    """
+    with _prepare_run(
+        user_message, user_context, request_id, evaluation_results_store, brand_trackers_store,
+        evaluate_agent, guardrail_enabled, speculative_rag, deadline_s, session_id, stream_tokens=True,
+    ) as (span, initial_state):
+        final_state = None
+        for mode, chunk in get_workflow().stream(initial_state, stream_mode=["custom", "updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+                continue
+            event = _stream_event(mode, chunk)
+            if event is not None:
+                yield event
+        _finish_run(span, final_state)
+        yield {"type": "final", "state": final_state}
+
+
+async def astream_workflow(
+    user_message: str,
+    user_context: dict | None = None,
+    request_id: str | None = None,
+    evaluation_results_store: dict | None = None,
+    brand_trackers_store: dict | None = None,
+    evaluate_agent: str | None = None,
+    guardrail_enabled: bool = True,
+    speculative_rag: bool | None = None,
+    deadline_s: float | None = None,
+    session_id: str | None = None,
+):
+    """Async variant of ``stream_workflow`` driven by the async graph.
+
+    Arguments are the same as ``run_workflow``.
+
+    Yields:
+        Same events as ``stream_workflow``
+    """
+    with _prepare_run(
+        user_message, user_context, request_id, evaluation_results_store, brand_trackers_store,
+        evaluate_agent, guardrail_enabled, speculative_rag, deadline_s, session_id, stream_tokens=True,
+    ) as (span, initial_state):
+        final_state = None
+        workflow = get_workflow(asynchronous=True)
+        async for mode, chunk in workflow.astream(initial_state, stream_mode=["custom", "updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+                continue
+            event = _stream_event(mode, chunk)
+            if event is not None:
+                yield event
+        _finish_run(span, final_state)
+        yield {"type": "final", "state": final_state}
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one workflow run inside a batch."""
+
+    index: int
+    duration_ms: int
+    state: dict | None = None
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchSummary:
+    """Throughput and latency summary for a workflow batch."""
+
+    total: int
+    succeeded: int
+    failed: int
+    wall_time_ms: int
+    throughput_per_s: float
+    latency_ms: dict[str, int] = field(default_factory=dict)
+    results: list[BatchItemResult] = field(default_factory=list)
+
+
+def _batch_kwargs(item: Any) -> dict[str, Any]:
+    """Normalize a batch item into run_workflow keyword arguments.
+
+    Items are either ``(user_message, user_context)`` pairs or dicts of
+    ``run_workflow`` keyword arguments.
+    """
+    if isinstance(item, dict):
+        return dict(item)
+    user_message, user_context = item
+    return {"user_message": user_message, "user_context": user_context}
+
+
+def _percentile(sorted_values: list[int], pct: float) -> int:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _summarize_batch(results: list[BatchItemResult], wall_time_ms: int) -> BatchSummary:
+    durations = sorted(r.duration_ms for r in results if r.succeeded)
+    succeeded = len(durations)
+    return BatchSummary(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        wall_time_ms=wall_time_ms,
+        throughput_per_s=round(succeeded / (wall_time_ms / 1000.0), 3) if wall_time_ms else 0.0,
+        latency_ms={
+            "mean": int(sum(durations) / succeeded) if succeeded else 0,
+            "p50": _percentile(durations, 50),
+            "p95": _percentile(durations, 95),
+            "p99": _percentile(durations, 99),
+            "max": durations[-1] if durations else 0,
+        },
+        results=sorted(results, key=lambda r: r.index),
+    )
+
+
+async def arun_workflow_batch(
+    items: Iterable[Any],
+    max_concurrency: int = 8,
+) -> AsyncIterator[BatchItemResult]:
+    """Run many workflows concurrently, yielding results as they finish.
+
+    All runs share one event loop, the cached async graph and the process-wide
+    LaunchDarkly and AWS clients. A failing item is reported in its result and
+    never stops the rest of the batch.
+
+    Args:
+        items: ``(user_message, user_context)`` pairs or dicts of
+            ``run_workflow`` keyword arguments
+        max_concurrency: Maximum workflows in flight at once
+
+    Yields:
+        BatchItemResult for each item, in completion order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(index: int, kwargs: dict[str, Any]) -> BatchItemResult:
+        async with semaphore:
+            start_time = time.time()
+            try:
+                state = await arun_workflow(**kwargs)
+                return BatchItemResult(index, int((time.time() - start_time) * 1000), state=state)
+            except Exception as e:
+                return BatchItemResult(index, int((time.time() - start_time) * 1000), error=str(e))
+
+    tasks = [asyncio.create_task(run_one(i, _batch_kwargs(item))) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_workflow_batch(
+    items: Iterable[Any],
+    max_concurrency: int = 8,
+    on_result: Callable[[BatchItemResult], None] | None = None,
+    wait_for_evaluations: bool = True,
+) -> BatchSummary:
+    """Run many workflows concurrently and summarize throughput and latency.
+
+    Synchronous entry point for scripts, tests and Lambda handlers; must not
+    be called from a running event loop (use ``arun_workflow_batch`` there).
+
+    Args:
+        items: ``(user_message, user_context)`` pairs or dicts of
+            ``run_workflow`` keyword arguments
+        max_concurrency: Maximum workflows in flight at once
+        on_result: Optional callback invoked as each item finishes
+        wait_for_evaluations: Wait for background brand voice evaluations
+            before returning (they are cancelled when the loop closes)
+
+    Returns:
+        BatchSummary with per-item results ordered by input position
+    """
+    from ..agents import wait_for_background_evaluations
+
+    async def run_all() -> BatchSummary:
+        start_time = time.time()
+        results = []
+        async for result in arun_workflow_batch(items, max_concurrency):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        summary = _summarize_batch(results, int((time.time() - start_time) * 1000))
+        if wait_for_evaluations:
+            await wait_for_background_evaluations()
+        return summary
+
+    with _tracer.start_as_current_span(
+        "multi-agent-workflow-batch",
+        attributes={"batch.max_concurrency": max_concurrency},
+    ) as span:
+        summary = asyncio.run(run_all())
+        span.set_attribute("batch.total", summary.total)
+        span.set_attribute("batch.failed", summary.failed)
+        span.set_attribute("batch.throughput_per_s", summary.throughput_per_s)
+        span.set_attribute("batch.latency_p95_ms", summary.latency_ms["p95"])
+        return summary
@@ -6,6 +6,8 @@ from .calendar import get_available_slots, schedule_appointment
 from .bedrock_rag import (
     retrieve_policy_documents,
     retrieve_provider_documents,
+    aretrieve_policy_documents,
+    aretrieve_provider_documents,
     get_policy_retriever,
     get_provider_retriever,
 )
@@ -17,6 +19,8 @@ __all__ = [
     "schedule_appointment",
     "retrieve_policy_documents",
     "retrieve_provider_documents",
+    "aretrieve_policy_documents",
+    "aretrieve_provider_documents",
     "get_policy_retriever",
     "get_provider_retriever",
 ]
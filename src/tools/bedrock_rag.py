@@ -1,5 +1,6 @@
 """Bedrock Knowledge Base RAG tools for policy and provider retrieval."""
 
+import asyncio
 import os
 import sys
 from typing import Any, Optional
@@ -23,6 +24,7 @@ class BedrockKnowledgeBaseRetriever:
         region: Optional[str] = None,
         profile: Optional[str] = None,
         top_k: int = 5,
+        timeout: Optional[float] = None,
     ):
         """Initialize Bedrock KB retriever.
 
@@ -31,11 +33,13 @@ class BedrockKnowledgeBaseRetriever:
             region: AWS region (defaults to AWS_REGION env var)
             profile: AWS profile (defaults to AWS_PROFILE env var)
             top_k: Number of documents to retrieve
+            timeout: Optional read/connect timeout in seconds (request deadline)
         """
         self.knowledge_base_id = knowledge_base_id
         self.region = region or os.getenv("AWS_REGION", "us-east-1")
         self.profile = profile or os.getenv("AWS_PROFILE")
         self.top_k = top_k
+        self.timeout = timeout
         self._client = None
 
     def _get_client(self):
@@ -47,15 +51,10 @@ class BedrockKnowledgeBaseRetriever:
         if self._client is None:
             from ..utils.aws_sso import get_sso_manager
             
-            # Get authenticated session via SSO manager
+            # Shared Bedrock Agent Runtime client from the SSO manager (pooled
+            # connections reused across retrievers; bounded by the request deadline if any)
             sso_manager = get_sso_manager(profile_name=self.profile, region=self.region)
-            session = sso_manager.get_boto3_session()
-            
-            # Create Bedrock Agent Runtime client
-            self._client = session.client(
-                service_name="bedrock-agent-runtime",
-                region_name=self.region
-            )
+            self._client = sso_manager.get_bedrock_client("bedrock-agent-runtime", timeout=self.timeout)
             
             print(f"🔍 Bedrock KB Retriever initialized (KB: {self.knowledge_base_id[:20]}...)")
         
@@ -77,6 +76,54 @@ class BedrockKnowledgeBaseRetriever:
         """
         client = self._get_client()
         
+        print(f"  🔍 Retrieving from Bedrock KB: '{query[:60]}...'")
+        
+        try:
+            response = client.retrieve(**self._retrieve_params(query, retrieval_config))
+        except Exception as e:
+            print(f"  ❌ Error retrieving from Bedrock KB: {e}")
+            raise
+
+        return self._parse_results(response)
+
+    async def aretrieve(
+        self,
+        query: str,
+        retrieval_config: Optional[dict] = None
+    ) -> list[dict[str, Any]]:
+        """Async variant of ``retrieve`` over aiobotocore (no thread per call).
+
+        Falls back to running ``retrieve`` in a worker thread when aiobotocore
+        is not installed.
+
+        Args:
+            query: The search query
+            retrieval_config: Optional retrieval configuration
+
+        Returns:
+            List of retrieved documents with content and metadata
+        """
+        from ..utils.aws_sso import async_bedrock_available, get_sso_manager
+
+        if not async_bedrock_available():
+            return await asyncio.to_thread(self.retrieve, query, retrieval_config)
+
+        # Shared per-event-loop client, bounded by the request deadline if any
+        sso_manager = get_sso_manager(profile_name=self.profile, region=self.region)
+        client = await sso_manager.get_async_bedrock_client("bedrock-agent-runtime", timeout=self.timeout)
+
+        print(f"  🔍 Retrieving from Bedrock KB: '{query[:60]}...'")
+
+        try:
+            response = await client.retrieve(**self._retrieve_params(query, retrieval_config))
+        except Exception as e:
+            print(f"  ❌ Error retrieving from Bedrock KB: {e}")
+            raise
+
+        return self._parse_results(response)
+
+    def _retrieve_params(self, query: str, retrieval_config: Optional[dict]) -> dict[str, Any]:
+        """Build the Retrieve API parameters for a query."""
         # Default retrieval configuration
         if retrieval_config is None:
             retrieval_config = {
@@ -84,35 +131,29 @@ class BedrockKnowledgeBaseRetriever:
                     "numberOfResults": self.top_k
                 }
             }
-        
-        print(f"  🔍 Retrieving from Bedrock KB: '{query[:60]}...'")
-        
-        try:
-            response = client.retrieve(
-                knowledgeBaseId=self.knowledge_base_id,
-                retrievalQuery={"text": query},
-                retrievalConfiguration=retrieval_config
-            )
-            
-            # Extract results
-            results = []
-            if "retrievalResults" in response:
-                for result in response["retrievalResults"]:
-                    doc = {
-                        "content": result.get("content", {}).get("text", ""),
-                        "score": result.get("score", 0.0),
-                        "location": result.get("location", {}),
-                        "metadata": result.get("metadata", {})
-                    }
-                    results.append(doc)
-                
-                print(f"  ✅ Retrieved {len(results)} documents (top score: {results[0]['score']:.3f})" if results else "  ⚠️  No documents retrieved")
-            
-            return results
+        return {
+            "knowledgeBaseId": self.knowledge_base_id,
+            "retrievalQuery": {"text": query},
+            "retrievalConfiguration": retrieval_config,
+        }
+
+    @staticmethod
+    def _parse_results(response: dict) -> list[dict[str, Any]]:
+        """Extract documents from a Retrieve API response."""
+        results = []
+        if "retrievalResults" in response:
+            for result in response["retrievalResults"]:
+                doc = {
+                    "content": result.get("content", {}).get("text", ""),
+                    "score": result.get("score", 0.0),
+                    "location": result.get("location", {}),
+                    "metadata": result.get("metadata", {})
+                }
+                results.append(doc)
             
-        except Exception as e:
-            print(f"  ❌ Error retrieving from Bedrock KB: {e}")
-            raise
+            print(f"  ✅ Retrieved {len(results)} documents (top score: {results[0]['score']:.3f})" if results else "  ⚠️  No documents retrieved")
+        
+        return results
 
     def retrieve_and_generate(
         self,
@@ -224,10 +265,27 @@ def get_kb_id_from_ld_config(config: dict, fallback_env_var: str = "") -> Option
     return fallback_env_var if fallback_env_var else None
 
 
+def resolve_kb_id(kind: str, ld_config: Optional[dict] = None, domain: Optional[str] = None) -> Optional[str]:
+    """Resolve the Knowledge Base ID a retriever of the given kind would use.
+
+    Args:
+        kind: "policy" or "provider"
+        ld_config: LaunchDarkly AI config (checks custom.awskbid)
+        domain: Domain override (e.g. "togglecell" uses telecom KB)
+
+    Returns:
+        KB ID, or None if not configured
+    """
+    fallback = POLICY_KB_ID if kind == "policy" else PROVIDER_KB_ID
+    domain_ids = DOMAIN_KB_IDS.get(domain, {})
+    return domain_ids.get(kind) or get_kb_id_from_ld_config(ld_config, fallback)
+
+
 def get_policy_retriever(
     top_k: int = 5,
     ld_config: Optional[dict] = None,
-    domain: Optional[str] = None
+    domain: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> Optional[BedrockKnowledgeBaseRetriever]:
     """Get retriever for policy knowledge base.
 
@@ -235,12 +293,12 @@ def get_policy_retriever(
         top_k: Number of documents to retrieve
         ld_config: LaunchDarkly AI config (checks custom.awskbid)
         domain: Domain override (e.g. "togglecell" uses telecom KB)
+        timeout: Optional read/connect timeout in seconds
 
     Returns:
         Bedrock KB retriever for policies, or None if not configured
     """
-    domain_ids = DOMAIN_KB_IDS.get(domain, {})
-    kb_id = domain_ids.get("policy") or get_kb_id_from_ld_config(ld_config, POLICY_KB_ID)
+    kb_id = resolve_kb_id("policy", ld_config, domain)
     
     if not kb_id:
         raise RuntimeError(
@@ -252,14 +310,16 @@ def get_policy_retriever(
     print(f"  📚 Using Policy KB: {kb_id} (domain: {domain or 'default'})")
     return BedrockKnowledgeBaseRetriever(
         knowledge_base_id=kb_id,
-        top_k=top_k
+        top_k=top_k,
+        timeout=timeout,
     )
 
 
 def get_provider_retriever(
     top_k: int = 5,
     ld_config: Optional[dict] = None,
-    domain: Optional[str] = None
+    domain: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> Optional[BedrockKnowledgeBaseRetriever]:
     """Get retriever for provider/store knowledge base.
 
@@ -267,12 +327,12 @@ def get_provider_retriever(
         top_k: Number of documents to retrieve
         ld_config: LaunchDarkly AI config (checks custom.awskbid)
         domain: Domain override (e.g. "togglecell" uses telecom KB)
+        timeout: Optional read/connect timeout in seconds
 
     Returns:
         Bedrock KB retriever for providers/stores, or None if not configured
     """
-    domain_ids = DOMAIN_KB_IDS.get(domain, {})
-    kb_id = domain_ids.get("provider") or get_kb_id_from_ld_config(ld_config, PROVIDER_KB_ID)
+    kb_id = resolve_kb_id("provider", ld_config, domain)
     
     if not kb_id:
         raise RuntimeError(
@@ -284,7 +344,8 @@ def get_provider_retriever(
     print(f"  📚 Using Provider KB: {kb_id} (domain: {domain or 'default'})")
     return BedrockKnowledgeBaseRetriever(
         knowledge_base_id=kb_id,
-        top_k=top_k
+        top_k=top_k,
+        timeout=timeout,
     )
 
 
@@ -292,7 +353,8 @@ def retrieve_policy_documents(
     query: str,
     policy_id: Optional[str] = None,
     ld_config: Optional[dict] = None,
-    domain: Optional[str] = None
+    domain: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> list[dict[str, Any]]:
     """Retrieve relevant policy documents using RAG.
 
@@ -301,13 +363,14 @@ def retrieve_policy_documents(
         policy_id: Optional policy ID to filter results
         ld_config: LaunchDarkly AI config (for KB ID in custom.awskbid)
         domain: Domain for KB selection (e.g. "togglecell")
+        timeout: Optional read/connect timeout in seconds (request deadline)
 
     Returns:
         List of relevant policy documents with content and metadata
     """
     print(f"📚 Retrieving policy documents via RAG...")
     
-    retriever = get_policy_retriever(ld_config=ld_config, domain=domain)
+    retriever = get_policy_retriever(ld_config=ld_config, domain=domain, timeout=timeout)
     
     # Enhance query with policy ID if available
     enhanced_query = query
@@ -328,7 +391,8 @@ def retrieve_provider_documents(
     location: Optional[str] = None,
     network: Optional[str] = None,
     ld_config: Optional[dict] = None,
-    domain: Optional[str] = None
+    domain: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> list[dict[str, Any]]:
     """Retrieve relevant provider/store documents using RAG.
 
@@ -339,13 +403,14 @@ def retrieve_provider_documents(
         network: Insurance network filter
         ld_config: LaunchDarkly AI config (for KB ID in custom.awskbid)
         domain: Domain for KB selection (e.g. "togglecell")
+        timeout: Optional read/connect timeout in seconds (request deadline)
 
     Returns:
         List of relevant provider/store documents with content and metadata
     """
     print(f"📚 Retrieving provider documents via RAG...")
     
-    retriever = get_provider_retriever(ld_config=ld_config, domain=domain)
+    retriever = get_provider_retriever(ld_config=ld_config, domain=domain, timeout=timeout)
     
     # Use original query without filter enhancement
     # Post-retrieval filtering in provider_specialist.py handles plan matching
@@ -358,3 +423,68 @@ def retrieve_provider_documents(
         print(f"  ⚠️  RAG retrieval failed: {e}, falling back to database")
         return []
 
+
+async def aretrieve_policy_documents(
+    query: str,
+    policy_id: Optional[str] = None,
+    ld_config: Optional[dict] = None,
+    domain: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> list[dict[str, Any]]:
+    """Async variant of retrieve_policy_documents.
+
+    The KB call is awaited on the event loop (aiobotocore), so an in-flight
+    retrieval does not hold a thread. With a timeout, the await is also
+    capped so a hung call cannot hold the request.
+    """
+    print("📚 Retrieving policy documents via RAG...")
+
+    retriever = get_policy_retriever(ld_config=ld_config, domain=domain, timeout=timeout)
+
+    # Enhance query with policy ID if available
+    enhanced_query = query
+    if policy_id:
+        enhanced_query = f"Policy {policy_id}: {query}"
+
+    return await _bounded(_aretrieve_or_empty(retriever, enhanced_query), timeout)
+
+
+async def aretrieve_provider_documents(
+    query: str,
+    specialty: Optional[str] = None,
+    location: Optional[str] = None,
+    network: Optional[str] = None,
+    ld_config: Optional[dict] = None,
+    domain: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> list[dict[str, Any]]:
+    """Async variant of retrieve_provider_documents (awaited on the event loop)."""
+    print("📚 Retrieving provider documents via RAG...")
+
+    retriever = get_provider_retriever(ld_config=ld_config, domain=domain, timeout=timeout)
+
+    # Original query only, as in retrieve_provider_documents
+    return await _bounded(_aretrieve_or_empty(retriever, query), timeout)
+
+
+async def _aretrieve_or_empty(retriever: BedrockKnowledgeBaseRetriever, query: str) -> list[dict[str, Any]]:
+    """Await a retrieval, falling back to no documents on failure."""
+    try:
+        return await retriever.aretrieve(query)
+    except Exception as e:
+        print(f"  ⚠️  RAG retrieval failed: {e}, falling back to database")
+        return []
+
+
+# Extra time past the botocore timeout before the await itself gives up
+_AWAIT_GRACE_S = 1.0
+
+
+async def _bounded(awaitable, timeout: Optional[float]):
+    """Await with an upper bound (no bound when timeout is None).
+
+    botocore's read timeout normally ends the call first; this is a safety net.
+    """
+    if timeout is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout + _AWAIT_GRACE_S)
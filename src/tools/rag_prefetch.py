@@ -0,0 +1,231 @@
+"""Speculative Knowledge Base prefetch that overlaps retrieval with triage.
+
+When enabled, policy and provider retrieval start before the triage LLM call
+returns. The specialist that triage routes to consumes its prefetched result
+(if it was fetched with the same arguments); the other retrieval is cancelled
+or discarded and counted as wasted.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from .bedrock_rag import resolve_kb_id, retrieve_policy_documents, retrieve_provider_documents
+
+# Shared pool for speculative retrievals (boto3 calls are blocking)
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RAG_PREFETCH_WORKERS", "16")),
+    thread_name_prefix="rag-prefetch",
+)
+
+# Process-wide counters for the cumulative wasted-retrieval rate
+_STATS_LOCK = threading.Lock()
+_STATS = {"started": 0, "consumed": 0, "wasted": 0}
+
+
+def speculative_rag_enabled(override: Optional[bool] = None) -> bool:
+    """Whether speculative prefetch is on (explicit override, else SPECULATIVE_RAG env var)."""
+    if override is not None:
+        return override
+    return os.getenv("SPECULATIVE_RAG", "false").lower() in ("1", "true", "yes")
+
+
+def policy_prefetch_key(query: str, policy_id: Optional[str], ld_config: Optional[dict], domain: Optional[str]) -> tuple:
+    """Arguments that determine a policy retrieval result."""
+    return (query, policy_id, domain, resolve_kb_id("policy", ld_config, domain))
+
+
+def provider_prefetch_key(query: str, ld_config: Optional[dict], domain: Optional[str]) -> tuple:
+    """Arguments that determine a provider retrieval result.
+
+    Specialty, location and network are not part of the key because provider
+    retrieval searches with the raw query only (filtering happens afterwards).
+    """
+    return (query, domain, resolve_kb_id("provider", ld_config, domain))
+
+
+class RAGPrefetch:
+    """Handles for the speculative retrievals started for one request."""
+
+    def __init__(self):
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.saved_ms = 0
+        self.wasted = 0
+        self.consumed = 0
+
+    def start(self, kind: str, key: tuple, fn, *args, **kwargs) -> None:
+        """Submit a retrieval to the prefetch pool.
+
+        Args:
+            kind: "policy" or "provider"
+            key: Arguments the result depends on (must match at consumption)
+            fn: Retrieval function
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+        """
+        entry: dict[str, Any] = {"key": key, "finished_at": None}
+
+        def run():
+            entry["started_at"] = time.time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                entry["finished_at"] = time.time()
+
+        entry["future"] = _PREFETCH_EXECUTOR.submit(run)
+        with self._lock:
+            self._entries[kind] = entry
+        with _STATS_LOCK:
+            _STATS["started"] += 1
+
+    def _claim(self, kind: str, key: tuple) -> Optional[dict[str, Any]]:
+        """Take the entry for kind if its key matches; discard every other entry."""
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        claimed = None
+        for entry_kind, entry in entries.items():
+            if entry_kind == kind and entry["key"] == key:
+                claimed = entry
+            else:
+                self._discard(entry)
+        return claimed
+
+    def _discard(self, entry: dict[str, Any]) -> None:
+        entry["future"].cancel()
+        self.wasted += 1
+        with _STATS_LOCK:
+            _STATS["wasted"] += 1
+
+    def _record_hit(self, entry: dict[str, Any], wait_started: float) -> None:
+        # Saved time is the part of the retrieval that overlapped earlier work
+        finished = entry["finished_at"] or time.time()
+        retrieval_ms = (finished - entry.get("started_at", finished)) * 1000
+        waited_ms = (time.time() - wait_started) * 1000
+        self.saved_ms += max(0, int(retrieval_ms - waited_ms))
+        self.consumed += 1
+        with _STATS_LOCK:
+            _STATS["consumed"] += 1
+
+    def take(self, kind: str, key: tuple, timeout: Optional[float] = None) -> Optional[list[dict[str, Any]]]:
+        """Consume the prefetched result for kind, waiting for it if still running.
+
+        Args:
+            kind: "policy" or "provider"
+            key: Arguments the caller would retrieve with
+            timeout: Maximum seconds to wait (request deadline)
+
+        Returns:
+            Retrieved documents, or None if nothing matching was prefetched
+            (or it failed or did not finish in time)
+        """
+        entry = self._claim(kind, key)
+        if entry is None:
+            return None
+        wait_started = time.time()
+        try:
+            documents = entry["future"].result(timeout)
+        except Exception as e:
+            print(f"  ⚠️  Speculative {kind} retrieval failed: {e}")
+            return None
+        self._record_hit(entry, wait_started)
+        print(f"  ⚡ Using prefetched {kind} documents (saved ~{self.saved_ms}ms)")
+        return documents
+
+    async def atake(self, kind: str, key: tuple, timeout: Optional[float] = None) -> Optional[list[dict[str, Any]]]:
+        """Async variant of take (awaits the prefetch without blocking the loop)."""
+        entry = self._claim(kind, key)
+        if entry is None:
+            return None
+        wait_started = time.time()
+        try:
+            documents = await asyncio.wait_for(asyncio.wrap_future(entry["future"]), timeout)
+        except Exception as e:
+            print(f"  ⚠️  Speculative {kind} retrieval failed: {e}")
+            return None
+        self._record_hit(entry, wait_started)
+        print(f"  ⚡ Using prefetched {kind} documents (saved ~{self.saved_ms}ms)")
+        return documents
+
+    def finish(self) -> dict[str, Any]:
+        """Discard unconsumed retrievals and return metrics for this request."""
+        with self._lock:
+            leftovers, self._entries = self._entries, {}
+        for entry in leftovers.values():
+            self._discard(entry)
+
+        started = self.consumed + self.wasted
+        with _STATS_LOCK:
+            cumulative = _STATS["wasted"] / _STATS["started"] if _STATS["started"] else 0.0
+        return {
+            "rag.speculative.started": started,
+            "rag.speculative.consumed": self.consumed,
+            "rag.speculative.wasted": self.wasted,
+            "rag.speculative.wasted_rate": self.wasted / started if started else 0.0,
+            "rag.speculative.wasted_rate_cumulative": round(cumulative, 4),
+            "rag.speculative.saved_ms": self.saved_ms,
+        }
+
+
+def start_rag_prefetch(query: str, user_context: dict[str, Any], config_context: Any | None = None) -> RAGPrefetch:
+    """Start policy and provider retrieval for a query before triage decides.
+
+    Both specialist AI Configs are resolved here (for their KB IDs), so the
+    config for the branch that is not taken is evaluated as well. Failures
+    only disable speculation for that branch; they never fail the request.
+
+    Args:
+        query: The user's query
+        user_context: User context (policy_id, domain, etc.)
+        config_context: Request's ConfigContext; the specialists reuse the
+            configs resolved here when their targeting context is unchanged
+
+    Returns:
+        Prefetch handles to store in the workflow state
+    """
+    from ..utils.config_context import ConfigContext
+
+    prefetch = RAGPrefetch()
+    config_context = config_context or ConfigContext()
+    domain = user_context.get("domain")
+    policy_id = user_context.get("policy_id")
+
+    try:
+        policy_config = config_context.resolve("policy_agent", user_context).config
+        prefetch.start(
+            "policy",
+            policy_prefetch_key(query, policy_id, policy_config, domain),
+            retrieve_policy_documents,
+            query,
+            policy_id,
+            ld_config=policy_config,
+            domain=domain,
+        )
+    except Exception as e:
+        print(f"  ⚠️  Skipping speculative policy retrieval: {e}")
+
+    try:
+        provider_config = config_context.resolve("provider_agent", user_context).config
+        prefetch.start(
+            "provider",
+            provider_prefetch_key(query, provider_config, domain),
+            retrieve_provider_documents,
+            query,
+            ld_config=provider_config,
+            domain=domain,
+        )
+    except Exception as e:
+        print(f"  ⚠️  Skipping speculative provider retrieval: {e}")
+
+    return prefetch
+
+
+def get_prefetch_stats() -> dict[str, Any]:
+    """Process-wide speculative retrieval counters."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    stats["wasted_rate"] = stats["wasted"] / stats["started"] if stats["started"] else 0.0
+    return stats
@@ -0,0 +1,317 @@
+"""Memoized AI Config evaluations for LaunchDarklyClient.get_ai_config.
+
+Every node resolves its AI Config several times per chat turn, and each call
+evaluates the flag, renders its prompt templates and rebuilds the config dict. The
+cache keeps the resulting config dict (never the tracker, which is rebuilt for
+the caller's context) keyed by the config key plus the values of only those
+context attributes that can change the result:
+
+- attributes referenced by the flag's targeting: rule clauses, segments,
+  prerequisites, and the context key for individual targets and rollouts
+- variables referenced by the prompt templates of any variation
+
+So two users who match the same rules share an entry, while targeting and
+percentage rollouts are still respected. Entries for a flag are dropped when
+the SDK's flag-change listener reports a change to it (or to a segment or
+prerequisite it uses), with a TTL as a safety net. Flags whose data the SDK
+does not expose, or that use big segments, are not cached.
+
+Cache hits skip ``variation``, so they send no flag evaluation events and are
+missing from the evaluation counts and flag insights in LaunchDarkly. Flags
+that need every evaluation (event tracking on the flag, a rule or the
+fallthrough, or an experiment rollout, including on prerequisites) are never
+cached. AI Config metrics (tokens, duration, feedback) are still tracked
+against the served variation.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+# Mustache tags: {{name}}, {{{name}}}, {{#section}}, {{/section}}, {{&name}}, {{>partial}}, {{!comment}}
+_TEMPLATE_TAG = re.compile(r"\{\{\{?\s*([#^/&>!]?)\s*([^}\s]*)\s*\}?\}\}")
+
+# Context dict key that holds the LaunchDarkly context key
+_CONTEXT_KEY_ATTRIBUTE = "user_key"
+
+
+class _Uncacheable(Exception):
+    """The flag's result may depend on the whole context."""
+
+
+def ai_config_cache_enabled() -> bool:
+    """Whether get_ai_config results are memoized (LD_CONFIG_CACHE env var, default true)."""
+    return os.getenv("LD_CONFIG_CACHE", "true").lower() in ("1", "true", "yes")
+
+
+def _context_attribute(reference: str) -> str:
+    """Context dict key for a LaunchDarkly attribute name or reference ("/address/city")."""
+    name = reference.lstrip("/").split("/")[0] if reference.startswith("/") else reference
+    return _CONTEXT_KEY_ATTRIBUTE if name == "key" else name
+
+
+def _rollout_attributes(rollout: Optional[dict[str, Any]]) -> set[str]:
+    if not rollout:
+        return set()
+    if not rollout.get("bucketBy"):
+        return {_CONTEXT_KEY_ATTRIBUTE}
+    return {_context_attribute(rollout["bucketBy"])}
+
+
+def _tracks_evaluations(flag: dict[str, Any]) -> bool:
+    """Whether the flag sends full evaluation events (event tracking or an experiment)."""
+    if flag.get("trackEvents") or flag.get("trackEventsFallthrough"):
+        return True
+    rollouts = [(flag.get("fallthrough") or {}).get("rollout")]
+    for rule in flag.get("rules", []):
+        if rule.get("trackEvents"):
+            return True
+        rollouts.append(rule.get("rollout"))
+    return any(rollout and rollout.get("kind") == "experiment" for rollout in rollouts)
+
+
+def _clause_attributes(
+    clauses: list[dict[str, Any]],
+    get_segment: Callable[[str], Optional[dict[str, Any]]],
+    seen: set[str],
+) -> set[str]:
+    attributes: set[str] = set()
+    for clause in clauses:
+        if clause.get("op") == "segmentMatch":
+            for segment_key in clause.get("values", []):
+                attributes |= _segment_attributes(segment_key, get_segment, seen)
+        elif clause.get("attribute") not in (None, "kind"):
+            attributes.add(_context_attribute(clause["attribute"]))
+    return attributes
+
+
+def _segment_attributes(
+    segment_key: str,
+    get_segment: Callable[[str], Optional[dict[str, Any]]],
+    seen: set[str],
+) -> set[str]:
+    if f"segment:{segment_key}" in seen:
+        return set()
+    seen.add(f"segment:{segment_key}")
+    segment = get_segment(segment_key)
+    if segment is None or segment.get("unbounded"):
+        # Unknown or big segment: membership cannot be derived from the context dict
+        raise _Uncacheable(segment_key)
+
+    attributes = set()
+    if any(segment.get(field) for field in ("included", "excluded", "includedContexts", "excludedContexts")):
+        attributes.add(_CONTEXT_KEY_ATTRIBUTE)
+    for rule in segment.get("rules", []):
+        attributes |= _clause_attributes(rule.get("clauses", []), get_segment, seen)
+        if rule.get("weight") is not None:
+            attributes.add(_context_attribute(rule["bucketBy"]) if rule.get("bucketBy") else _CONTEXT_KEY_ATTRIBUTE)
+    return attributes
+
+
+def _targeting_attributes(
+    flag: dict[str, Any],
+    get_flag: Callable[[str], Optional[dict[str, Any]]],
+    get_segment: Callable[[str], Optional[dict[str, Any]]],
+    seen: set[str],
+) -> set[str]:
+    """Context attributes the flag's evaluation can depend on."""
+    if _tracks_evaluations(flag):
+        # Every evaluation must reach LaunchDarkly, so it cannot be served from the cache
+        raise _Uncacheable(flag.get("key"))
+    attributes: set[str] = set()
+    if flag.get("targets") or flag.get("contextTargets"):
+        attributes.add(_CONTEXT_KEY_ATTRIBUTE)
+    for rule in flag.get("rules", []):
+        attributes |= _clause_attributes(rule.get("clauses", []), get_segment, seen)
+        attributes |= _rollout_attributes(rule.get("rollout"))
+    attributes |= _rollout_attributes((flag.get("fallthrough") or {}).get("rollout"))
+
+    for prerequisite in flag.get("prerequisites", []):
+        key = prerequisite.get("key")
+        if f"flag:{key}" in seen:
+            continue
+        seen.add(f"flag:{key}")
+        prerequisite_flag = get_flag(key)
+        if prerequisite_flag is None:
+            raise _Uncacheable(key)
+        attributes |= _targeting_attributes(prerequisite_flag, get_flag, get_segment, seen)
+    return attributes
+
+
+def _template_attributes(flag: dict[str, Any]) -> set[str]:
+    """Context attributes interpolated into any variation's instructions or messages."""
+    templates = []
+    for variation in flag.get("variations", []):
+        if not isinstance(variation, dict):
+            continue
+        if isinstance(variation.get("instructions"), str):
+            templates.append(variation["instructions"])
+        for message in variation.get("messages") or []:
+            if isinstance(message, dict) and isinstance(message.get("content"), str):
+                templates.append(message["content"])
+
+    attributes = set()
+    for template in templates:
+        for sigil, name in _TEMPLATE_TAG.findall(template):
+            if sigil in ("!", "/") or name in ("", "."):
+                continue
+            if sigil == ">":
+                raise _Uncacheable(name)
+            path = name.split(".")
+            if path[0] == "ldctx":
+                if len(path) == 1:
+                    raise _Uncacheable(name)
+                attributes.add(_context_attribute(path[1]))
+            else:
+                attributes.add(path[0])
+    return attributes
+
+
+def cache_key_attributes(
+    flag: Optional[dict[str, Any]],
+    get_flag: Callable[[str], Optional[dict[str, Any]]],
+    get_segment: Callable[[str], Optional[dict[str, Any]]],
+) -> Optional[tuple[str, ...]]:
+    """Context attributes an AI Config's resolved config depends on.
+
+    Args:
+        flag: The AI Config's flag data (LaunchDarkly JSON), None if unknown
+        get_flag: Flag data for a key (prerequisites)
+        get_segment: Segment data for a key
+
+    Returns:
+        Sorted attribute names, or None if the result cannot be keyed by
+        attributes (unknown flag, big segments, whole-context templates) or
+        must not be cached (evaluation events tracked, experiments)
+    """
+    if flag is None:
+        return None
+    try:
+        attributes = _targeting_attributes(flag, get_flag, get_segment, {f"flag:{flag.get('key')}"})
+        attributes |= _template_attributes(flag)
+    except _Uncacheable:
+        return None
+    return tuple(sorted(attributes))
+
+
+def _freeze(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class AIConfigCache:
+    """Resolved AI Config dicts keyed by config key and the context attributes they depend on."""
+
+    def __init__(self, max_entries: int = 10000, ttl_s: float = 300):
+        """
+        Args:
+            max_entries: Resolved configs kept (LRU)
+            ttl_s: Seconds an entry stays valid without a flag change
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[tuple, tuple[float, dict[str, Any], tuple]] = OrderedDict()
+        self._attributes: dict[str, Optional[tuple[str, ...]]] = {}
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "uncacheable": 0, "stores": 0, "invalidations": 0}
+
+    def key_for(
+        self,
+        config_key: str,
+        context: dict[str, Any],
+        flag_data: Callable[[], Optional[dict[str, Any]]],
+        get_flag: Callable[[str], Optional[dict[str, Any]]],
+        get_segment: Callable[[str], Optional[dict[str, Any]]],
+    ) -> Optional[tuple]:
+        """Cache key for a lookup, or None if this config cannot be cached.
+
+        The attributes a config depends on are derived from its flag data once
+        and kept until the flag changes.
+        """
+        if config_key in self._attributes:
+            attributes = self._attributes.get(config_key)
+        else:
+            flag = flag_data()
+            attributes = cache_key_attributes(flag, get_flag, get_segment)
+            if flag is not None:
+                # A flag missing from the store is looked up again next time
+                with self._lock:
+                    self._attributes[config_key] = attributes
+        if attributes is None:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return None
+        return (config_key, tuple(_freeze(context.get(name)) for name in attributes))
+
+    def generation(self, config_key: str) -> int:
+        """Change counter of a config (a put is dropped if the flag changed since the lookup)."""
+        return self._generations.get(config_key, 0)
+
+    def get(self, key: tuple) -> Optional[tuple[dict[str, Any], tuple]]:
+        """(config dict, tracker metadata) for a key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return entry[1], entry[2]
+
+    def put(self, key: tuple, generation: int, config: dict[str, Any], tracker_metadata: tuple) -> None:
+        """Store a resolved config unless its flag changed during the evaluation."""
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_s, config, tracker_metadata)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, config_key: str) -> None:
+        """Drop every entry of a config (flag-change listener)."""
+        with self._lock:
+            self._generations[config_key] = self._generations.get(config_key, 0) + 1
+            self._attributes.pop(config_key, None)
+            stale = [key for key in self._entries if key[0] == config_key]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for config_key in list(self._attributes):
+                self._generations[config_key] = self._generations.get(config_key, 0) + 1
+            self._entries.clear()
+            self._attributes.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters, hit rate and entries."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["cacheable_attributes"] = {
+                key: list(value) if value is not None else None for key, value in self._attributes.items()
+            }
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_ai_config_cache() -> AIConfigCache:
+    """Process-wide AI Config cache (LD_CONFIG_CACHE_* env vars)."""
+    return AIConfigCache(
+        max_entries=int(os.getenv("LD_CONFIG_CACHE_MAX_ENTRIES", "10000")),
+        ttl_s=float(os.getenv("LD_CONFIG_CACHE_TTL_S", "300")),
+    )
@@ -1,22 +1,62 @@
 """AWS SSO manager for token refresh and session management."""
 
+import asyncio
+import importlib.util
+import math
 import os
 import subprocess
+import threading
 import time
 from datetime import datetime, timedelta
 from functools import lru_cache
 from typing import Optional
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, TokenRetrievalError
 from dotenv import load_dotenv
 
+from .fake_bedrock import FakeAsyncBedrockClient, FakeBedrockClient, fake_bedrock_enabled
+
 # Load environment variables
 load_dotenv()
 
 
+def default_client_config() -> Config:
+    """botocore config shared by all Bedrock clients.
+
+    Sized for concurrent chat traffic: a large connection pool with TCP
+    keepalive so sockets are reused across requests and threads, adaptive
+    retries (client-side rate limiting on throttling) and explicit timeouts.
+    """
+    return Config(
+        max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50")),
+        tcp_keepalive=True,
+        connect_timeout=float(os.getenv("BEDROCK_CONNECT_TIMEOUT_S", "5")),
+        read_timeout=float(os.getenv("BEDROCK_READ_TIMEOUT_S", "60")),
+        retries={
+            "total_max_attempts": int(os.getenv("BEDROCK_MAX_ATTEMPTS", "3")),
+            "mode": os.getenv("BEDROCK_RETRY_MODE", "adaptive"),
+        },
+    )
+
+
+def async_bedrock_available() -> bool:
+    """Whether the async Bedrock transport (aiobotocore or the local fake) is available."""
+    return fake_bedrock_enabled() or _aiobotocore_installed()
+
+
+@lru_cache(maxsize=1)
+def _aiobotocore_installed() -> bool:
+    return importlib.util.find_spec("aiobotocore") is not None
+
+
 class AWSSSOManager:
-    """Manages AWS SSO authentication and token refresh."""
+    """Manages AWS SSO authentication and token refresh.
+
+    Owns one long-lived boto3 session and a cache of clients per service, so
+    all callers share the same connection pools.
+    """
 
     def __init__(self, profile_name: Optional[str] = None, region: Optional[str] = None):
         """Initialize AWS SSO Manager.
@@ -29,6 +69,12 @@ class AWSSSOManager:
         self.region = region or os.getenv("AWS_REGION", "us-east-1")
         self.last_check = None
         self.check_interval = 300  # Check every 5 minutes
+        self._session: Optional[boto3.Session] = None
+        self._clients: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        # aiobotocore clients are bound to the event loop that created them
+        self._aio_session = None
+        self._async_clients: dict[tuple, tuple] = {}
 
         print(f"🔐 AWS SSO Manager initialized (profile: {self.profile_name}, region: {self.region})")
 
@@ -41,6 +87,10 @@ class AWSSSOManager:
         current_time = time.time()
         if self.last_check and (current_time - self.last_check) < self.check_interval:
             return True
+        if fake_bedrock_enabled():
+            # The local fake backend needs no credentials
+            self.last_check = current_time
+            return True
 
         try:
             if self.profile_name:
@@ -79,6 +129,7 @@ class AWSSSOManager:
             if result.returncode == 0:
                 print(f"✅ AWS SSO login successful for profile: {self.profile_name}")
                 self.last_check = time.time()
+                self.reset_clients()
                 return True
             else:
                 print(f"❌ AWS SSO login failed: {result.stderr}")
@@ -95,7 +146,7 @@ class AWSSSOManager:
             return False
 
     def get_boto3_session(self) -> boto3.Session:
-        """Get a boto3 session with valid credentials.
+        """Get the shared boto3 session with valid credentials.
 
         Returns:
             boto3.Session with valid credentials
@@ -109,15 +160,27 @@ class AWSSSOManager:
                 f"Please run 'aws sso login --profile {self.profile_name}' manually."
             )
 
-        if self.profile_name:
-            return boto3.Session(profile_name=self.profile_name, region_name=self.region)
-        return boto3.Session(region_name=self.region)
+        with self._lock:
+            return self._get_session_locked()
+
+    def _get_session_locked(self) -> boto3.Session:
+        if self._session is None:
+            if self.profile_name:
+                self._session = boto3.Session(profile_name=self.profile_name, region_name=self.region)
+            else:
+                self._session = boto3.Session(region_name=self.region)
+        return self._session
+
+    def get_bedrock_client(self, service_name: str = "bedrock-runtime", timeout: Optional[float] = None):
+        """Get a shared Bedrock client with valid credentials.
 
-    def get_bedrock_client(self, service_name: str = "bedrock-runtime"):
-        """Get a Bedrock client with valid credentials.
+        Clients are cached per service (and per whole-second timeout for
+        deadline-bounded calls) and are safe to use from many threads.
 
         Args:
             service_name: AWS service name (default: bedrock-runtime)
+            timeout: Optional read/connect timeout in seconds (request deadline);
+                such clients do not retry
 
         Returns:
             Boto3 client for Bedrock
@@ -125,8 +188,93 @@ class AWSSSOManager:
         Raises:
             RuntimeError: If authentication fails
         """
-        session = self.get_boto3_session()
-        return session.client(service_name, region_name=self.region)
+        if not self.ensure_authenticated():
+            raise RuntimeError(
+                f"Failed to authenticate with AWS SSO (profile: {self.profile_name}). "
+                f"Please run 'aws sso login --profile {self.profile_name}' manually."
+            )
+
+        timeout_s = max(1, math.ceil(timeout)) if timeout else None
+        key = (service_name, timeout_s)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None and fake_bedrock_enabled():
+                client = FakeBedrockClient(service_name, read_timeout=timeout_s)
+                self._clients[key] = client
+            elif client is None:
+                config = timeout_client_config(timeout_s) if timeout_s else default_client_config()
+                # boto3 sessions are not thread-safe, so clients are created under the lock
+                client = self._get_session_locked().client(service_name, region_name=self.region, config=config)
+                self._clients[key] = client
+            return client
+
+    async def get_async_bedrock_client(self, service_name: str = "bedrock-runtime", timeout: Optional[float] = None):
+        """Get a shared aiobotocore client for the running event loop.
+
+        Same caching and config as ``get_bedrock_client``, but calls are
+        awaited on the event loop instead of blocking a thread. Requires
+        aiobotocore (see ``async_bedrock_available``).
+
+        Args:
+            service_name: AWS service name (default: bedrock-runtime)
+            timeout: Optional read/connect timeout in seconds (request deadline)
+
+        Returns:
+            aiobotocore client for Bedrock
+
+        Raises:
+            RuntimeError: If authentication fails
+        """
+        if self._auth_check_due() and not await asyncio.to_thread(self.ensure_authenticated):
+            raise RuntimeError(
+                f"Failed to authenticate with AWS SSO (profile: {self.profile_name}). "
+                f"Please run 'aws sso login --profile {self.profile_name}' manually."
+            )
+
+        timeout_s = max(1, math.ceil(timeout)) if timeout else None
+        if fake_bedrock_enabled():
+            # Fake clients are not bound to an event loop
+            with self._lock:
+                return self._clients.setdefault(
+                    ("async", service_name, timeout_s),
+                    FakeAsyncBedrockClient(service_name, read_timeout=timeout_s),
+                )
+
+        from aiobotocore.session import AioSession
+
+        loop = asyncio.get_running_loop()
+        key = (id(loop), service_name, timeout_s)
+        with self._lock:
+            # Forget clients whose event loop has been closed (e.g. finished asyncio.run batches)
+            for stale in [k for k, (client_loop, _) in self._async_clients.items() if client_loop.is_closed()]:
+                del self._async_clients[stale]
+            cached = self._async_clients.get(key)
+            if cached is not None:
+                return cached[1]
+            if self._aio_session is None:
+                self._aio_session = AioSession(profile=self.profile_name)
+
+        config = timeout_client_config(timeout_s) if timeout_s else default_client_config()
+        client = await self._aio_session.create_client(
+            service_name, region_name=self.region, config=config
+        ).__aenter__()
+        with self._lock:
+            # Another task may have created one meanwhile; keep the first
+            existing = self._async_clients.setdefault(key, (loop, client))
+        if existing[1] is not client:
+            await client.__aexit__(None, None, None)
+        return existing[1]
+
+    def _auth_check_due(self) -> bool:
+        return not self.last_check or (time.time() - self.last_check) >= self.check_interval
+
+    def reset_clients(self) -> None:
+        """Drop the cached session and clients (e.g. after a credential refresh)."""
+        with self._lock:
+            self._session = None
+            self._clients.clear()
+            self._aio_session = None
+            self._async_clients.clear()
 
     def force_refresh(self) -> bool:
         """Force a credential refresh regardless of check interval.
@@ -138,6 +286,22 @@ class AWSSSOManager:
         return self._refresh_credentials()
 
 
+def timeout_client_config(timeout_s: float) -> Config:
+    """botocore config for calls bounded by a request deadline.
+
+    Read and connect timeouts follow the remaining budget (rounded up to whole
+    seconds) and retries are disabled, since a retry would outlive the budget.
+    """
+    seconds = max(1, math.ceil(timeout_s))
+    return default_client_config().merge(
+        Config(
+            read_timeout=seconds,
+            connect_timeout=min(seconds, 5),
+            retries={"total_max_attempts": 1, "mode": "standard"},
+        )
+    )
+
+
 @lru_cache(maxsize=1)
 def get_sso_manager(
     profile_name: Optional[str] = None, region: Optional[str] = None
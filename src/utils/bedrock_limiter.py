@@ -0,0 +1,337 @@
+"""Adaptive concurrency limiter and circuit breaker for Bedrock model calls.
+
+Every converse/converse_stream call goes through the guard of its model:
+
+- AIMD limiter: the concurrency limit grows by ~1 per limit's worth of
+  successful calls and halves when Bedrock throttles. Calls over the limit
+  wait in a bounded queue; a full queue or a wait longer than
+  BEDROCK_QUEUE_TIMEOUT_S (or the call's own timeout) sheds the call with
+  ``BedrockOverloaded``.
+- Circuit breaker: BEDROCK_BREAKER_FAILURES consecutive throttling/server
+  errors open the breaker and calls fail fast with ``BedrockCircuitOpen`` for
+  BEDROCK_BREAKER_COOLDOWN_S; then one probe call decides whether it closes.
+
+Sync threads and asyncio tasks share the same guard. ``get_bedrock_guard_stats``
+reports limit, in-flight calls, queue depth and breaker state per model, and
+each call records them as ``bedrock.*`` span attributes.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Optional
+
+from opentelemetry import trace
+
+_THROTTLING_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+}
+_SERVER_ERROR_CODES = {
+    "InternalServerException",
+    "ServiceUnavailableException",
+    "ModelTimeoutException",
+    "ModelNotReadyException",
+}
+
+
+class BedrockOverloaded(RuntimeError):
+    """A Bedrock call was shed because the model is overloaded."""
+
+
+class BedrockCircuitOpen(BedrockOverloaded):
+    """The model's circuit breaker is open; the call was not attempted."""
+
+
+def bedrock_limiter_enabled() -> bool:
+    """Whether Bedrock calls go through the limiter (BEDROCK_LIMITER env var, default true)."""
+    return os.getenv("BEDROCK_LIMITER", "true").lower() in ("1", "true", "yes")
+
+
+def _error_code(error: BaseException) -> Optional[str]:
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code")
+    return None
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """Whether Bedrock rejected a call for rate or quota reasons."""
+    message = str(error).lower()
+    return _error_code(error) in _THROTTLING_CODES or "throttl" in message or "too many requests" in message
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an error means Bedrock is overloaded (shed, breaker open or throttled)."""
+    return isinstance(error, BedrockOverloaded) or is_throttling_error(error)
+
+
+class _Waiter:
+    """A queued call, woken from any thread (sync event or asyncio future)."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+        self.granted = False
+        self.rejected = False
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class BedrockGuard:
+    """Concurrency limit, wait queue and circuit breaker for one model."""
+
+    def __init__(self, model_id: str):
+        """
+        Args:
+            model_id: Bedrock model ID the guard protects
+        """
+        self.model_id = model_id
+        self.min_limit = 1
+        self.max_limit = int(os.getenv("BEDROCK_LIMIT_MAX", "128"))
+        self.max_queue = int(os.getenv("BEDROCK_MAX_QUEUE", "100"))
+        self.queue_timeout_s = float(os.getenv("BEDROCK_QUEUE_TIMEOUT_S", "10"))
+        self.failure_threshold = int(os.getenv("BEDROCK_BREAKER_FAILURES", "5"))
+        self.cooldown_s = float(os.getenv("BEDROCK_BREAKER_COOLDOWN_S", "10"))
+
+        self._limit = float(os.getenv("BEDROCK_LIMIT_INITIAL", "16"))
+        self._in_flight = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._stats = {"calls": 0, "queued": 0, "shed": 0, "rejected_open": 0, "throttled": 0, "breaker_opens": 0}
+
+    # ---- admission ----
+
+    def _admit_locked(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Optional[_Waiter]:
+        """Admit a call now (None), queue it (its waiter) or raise."""
+        if self._state == "open":
+            if time.monotonic() - self._opened_at < self.cooldown_s:
+                self._stats["rejected_open"] += 1
+                raise BedrockCircuitOpen(f"Bedrock circuit breaker open for {self.model_id}")
+            self._state = "half_open"
+            print(f"  ⚡ Bedrock circuit breaker half-open for {self.model_id}: sending a probe")
+        if self._state == "half_open" and self._in_flight > 0:
+            # Only the probe call runs until the breaker closes
+            self._stats["rejected_open"] += 1
+            raise BedrockCircuitOpen(f"Bedrock circuit breaker half-open for {self.model_id} (probe in flight)")
+
+        self._stats["calls"] += 1
+        if self._in_flight < max(self.min_limit, int(self._limit)) and not self._waiters:
+            self._in_flight += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            self._stats["shed"] += 1
+            raise BedrockOverloaded(f"Bedrock queue full for {self.model_id} ({len(self._waiters)} waiting)")
+        self._stats["queued"] += 1
+        waiter = _Waiter(loop)
+        self._waiters.append(waiter)
+        return waiter
+
+    def _wait_timeout(self, timeout: Optional[float]) -> float:
+        return min(self.queue_timeout_s, timeout) if timeout else self.queue_timeout_s
+
+    def _queue_result_locked(self, waiter: _Waiter) -> bool:
+        """After a wait: True if granted; otherwise dequeue it (shed)."""
+        if waiter.granted:
+            return True
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        return False
+
+    def _raise_for_waiter(self, waiter: _Waiter, waited_s: float) -> None:
+        if waiter.rejected:
+            raise BedrockCircuitOpen(f"Bedrock circuit breaker opened for {self.model_id} while queued")
+        with self._lock:
+            self._stats["shed"] += 1
+        raise BedrockOverloaded(f"No Bedrock capacity for {self.model_id} after waiting {waited_s:.1f}s")
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Take a call slot, waiting in the queue if needed.
+
+        Raises:
+            BedrockCircuitOpen: If the breaker is open
+            BedrockOverloaded: If the queue is full or the wait times out
+        """
+        start = time.monotonic()
+        with self._lock:
+            waiter = self._admit_locked()
+        if waiter is None:
+            self._record_admission(start)
+            return
+
+        waiter.event.wait(self._wait_timeout(timeout))
+        with self._lock:
+            granted = self._queue_result_locked(waiter)
+        if not granted:
+            self._raise_for_waiter(waiter, time.monotonic() - start)
+        self._record_admission(start)
+
+    async def aacquire(self, timeout: Optional[float] = None) -> None:
+        """Async variant of ``acquire`` (waits without blocking the event loop)."""
+        start = time.monotonic()
+        with self._lock:
+            waiter = self._admit_locked(asyncio.get_running_loop())
+        if waiter is None:
+            self._record_admission(start)
+            return
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self._wait_timeout(timeout))
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = self._queue_result_locked(waiter)
+            if granted and not waiter.rejected:
+                self.release("cancelled")
+            raise
+        with self._lock:
+            granted = self._queue_result_locked(waiter)
+        if not granted:
+            self._raise_for_waiter(waiter, time.monotonic() - start)
+        self._record_admission(start)
+
+    def _record_admission(self, start: float) -> None:
+        span = trace.get_current_span()
+        if span and span.is_recording():
+            stats = self.stats()
+            span.set_attribute("bedrock.queue_wait_ms", int((time.monotonic() - start) * 1000))
+            span.set_attribute("bedrock.in_flight", stats["in_flight"])
+            span.set_attribute("bedrock.queue_depth", stats["queue_depth"])
+            span.set_attribute("bedrock.concurrency_limit", stats["limit"])
+            span.set_attribute("bedrock.breaker_state", stats["breaker_state"])
+
+    # ---- completion ----
+
+    def release(self, outcome: str) -> None:
+        """Free a slot and adapt the limit and breaker.
+
+        Args:
+            outcome: "success", "throttled", "server_error", "error" (client-side
+                errors, no signal) or "cancelled"
+        """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+            if outcome == "success":
+                self._limit = min(self.max_limit, self._limit + 1 / max(1.0, self._limit))
+                self._consecutive_failures = 0
+                if self._state == "half_open":
+                    self._state = "closed"
+                    print(f"  ⚡ Bedrock circuit breaker closed for {self.model_id}")
+            elif outcome in ("throttled", "server_error"):
+                if outcome == "throttled":
+                    self._stats["throttled"] += 1
+                    self._limit = max(self.min_limit, self._limit / 2)
+                self._consecutive_failures += 1
+                if self._state == "half_open" or (
+                    self._state == "closed" and self._consecutive_failures >= self.failure_threshold
+                ):
+                    self._open_locked()
+
+            self._wake_waiters_locked()
+
+    def _open_locked(self) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._stats["breaker_opens"] += 1
+        print(
+            f"  ⚡ Bedrock circuit breaker OPEN for {self.model_id} after {self._consecutive_failures} failures "
+            f"(failing fast for {self.cooldown_s:.0f}s, {len(self._waiters)} queued calls rejected)"
+        )
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            waiter.rejected = True
+            waiter.wake()
+
+    def _wake_waiters_locked(self) -> None:
+        if self._state != "closed":
+            return
+        while self._waiters and self._in_flight < max(self.min_limit, int(self._limit)):
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            waiter.granted = True
+            waiter.wake()
+
+    @staticmethod
+    def classify(error: Optional[BaseException]) -> str:
+        """Release outcome for a finished call."""
+        if error is None or isinstance(error, GeneratorExit):
+            return "success"
+        if isinstance(error, asyncio.CancelledError):
+            return "cancelled"
+        if is_throttling_error(error):
+            return "throttled"
+        if _error_code(error) in _SERVER_ERROR_CODES:
+            return "server_error"
+        return "error"
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None):
+        """Hold a call slot for the duration of the block."""
+        self.acquire(timeout)
+        try:
+            yield
+        except BaseException as e:
+            self.release(self.classify(e))
+            raise
+        self.release("success")
+
+    @asynccontextmanager
+    async def aslot(self, timeout: Optional[float] = None):
+        """Async variant of ``slot``."""
+        await self.aacquire(timeout)
+        try:
+            yield
+        except BaseException as e:
+            self.release(self.classify(e))
+            raise
+        self.release("success")
+
+    def stats(self) -> dict[str, Any]:
+        """Limit, in-flight calls, queue depth, breaker state and counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["limit"] = max(self.min_limit, int(self._limit))
+            stats["in_flight"] = self._in_flight
+            stats["queue_depth"] = len(self._waiters)
+            stats["breaker_state"] = self._state
+        return stats
+
+
+_guards: dict[str, BedrockGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_bedrock_guard(model_id: str) -> BedrockGuard:
+    """The shared guard for a Bedrock model (created on first use)."""
+    with _guards_lock:
+        guard = _guards.get(model_id)
+        if guard is None:
+            guard = BedrockGuard(model_id)
+            _guards[model_id] = guard
+        return guard
+
+
+def get_bedrock_guard_stats() -> dict[str, dict[str, Any]]:
+    """Limiter and breaker metrics per Bedrock model."""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.model_id: guard.stats() for guard in guards}
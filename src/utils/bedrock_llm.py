@@ -1,15 +1,97 @@
 """AWS Bedrock LLM wrapper using the Converse API with streaming support."""
 
+import asyncio
+import inspect
 import json
+import os
 import time
-from typing import Any, Dict, Iterator, List, Optional
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
-from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 
-from .aws_sso import get_sso_manager
+from .aws_sso import async_bedrock_available, get_sso_manager
+from .bedrock_limiter import bedrock_limiter_enabled, get_bedrock_guard
+
+# additional_kwargs key holding prompt-cache boundaries (character offsets into content)
+CACHE_POINTS_KEY = "cache_points"
+
+# Bedrock allows at most 4 cache checkpoints per request
+_MAX_CACHE_POINTS = 4
+
+# Tool the model is forced to call for structured output (``json_schema`` call kwarg)
+STRUCTURED_OUTPUT_TOOL = "structured_output"
+
+# Model families that support Converse prompt caching (cachePoint blocks)
+_PROMPT_CACHING_MODELS = (
+    "claude-3-5-haiku",
+    "claude-3-7-sonnet",
+    "claude-sonnet-4",
+    "claude-opus-4",
+    "claude-haiku-4",
+    "amazon.nova",
+)
+
+# Model families whose Converse API accepts a forced toolChoice (structured output)
+_FORCED_TOOL_CHOICE_MODELS = (
+    "anthropic.claude-3",
+    "anthropic.claude-sonnet-4",
+    "anthropic.claude-opus-4",
+    "anthropic.claude-haiku-4",
+    "amazon.nova",
+    "mistral.mistral-large",
+)
+
+# Models that rejected a forced toolChoice at runtime (skipped from then on)
+_FORCED_TOOL_CHOICE_REJECTED: set[str] = set()
+
+
+def add_cache_point(message: BaseMessage, offset: Optional[int] = None) -> None:
+    """Mark a prompt-cache boundary in a message.
+
+    Everything before the boundary (including earlier messages) is a stable
+    prefix that Bedrock may cache. Other providers ignore the mark.
+
+    Args:
+        message: Message to mark (string content)
+        offset: Character offset of the boundary (default: end of the content)
+    """
+    if not isinstance(message.content, str):
+        return
+    position = len(message.content) if offset is None else offset
+    points = message.additional_kwargs.setdefault(CACHE_POINTS_KEY, [])
+    if position > 0 and position not in points:
+        points.append(position)
+
+
+def prompt_caching_supported(model_id: str) -> bool:
+    """Whether cachePoint blocks are sent for a model (BEDROCK_PROMPT_CACHING env var)."""
+    if os.getenv("BEDROCK_PROMPT_CACHING", "true").lower() not in ("1", "true", "yes"):
+        return False
+    return any(family in model_id for family in _PROMPT_CACHING_MODELS)
+
+
+def forced_tool_choice_supported(model_id: str) -> bool:
+    """Whether a ``json_schema`` call can force the structured output tool on a model."""
+    if model_id in _FORCED_TOOL_CHOICE_REJECTED:
+        return False
+    return any(family in model_id for family in _FORCED_TOOL_CHOICE_MODELS)
+
+
+def is_tool_choice_error(error: BaseException) -> bool:
+    """Whether a Bedrock error is a validation error about the tool configuration."""
+    response = getattr(error, "response", None)
+    code = response.get("Error", {}).get("Code", "") if isinstance(response, dict) else ""
+    validation = code == "ValidationException" or "ValidationException" in str(error)
+    return validation and "tool" in str(error).lower()
+
+
+def reject_forced_tool_choice(model_id: str) -> None:
+    """Stop forcing the structured output tool on a model that rejected it."""
+    _FORCED_TOOL_CHOICE_REJECTED.add(model_id)
 
 
 class BedrockConverseLLM(BaseChatModel):
@@ -37,19 +119,27 @@ class BedrockConverseLLM(BaseChatModel):
     aws_sso_manager: Any = None
     """AWS SSO manager instance"""
 
-    _bedrock_client: Any = None
-    """Cached Bedrock client to avoid creating new connections on every call"""
-
     def __init__(self, **kwargs):
         """Initialize Bedrock Converse LLM."""
         super().__init__(**kwargs)
-        # Initialize SSO manager
+        # Initialize SSO manager (owns the shared, pooled Bedrock clients)
         self.aws_sso_manager = get_sso_manager(
             profile_name=self.profile_name, region=self.region
         )
-        # Create and cache the Bedrock client ONCE
-        self._bedrock_client = self.aws_sso_manager.get_bedrock_client("bedrock-runtime")
-        print(f"✅ Bedrock client cached for model {self.model_id}")
+        self.aws_sso_manager.get_bedrock_client("bedrock-runtime")
+        print(f"✅ Bedrock client ready for model {self.model_id}")
+
+    def _client_for(self, timeout: Optional[float]) -> Any:
+        """Shared Bedrock client for one call.
+
+        Calls with a ``timeout`` (the request's remaining deadline) use a client
+        whose read timeout matches it; others share the default client.
+        """
+        return self.aws_sso_manager.get_bedrock_client("bedrock-runtime", timeout=timeout)
+
+    def _refresh_clients(self) -> None:
+        """Recreate clients after a credential refresh."""
+        self.aws_sso_manager.reset_clients()
 
     @property
     def _llm_type(self) -> str:
@@ -79,17 +169,18 @@ class BedrockConverseLLM(BaseChatModel):
         """
         converse_messages = []
         system_messages = []
+        cache = _CachePointBudget() if prompt_caching_supported(self.model_id) else None
 
         for message in messages:
             if isinstance(message, SystemMessage):
-                system_messages.append({"text": message.content})
+                system_messages.extend(_content_blocks(message, cache))
             elif isinstance(message, HumanMessage):
                 converse_messages.append(
-                    {"role": "user", "content": [{"text": message.content}]}
+                    {"role": "user", "content": _content_blocks(message, cache)}
                 )
             elif isinstance(message, AIMessage):
                 converse_messages.append(
-                    {"role": "assistant", "content": [{"text": message.content}]}
+                    {"role": "assistant", "content": _content_blocks(message, cache)}
                 )
             else:
                 # Default to user message
@@ -99,6 +190,92 @@ class BedrockConverseLLM(BaseChatModel):
 
         return converse_messages, system_messages if system_messages else None
 
+    def _api_params(
+        self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build Converse API parameters for a call."""
+        converse_messages, system_messages = self._convert_messages_to_converse_format(
+            messages
+        )
+
+        inference_config = {
+            "temperature": kwargs.get("temperature", self.temperature),
+            "maxTokens": kwargs.get("max_tokens", self.max_tokens),
+        }
+
+        if stop:
+            inference_config["stopSequences"] = stop
+
+        api_params = {
+            "modelId": self.model_id,
+            "messages": converse_messages,
+            "inferenceConfig": inference_config,
+        }
+
+        if system_messages:
+            api_params["system"] = system_messages
+
+        if kwargs.get("json_schema"):
+            # Structured output: force a single tool whose input is the JSON object
+            api_params["toolConfig"] = {
+                "tools": [{
+                    "toolSpec": {
+                        "name": STRUCTURED_OUTPUT_TOOL,
+                        "description": "Return the answer as a JSON object matching the schema.",
+                        "inputSchema": {"json": kwargs["json_schema"]},
+                    }
+                }],
+                "toolChoice": {"tool": {"name": STRUCTURED_OUTPUT_TOOL}},
+            }
+
+        return api_params
+
+    def _call_slot(self, timeout: Optional[float]) -> Any:
+        """Limiter and circuit breaker slot for one call (no-op if BEDROCK_LIMITER is off)."""
+        if not bedrock_limiter_enabled():
+            return nullcontext()
+        return get_bedrock_guard(self.model_id).slot(timeout)
+
+    def _acall_slot(self, timeout: Optional[float]) -> Any:
+        """Async variant of ``_call_slot``."""
+        if not bedrock_limiter_enabled():
+            return nullcontext()
+        return get_bedrock_guard(self.model_id).aslot(timeout)
+
+    def _chat_result(self, response: Dict[str, Any]) -> ChatResult:
+        """Convert a Converse API response into a ChatResult."""
+        output_message = response.get("output", {}).get("message", {})
+        content_blocks = output_message.get("content", [])
+        response_text = "".join(
+            block.get("text", "") for block in content_blocks if "text" in block
+        )
+        # Structured output (json_schema): the tool input is the response
+        tool_inputs = [block["toolUse"].get("input", {}) for block in content_blocks if "toolUse" in block]
+        if tool_inputs and not response_text:
+            response_text = json.dumps(tool_inputs[0])
+
+        token_usage = _token_usage(response.get("usage", {}))
+        stop_reason = response.get("stopReason")
+
+        message = AIMessage(
+            content=response_text,
+            response_metadata={
+                "model_id": self.model_id,
+                "stop_reason": stop_reason,
+                "token_usage": token_usage,
+            },
+        )
+        message.usage_metadata = token_usage
+
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={
+                "token_usage": token_usage,
+                "model_id": self.model_id,
+                "stop_reason": stop_reason,
+            },
+        )
+
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -116,115 +293,62 @@ class BedrockConverseLLM(BaseChatModel):
             messages: List of messages
             stop: Stop sequences
             run_manager: Callback manager
-            **kwargs: Additional arguments
+            **kwargs: Additional arguments (temperature, max_tokens, timeout,
+                json_schema for structured output via a forced tool call)
 
         Returns:
             ChatResult with the response
         """
-        bedrock_client = self._bedrock_client
-
-        converse_messages, system_messages = self._convert_messages_to_converse_format(
-            messages
-        )
-
-        inference_config = {
-            "temperature": kwargs.get("temperature", self.temperature),
-            "maxTokens": kwargs.get("max_tokens", self.max_tokens),
-        }
-
-        if stop:
-            inference_config["stopSequences"] = stop
-
-        api_params = {
-            "modelId": self.model_id,
-            "messages": converse_messages,
-            "inferenceConfig": inference_config,
-        }
-
-        if system_messages:
-            api_params["system"] = system_messages
+        api_params = self._api_params(messages, stop, kwargs)
 
         try:
-            response = bedrock_client.converse(**api_params)
+            with self._call_slot(kwargs.get("timeout")):
+                response = self._client_for(kwargs.get("timeout")).converse(**api_params)
+        except Exception as e:
+            if not _is_credentials_error(e):
+                raise
+            print("🔄 Credentials may be expired, attempting refresh...")
+            if not self.aws_sso_manager.force_refresh():
+                raise
+            self._refresh_clients()
+            with self._call_slot(kwargs.get("timeout")):
+                response = self._client_for(kwargs.get("timeout")).converse(**api_params)
+
+        return self._chat_result(response)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """Async variant of ``_generate`` over aiobotocore (no thread per call).
 
-            output_message = response.get("output", {}).get("message", {})
-            content_blocks = output_message.get("content", [])
-            response_text = "".join(
-                block.get("text", "") for block in content_blocks if "text" in block
-            )
+        Falls back to LangChain's executor-based default when aiobotocore is
+        not installed.
+        """
+        if not async_bedrock_available():
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
 
-            usage = response.get("usage", {})
-            token_usage = {
-                "input_tokens": usage.get("inputTokens", 0),
-                "output_tokens": usage.get("outputTokens", 0),
-                "total_tokens": usage.get("totalTokens", 0),
-            }
-            stop_reason = response.get("stopReason")
-
-            message = AIMessage(
-                content=response_text,
-                response_metadata={
-                    "model_id": self.model_id,
-                    "stop_reason": stop_reason,
-                    "token_usage": token_usage,
-                },
-            )
-            message.usage_metadata = token_usage
-
-            return ChatResult(
-                generations=[ChatGeneration(message=message)],
-                llm_output={
-                    "token_usage": token_usage,
-                    "model_id": self.model_id,
-                    "stop_reason": stop_reason,
-                },
-            )
+        api_params = self._api_params(messages, stop, kwargs)
 
+        try:
+            client = await self.aws_sso_manager.get_async_bedrock_client("bedrock-runtime", timeout=kwargs.get("timeout"))
+            async with self._acall_slot(kwargs.get("timeout")):
+                response = await client.converse(**api_params)
         except Exception as e:
-            if "credentials" in str(e).lower() or "expired" in str(e).lower():
-                print("🔄 Credentials may be expired, attempting refresh...")
-                if self.aws_sso_manager.force_refresh():
-                    self._bedrock_client = self.aws_sso_manager.get_bedrock_client(
-                        "bedrock-runtime"
-                    )
-
-                    response = self._bedrock_client.converse(**api_params)
-
-                    output_message = response.get("output", {}).get("message", {})
-                    content_blocks = output_message.get("content", [])
-                    response_text = "".join(
-                        block.get("text", "") for block in content_blocks
-                        if "text" in block
-                    )
-
-                    usage = response.get("usage", {})
-                    token_usage = {
-                        "input_tokens": usage.get("inputTokens", 0),
-                        "output_tokens": usage.get("outputTokens", 0),
-                        "total_tokens": usage.get("totalTokens", 0),
-                    }
-                    stop_reason = response.get("stopReason")
-
-                    message = AIMessage(
-                        content=response_text,
-                        response_metadata={
-                            "model_id": self.model_id,
-                            "stop_reason": stop_reason,
-                            "token_usage": token_usage,
-                        },
-                    )
-                    message.usage_metadata = token_usage
-
-                    return ChatResult(
-                        generations=[ChatGeneration(message=message)],
-                        llm_output={
-                            "token_usage": token_usage,
-                            "model_id": self.model_id,
-                            "stop_reason": stop_reason,
-                        },
-                    )
-
-            raise
+            if not _is_credentials_error(e):
+                raise
+            print("🔄 Credentials may be expired, attempting refresh...")
+            if not await asyncio.to_thread(self.aws_sso_manager.force_refresh):
+                raise
+            self._refresh_clients()
+            client = await self.aws_sso_manager.get_async_bedrock_client("bedrock-runtime", timeout=kwargs.get("timeout"))
+            async with self._acall_slot(kwargs.get("timeout")):
+                response = await client.converse(**api_params)
+
+        return self._chat_result(response)
 
     def _stream(
         self,
@@ -232,156 +356,266 @@ class BedrockConverseLLM(BaseChatModel):
         stop: Optional[List[str]] = None,
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
-    ) -> Iterator[ChatGeneration]:
+    ) -> Iterator[ChatGenerationChunk]:
         """Stream responses from Bedrock using converseStream API.
         
-        Yields chunks as they arrive from Bedrock.
+        Yields chunks as they arrive from Bedrock, then a final metadata-only
+        chunk with token usage. ``model_id`` and ``ttft_ms`` are set on the
+        first chunk only, so they survive LangChain's chunk merging intact.
         """
-        bedrock_client = self._bedrock_client
-        converse_messages, system_messages = self._convert_messages_to_converse_format(
-            messages
-        )
-        inference_config = {
-            "temperature": kwargs.get("temperature", self.temperature),
-            "maxTokens": kwargs.get("max_tokens", self.max_tokens),
-        }
-        if stop:
-            inference_config["stopSequences"] = stop
-        api_params = {
-            "modelId": self.model_id,
-            "messages": converse_messages,
-            "inferenceConfig": inference_config,
-        }
-        if system_messages:
-            api_params["system"] = system_messages
+        api_params = self._api_params(messages, stop, kwargs)
 
+        emitted = False
         try:
-            start_time = time.time()
-            ttft_ms = None
-            
-            response_stream = bedrock_client.converse_stream(**api_params)
-            
-            accumulated_text = ""
-            token_usage = {}
-            stop_reason = None
-            
-            for event in response_stream["stream"]:
-                # Capture TTFT on first content delta
-                if ttft_ms is None and "contentBlockDelta" in event:
-                    ttft_ms = int((time.time() - start_time) * 1000)
-                
-                # Yield each chunk as it arrives
-                if "contentBlockDelta" in event:
-                    delta = event["contentBlockDelta"].get("delta", {})
-                    if "text" in delta:
-                        chunk_text = delta["text"]
-                        accumulated_text += chunk_text
-                        
-                        # Create a chunk with the incremental text
-                        message = AIMessage(
-                            content=chunk_text,
-                            response_metadata={
-                                "model_id": self.model_id,
-                                "ttft_ms": ttft_ms,
-                                "is_chunk": True,
-                            },
-                        )
-                        yield ChatGeneration(message=message)
-                
-                # Capture final metadata
-                if "metadata" in event:
-                    metadata = event["metadata"]
-                    usage = metadata.get("usage", {})
-                    token_usage = {
-                        "input_tokens": usage.get("inputTokens", 0),
-                        "output_tokens": usage.get("outputTokens", 0),
-                        "total_tokens": usage.get("totalTokens", 0),
-                    }
-                    stop_reason = metadata.get("stopReason")
-            
-            # Yield final metadata chunk
-            if ttft_ms is None:
-                ttft_ms = int((time.time() - start_time) * 1000)
-            
-            final_message = AIMessage(
-                content="",  # Empty content for metadata-only message
-                response_metadata={
-                    "model_id": self.model_id,
-                    "stop_reason": stop_reason,
-                    "token_usage": token_usage,
-                    "ttft_ms": ttft_ms,
-                    "is_final": True,
-                },
+            for chunk in self._iter_converse_stream(
+                self._client_for(kwargs.get("timeout")), api_params, run_manager, kwargs.get("timeout")
+            ):
+                emitted = True
+                yield chunk
+            return
+        except Exception as e:
+            # Only retry if nothing reached the caller yet (a retry would duplicate text)
+            if emitted or not _is_credentials_error(e):
+                raise
+            print("🔄 Credentials may be expired, attempting refresh...")
+            if not self.aws_sso_manager.force_refresh():
+                raise
+            self._refresh_clients()
+
+        # Retry streaming after refresh
+        yield from self._iter_converse_stream(
+                self._client_for(kwargs.get("timeout")), api_params, run_manager, kwargs.get("timeout")
             )
-            final_message.usage_metadata = token_usage
-            yield ChatGeneration(message=final_message)
 
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Async variant of ``_stream`` over aiobotocore (same chunks and metadata).
+
+        Falls back to LangChain's executor-based default when aiobotocore is
+        not installed.
+        """
+        if not async_bedrock_available():
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+            return
+
+        api_params = self._api_params(messages, stop, kwargs)
+
+        emitted = False
+        try:
+            client = await self.aws_sso_manager.get_async_bedrock_client("bedrock-runtime", timeout=kwargs.get("timeout"))
+            converse_stream = self._aiter_converse_stream(client, api_params, run_manager, kwargs.get("timeout"))
+            try:
+                async for chunk in converse_stream:
+                    emitted = True
+                    yield chunk
+            finally:
+                # Release the connection and limiter slot now, not when the generator is collected
+                await converse_stream.aclose()
+            return
         except Exception as e:
-            if "credentials" in str(e).lower() or "expired" in str(e).lower():
-                print("🔄 Credentials may be expired, attempting refresh...")
-                if self.aws_sso_manager.force_refresh():
-                    self._bedrock_client = self.aws_sso_manager.get_bedrock_client(
-                        "bedrock-runtime"
-                    )
-                    
-                    # Retry streaming after refresh
-                    start_time = time.time()
-                    ttft_ms = None
-                    
-                    response_stream = self._bedrock_client.converse_stream(**api_params)
-                    
-                    accumulated_text = ""
-                    token_usage = {}
-                    stop_reason = None
-                    
-                    for event in response_stream["stream"]:
-                        if ttft_ms is None and "contentBlockDelta" in event:
-                            ttft_ms = int((time.time() - start_time) * 1000)
-                        
-                        if "contentBlockDelta" in event:
-                            delta = event["contentBlockDelta"].get("delta", {})
-                            if "text" in delta:
-                                chunk_text = delta["text"]
-                                accumulated_text += chunk_text
-                                
-                                message = AIMessage(
-                                    content=chunk_text,
-                                    response_metadata={
-                                        "model_id": self.model_id,
-                                        "ttft_ms": ttft_ms,
-                                        "is_chunk": True,
-                                    },
-                                )
-                                yield ChatGeneration(message=message)
-                        
-                        if "metadata" in event:
-                            metadata = event["metadata"]
-                            usage = metadata.get("usage", {})
-                            token_usage = {
-                                "input_tokens": usage.get("inputTokens", 0),
-                                "output_tokens": usage.get("outputTokens", 0),
-                                "total_tokens": usage.get("totalTokens", 0),
-                            }
-                            stop_reason = metadata.get("stopReason")
-                    
-                    if ttft_ms is None:
-                        ttft_ms = int((time.time() - start_time) * 1000)
-                    
-                    final_message = AIMessage(
-                        content="",
-                        response_metadata={
-                            "model_id": self.model_id,
-                            "stop_reason": stop_reason,
-                            "token_usage": token_usage,
-                            "ttft_ms": ttft_ms,
-                            "is_final": True,
-                        },
-                    )
-                    final_message.usage_metadata = token_usage
-                    yield ChatGeneration(message=final_message)
-
-            raise
+            if emitted or not _is_credentials_error(e):
+                raise
+            print("🔄 Credentials may be expired, attempting refresh...")
+            if not await asyncio.to_thread(self.aws_sso_manager.force_refresh):
+                raise
+            self._refresh_clients()
+
+        client = await self.aws_sso_manager.get_async_bedrock_client("bedrock-runtime", timeout=kwargs.get("timeout"))
+        converse_stream = self._aiter_converse_stream(client, api_params, run_manager, kwargs.get("timeout"))
+        try:
+            async for chunk in converse_stream:
+                yield chunk
+        finally:
+            await converse_stream.aclose()
+
+    def _iter_converse_stream(
+        self,
+        bedrock_client: Any,
+        api_params: Dict[str, Any],
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[ChatGenerationChunk]:
+        """Call converse_stream and convert its events into LangChain chunks.
+
+        The limiter slot and the connection are held until the stream ends
+        (or the caller stops reading).
+        """
+        stream_state = _ConverseStreamState()
+
+        with self._call_slot(timeout):
+            response_stream = bedrock_client.converse_stream(**api_params)
 
+            try:
+                for event in response_stream["stream"]:
+                    chunk = stream_state.chunk_for_event(event, self.model_id)
+                    if chunk is not None:
+                        if run_manager:
+                            run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                        yield chunk
+            finally:
+                # A caller that stops early (e.g. once a JSON object closes) drops the connection
+                close = getattr(response_stream["stream"], "close", None)
+                if close is not None:
+                    close()
+
+        yield stream_state.final_chunk(self.model_id)
+
+    async def _aiter_converse_stream(
+        self,
+        bedrock_client: Any,
+        api_params: Dict[str, Any],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Async variant of ``_iter_converse_stream`` (aiobotocore event stream)."""
+        stream_state = _ConverseStreamState()
+
+        async with self._acall_slot(timeout):
+            response_stream = await bedrock_client.converse_stream(**api_params)
+
+            try:
+                async for event in response_stream["stream"]:
+                    chunk = stream_state.chunk_for_event(event, self.model_id)
+                    if chunk is not None:
+                        if run_manager:
+                            await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                        yield chunk
+            finally:
+                close = getattr(response_stream["stream"], "close", None)
+                if close is not None:
+                    closed = close()
+                    if inspect.isawaitable(closed):
+                        await closed
+
+        yield stream_state.final_chunk(self.model_id)
+
+
+def _token_usage(usage: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert Converse usage into LangChain usage metadata.
+
+    Bedrock reports cached prompt tokens separately from inputTokens;
+    input_tokens here includes them (LangChain convention), with the split in
+    input_token_details.
+    """
+    cache_read = usage.get("cacheReadInputTokens", 0) or 0
+    cache_write = usage.get("cacheWriteInputTokens", 0) or 0
+    token_usage: Dict[str, Any] = {
+        "input_tokens": usage.get("inputTokens", 0) + cache_read + cache_write,
+        "output_tokens": usage.get("outputTokens", 0),
+        "total_tokens": usage.get("totalTokens", 0),
+    }
+    if cache_read or cache_write:
+        token_usage["input_token_details"] = {"cache_read": cache_read, "cache_creation": cache_write}
+    return token_usage
+
+
+class _CachePointBudget:
+    """Places cachePoint blocks for one request.
+
+    Skips boundaries whose prefix is below the model's minimum cacheable size
+    (BEDROCK_CACHE_MIN_TOKENS, ~4 characters per token) and stops at Bedrock's
+    limit of 4 checkpoints.
+    """
+
+    def __init__(self):
+        self.min_chars = int(os.getenv("BEDROCK_CACHE_MIN_TOKENS", "1024")) * 4
+        self.prefix_chars = 0
+        self.remaining = _MAX_CACHE_POINTS
+
+    def allow(self, prefix_chars: int) -> bool:
+        if self.remaining <= 0 or prefix_chars < self.min_chars:
+            return False
+        self.remaining -= 1
+        return True
+
+
+def _content_blocks(message: BaseMessage, cache: Optional[_CachePointBudget]) -> List[Dict[str, Any]]:
+    """Converse content blocks for a message, split at its cache points."""
+    text = message.content if isinstance(message.content, str) else str(message.content)
+    points = message.additional_kwargs.get(CACHE_POINTS_KEY) if cache is not None else None
+    if not points:
+        if cache is not None:
+            cache.prefix_chars += len(text)
+        return [{"text": text}]
+
+    blocks: List[Dict[str, Any]] = []
+    start = 0
+    for point in sorted(p for p in points if 0 < p <= len(text)):
+        if point <= start or not text[start:point].strip():
+            continue
+        blocks.append({"text": text[start:point]})
+        cache.prefix_chars += point - start
+        start = point
+        if cache.allow(cache.prefix_chars):
+            blocks.append({"cachePoint": {"type": "default"}})
+    if start < len(text) and text[start:].strip():
+        blocks.append({"text": text[start:]})
+        cache.prefix_chars += len(text) - start
+    return blocks or [{"text": text}]
+
+
+def _is_credentials_error(error: Exception) -> bool:
+    """Whether a Bedrock error looks like expired or missing credentials."""
+    return "credentials" in str(error).lower() or "expired" in str(error).lower()
+
+
+class _ConverseStreamState:
+    """Converts converse_stream events into chunks, tracking TTFT and usage."""
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.ttft_ms: Optional[int] = None
+        self.token_usage: Dict[str, int] = {}
+        self.stop_reason: Optional[str] = None
+
+    def chunk_for_event(self, event: Dict[str, Any], model_id: str) -> Optional[ChatGenerationChunk]:
+        """Text chunk for a content delta event (None for other events)."""
+        # Capture final metadata
+        if "metadata" in event:
+            self.token_usage = _token_usage(event["metadata"].get("usage", {}))
+        if "messageStop" in event:
+            self.stop_reason = event["messageStop"].get("stopReason")
+
+        if "contentBlockDelta" not in event:
+            return None
+        delta = event["contentBlockDelta"].get("delta", {})
+        if "toolUse" in delta:
+            # Structured output (json_schema): stream the tool input JSON as text
+            delta = {"text": delta["toolUse"].get("input", "")}
+        if "text" not in delta:
+            return None
+
+        response_metadata = {}
+        # Capture TTFT on first content delta
+        if self.ttft_ms is None:
+            self.ttft_ms = int((time.time() - self.start_time) * 1000)
+            response_metadata = {"model_id": model_id, "ttft_ms": self.ttft_ms}
+
+        return ChatGenerationChunk(
+            message=AIMessageChunk(content=delta["text"], response_metadata=response_metadata)
+        )
+
+    def final_chunk(self, model_id: str) -> ChatGenerationChunk:
+        """Metadata-only chunk with token usage and stop reason."""
+        final_metadata = {"stop_reason": self.stop_reason, "token_usage": self.token_usage}
+        if self.ttft_ms is None:
+            # No text was produced; still report model and latency
+            final_metadata["model_id"] = model_id
+            final_metadata["ttft_ms"] = int((time.time() - self.start_time) * 1000)
+
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",  # Empty content for metadata-only chunk
+                response_metadata=final_metadata,
+                usage_metadata=self.token_usage or None,
+            )
+        )
 
 # Common Bedrock model IDs
 BEDROCK_MODELS = {
@@ -0,0 +1,95 @@
+"""Request-scoped AI Config resolution.
+
+A workflow run creates one ``ConfigContext`` and carries it in the state
+(``config_context``). Nodes resolve their AI Configs through it, so a config
+looked up several times in one request (the specialists read it for the KB id
+and again for the model, the agent evaluator for the tracker) is resolved
+once: the config dict, tracker, LaunchDarkly context and ModelInvoker (with
+its pooled model) are handed out together.
+
+Entries are keyed by config key and the targeting context, so a node that
+sees a different context (e.g. after triage extracted more of it) still gets
+a fresh evaluation.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from ldclient import Context
+
+
+@dataclass
+class ResolvedConfig:
+    """An AI Config resolved once for a request."""
+
+    config_key: str
+    config: dict[str, Any]
+    tracker: Any
+    ld_context: Context
+    invokers: dict[tuple, Any] = field(default_factory=dict)
+
+
+class ConfigContext:
+    """AI Configs resolved for one request, reused by every node that needs them."""
+
+    def __init__(self):
+        self._resolved: dict[tuple, ResolvedConfig] = {}
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "resolutions": 0}
+
+    @staticmethod
+    def _key(config_key: str, context: Optional[dict[str, Any]], default_config: Optional[dict[str, Any]]) -> tuple:
+        return (
+            config_key,
+            json.dumps(context or {}, sort_keys=True, default=str),
+            json.dumps(default_config, sort_keys=True, default=str) if default_config else None,
+        )
+
+    def resolve(
+        self,
+        config_key: str,
+        context: Optional[dict[str, Any]] = None,
+        default_config: Optional[dict[str, Any]] = None,
+    ) -> ResolvedConfig:
+        """Config dict, tracker and LaunchDarkly context of an AI Config (resolved once per request).
+
+        Args:
+            config_key: The AI config key in LaunchDarkly
+            context: User/session context for targeting
+            default_config: Default configuration fallback (dict)
+
+        Returns:
+            The resolved config; callers must not modify its config dict
+        """
+        key = self._key(config_key, context, default_config)
+        with self._lock:
+            self._stats["lookups"] += 1
+            resolved = self._resolved.get(key)
+        if resolved is not None:
+            return resolved
+
+        from .launchdarkly_config import get_ld_client
+
+        config, tracker, ld_context = get_ld_client().get_ai_config(config_key, context, default_config)
+        with self._lock:
+            # A concurrent node may have resolved it first; keep one result per request
+            resolved = self._resolved.setdefault(key, ResolvedConfig(config_key, config, tracker, ld_context))
+            self._stats["resolutions"] += resolved.config is config
+        return resolved
+
+    def invoker(self, resolved: ResolvedConfig, options: tuple, build: Callable[[], Any]) -> Any:
+        """ModelInvoker for a resolved config and invoker options, built on first use."""
+        with self._lock:
+            invoker = resolved.invokers.get(options)
+        if invoker is None:
+            invoker = build()
+            with self._lock:
+                invoker = resolved.invokers.setdefault(options, invoker)
+        return invoker
+
+    def stats(self) -> dict[str, int]:
+        """Config lookups and actual resolutions in this request."""
+        with self._lock:
+            return dict(self._stats)
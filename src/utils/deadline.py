@@ -0,0 +1,158 @@
+"""Per-request deadlines shared by every node of the workflow.
+
+A request gets one time budget (from the API request or WORKFLOW_DEADLINE_S).
+Each node asks for the remaining budget and applies it as a model/retrieval
+timeout, a smaller max_tokens, or by skipping optional work. Every decision is
+recorded on the current span as ``deadline.*`` attributes.
+"""
+
+import os
+import time
+from typing import Any, Optional
+
+from opentelemetry import trace
+
+# Below this many seconds a model call is not attempted
+MIN_MODEL_CALL_S = float(os.getenv("DEADLINE_MIN_MODEL_CALL_S", "1.0"))
+
+# Conservative generation rate used to trim max_tokens to the remaining budget
+_TOKENS_PER_SECOND = 40
+
+# Never trim max_tokens below this (shorter answers are rarely useful)
+_MIN_MAX_TOKENS = 128
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before a required step could run."""
+
+
+class Deadline:
+    """Absolute deadline for one request (monotonic clock)."""
+
+    def __init__(self, budget_s: float):
+        """
+        Args:
+            budget_s: Time budget in seconds, starting now
+        """
+        self.budget_s = budget_s
+        self.expires_at = time.monotonic() + budget_s
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        return int(self.remaining() * 1000)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def __repr__(self) -> str:
+        return f"Deadline(budget_s={self.budget_s}, remaining_ms={self.remaining_ms()})"
+
+
+def resolve_deadline(budget_s: Optional[float] = None) -> Optional[Deadline]:
+    """Create the deadline for a request.
+
+    Args:
+        budget_s: Explicit budget in seconds (default: WORKFLOW_DEADLINE_S env
+            var, 60). A budget of 0 or less disables the deadline.
+
+    Returns:
+        Deadline, or None when disabled
+    """
+    if budget_s is None:
+        budget_s = float(os.getenv("WORKFLOW_DEADLINE_S", "60") or 0)
+    if budget_s <= 0:
+        return None
+    return Deadline(budget_s)
+
+
+def record_deadline_decision(deadline: Optional[Deadline], decision: str, **attributes: Any) -> None:
+    """Record a node's degradation decision on the current span.
+
+    Args:
+        deadline: The request deadline
+        decision: What the node did ("full", "trimmed", "skipped", "timeout_fallback", ...)
+        **attributes: Extra ``deadline.<name>`` span attributes (e.g. timeout_s, max_tokens)
+    """
+    if deadline is None:
+        return
+    span = trace.get_current_span()
+    if span and span.is_recording():
+        span.set_attribute("deadline.decision", decision)
+        span.set_attribute("deadline.remaining_ms", deadline.remaining_ms())
+        span.set_attribute("deadline.budget_ms", int(deadline.budget_s * 1000))
+        for name, value in attributes.items():
+            if value is not None:
+                span.set_attribute(f"deadline.{name}", value)
+    if decision != "full":
+        print(f"  ⏱️  Deadline: {decision} ({deadline.remaining_ms()}ms left)")
+
+
+def model_call_budget(deadline: Optional[Deadline], model: Any, stage: str) -> dict[str, Any]:
+    """Keyword arguments that keep one model call within the remaining budget.
+
+    The call gets ``timeout`` (applied as the provider's request/read timeout)
+    and, when the budget cannot cover the configured ``max_tokens`` at a
+    conservative generation rate, a trimmed ``max_tokens``.
+
+    Args:
+        deadline: The request deadline (None means no budget)
+        model: The LangChain chat model about to be called
+        stage: Name of the calling node (for the error message)
+
+    Returns:
+        Keyword arguments for ModelInvoker.invoke/ainvoke/stream/astream
+
+    Raises:
+        DeadlineExceeded: If too little time is left to attempt the call
+    """
+    if deadline is None:
+        return {}
+
+    remaining = deadline.remaining()
+    if remaining < MIN_MODEL_CALL_S:
+        record_deadline_decision(deadline, "skipped")
+        raise DeadlineExceeded(f"{stage}: {int(remaining * 1000)}ms left, not enough for a model call")
+
+    call_kwargs: dict[str, Any] = {"timeout": round(remaining, 3)}
+    configured = getattr(model, "max_tokens", None)
+    affordable = max(_MIN_MAX_TOKENS, int(remaining * _TOKENS_PER_SECOND))
+    if isinstance(configured, int) and affordable < configured:
+        call_kwargs["max_tokens"] = affordable
+        record_deadline_decision(deadline, "trimmed", timeout_s=call_kwargs["timeout"], max_tokens=affordable)
+    else:
+        record_deadline_decision(deadline, "full", timeout_s=call_kwargs["timeout"])
+    return call_kwargs
+
+
+def check_deadline(deadline: Optional[Deadline], stage: str) -> None:
+    """Fail fast if the budget is already spent.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    if deadline is not None and deadline.expired():
+        record_deadline_decision(deadline, "skipped")
+        raise DeadlineExceeded(f"{stage}: request deadline passed")
+
+
+def retrieval_timeout(deadline: Optional[Deadline], stage: str) -> Optional[float]:
+    """Timeout for a blocking retrieval call (None when there is no deadline).
+
+    Raises:
+        DeadlineExceeded: If the budget is already spent
+    """
+    if deadline is None:
+        return None
+    check_deadline(deadline, stage)
+    return round(deadline.remaining(), 3)
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """Whether an exception is a timeout (botocore, OpenAI, Anthropic, asyncio, ...)."""
+    if isinstance(error, TimeoutError):
+        return True
+    name = type(error).__name__.lower()
+    return "timeout" in name or "timed out" in str(error).lower()
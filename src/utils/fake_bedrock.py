@@ -0,0 +1,462 @@
+"""Local fake of the Bedrock Runtime and Agent Runtime APIs for load testing.
+
+With BEDROCK_FAKE=true the AWS SSO manager hands out these clients instead of
+boto3/aiobotocore ones, so BedrockConverseLLM and the Knowledge Base retriever
+run unchanged (converse, converse_stream, retrieve) without network access or
+Bedrock quota. Responses are templated from the request and carry realistic
+token counts (including prompt-cache reads/writes at cachePoint blocks) and
+answer forced tool calls (toolChoice) with the tool input as JSON;
+latency follows configurable distributions for time to first token,
+per-token generation time and occasional tail spikes.
+
+Everything is deterministic for a given FAKE_BEDROCK_SEED: the same request
+gets the same text, and the n-th repeat of a request gets the same latency.
+
+Latency settings (milliseconds unless noted):
+
+    FAKE_BEDROCK_TTFT_MS        median time to first token (default 350)
+    FAKE_BEDROCK_TTFT_SIGMA     lognormal spread of TTFT (default 0.35)
+    FAKE_BEDROCK_TOKEN_MS       time per output token (default 12)
+    FAKE_BEDROCK_SPIKE_RATE     fraction of calls with a tail spike (default 0.02)
+    FAKE_BEDROCK_SPIKE_MS       extra latency of a spike (default 2500)
+    FAKE_BEDROCK_RETRIEVE_MS    median Knowledge Base retrieve latency (default 120)
+    FAKE_BEDROCK_OUTPUT_TOKENS  median answer length in tokens (default 160)
+    FAKE_BEDROCK_RESPONSES      JSON file of {"match": regex, "response": template} rules
+    FAKE_BEDROCK_MAX_CONCURRENCY  concurrent calls per model before ThrottlingException (0 = no quota)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+_FILLER_SENTENCES = [
+    "Based on your plan details, this is covered under your current benefits.",
+    "You may need a referral from your primary care provider first.",
+    "In-network providers keep your out-of-pocket costs lowest.",
+    "Your deductible and copay amounts are listed in your plan summary.",
+    "Prior authorization may be required for some services.",
+    "You can confirm eligibility by calling the number on your member ID card.",
+    "Coverage can differ between in-network and out-of-network care.",
+    "Preventive services are usually covered at no additional cost.",
+]
+
+_RETRIEVED_SNIPPETS = [
+    "Members pay a $25 copay for primary care visits after the deductible is met.",
+    "Specialist visits require a referral for HMO plans; PPO plans do not.",
+    "Emergency room visits are covered in and out of network with a $250 copay.",
+    "Preventive care, including annual physicals and vaccines, is covered at 100%.",
+    "Prescription drugs are covered in four tiers with copays from $10 to $80.",
+    "Telehealth visits are available 24/7 with a $0 copay on most plans.",
+    "Providers in the network accept new patients unless marked otherwise.",
+]
+_TRIAGE_ROUTES = ("policy_question", "provider_lookup", "schedule_agent", "general_question")
+
+# Fraction of free-text triage answers that explain the decision after the JSON, as real models often do
+_TRIAGE_TRAILING_TEXT_RATE = 0.25
+
+# Shared by all fake clients, like Bedrock's server-side state: repeat counts
+# (latency of the n-th identical request) and prompt prefixes already cached
+_repeats: Counter = Counter()
+_cached_prefixes: set[str] = set()
+_in_flight: Counter = Counter()
+_state_lock = threading.Lock()
+
+
+def fake_bedrock_enabled() -> bool:
+    """Whether Bedrock calls go to the local fake (BEDROCK_FAKE env var, default false)."""
+    return os.getenv("BEDROCK_FAKE", "false").lower() in ("1", "true", "yes")
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+@dataclass
+class FakeLatencyProfile:
+    """Latency distributions of the fake backend (all in milliseconds)."""
+
+    ttft_ms: float = 350.0
+    ttft_sigma: float = 0.35
+    token_ms: float = 12.0
+    spike_rate: float = 0.02
+    spike_ms: float = 2500.0
+    retrieve_ms: float = 120.0
+
+    @classmethod
+    def from_env(cls) -> "FakeLatencyProfile":
+        return cls(
+            ttft_ms=float(os.getenv("FAKE_BEDROCK_TTFT_MS", "350")),
+            ttft_sigma=float(os.getenv("FAKE_BEDROCK_TTFT_SIGMA", "0.35")),
+            token_ms=float(os.getenv("FAKE_BEDROCK_TOKEN_MS", "12")),
+            spike_rate=float(os.getenv("FAKE_BEDROCK_SPIKE_RATE", "0.02")),
+            spike_ms=float(os.getenv("FAKE_BEDROCK_SPIKE_MS", "2500")),
+            retrieve_ms=float(os.getenv("FAKE_BEDROCK_RETRIEVE_MS", "120")),
+        )
+
+    def first_token_s(self, rng: random.Random) -> float:
+        """Time to first token, including a tail spike on some calls."""
+        ttft = self.ttft_ms * math.exp(rng.gauss(0, self.ttft_sigma)) if self.ttft_ms > 0 else 0.0
+        if rng.random() < self.spike_rate:
+            ttft += self.spike_ms
+        return ttft / 1000
+
+    def retrieve_s(self, rng: random.Random) -> float:
+        latency = self.retrieve_ms * math.exp(rng.gauss(0, self.ttft_sigma)) if self.retrieve_ms > 0 else 0.0
+        if rng.random() < self.spike_rate:
+            latency += self.spike_ms
+        return latency / 1000
+
+
+@lru_cache(maxsize=1)
+def _response_rules() -> list[tuple[re.Pattern, str]]:
+    """Canned responses from FAKE_BEDROCK_RESPONSES (first matching regex wins)."""
+    path = os.getenv("FAKE_BEDROCK_RESPONSES")
+    if not path:
+        return []
+    with open(path) as f:
+        rules = json.load(f)
+    return [(re.compile(rule["match"], re.IGNORECASE | re.DOTALL), rule["response"]) for rule in rules]
+
+
+class _FakeBackend:
+    """Request parsing, response templating and latency shared by the fake clients."""
+
+    def __init__(self, read_timeout: Optional[float] = None):
+        self.read_timeout = read_timeout
+        self.profile = FakeLatencyProfile.from_env()
+        self.seed = os.getenv("FAKE_BEDROCK_SEED", "0")
+        self.output_tokens = int(os.getenv("FAKE_BEDROCK_OUTPUT_TOKENS", "160"))
+
+    def _digest(self, *parts: Any) -> str:
+        return hashlib.sha256(json.dumps([self.seed, *parts], sort_keys=True, default=str).encode()).hexdigest()
+
+    def _rngs(self, request: dict[str, Any]) -> tuple[random.Random, random.Random]:
+        """(content RNG, latency RNG): content depends only on the request, latency also on its repeat count."""
+        digest = self._digest(request)
+        with _state_lock:
+            _repeats[digest] += 1
+            repeat = _repeats[digest]
+        return random.Random(digest), random.Random(f"{digest}:{repeat}")
+
+    def wait(self, latency_s: float) -> tuple[float, bool]:
+        """(seconds to wait, whether the call times out) under the client's read timeout."""
+        if self.read_timeout and latency_s > self.read_timeout:
+            return self.read_timeout, True
+        return latency_s, False
+
+    # ---- Converse ----
+
+    def plan_converse(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Response text, usage and latency for one converse/converse_stream call."""
+        content_rng, latency_rng = self._rngs({"converse": params})
+        system_text, prompt_text, usage = self._prompt_usage(params)
+        text = self._response_text(system_text, prompt_text, content_rng)
+        tool_use = self._tool_use(params)
+        if tool_use is not None:
+            # Forced tool use (structured output): the answer is the tool input JSON
+            text = text if text.startswith("{") and _is_json_object(text) else json.dumps({"response": text})
+        elif sum(route in f"{system_text}{prompt_text}" for route in _TRIAGE_ROUTES) >= 2:
+            if content_rng.random() < _TRIAGE_TRAILING_TEXT_RATE:
+                text += "\n\nThe query mentions plan details, so it is routed to the matching specialist."
+
+        output_tokens = _approx_tokens(text)
+        max_tokens = params.get("inferenceConfig", {}).get("maxTokens")
+        stop_reason = "end_turn" if tool_use is None else "tool_use"
+        if max_tokens and output_tokens > max_tokens:
+            text = text[: max_tokens * 4]
+            output_tokens = max_tokens
+            stop_reason = "max_tokens"
+
+        usage["outputTokens"] = output_tokens
+        usage["totalTokens"] = (
+            usage["inputTokens"] + usage.get("cacheReadInputTokens", 0)
+            + usage.get("cacheWriteInputTokens", 0) + output_tokens
+        )
+        first_token_s = self.profile.first_token_s(latency_rng)
+        return {
+            "text": text,
+            "tool_use": tool_use,
+            "usage": usage,
+            "stop_reason": stop_reason,
+            "first_token_s": first_token_s,
+            "token_s": self.profile.token_ms / 1000,
+            "latency_ms": int((first_token_s + output_tokens * self.profile.token_ms / 1000) * 1000),
+        }
+
+    def _tool_use(self, params: dict[str, Any]) -> Optional[dict[str, str]]:
+        """The tool the model must call (toolChoice "tool"), if any."""
+        tool_config = params.get("toolConfig") or {}
+        name = tool_config.get("toolChoice", {}).get("tool", {}).get("name")
+        if name is None:
+            return None
+        return {"toolUseId": f"tooluse_{self._digest(params)[:16]}", "name": name}
+
+    def _prompt_usage(self, params: dict[str, Any]) -> tuple[str, str, dict[str, int]]:
+        """Prompt text and input token usage, splitting cached prefixes at cachePoint blocks."""
+        blocks = list(params.get("system") or [])
+        for message in params.get("messages", []):
+            blocks.extend(message.get("content", []))
+
+        cached_tokens = 0
+        prefix = ""
+        write = False
+        for block in blocks:
+            if "cachePoint" in block:
+                prefix_key = self._digest(params.get("modelId"), prefix)
+                with _state_lock:
+                    write = write or prefix_key not in _cached_prefixes
+                    _cached_prefixes.add(prefix_key)
+                cached_tokens = _approx_tokens(prefix)
+            else:
+                prefix += block.get("text", "")
+
+        system_text = "".join(block.get("text", "") for block in params.get("system") or [])
+        messages = params.get("messages", [])
+        prompt_text = "".join(block.get("text", "") for block in (messages[-1]["content"] if messages else []))
+
+        usage = {"inputTokens": _approx_tokens(prefix) - cached_tokens}
+        if cached_tokens:
+            usage["cacheWriteInputTokens" if write else "cacheReadInputTokens"] = cached_tokens
+        return system_text, prompt_text, usage
+
+    def _response_text(self, system_text: str, prompt_text: str, rng: random.Random) -> str:
+        """Canned (FAKE_BEDROCK_RESPONSES) or templated response for the prompt."""
+        full_prompt = f"{system_text}\n{prompt_text}"
+        for pattern, template in _response_rules():
+            if pattern.search(full_prompt):
+                return template.replace("{query}", prompt_text[:200])
+
+        # A triage prompt lists the routes it can choose from
+        if sum(route in full_prompt for route in _TRIAGE_ROUTES) >= 2:
+            return json.dumps(_triage_decision(prompt_text))
+        if '"score"' in full_prompt:
+            score = round(rng.uniform(0.75, 0.98), 2)
+            return json.dumps({"score": score, "reasoning": "Consistent with the provided context.", "issues": []})
+
+        target = max(16, int(self.output_tokens * math.exp(rng.gauss(0, 0.4))))
+        sentences = ["Thanks for reaching out."]
+        while _approx_tokens(" ".join(sentences)) < target:
+            sentences.append(rng.choice(_FILLER_SENTENCES))
+        return " ".join(sentences)
+
+    # ---- Knowledge Base retrieve ----
+
+    def plan_retrieve(self, params: dict[str, Any]) -> tuple[dict[str, Any], float]:
+        """Retrieve response and its latency."""
+        content_rng, latency_rng = self._rngs({"retrieve": params})
+        count = (
+            params.get("retrievalConfiguration", {})
+            .get("vectorSearchConfiguration", {})
+            .get("numberOfResults", 5)
+        )
+        results = []
+        score = content_rng.uniform(0.7, 0.9)
+        for i in range(count):
+            results.append({
+                "content": {"text": " ".join(content_rng.sample(_RETRIEVED_SNIPPETS, 3))},
+                "score": round(score, 3),
+                "location": {
+                    "type": "S3",
+                    "s3Location": {"uri": f"s3://fake-kb/{params.get('knowledgeBaseId', 'kb')}/doc-{i}.md"},
+                },
+                "metadata": {},
+            })
+            score *= content_rng.uniform(0.85, 0.98)
+        return {"retrievalResults": results}, self.profile.retrieve_s(latency_rng)
+
+
+def _triage_decision(query: str) -> dict[str, Any]:
+    """Triage JSON routed by the local triage classifier (policy question if undecided)."""
+    query_type, confidence = "policy_question", 0.75
+    try:
+        from ..agents.triage_classifier import classify_query
+
+        classification = classify_query(query)
+        if classification.query_type is not None:
+            query_type, confidence = classification.query_type, max(0.7, round(classification.confidence, 2))
+    except Exception:
+        pass
+    return {
+        "query_type": query_type,
+        "confidence_score": confidence,
+        "extracted_context": {},
+        "escalation_needed": False,
+        "reasoning": "Routed by the fake Bedrock backend.",
+    }
+
+
+def _timeout_error() -> ReadTimeoutError:
+    return ReadTimeoutError(endpoint_url="fake-bedrock://local")
+
+
+def _throttling_error(operation: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": "ThrottlingException", "Message": "Too many requests, please wait before trying again."}},
+        operation,
+    )
+
+
+@contextmanager
+def _model_quota(params: dict[str, Any], operation: str):
+    """Hold one of the model's concurrent-call slots (FAKE_BEDROCK_MAX_CONCURRENCY)."""
+    model_id = params.get("modelId", "")
+    limit = int(os.getenv("FAKE_BEDROCK_MAX_CONCURRENCY", "0"))
+    with _state_lock:
+        if limit and _in_flight[model_id] >= limit:
+            raise _throttling_error(operation)
+        _in_flight[model_id] += 1
+    try:
+        yield
+    finally:
+        with _state_lock:
+            _in_flight[model_id] -= 1
+
+
+def _is_json_object(text: str) -> bool:
+    try:
+        return isinstance(json.loads(text), dict)
+    except ValueError:
+        return False
+
+
+def _converse_response(plan: dict[str, Any]) -> dict[str, Any]:
+    if plan["tool_use"] is not None:
+        # A tool input cut off by maxTokens arrives empty
+        tool_input = json.loads(plan["text"]) if _is_json_object(plan["text"]) else {}
+        content = [{"toolUse": {**plan["tool_use"], "input": tool_input}}]
+    else:
+        content = [{"text": plan["text"]}]
+    return {
+        "output": {"message": {"role": "assistant", "content": content}},
+        "stopReason": plan["stop_reason"],
+        "usage": plan["usage"],
+        "metrics": {"latencyMs": plan["latency_ms"]},
+    }
+
+
+def _content_events(plan: dict[str, Any]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """(events before the first delta, one delta event per stream piece)."""
+    start = []
+    if plan["tool_use"] is not None:
+        start.append({"contentBlockStart": {"contentBlockIndex": 0, "start": {"toolUse": plan["tool_use"]}}})
+    key = "text" if plan["tool_use"] is None else "toolUse"
+    deltas = [
+        {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {key: piece if key == "text" else {"input": piece}}}}
+        for piece in _stream_pieces(plan["text"])
+    ]
+    return start, deltas
+
+
+def _stream_pieces(text: str) -> list[str]:
+    """Split a response into ~4-token deltas (words with their trailing space)."""
+    words = re.findall(r"\S+\s*", text)
+    return ["".join(words[i:i + 3]) for i in range(0, len(words), 3)] or [""]
+
+
+class FakeBedrockClient:
+    """Synchronous stand-in for boto3 bedrock-runtime / bedrock-agent-runtime clients."""
+
+    def __init__(self, service_name: str, read_timeout: Optional[float] = None):
+        self.service_name = service_name
+        self._backend = _FakeBackend(read_timeout)
+
+    def converse(self, **params: Any) -> dict[str, Any]:
+        plan = self._backend.plan_converse(params)
+        wait_s, timed_out = self._backend.wait(plan["latency_ms"] / 1000)
+        with _model_quota(params, "Converse"):
+            time.sleep(wait_s)
+        if timed_out:
+            raise _timeout_error()
+        return _converse_response(plan)
+
+    def converse_stream(self, **params: Any) -> dict[str, Any]:
+        plan = self._backend.plan_converse(params)
+        wait_s, timed_out = self._backend.wait(plan["first_token_s"])
+        with _model_quota(params, "ConverseStream"):
+            time.sleep(wait_s)
+        if timed_out:
+            raise _timeout_error()
+        return {"stream": self._events(plan)}
+
+    def _events(self, plan: dict[str, Any]):
+        yield {"messageStart": {"role": "assistant"}}
+        start, deltas = _content_events(plan)
+        yield from start
+        for index, (piece, delta) in enumerate(zip(_stream_pieces(plan["text"]), deltas)):
+            if index:
+                time.sleep(_approx_tokens(piece) * plan["token_s"])
+            yield delta
+        yield {"contentBlockStop": {"contentBlockIndex": 0}}
+        yield {"messageStop": {"stopReason": plan["stop_reason"]}}
+        yield {"metadata": {"usage": plan["usage"], "metrics": {"latencyMs": plan["latency_ms"]}}}
+
+    def retrieve(self, **params: Any) -> dict[str, Any]:
+        response, latency_s = self._backend.plan_retrieve(params)
+        wait_s, timed_out = self._backend.wait(latency_s)
+        time.sleep(wait_s)
+        if timed_out:
+            raise _timeout_error()
+        return response
+
+
+class FakeAsyncBedrockClient:
+    """aiobotocore-style stand-in (awaitable calls, async event stream)."""
+
+    def __init__(self, service_name: str, read_timeout: Optional[float] = None):
+        self.service_name = service_name
+        self._backend = _FakeBackend(read_timeout)
+
+    async def converse(self, **params: Any) -> dict[str, Any]:
+        plan = self._backend.plan_converse(params)
+        wait_s, timed_out = self._backend.wait(plan["latency_ms"] / 1000)
+        with _model_quota(params, "Converse"):
+            await asyncio.sleep(wait_s)
+        if timed_out:
+            raise _timeout_error()
+        return _converse_response(plan)
+
+    async def converse_stream(self, **params: Any) -> dict[str, Any]:
+        plan = self._backend.plan_converse(params)
+        wait_s, timed_out = self._backend.wait(plan["first_token_s"])
+        with _model_quota(params, "ConverseStream"):
+            await asyncio.sleep(wait_s)
+        if timed_out:
+            raise _timeout_error()
+        return {"stream": self._events(plan)}
+
+    async def _events(self, plan: dict[str, Any]):
+        yield {"messageStart": {"role": "assistant"}}
+        start, deltas = _content_events(plan)
+        for event in start:
+            yield event
+        for index, (piece, delta) in enumerate(zip(_stream_pieces(plan["text"]), deltas)):
+            if index:
+                await asyncio.sleep(_approx_tokens(piece) * plan["token_s"])
+            yield delta
+        yield {"contentBlockStop": {"contentBlockIndex": 0}}
+        yield {"messageStop": {"stopReason": plan["stop_reason"]}}
+        yield {"metadata": {"usage": plan["usage"], "metrics": {"latencyMs": plan["latency_ms"]}}}
+
+    async def retrieve(self, **params: Any) -> dict[str, Any]:
+        response, latency_s = self._backend.plan_retrieve(params)
+        wait_s, timed_out = self._backend.wait(latency_s)
+        await asyncio.sleep(wait_s)
+        if timed_out:
+            raise _timeout_error()
+        return response
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
@@ -0,0 +1,277 @@
+"""Hedged model requests to cut tail latency.
+
+A hedged call sends the request to the primary model and, if it has not
+answered within a delay taken from recent latencies of the same AI Config
+(HEDGE_PERCENTILE, default p95), sends a duplicate to the hedge target (the
+same model, another region or another inference profile). The first response
+wins and the other request is cancelled.
+
+Hedging is off by default (LLM_HEDGING). Per AI Config, the custom parameters
+``hedge`` (false opts out), ``hedge_percentile``, ``hedge_model`` and
+``hedge_region`` override the env defaults. Hedge rate, win rate and the
+tokens spent on losing duplicates are kept per config (``get_hedge_stats``).
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+# Latencies kept per config for the hedge delay percentile
+_LATENCY_WINDOW = 200
+
+# Calls observed before the percentile is trusted (HEDGE_DEFAULT_DELAY_MS until then)
+_MIN_SAMPLES = 20
+
+
+def hedging_enabled() -> bool:
+    """Whether model calls may be hedged (LLM_HEDGING env var, default false)."""
+    return os.getenv("LLM_HEDGING", "false").lower() in ("1", "true", "yes")
+
+
+@dataclass
+class HedgeOutcome:
+    """How one hedged call played out."""
+
+    hedged: bool = False
+    hedge_won: bool = False
+    delay_ms: int = 0
+
+
+class HedgePolicy:
+    """Hedge delay and counters for one AI Config."""
+
+    def __init__(self, config_key: str, percentile: float = 95.0):
+        """
+        Args:
+            config_key: AI Config the policy belongs to
+            percentile: Latency percentile after which a duplicate is sent
+        """
+        self.config_key = config_key
+        self.percentile = percentile
+        self.default_delay_ms = float(os.getenv("HEDGE_DEFAULT_DELAY_MS", "3000"))
+        self.min_delay_ms = float(os.getenv("HEDGE_MIN_DELAY_MS", "250"))
+        self._latencies: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "extra_input_tokens": 0,
+            "extra_output_tokens": 0,
+            "cancelled": 0,
+        }
+
+    def delay_s(self) -> float:
+        """Seconds to wait for the primary before sending the duplicate."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < _MIN_SAMPLES:
+            return self.default_delay_ms / 1000
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        return max(self.min_delay_ms, latencies[index]) / 1000
+
+    def record(self, latency_ms: float, outcome: HedgeOutcome) -> None:
+        """Record a finished call (the latency the caller saw)."""
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self._stats["calls"] += 1
+            self._stats["hedged"] += outcome.hedged
+            self._stats["hedge_wins"] += outcome.hedge_won
+
+    def record_loser(self, result: Any) -> None:
+        """Count the tokens a losing duplicate spent (or that it was cancelled)."""
+        usage = getattr(result, "usage_metadata", None) or {}
+        with self._lock:
+            if result is None:
+                self._stats["cancelled"] += 1
+            self._stats["extra_input_tokens"] += usage.get("input_tokens", 0)
+            self._stats["extra_output_tokens"] += usage.get("output_tokens", 0)
+
+    def stats(self) -> dict[str, Any]:
+        """Counters plus hedge rate, win rate and the current delay."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["hedge_rate"] = stats["hedged"] / stats["calls"] if stats["calls"] else 0.0
+        stats["win_rate"] = stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0
+        stats["delay_ms"] = int(self.delay_s() * 1000)
+        stats["percentile"] = self.percentile
+        return stats
+
+
+_policies: dict[str, HedgePolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_hedge_policy(config_key: str, percentile: Optional[float] = None) -> HedgePolicy:
+    """The hedge policy of an AI Config (created on first use).
+
+    Args:
+        config_key: AI Config key
+        percentile: Per-config percentile (default: HEDGE_PERCENTILE env var, 95)
+    """
+    with _policies_lock:
+        policy = _policies.get(config_key)
+        if policy is None:
+            policy = HedgePolicy(config_key, float(os.getenv("HEDGE_PERCENTILE", "95")))
+            _policies[config_key] = policy
+    if percentile is not None:
+        policy.percentile = float(percentile)
+    return policy
+
+
+def get_hedge_stats() -> dict[str, dict[str, Any]]:
+    """Hedging counters per AI Config."""
+    with _policies_lock:
+        policies = list(_policies.values())
+    return {policy.config_key: policy.stats() for policy in policies}
+
+
+@lru_cache(maxsize=1)
+def _get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv("HEDGE_WORKERS", "64")),
+        thread_name_prefix="llm-hedge",
+    )
+
+
+def _hedge_kwargs(kwargs: dict[str, Any], elapsed_s: float) -> dict[str, Any]:
+    """Call kwargs for the duplicate (its timeout is what is left of the original)."""
+    hedge_kwargs = dict(kwargs)
+    if hedge_kwargs.get("timeout"):
+        hedge_kwargs["timeout"] = max(0.001, round(hedge_kwargs["timeout"] - elapsed_s, 3))
+    return hedge_kwargs
+
+
+def _pick_winner(first: Any, second: Any, done: set) -> Any:
+    """The first request that finished successfully (None if the finishers all failed)."""
+    for future in (first, second):
+        if future in done and future.exception() is None:
+            return future
+    return None
+
+
+def _submit(fn, *args: Any, **kwargs: Any) -> Future:
+    # Run in a copy of the caller's context so the call stays under the current span
+    return _get_executor().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def _start_primary(fn, *args: Any, **kwargs: Any) -> Future:
+    """Run the primary request on its own thread.
+
+    The caller must be free to return the duplicate's response, so the primary
+    cannot run on the calling thread; a dedicated thread (one per in-flight
+    call) keeps it from queueing behind other calls in the bounded hedge pool.
+    """
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(context.run(fn, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-primary", daemon=True).start()
+    return future
+
+
+def invoke_hedged(
+    primary: Any,
+    hedge: Any,
+    messages: list,
+    kwargs: dict[str, Any],
+    policy: HedgePolicy,
+) -> tuple[Any, HedgeOutcome]:
+    """Invoke a model, sending a duplicate to ``hedge`` if the primary is slow.
+
+    Returns:
+        Tuple of (winning response, outcome)
+
+    Raises:
+        Exception: The primary's error if it fails before the hedge delay, or
+            the last error when both requests fail
+    """
+    start = time.monotonic()
+    delay_s = policy.delay_s()
+    first = _start_primary(primary.invoke, messages, **kwargs)
+    done, _ = wait([first], timeout=delay_s)
+    if done:
+        outcome = HedgeOutcome(delay_ms=int(delay_s * 1000))
+        result = first.result()
+        policy.record((time.monotonic() - start) * 1000, outcome)
+        return result, outcome
+
+    second = _submit(hedge.invoke, messages, **_hedge_kwargs(kwargs, time.monotonic() - start))
+    done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+    winner = _pick_winner(first, second, done)
+    if winner is None:
+        # The first finisher failed; fall back to the other request
+        winner = second if first in done else first
+        wait([winner])
+    loser = second if winner is first else first
+
+    outcome = HedgeOutcome(hedged=True, hedge_won=winner is second, delay_ms=int(delay_s * 1000))
+    policy.record((time.monotonic() - start) * 1000, outcome)
+    if winner.exception() is not None:
+        raise winner.exception()
+
+    # A thread cannot be interrupted: a running loser finishes in the background and its tokens count as extra spend
+    if loser.cancel():
+        policy.record_loser(None)
+    else:
+        loser.add_done_callback(lambda f: policy.record_loser(None if f.exception() else f.result()))
+    return winner.result(), outcome
+
+
+async def ainvoke_hedged(
+    primary: Any,
+    hedge: Any,
+    messages: list,
+    kwargs: dict[str, Any],
+    policy: HedgePolicy,
+) -> tuple[Any, HedgeOutcome]:
+    """Async variant of ``invoke_hedged``; the losing request is cancelled."""
+    start = time.monotonic()
+    delay_s = policy.delay_s()
+    first = asyncio.ensure_future(primary.ainvoke(messages, **kwargs))
+    done, _ = await asyncio.wait({first}, timeout=delay_s)
+    if done:
+        outcome = HedgeOutcome(delay_ms=int(delay_s * 1000))
+        result = first.result()
+        policy.record((time.monotonic() - start) * 1000, outcome)
+        return result, outcome
+
+    second = asyncio.ensure_future(hedge.ainvoke(messages, **_hedge_kwargs(kwargs, time.monotonic() - start)))
+    try:
+        done, _ = await asyncio.wait({first, second}, return_when=asyncio.FIRST_COMPLETED)
+        winner = _pick_winner(first, second, done)
+        if winner is None:
+            # The first finisher failed; fall back to the other request
+            winner = second if first in done else first
+            await asyncio.wait({winner})
+    except asyncio.CancelledError:
+        first.cancel()
+        second.cancel()
+        raise
+    loser = second if winner is first else first
+
+    outcome = HedgeOutcome(hedged=True, hedge_won=winner is second, delay_ms=int(delay_s * 1000))
+    policy.record((time.monotonic() - start) * 1000, outcome)
+    if winner.exception() is not None:
+        raise winner.exception()
+
+    if loser.done():
+        policy.record_loser(None if loser.exception() else loser.result())
+    else:
+        loser.cancel()
+        policy.record_loser(None)
+    return winner.result(), outcome
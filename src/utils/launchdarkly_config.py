@@ -1,10 +1,12 @@
 """LaunchDarkly AI Config integration."""
 
 import os
+import threading
 import time
 from functools import lru_cache
 from typing import Any, Optional
 
+import chevron
 import ldclient
 from dotenv import load_dotenv
 from langchain_core.language_models import BaseChatModel
@@ -12,12 +14,57 @@ from langchain_core.messages import BaseMessage
 from ldclient import Context
 from ldclient.config import Config
 from ldai.client import LDAIClient, ModelConfig, ProviderConfig, LDMessage
-from ldai.models import AIConfig, AICompletionConfig, AICompletionConfigDefault
+from ldai.models import AIConfig, AICompletionConfigDefault
+from ldai.tracker import LDAIConfigTracker
+from ldclient.versioned_data_kind import FEATURES, SEGMENTS
+
+from .ai_config_cache import ai_config_cache_enabled, get_ai_config_cache
+from .bedrock_llm import add_cache_point
+from .metrics_emitter import get_metrics_emitter
+from .observability import get_feature_store
+from .prompt_template import compile_template, render_template
 
 # Load environment variables
 load_dotenv()
 
 
+# AI Config lookups vs. flag evaluations (one evaluation per uncached lookup)
+_EVALUATION_STATS_LOCK = threading.Lock()
+_EVALUATION_STATS: dict[str, dict[str, int]] = {}
+
+
+def _record_ai_config_lookup(config_key: str, evaluated: bool) -> None:
+    with _EVALUATION_STATS_LOCK:
+        stats = _EVALUATION_STATS.setdefault(config_key, {"lookups": 0, "evaluations": 0})
+        stats["lookups"] += 1
+        stats["evaluations"] += evaluated
+
+
+def get_ai_config_evaluation_stats() -> dict[str, Any]:
+    """AI Config lookups and LaunchDarkly flag evaluations, in total and per config.
+
+    Each evaluation sends one evaluation event, so ``evaluations_per_lookup``
+    is also the event volume per lookup (below 1 with the AI Config cache).
+    """
+    with _EVALUATION_STATS_LOCK:
+        by_config = {key: dict(stats) for key, stats in _EVALUATION_STATS.items()}
+    lookups = sum(stats["lookups"] for stats in by_config.values())
+    evaluations = sum(stats["evaluations"] for stats in by_config.values())
+    return {
+        "lookups": lookups,
+        "evaluations": evaluations,
+        "evaluations_per_lookup": evaluations / lookups if lookups else 0.0,
+        "by_config": by_config,
+    }
+
+
+def _context_for_dump(context_vars: dict[str, Any], context_keys: Optional[list[str]]) -> dict[str, Any]:
+    """Variables shown to the model as user context JSON (all but the query, or only context_keys)."""
+    if context_keys is None:
+        return {k: v for k, v in context_vars.items() if k != "query"}
+    return {k: context_vars[k] for k in context_keys if k in context_vars and k != "query"}
+
+
 class LaunchDarklyClient:
     """LaunchDarkly client wrapper for AI Configs."""
 
@@ -59,6 +106,18 @@ class LaunchDarklyClient:
         # Use the already-initialized client (with ObservabilityPlugin from observability.py)
         self.client = ldclient.get()
         self.ai_client = LDAIClient(self.client)
+
+        # Resolved AI Configs, invalidated when LaunchDarkly reports a flag change.
+        # Cache keys come from the flag data, read through the SDK's FeatureStore
+        # interface; without access to the store the cache stays off.
+        self._feature_store = get_feature_store()
+        self._config_cache = None
+        if ai_config_cache_enabled():
+            if self._feature_store is not None:
+                self._config_cache = get_ai_config_cache()
+                self.client.flag_tracker.add_listener(self._on_flag_change)
+            else:
+                print("⚠️  AI Config cache disabled: the LaunchDarkly client has no readable feature store")
         print("✅ LaunchDarkly AI Config client ready (using observability-enabled SDK)")
 
     def get_ai_config(
@@ -78,7 +137,8 @@ class LaunchDarklyClient:
             Tuple of (config_value, tracker, ld_context) for the AI config
             
         Raises:
-            RuntimeError: If LaunchDarkly client is not initialized
+            RuntimeError: If LaunchDarkly client is not initialized, the flag
+                evaluation fails, or its prompt template is malformed
         """
         if not self.ai_client:
             raise RuntimeError("LaunchDarkly client is not initialized. Check your SDK key.")
@@ -86,116 +146,105 @@ class LaunchDarklyClient:
         # Create LaunchDarkly context
         ld_context = self._create_context(context or {})
 
+        cache = self._config_cache
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.key_for(
+                config_key,
+                context or {},
+                lambda: self._flag_data(FEATURES, config_key),
+                lambda key: self._flag_data(FEATURES, key),
+                lambda key: self._flag_data(SEGMENTS, key),
+            )
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                _record_ai_config_lookup(config_key, evaluated=False)
+                config_dict, tracker_metadata = cached
+                # Shallow copy: callers treat the config as read-only
+                return dict(config_dict), LDAIConfigTracker(self.client, *tracker_metadata, ld_context), ld_context
+            generation = cache.generation(config_key)
+
+        config_dict, tracker_metadata = self._evaluate_ai_config(config_key, context, default_config, ld_context)
+        _record_ai_config_lookup(config_key, evaluated=True)
+
+        if cache_key is not None and config_dict.get("_variation") != "default-fallback":
+            cache.put(cache_key, generation, dict(config_dict), tracker_metadata)
+        return config_dict, LDAIConfigTracker(self.client, *tracker_metadata, ld_context), ld_context
+
+    def _evaluate_ai_config(
+        self,
+        config_key: str,
+        context: Optional[dict[str, Any]],
+        default_config: Optional[dict[str, Any]],
+        ld_context: Context,
+    ) -> tuple[dict[str, Any], tuple]:
+        """Evaluate an AI Config with a single flag evaluation.
+
+        The variation key, model, custom parameters, provider and prompt all
+        come from the one evaluated variation (the same rendering the AI SDK's
+        ``agent_config``/``config`` do, without their second evaluation and
+        usage events).
+
+        Returns:
+            Tuple of (config_dict, tracker metadata for ``LDAIConfigTracker``)
+        """
         # Default configuration - convert dict to AIConfig if needed
         if default_config:
             default_ai_config = self._dict_to_ai_config(default_config, key=config_key)
         else:
             default_ai_config = self._get_default_ai_config(key=config_key)
 
-        # Try agent-based config first (using .agent_config() method)
         try:
-            from ldai.models import AIAgentConfigDefault
-            
+            variation = self.client.variation(config_key, ld_context, default_ai_config.to_dict())
+        except Exception as e:
+            print(f"❌ CATASTROPHIC: Error retrieving AI config '{config_key}': {e}")
+            raise RuntimeError(f"Failed to retrieve AI config '{config_key}' from LaunchDarkly: {e}")
+        if not isinstance(variation, dict):
+            variation = default_ai_config.to_dict()
+
+        ld_meta = variation.get("_ldMeta") or {}
+        ldctx = ld_context.to_dict()
+        instructions = variation.get("instructions")
+
+        if ld_meta.get("enabled") and isinstance(instructions, str) and instructions:
+            # Agent-based config ("Goal or task" field): instructions rendered with the context variables
             template_vars = {k: str(v) for k, v in (context or {}).items()
                             if isinstance(v, (str, int, float, bool))}
+            config_dict = {
+                "enabled": True,
+                "provider": (variation.get("provider") or {}).get("name", ""),
+                "_variation": ld_meta.get("variationKey", "unknown"),
+            }
+            model_dict = self._variation_model(variation)
+            if model_dict:
+                config_dict["model"] = model_dict
+            config_dict["_instructions"] = self._render_prompt(config_key, instructions, {**template_vars, "ldctx": ldctx})
+        else:
+            # Completion-based config: messages rendered with the LaunchDarkly context only
+            config_dict = {"enabled": bool(ld_meta.get("enabled", False))}
+            messages = variation.get("messages")
+            if isinstance(messages, list) and messages and all(isinstance(m, dict) for m in messages):
+                config_dict["messages"] = [
+                    {"role": m["role"], "content": self._render_prompt(config_key, m["content"], {"ldctx": ldctx})}
+                    for m in messages
+                ]
+            model_dict = self._variation_model(variation)
+            if model_dict:
+                config_dict["model"] = model_dict
+            if variation.get("provider"):
+                config_dict["provider"] = variation["provider"].get("name", "")
+            config_dict["_variation"] = ld_meta.get("variationKey", "unknown")
 
-            agent = self.ai_client.agent_config(
-                config_key,
-                ld_context,
-                AIAgentConfigDefault(
-                    enabled=True,
-                    instructions="__DEFAULT_INSTRUCTIONS__"
-                ),
-                variables=template_vars,
-            )
-            
-            if agent and agent.enabled:
-                
-                # Check if this is actually an agent-based config (has non-default instructions)
-                has_instructions = (
-                    hasattr(agent, 'instructions') and 
-                    agent.instructions and 
-                    agent.instructions != "__DEFAULT_INSTRUCTIONS__"
-                )
-                
-                if has_instructions:
-                    # This is truly an agent-based config (has "Goal or task" field)
-                    # Use agent.to_dict() to get all data including custom parameters
-                    agent_dict = agent.to_dict()
-                    
-                    # Get variation key by calling variation_detail (agents() API doesn't expose it)
-                    try:
-                        vd = self.client.variation_detail(config_key, ld_context, {})
-                        if vd and isinstance(vd.value, dict):
-                            variation_name = vd.value.get("_ldMeta", {}).get("variationKey", "unknown")
-                        else:
-                            variation_name = "unknown"
-                    except:
-                        variation_name = "unknown"
-                    
-                    # Extract provider
-                    provider_value = ""
-                    if agent_dict.get("provider"):
-                        provider_dict = agent_dict["provider"]
-                        provider_value = provider_dict.get("name", "") if isinstance(provider_dict, dict) else str(provider_dict)
-                    
-                    config_dict = {
-                        "enabled": agent_dict.get("_ldMeta", {}).get("enabled", True),
-                        "provider": provider_value,
-                        "_variation": variation_name,  # Store variation name in config
-                    }
-                    
-                    # Extract model config with custom parameters
-                    if agent_dict.get("model"):
-                        model_dict = agent_dict["model"]
-                        config_dict["model"] = {
-                            "name": model_dict.get("name", ""),
-                            "parameters": model_dict.get("parameters", {}),
-                        }
-                        # Custom parameters (like awskbid) are available in agent.to_dict()!
-                        if model_dict.get("custom"):
-                            config_dict["model"]["custom"] = model_dict["custom"]
-                    
-                    # Store instructions separately (not as messages)
-                    config_dict["_instructions"] = agent_dict.get("instructions", "")
-                    
-                    tracker = agent.tracker
-                    # Variation logging is now handled by individual agents
-                    return config_dict, tracker, ld_context
-                # If no instructions, this is a completion-based config, fall through
-        except Exception as e:
-            # Agent-based retrieval failed, will try completion-based
-            pass
-
-        # Fall back to completion-based config (using .config() method)
-        try:
-            config_value = self.ai_client.config(
-                config_key, ld_context, default_ai_config, {}
-            )
-            tracker = config_value.tracker
-            
-            config_dict = self._ai_config_to_dict(config_value)
-            
-            try:
-                vd = self.client.variation_detail(config_key, ld_context, {})
-                if vd and isinstance(vd.value, dict):
-                    variation_name = vd.value.get("_ldMeta", {}).get("variationKey", "unknown")
-                else:
-                    variation_name = "unknown"
-            except:
-                variation_name = "unknown"
-            
-            config_dict["_variation"] = variation_name
-            
             default_dict = self._ai_config_to_dict(default_ai_config)
-            
+
             is_from_ld = (
                 config_dict.get("model", {}).get("name") != default_dict.get("model", {}).get("name") or
                 config_dict.get("provider") != default_dict.get("provider") or
                 "custom" in config_dict.get("model", {}) or
                 config_dict.get("messages")
             )
-            
+
             if not is_from_ld:
                 if default_config:
                     config_dict["_variation"] = "default-fallback"
@@ -203,14 +252,55 @@ class LaunchDarklyClient:
                 else:
                     error_msg = f"CATASTROPHIC: AI config '{config_key}' not found in LaunchDarkly!"
                     print(f"❌ {error_msg}")
-                    raise RuntimeError(error_msg)
-            
-            return config_dict, tracker, ld_context
-            
+                    raise RuntimeError(f"Failed to retrieve AI config '{config_key}' from LaunchDarkly: {error_msg}")
+
+        tracker_metadata = (
+            ld_meta.get("variationKey", ""),
+            config_key,
+            int(ld_meta.get("version", 1)),
+            config_dict.get("model", {}).get("name", ""),
+            config_dict.get("provider", ""),
+        )
+        return config_dict, tracker_metadata
+
+    @staticmethod
+    def _render_prompt(config_key: str, template: str, data: dict[str, Any]) -> str:
+        """Render a prompt template of an evaluated variation.
+
+        Raises:
+            RuntimeError: If the template is malformed (same error as a failed evaluation)
+        """
+        try:
+            return chevron.render(template, data)
         except Exception as e:
-            print(f"❌ CATASTROPHIC: Error retrieving AI config '{config_key}': {e}")
+            print(f"❌ CATASTROPHIC: Error rendering AI config '{config_key}': {e}")
             raise RuntimeError(f"Failed to retrieve AI config '{config_key}' from LaunchDarkly: {e}")
 
+    @staticmethod
+    def _variation_model(variation: dict[str, Any]) -> dict[str, Any]:
+        """Model name, parameters and custom parameters of an evaluated variation."""
+        model = variation.get("model")
+        if not isinstance(model, dict):
+            return {}
+        model_dict = {"name": model.get("name", ""), "parameters": model.get("parameters") or {}}
+        # Custom parameters (like awskbid) live in model.custom
+        if model.get("custom"):
+            model_dict["custom"] = model["custom"]
+        return model_dict
+
+    def _flag_data(self, kind: Any, key: str) -> Optional[dict[str, Any]]:
+        """Raw flag or segment JSON from the SDK's feature store (None if unavailable)."""
+        try:
+            item = self._feature_store.get(kind, key, lambda item: item)
+            return item.to_json_dict() if item is not None else None
+        except Exception:
+            return None
+
+    def _on_flag_change(self, change: Any) -> None:
+        """Drop cached configs of a changed flag (also fired for its segments and prerequisites)."""
+        if self._config_cache is not None:
+            self._config_cache.invalidate(change.key)
+
     def _create_context(self, context_dict: dict[str, Any]) -> Context:
         """Create LaunchDarkly context from dictionary.
 
@@ -347,12 +437,24 @@ class LaunchDarklyClient:
 
         return result
 
-    def build_langchain_messages(self, ld_config: dict[str, Any], context_vars: dict[str, Any]) -> list:
+    def build_langchain_messages(
+        self,
+        ld_config: dict[str, Any],
+        context_vars: dict[str, Any],
+        context_keys: Optional[list[str]] = None,
+    ) -> list:
         """Build LangChain messages from LaunchDarkly config (agent-based or completion-based).
         
+        A ``conversation_history`` variable (multi-turn sessions) is added ahead
+        of the user message unless the prompt template places it itself.
+        System messages get a prompt-cache point after their static prefix
+        (the template text before the first variable).
+
         Args:
             ld_config: The LaunchDarkly AI config dict
             context_vars: Variables for template replacement
+            context_keys: Variables to include in the user context JSON
+                (default: all; template replacement always sees every variable)
             
         Returns:
             List of LangChain message objects (SystemMessage, HumanMessage, AIMessage)
@@ -361,32 +463,43 @@ class LaunchDarklyClient:
         import json
         
         langchain_messages = []
+        history = context_vars.get("conversation_history")
+        if history:
+            templates = [ld_config.get("_instructions", "")] + [m.get("content", "") for m in ld_config.get("messages", [])]
+            history_in_template = any("conversation_history}}" in (t or "") for t in templates)
+            context_vars = {k: v for k, v in context_vars.items() if k != "conversation_history"}
+            context_vars_with_history = {**context_vars, "conversation_history": history}
+        else:
+            history_in_template = False
+            context_vars_with_history = context_vars
         
         if "_instructions" in ld_config:
             # Agent-based config: instructions + user query
-            instructions = ld_config["_instructions"]
+            template = compile_template(ld_config["_instructions"] or "")
             # Replace template variables in instructions
-            for key, value in context_vars.items():
-                instructions = instructions.replace(f"{{{{{key}}}}}", str(value))
-                instructions = instructions.replace(f"{{{{ldctx.{key}}}}}", str(value))
+            instructions = template.render(context_vars_with_history)
             
             # System message with instructions, then user message with query
             query = context_vars.get("query", "")
-            user_context = {k: v for k, v in context_vars.items() if k != "query"}
+            user_context = _context_for_dump(context_vars, context_keys)
+            system_message = SystemMessage(content=instructions)
+            add_cache_point(system_message, template.static_prefix_length)
             langchain_messages = [
-                SystemMessage(content=instructions),
+                system_message,
                 HumanMessage(content=f"User query: {query}\n\nUser context:\n{json.dumps(user_context, indent=2, default=str)}")
             ]
         elif "messages" in ld_config:
             # Completion-based config: use messages from LaunchDarkly
             ld_messages = ld_config["messages"]
-            formatted_messages = self.format_messages(ld_messages, context_vars)
+            formatted_messages = self.format_messages(ld_messages, context_vars_with_history)
             
             # Convert to LangChain message format
             has_user_message = False
-            for msg in formatted_messages:
+            for raw_msg, msg in zip(ld_messages, formatted_messages):
                 if msg["role"] == "system":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
+                    system_message = SystemMessage(content=msg["content"])
+                    add_cache_point(system_message, compile_template(raw_msg.get("content") or "").static_prefix_length)
+                    langchain_messages.append(system_message)
                 elif msg["role"] == "user":
                     langchain_messages.append(HumanMessage(content=msg["content"]))
                     has_user_message = True
@@ -397,7 +510,7 @@ class LaunchDarklyClient:
             # If we only have a system message, add a user message with query
             if not has_user_message and langchain_messages:
                 query = context_vars.get("query", "")
-                user_context_minimal = {k: v for k, v in context_vars.items() if k not in ["query"]}
+                user_context_minimal = _context_for_dump(context_vars, context_keys)
                 user_msg = f"User query: {query}\n\nContext:\n{json.dumps(user_context_minimal, indent=2, default=str)}"
                 langchain_messages.append(HumanMessage(content=user_msg))
         else:
@@ -408,13 +521,21 @@ class LaunchDarklyClient:
                 f"  - For agent-based: Set 'Goal or task' field\n"
                 f"  - For completion-based: Add messages in 'Prompt' section"
             )
+
+        if history and not history_in_template:
+            for i in range(len(langchain_messages) - 1, -1, -1):
+                if isinstance(langchain_messages[i], HumanMessage):
+                    content = langchain_messages[i].content
+                    langchain_messages[i] = HumanMessage(content=f"Conversation so far:\n{history}\n\n{content}")
+                    break
         
         return langchain_messages
 
     def format_messages(self, messages: list[dict], context_vars: dict[str, Any]) -> list[dict]:
         """Format LaunchDarkly messages with context variables.
         
-        Replaces template variables like {{ldctx.name}} or {{variable_name}} with actual values.
+        Replaces template variables like {{ldctx.name}} or {{variable_name}} with actual values
+        (unknown variables are kept as written). Templates are compiled once and cached.
         
         Args:
             messages: List of message dicts with 'role' and 'content' from LaunchDarkly
@@ -423,35 +544,14 @@ class LaunchDarklyClient:
         Returns:
             List of formatted messages
         """
-        import re
-        
-        formatted_messages = []
-        for msg in messages:
-            content = msg.get("content", "")
-            
-            # Replace {{ldctx.attribute}} with context values
-            def replace_ldctx(match):
-                attr = match.group(1)
-                return str(context_vars.get(attr, f"{{{{ldctx.{attr}}}}}"))  # Keep original if not found
-            
-            content = re.sub(r'\{\{ldctx\.(\w+)\}\}', replace_ldctx, content)
-            
-            # Replace {{variable_name}} with values
-            def replace_var(match):
-                var = match.group(1)
-                return str(context_vars.get(var, f"{{{{{var}}}}}"))  # Keep original if not found
-            
-            content = re.sub(r'\{\{(\w+)\}\}', replace_var, content)
-            
-            formatted_messages.append({
-                "role": msg.get("role", "user"),
-                "content": content
-            })
-        
-        return formatted_messages
+        return [
+            {"role": msg.get("role", "user"), "content": render_template(msg.get("content", ""), context_vars)}
+            for msg in messages
+        ]
 
     def close(self):
-        """Close the LaunchDarkly client."""
+        """Close the LaunchDarkly client (after sending queued metric events)."""
+        get_metrics_emitter().flush(timeout=5.0)
         if self.client:
             self.client.close()
 
@@ -478,6 +578,14 @@ class NoOpTracker:
         """No-op track tokens."""
         pass
 
+    def track_duration(self, duration):
+        """No-op track duration."""
+        pass
+
+    def track_time_to_first_token(self, ttft):
+        """No-op track time to first token."""
+        pass
+
 
 class ModelInvoker:
     """Helper class to invoke models with tracking.
@@ -493,7 +601,10 @@ class ModelInvoker:
         config_key: str = "",
         is_agent_config: bool = False,
         user_context: Optional[Context] = None,
-        skip_span_annotation: bool = False
+        skip_span_annotation: bool = False,
+        cache_responses: bool = False,
+        hedge_model: Optional[BaseChatModel] = None,
+        hedge_policy: Any = None
     ):
         """Initialize model invoker.
 
@@ -504,6 +615,10 @@ class ModelInvoker:
             is_agent_config: Whether this is an agent-based config
             user_context: LaunchDarkly user context (for span annotation)
             skip_span_annotation: If True, skip all span annotation (for background threads)
+            cache_responses: Serve identical requests from the response cache
+            hedge_model: Model a duplicate request is sent to when the primary is slow
+                (None disables hedging)
+            hedge_policy: HedgePolicy with the hedge delay and counters for this config
         """
         self.model = model
         self.tracker = tracker
@@ -511,248 +626,376 @@ class ModelInvoker:
         self._is_agent_config = is_agent_config
         self.user_context = user_context
         self.skip_span_annotation = skip_span_annotation
+        self.cache_responses = cache_responses
+        self.hedge_model = hedge_model
+        self.hedge_policy = hedge_policy
 
-    def invoke(self, messages: list[BaseMessage]) -> Any:
+    def invoke(self, messages: list[BaseMessage], **kwargs: Any) -> Any:
         """Invoke the model with tracking.
 
         Args:
             messages: List of messages to send to the model
+            **kwargs: Per-call model arguments (e.g. timeout, max_tokens)
 
         Returns:
             Model response
         """
         try:
-            # Skip span annotation entirely if flag is set (background threads like judges)
-            if not self.skip_span_annotation:
-                # Set ld.ai_config.key on the CURRENT span for THIS agent
-                # Skip span annotation for background threads (judges) - they reference closed spans
-                try:
-                    from opentelemetry import trace
-                    
-                    current_span = trace.get_current_span()
-                    
-                    # Check if span is valid and recording BEFORE any operations
-                    # Background threads will have invalid/ended spans - skip them entirely
-                    if (current_span and 
-                        self.config_key and 
-                        hasattr(current_span, 'is_recording') and 
-                        current_span.is_recording()):
-                        
-                        # Additional check: is this a valid span context?
-                        span_context = current_span.get_span_context()
-                        if not span_context or not span_context.is_valid:
-                            # Invalid context - skip annotation (background thread)
-                            pass
-                        else:
-                            # Valid, recording span - safe to annotate
-                            try:
-                                current_span.set_attribute("ld.ai_config.key", self.config_key)
-                                
-                                # Add feature_flag event
-                                if self.user_context:
-                                    ctx_dict = self.user_context.to_dict() if hasattr(self.user_context, 'to_dict') else {}
-                                    ctx_id = ctx_dict.get('key') or ctx_dict.get('userKey') or 'anonymous'
-                                    
-                                    current_span.add_event(
-                                        "feature_flag",
-                                        attributes={
-                                            "feature_flag.key": self.config_key,
-                                            "feature_flag.provider.name": "LaunchDarkly",
-                                            "feature_flag.context.id": ctx_id,
-                                            "feature_flag.result.value": True,
-                                        },
-                                    )
-                                
-                                # Trigger LD variation for correlation
-                                if self.user_context:
-                                    _ = ldclient.get().variation(self.config_key, self.user_context, True)
-                            except Exception:
-                                # Silently ignore any annotation errors - don't let them break LLM calls
-                                pass
-                                
-                except Exception:
-                    # Don't fail model invocation if span annotation fails entirely
-                    pass
-            
+            self._annotate_current_span()
+
+            cache_key, cached = self._cached_response(messages, kwargs)
+            if cached is not None:
+                return cached
+
             # Track the LLM call
-            result = self.tracker.track_duration_of(lambda: self.model.invoke(messages))
-            
-            # Track success (no arguments)
-            self.tracker.track_success()
-            
-            # Extract and track token usage if available
-            if hasattr(result, "usage_metadata") and result.usage_metadata:
-                from ldai.tracker import TokenUsage
-                import random
-                
-                usage_data = result.usage_metadata
-                
-                # Extract actual token usage (no jitter)
-                input_tokens = usage_data.get("input_tokens", 0)
-                output_tokens = usage_data.get("output_tokens", 0)
-                total_tokens = input_tokens + output_tokens
-                
-                token_usage = TokenUsage(
-                    input=input_tokens,
-                    output=output_tokens,
-                    total=total_tokens
-                )
-                self.tracker.track_tokens(token_usage)
-            
-            # Extract and track Time to First Token (TTFT) if available
-            ttft_ms = None
-            if hasattr(result, "response_metadata") and isinstance(result.response_metadata, dict):
-                ttft_ms = result.response_metadata.get("ttft_ms")
-            elif hasattr(result, "generations") and len(result.generations) > 0:
-                gen = result.generations[0]
-                if hasattr(gen, "message") and hasattr(gen.message, "response_metadata"):
-                    ttft_ms = gen.message.response_metadata.get("ttft_ms")
-            
-            # Track TTFT in LaunchDarkly if available
-            if ttft_ms is not None:
-                try:
-                    self.tracker.track_time_to_first_token(ttft_ms)
-                except Exception as e:
-                    # Don't fail if TTFT tracking fails
-                    import logging
-                    logging.debug(f"Failed to track TTFT: {e}")
-            
+            result = self.tracker.track_duration_of(lambda: self._invoke_model(messages, kwargs))
+
+            self._track_response(result)
+            self._store_response(cache_key, result)
             return result
 
         except Exception as e:
-            # Track error (no arguments)
-            self.tracker.track_error()
-            
-            # Mark span as error if available
+            self._track_failure(e)
+            raise
+
+    async def ainvoke(self, messages: list[BaseMessage], **kwargs: Any) -> Any:
+        """Invoke the model asynchronously with tracking.
+
+        Same tracking as ``invoke`` but awaits the model's native async path,
+        so the calling event loop is free while the request is in flight.
+
+        Args:
+            messages: List of messages to send to the model
+            **kwargs: Per-call model arguments (e.g. timeout, max_tokens)
+
+        Returns:
+            Model response
+        """
+        try:
+            self._annotate_current_span()
+
+            cache_key, cached = self._cached_response(messages, kwargs)
+            if cached is not None:
+                return cached
+
+            # track_duration_of only wraps sync callables, so time the await manually
+            import time
+            start_time = time.time()
+            result = await self._ainvoke_model(messages, kwargs)
+            self.tracker.track_duration(int((time.time() - start_time) * 1000))
+
+            self._track_response(result)
+            self._store_response(cache_key, result)
+            return result
+
+        except Exception as e:
+            self._track_failure(e)
+            raise
+
+    def _invoke_model(self, messages: list[BaseMessage], kwargs: dict[str, Any]) -> Any:
+        """Call the model, hedging the request when a hedge model is configured."""
+        if self.hedge_model is None:
+            return self.model.invoke(messages, **kwargs)
+        from .hedging import invoke_hedged
+
+        result, outcome = invoke_hedged(self.model, self.hedge_model, messages, kwargs, self.hedge_policy)
+        self._record_hedge(outcome)
+        return result
+
+    async def _ainvoke_model(self, messages: list[BaseMessage], kwargs: dict[str, Any]) -> Any:
+        """Async variant of ``_invoke_model``."""
+        if self.hedge_model is None:
+            return await self.model.ainvoke(messages, **kwargs)
+        from .hedging import ainvoke_hedged
+
+        result, outcome = await ainvoke_hedged(self.model, self.hedge_model, messages, kwargs, self.hedge_policy)
+        self._record_hedge(outcome)
+        return result
+
+    def _record_hedge(self, outcome: Any) -> None:
+        """Record whether the call was hedged and which request won on the current span."""
+        if outcome.hedged:
+            print(f"  🏁 Hedged {self.config_key or 'model call'} after {outcome.delay_ms}ms → "
+                  f"{'hedge' if outcome.hedge_won else 'primary'} won")
+        try:
+            from opentelemetry import trace
+            span = trace.get_current_span()
+            if span and span.is_recording():
+                span.set_attribute("llm.hedged", outcome.hedged)
+                span.set_attribute("llm.hedge_won", outcome.hedge_won)
+                span.set_attribute("llm.hedge_delay_ms", outcome.delay_ms)
+        except Exception:
+            pass
+
+    def _cached_response(self, messages: list[BaseMessage], kwargs: dict[str, Any]) -> tuple[Optional[str], Any]:
+        """Look the request up in the response cache.
+
+        Returns:
+            Tuple of (cache key or None when caching is off, cached response or None)
+        """
+        if not self.cache_responses:
+            return None, None
+        from .response_cache import get_response_cache, response_cache_key
+
+        cache_key = response_cache_key(self.model, messages, kwargs)
+        cached = get_response_cache().get(cache_key)
+        if cached is not None:
+            # No model call was made, so only success is tracked (no duration or tokens)
+            self.tracker.track_success()
             try:
                 from opentelemetry import trace
                 span = trace.get_current_span()
                 if span and span.is_recording():
-                    from opentelemetry.trace import Status, StatusCode
-                    span.set_status(Status(StatusCode.ERROR, str(e)))
-                    span.record_exception(e)
-            except:
+                    span.set_attribute("llm.response_cache_hit", True)
+            except Exception:
                 pass
-                
-            raise
+            print(f"  ♻️  Response cache hit for {self.config_key or 'model call'}")
+        return cache_key, cached
+
+    def _store_response(self, cache_key: Optional[str], result: Any) -> None:
+        """Keep a model response for identical later requests."""
+        if cache_key is None:
+            return
+        from .response_cache import get_response_cache
+
+        try:
+            get_response_cache().put(cache_key, result)
+        except Exception as e:
+            # A cache write failure must not fail the model call
+            import logging
+            logging.debug(f"Failed to cache model response: {e}")
+
+    def _annotate_current_span(self) -> None:
+        """Link the current span to this AI Config (no-op for background judges)."""
+        # Skip span annotation entirely if flag is set (background threads like judges)
+        if self.skip_span_annotation:
+            return
+
+        # Set ld.ai_config.key on the CURRENT span for THIS agent
+        # Skip span annotation for background threads (judges) - they reference closed spans
+        try:
+            from opentelemetry import trace
+
+            current_span = trace.get_current_span()
+
+            # Check if span is valid and recording BEFORE any operations
+            # Background threads will have invalid/ended spans - skip them entirely
+            if (current_span and 
+                self.config_key and 
+                hasattr(current_span, 'is_recording') and 
+                current_span.is_recording()):
+
+                # Additional check: is this a valid span context?
+                span_context = current_span.get_span_context()
+                if not span_context or not span_context.is_valid:
+                    # Invalid context - skip annotation (background thread)
+                    return
+
+                # Valid, recording span - safe to annotate
+                try:
+                    current_span.set_attribute("ld.ai_config.key", self.config_key)
+
+                    # Add feature_flag event
+                    if self.user_context:
+                        ctx_dict = self.user_context.to_dict() if hasattr(self.user_context, 'to_dict') else {}
+                        ctx_id = ctx_dict.get('key') or ctx_dict.get('userKey') or 'anonymous'
+
+                        current_span.add_event(
+                            "feature_flag",
+                            attributes={
+                                "feature_flag.key": self.config_key,
+                                "feature_flag.provider.name": "LaunchDarkly",
+                                "feature_flag.context.id": ctx_id,
+                                "feature_flag.result.value": True,
+                            },
+                        )
+
+                    # Trigger LD variation for correlation (queued, evaluated by the metrics emitter)
+                    if self.user_context:
+                        get_metrics_emitter().variation(self.config_key, self.user_context, True)
+                except Exception:
+                    # Silently ignore any annotation errors - don't let them break LLM calls
+                    pass
+
+        except Exception:
+            # Don't fail model invocation if span annotation fails entirely
+            pass
+
+    def _track_response(self, result: Any) -> None:
+        """Track success, token usage and TTFT for a completed model call."""
+        # Track success (no arguments)
+        self.tracker.track_success()
+
+        # Extract and track token usage if available
+        if hasattr(result, "usage_metadata") and result.usage_metadata:
+            from ldai.tracker import TokenUsage
+
+            usage_data = result.usage_metadata
+
+            # Extract actual token usage (no jitter)
+            input_tokens = usage_data.get("input_tokens", 0)
+            output_tokens = usage_data.get("output_tokens", 0)
+            total_tokens = input_tokens + output_tokens
+
+            token_usage = TokenUsage(
+                input=input_tokens,
+                output=output_tokens,
+                total=total_tokens
+            )
+            self.tracker.track_tokens(token_usage)
+
+        # Extract and track Time to First Token (TTFT) if available
+        ttft_ms = None
+        if hasattr(result, "response_metadata") and isinstance(result.response_metadata, dict):
+            ttft_ms = result.response_metadata.get("ttft_ms")
+        elif hasattr(result, "generations") and len(result.generations) > 0:
+            gen = result.generations[0]
+            if hasattr(gen, "message") and hasattr(gen.message, "response_metadata"):
+                ttft_ms = gen.message.response_metadata.get("ttft_ms")
+
+        # Track TTFT in LaunchDarkly if available
+        if ttft_ms is not None:
+            try:
+                self.tracker.track_time_to_first_token(ttft_ms)
+            except Exception as e:
+                # Don't fail if TTFT tracking fails
+                import logging
+                logging.debug(f"Failed to track TTFT: {e}")
+
+    def _track_failure(self, error: Exception) -> None:
+        """Track a failed model call and mark the current span as errored."""
+        # Track error (no arguments)
+        self.tracker.track_error()
+
+        # Mark span as error if available
+        try:
+            from opentelemetry import trace
+            span = trace.get_current_span()
+            if span and span.is_recording():
+                from opentelemetry.trace import Status, StatusCode
+                span.set_status(Status(StatusCode.ERROR, str(error)))
+                span.record_exception(error)
+        except:
+            pass
     
-    def stream(self, messages: list[BaseMessage]):
+    def stream(self, messages: list[BaseMessage], **kwargs: Any):
         """Stream the model response with tracking.
         
         Args:
             messages: List of messages to send to the model
+            **kwargs: Per-call model arguments (e.g. timeout, max_tokens)
             
         Yields:
-            Chunks from the model as they arrive
+            Message chunks from the model as they arrive
         """
         try:
-            # Skip span annotation for streaming (same as invoke)
-            if not self.skip_span_annotation:
-                try:
-                    from opentelemetry import trace
-                    current_span = trace.get_current_span()
-                    
-                    if (current_span and 
-                        self.config_key and 
-                        hasattr(current_span, 'is_recording') and 
-                        current_span.is_recording()):
-                        
-                        span_context = current_span.get_span_context()
-                        if not span_context or not span_context.is_valid:
-                            pass
-                        else:
-                            try:
-                                current_span.set_attribute("ld.ai_config.key", self.config_key)
-                                
-                                if self.user_context:
-                                    ctx_dict = self.user_context.to_dict() if hasattr(self.user_context, 'to_dict') else {}
-                                    ctx_id = ctx_dict.get('key') or ctx_dict.get('userKey') or 'anonymous'
-                                    
-                                    current_span.add_event(
-                                        "feature_flag",
-                                        attributes={
-                                            "feature_flag.key": self.config_key,
-                                            "feature_flag.provider.name": "LaunchDarkly",
-                                            "feature_flag.context.id": ctx_id,
-                                            "feature_flag.result.value": True,
-                                        },
-                                    )
-                                
-                                if self.user_context:
-                                    _ = ldclient.get().variation(self.config_key, self.user_context, True)
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
+            self._annotate_current_span()
             
             # Track start time for duration
             import time
             start_time = time.time()
             
             # Stream from the model
-            accumulated_tokens = {"input": 0, "output": 0, "total": 0}
-            ttft_ms = None
-            
-            for chunk in self.model.stream(messages):
-                # Extract TTFT from first chunk
-                if ttft_ms is None:
-                    chunk_metadata = chunk.message.response_metadata if hasattr(chunk, 'message') else {}
-                    if isinstance(chunk_metadata, dict):
-                        ttft_ms = chunk_metadata.get("ttft_ms")
-                
-                # Extract token usage from final chunk
-                if hasattr(chunk, 'message') and hasattr(chunk.message, 'usage_metadata'):
-                    if chunk.message.usage_metadata:
-                        accumulated_tokens = {
-                            "input": chunk.message.usage_metadata.get("input_tokens", 0),
-                            "output": chunk.message.usage_metadata.get("output_tokens", 0),
-                            "total": chunk.message.usage_metadata.get("total_tokens", 0)
-                        }
-                
-                yield chunk
+            stream_metrics = {"tokens": None, "ttft_ms": None}
             
-            # Track metrics after streaming completes
-            duration_ms = int((time.time() - start_time) * 1000)
-            
-            # Track success
-            self.tracker.track_success()
-            
-            # Track duration manually
-            self.tracker.track_duration(duration_ms)
-            
-            # Track tokens if we got them
-            if accumulated_tokens["total"] > 0:
-                from ldai.tracker import TokenUsage
-                token_usage = TokenUsage(
-                    input=accumulated_tokens["input"],
-                    output=accumulated_tokens["output"],
-                    total=accumulated_tokens["total"]
-                )
-                self.tracker.track_tokens(token_usage)
+            model_stream = self.model.stream(messages, **kwargs)
+            try:
+                for chunk in model_stream:
+                    self._observe_chunk(chunk, stream_metrics)
+                    yield chunk
+            except GeneratorExit:
+                # The caller stopped reading early (e.g. structured output is complete): close the model stream
+                model_stream.close()
+                self._track_stream(int((time.time() - start_time) * 1000), stream_metrics)
+                raise
             
-            # Track TTFT if we got it
-            if ttft_ms is not None:
-                try:
-                    self.tracker.track_time_to_first_token(ttft_ms)
-                except Exception as e:
-                    import logging
-                    logging.debug(f"Failed to track TTFT: {e}")
+            self._track_stream(int((time.time() - start_time) * 1000), stream_metrics)
         
         except Exception as e:
-            self.tracker.track_error()
-            
+            self._track_failure(e)
+            raise
+
+    async def astream(self, messages: list[BaseMessage], **kwargs: Any):
+        """Async variant of ``stream`` with the same tracking.
+
+        Args:
+            messages: List of messages to send to the model
+            **kwargs: Per-call model arguments (e.g. timeout, max_tokens)
+
+        Yields:
+            Message chunks from the model as they arrive
+        """
+        try:
+            self._annotate_current_span()
+
+            import time
+            start_time = time.time()
+            stream_metrics = {"tokens": None, "ttft_ms": None}
+
+            model_stream = self.model.astream(messages, **kwargs)
             try:
-                from opentelemetry import trace
-                span = trace.get_current_span()
-                if span and span.is_recording():
-                    from opentelemetry.trace import Status, StatusCode
-                    span.set_status(Status(StatusCode.ERROR, str(e)))
-                    span.record_exception(e)
-            except:
-                pass
-            
+                async for chunk in model_stream:
+                    self._observe_chunk(chunk, stream_metrics)
+                    yield chunk
+            except GeneratorExit:
+                await model_stream.aclose()
+                self._track_stream(int((time.time() - start_time) * 1000), stream_metrics)
+                raise
+
+            self._track_stream(int((time.time() - start_time) * 1000), stream_metrics)
+
+        except Exception as e:
+            self._track_failure(e)
             raise
 
+    @staticmethod
+    def _observe_chunk(chunk: Any, stream_metrics: dict[str, Any]) -> None:
+        """Collect TTFT and token usage from a streamed chunk."""
+        # Chat models yield message chunks; raw _stream output wraps them in generations
+        message = chunk.message if hasattr(chunk, "message") else chunk
+
+        # Extract TTFT from the first chunk that carries it
+        if stream_metrics["ttft_ms"] is None:
+            chunk_metadata = getattr(message, "response_metadata", None)
+            if isinstance(chunk_metadata, dict):
+                stream_metrics["ttft_ms"] = chunk_metadata.get("ttft_ms")
+
+        # Extract token usage from final chunk
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            stream_metrics["tokens"] = {
+                "input": usage.get("input_tokens", 0),
+                "output": usage.get("output_tokens", 0),
+                "total": usage.get("total_tokens", 0),
+            }
+
+    def _track_stream(self, duration_ms: int, stream_metrics: dict[str, Any]) -> None:
+        """Track metrics after streaming completes."""
+        # Track success
+        self.tracker.track_success()
+        
+        # Track duration manually
+        self.tracker.track_duration(duration_ms)
+        
+        # Track tokens if we got them
+        tokens = stream_metrics["tokens"]
+        if tokens and tokens["total"] > 0:
+            from ldai.tracker import TokenUsage
+            token_usage = TokenUsage(
+                input=tokens["input"],
+                output=tokens["output"],
+                total=tokens["total"]
+            )
+            self.tracker.track_tokens(token_usage)
+        
+        # Track TTFT if we got it
+        if stream_metrics["ttft_ms"] is not None:
+            try:
+                self.tracker.track_time_to_first_token(stream_metrics["ttft_ms"])
+            except Exception as e:
+                import logging
+                logging.debug(f"Failed to track TTFT: {e}")
+
     def _extract_tokens(self, response: Any) -> dict[str, int]:
         """Extract token counts from response.
 
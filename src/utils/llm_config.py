@@ -1,18 +1,100 @@
 """LLM configuration and initialization."""
 
 import os
+import threading
+import time
+from collections import OrderedDict
 from functools import lru_cache
 from typing import Any, Optional, Tuple
 
 from dotenv import load_dotenv
 from langchain_core.language_models import BaseChatModel
 
+from .config_context import ConfigContext
+from .hedging import get_hedge_policy, hedging_enabled
 from .launchdarkly_config import ModelInvoker, get_ld_client
+from .response_cache import response_cache_enabled
 
 # Load environment variables
 load_dotenv()
 
 
+class LLMPool:
+    """Thread-safe registry of shared model instances.
+
+    Model objects are stateless between calls, so requests using the same
+    provider, model and parameters can share one instance (and its HTTP
+    connections) instead of building a new client per request. The pool is
+    bounded; the least recently used instance is evicted first.
+    """
+
+    def __init__(self, max_size: int = 32):
+        """
+        Args:
+            max_size: Maximum number of pooled model instances
+        """
+        self.max_size = max_size
+        self._models: OrderedDict[tuple, BaseChatModel] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "construction_ms": 0}
+
+    def get(self, key: tuple, factory) -> BaseChatModel:
+        """Return the pooled model for a key, building it with factory() on a miss.
+
+        Args:
+            key: Identity of the model (provider, model ID, parameters, region)
+            factory: Zero-argument callable that builds the model
+
+        Returns:
+            Shared model instance
+        """
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self._stats["hits"] += 1
+                return model
+
+        # Build outside the lock so other keys are not blocked on slow client setup
+        start_time = time.time()
+        model = factory()
+        construction_ms = int((time.time() - start_time) * 1000)
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["construction_ms"] += construction_ms
+            existing = self._models.get(key)
+            if existing is not None:
+                # Another thread built the same model first; share its instance
+                self._models.move_to_end(key)
+                return existing
+            self._models[key] = model
+            while len(self._models) > self.max_size:
+                self._models.popitem(last=False)
+                self._stats["evictions"] += 1
+        return model
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Pool counters: hits, misses, evictions, hit_rate, total and average construction time."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._models)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["avg_construction_ms"] = stats["construction_ms"] / stats["misses"] if stats["misses"] else 0.0
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_llm_pool() -> LLMPool:
+    """Process-wide model pool (size from the LLM_POOL_SIZE env var, default 32)."""
+    return LLMPool(max_size=int(os.getenv("LLM_POOL_SIZE", "32")))
+
+
 @lru_cache(maxsize=1)
 def get_llm(temperature: float = 0.7) -> BaseChatModel:
     """Get configured LLM instance.
@@ -97,6 +179,26 @@ def get_structured_llm(temperature: float = 0.0):
     return llm
 
 
+def token_usage_from_response(response: Any) -> dict[str, int]:
+    """Token counts recorded in agent_data for a model response.
+
+    Returns ``input`` and ``output``, plus ``cache_read`` and ``cache_write``
+    (prompt-cache tokens, included in ``input``) when the provider reports them.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return {"input": 0, "output": 0}
+    tokens = {
+        "input": usage.get("input_tokens", 0),
+        "output": usage.get("output_tokens", 0),
+    }
+    details = usage.get("input_token_details") or {}
+    if details.get("cache_read") or details.get("cache_creation"):
+        tokens["cache_read"] = details.get("cache_read", 0)
+        tokens["cache_write"] = details.get("cache_creation", 0)
+    return tokens
+
+
 def get_llm_from_config(
     config_key: str,
     context: Optional[dict[str, Any]] = None,
@@ -144,6 +246,7 @@ def get_model_invoker(
     skip_span_annotation: bool = False,
     default_config: Optional[Any] = None,
     override_guardrail_enabled: Optional[bool] = None,
+    config_context: Optional[ConfigContext] = None,
 ) -> Tuple[ModelInvoker, dict[str, Any]]:
     """Get a ModelInvoker with tracking and full config (including messages) from LaunchDarkly.
 
@@ -154,6 +257,8 @@ def get_model_invoker(
         skip_span_annotation: If True, skip all span annotation (for background threads like judges)
         default_config: Default AIConfig to use if LaunchDarkly is unavailable or flag doesn't exist
         override_guardrail_enabled: If provided, override guardrail setting (True=enable, False=disable, None=use config)
+        config_context: Request's ConfigContext (state["config_context"]); the config
+            and invoker are then resolved once per request and shared with other nodes
 
     Returns:
         Tuple of (ModelInvoker instance with tracking, full config dict including messages)
@@ -165,9 +270,31 @@ def get_model_invoker(
     if default_config:
         # If it's an AIConfig object, convert it to dict using the client's method
         default_config_dict = ld_client._ai_config_to_dict(default_config)
-    
+
+    if config_context is not None:
+        resolved = config_context.resolve(config_key, context, default_config_dict)
+        model_invoker = config_context.invoker(
+            resolved,
+            (default_temperature, skip_span_annotation),
+            lambda: _build_model_invoker(
+                config_key, resolved.config, resolved.tracker, resolved.ld_context, default_temperature, skip_span_annotation
+            ),
+        )
+        return model_invoker, dict(resolved.config)
+
     config, tracker, ld_context = ld_client.get_ai_config(config_key, context, default_config_dict)
-    
+    return _build_model_invoker(config_key, config, tracker, ld_context, default_temperature, skip_span_annotation), config
+
+
+def _build_model_invoker(
+    config_key: str,
+    config: dict[str, Any],
+    tracker: Any,
+    ld_context: Any,
+    default_temperature: float,
+    skip_span_annotation: bool,
+) -> ModelInvoker:
+    """Create the ModelInvoker (pooled model, response cache and hedging settings) for a resolved config."""
     # Create LLM directly from the config (don't call get_llm_from_config which would retrieve again)
     provider = config.get("provider", "bedrock")
     # Parse provider name (e.g., "Bedrock:Anthropic" -> "bedrock")
@@ -187,6 +314,23 @@ def get_model_invoker(
     
     # Determine if this is an agent-based config (has _instructions vs messages)
     is_agent_config = "_instructions" in config or config.get("_enabled", False)
+
+    # Response cache is opt-in (RESPONSE_CACHE); a config opts out with custom response_cache=false
+    custom = config.get("_custom") or model_config.get("custom") or {}
+    cache_responses = response_cache_enabled() and str(custom.get("response_cache", True)).lower() != "false"
+
+    # Hedging is opt-in (LLM_HEDGING); a config opts out with custom hedge=false
+    hedge_model = None
+    hedge_policy = None
+    if hedging_enabled() and str(custom.get("hedge", True)).lower() != "false":
+        hedge_model = _create_llm_for_provider(
+            provider,
+            custom.get("hedge_model") or model_name,
+            temperature,
+            max_tokens,
+            region=custom.get("hedge_region") or os.getenv("HEDGE_REGION") or None,
+        )
+        hedge_policy = get_hedge_policy(config_key, custom.get("hedge_percentile"))
     
     # Pass ld_context to ModelInvoker for ld.variation() correlation
     return ModelInvoker(
@@ -195,17 +339,25 @@ def get_model_invoker(
         config_key=config_key,
         is_agent_config=is_agent_config,
         user_context=ld_context,
-        skip_span_annotation=skip_span_annotation
-    ), config
+        skip_span_annotation=skip_span_annotation,
+        cache_responses=cache_responses,
+        hedge_model=hedge_model,
+        hedge_policy=hedge_policy
+    )
 
 
 def _create_llm_for_provider(
     provider: str, 
     model_name: str, 
     temperature: float, 
-    max_tokens: int
+    max_tokens: int,
+    region: Optional[str] = None,
 ) -> BaseChatModel:
-    """Create LLM instance for the specified provider.
+    """Get the shared LLM instance for a provider, model and parameters.
+
+    Instances come from the process-wide LLMPool, so repeated requests reuse
+    the same client and its warm connections. Callers must not mutate the
+    returned model; pass per-call options as invoke() keyword arguments.
 
     Args:
         provider: Provider name (bedrock, openai, anthropic, etc.)
@@ -213,6 +365,7 @@ def _create_llm_for_provider(
         model_name: Model name or Bedrock model ID (e.g., "us.anthropic.claude-sonnet-4-20250514-v1:0")
         temperature: Sampling temperature
         max_tokens: Maximum tokens to generate
+        region: AWS region for Bedrock models (default: AWS_REGION env var)
 
     Returns:
         Configured LLM instance
@@ -222,7 +375,25 @@ def _create_llm_for_provider(
     """
     # Normalize provider name - handle formats like "Bedrock:Anthropic" from LaunchDarkly
     provider_normalized = provider.split(':')[0].lower() if ':' in provider else provider.lower()
-    
+    if provider_normalized == "bedrock":
+        region = region or os.getenv("AWS_REGION", "us-east-1")
+    else:
+        region = None
+    key = (provider_normalized, model_name, temperature, max_tokens, region)
+    return get_llm_pool().get(
+        key, lambda: _build_llm_for_provider(provider, provider_normalized, model_name, temperature, max_tokens, region)
+    )
+
+
+def _build_llm_for_provider(
+    provider: str,
+    provider_normalized: str,
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    region: Optional[str] = None,
+) -> BaseChatModel:
+    """Construct a new LLM instance (called by the pool on a miss)."""
     if provider_normalized == "bedrock":
         from .bedrock_llm import BedrockConverseLLM, get_bedrock_model_id
 
@@ -230,7 +401,7 @@ def _create_llm_for_provider(
         model_id = get_bedrock_model_id(model_name)
 
         # Get AWS configuration
-        region = os.getenv("AWS_REGION", "us-east-1")
+        region = region or os.getenv("AWS_REGION", "us-east-1")
         profile = os.getenv("AWS_PROFILE")
 
         return BedrockConverseLLM(
@@ -0,0 +1,222 @@
+"""Batched, off-hot-path emission of LaunchDarkly metric events.
+
+Request threads used to build a LaunchDarkly ``Context`` and call
+``ldclient.get().track(...)`` inline for every cost, duration and judgment
+metric, plus a ``variation`` call per model invocation for trace correlation.
+Now they only append the event to a bounded queue. A single background
+worker drains it in batches, builds (and caches) one ``Context`` per user, and
+makes the SDK calls.
+
+When the queue is full, the overflow policy (LD_METRICS_OVERFLOW) decides
+which event is dropped: ``drop_newest`` rejects the new event, ``drop_oldest``
+evicts the oldest queued one. Drops and queue depth are reported by
+``get_metrics_emitter_stats``. ``flush`` waits for queued events (called on
+client close and at interpreter exit). With LD_METRICS_EMITTER=false events
+are sent inline as before.
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Optional
+
+import ldclient
+from ldclient import Context
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest")
+
+
+def metrics_emitter_enabled() -> bool:
+    """Whether metric events are queued for the background worker (LD_METRICS_EMITTER, default true)."""
+    return os.getenv("LD_METRICS_EMITTER", "true").lower() in ("1", "true", "yes")
+
+
+class MetricsEmitter:
+    """Bounded queue of LaunchDarkly track/variation calls, dispatched in batches by one worker thread."""
+
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 100,
+        flush_interval_s: float = 0.5,
+        overflow: str = "drop_newest",
+        max_contexts: int = 10000,
+    ):
+        """
+        Args:
+            max_queue: Events kept before the overflow policy applies
+            batch_size: Events dispatched per worker wake-up
+            flush_interval_s: Longest an event waits for a batch to fill
+            overflow: "drop_newest" or "drop_oldest"
+            max_contexts: Per-user Contexts kept (LRU)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"LD_METRICS_OVERFLOW must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.overflow = overflow
+        self.max_contexts = max_contexts
+        self._queue: deque[tuple] = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._worker: Optional[threading.Thread] = None
+        self._contexts: OrderedDict[tuple, Context] = OrderedDict()
+        self._stats = {
+            "enqueued": 0,
+            "dispatched": 0,
+            "dropped": 0,
+            "errors": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "context_cache_hits": 0,
+        }
+
+    def track(
+        self,
+        event_name: str,
+        context: Any,
+        metric_value: Optional[float] = None,
+        data: Optional[Any] = None,
+    ) -> None:
+        """Queue an ``ldclient.track`` call.
+
+        Args:
+            event_name: Metric event key
+            context: LaunchDarkly Context, or a user context dict (user_key, name)
+            metric_value: Numeric metric value
+            data: Optional event data
+        """
+        self._emit(("track", event_name, context, metric_value, data))
+
+    def variation(self, flag_key: str, context: Any, default: Any = None) -> None:
+        """Queue an ``ldclient.variation`` call whose result is not needed (trace correlation)."""
+        self._emit(("variation", flag_key, context, default, None))
+
+    def _emit(self, event: tuple) -> None:
+        if not metrics_emitter_enabled():
+            self._dispatch(event)
+            return
+        with self._condition:
+            if len(self._queue) >= self.max_queue:
+                self._stats["dropped"] += 1
+                if self.overflow == "drop_newest":
+                    return
+                self._queue.popleft()
+            self._queue.append(event)
+            self._stats["enqueued"] += 1
+            if len(self._queue) > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = len(self._queue)
+            if self._worker is None:
+                self._start_worker()
+            elif len(self._queue) == self.batch_size:
+                # A full batch is ready: wake the worker instead of waiting for the flush interval
+                self._condition.notify()
+
+    def _start_worker(self) -> None:
+        self._worker = threading.Thread(target=self._run, name="ld-metrics-emitter", daemon=True)
+        self._worker.start()
+        atexit.register(self.flush, 2.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if len(self._queue) < self.batch_size:
+                    self._condition.wait(self.flush_interval_s)
+                if not self._queue:
+                    continue
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+            for event in batch:
+                self._dispatch(event)
+            with self._condition:
+                self._in_flight = 0
+                self._stats["batches"] += 1
+                self._condition.notify_all()
+
+    def _dispatch(self, event: tuple) -> None:
+        kind, key, context, value, data = event
+        try:
+            ld_context = self._context(context)
+            client = ldclient.get()
+            if kind == "track":
+                client.track(event_name=key, context=ld_context, data=data, metric_value=value)
+            else:
+                client.variation(key, ld_context, value)
+            with self._condition:
+                self._stats["dispatched"] += 1
+        except Exception as e:
+            with self._condition:
+                self._stats["errors"] += 1
+            print(f"⚠️  Failed to send LaunchDarkly {kind} event '{key}': {e}")
+
+    def _context(self, context: Any) -> Context:
+        """LaunchDarkly Context for an event (user context dicts share one cached Context per user)."""
+        if isinstance(context, Context):
+            return context
+        context = context or {}
+        cache_key = (context.get("user_key", "anonymous"), context.get("name"))
+        with self._condition:
+            cached = self._contexts.get(cache_key)
+            if cached is not None:
+                self._contexts.move_to_end(cache_key)
+                self._stats["context_cache_hits"] += 1
+                return cached
+        builder = Context.builder(cache_key[0]).kind("user")
+        if cache_key[1]:
+            builder.set("name", cache_key[1])
+        ld_context = builder.build()
+        with self._condition:
+            self._contexts[cache_key] = ld_context
+            while len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+        return ld_context
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until queued events are dispatched.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue drained in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._queue or self._in_flight:
+                if self._worker is None:
+                    return False
+                self._condition.notify()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining if remaining is None else min(remaining, 0.05))
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, overflow policy and enqueued/dispatched/dropped counters."""
+        with self._condition:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._queue) + self._in_flight
+        stats["max_queue"] = self.max_queue
+        stats["overflow"] = self.overflow
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_metrics_emitter() -> MetricsEmitter:
+    """Process-wide metrics emitter (LD_METRICS_* env vars)."""
+    return MetricsEmitter(
+        max_queue=int(os.getenv("LD_METRICS_MAX_QUEUE", "10000")),
+        batch_size=int(os.getenv("LD_METRICS_BATCH_SIZE", "100")),
+        flush_interval_s=float(os.getenv("LD_METRICS_FLUSH_INTERVAL_S", "0.5")),
+        overflow=os.getenv("LD_METRICS_OVERFLOW", "drop_newest"),
+    )
+
+
+def get_metrics_emitter_stats() -> dict[str, Any]:
+    """Stats of the process-wide metrics emitter."""
+    return get_metrics_emitter().stats()
@@ -23,6 +23,9 @@ logger = logging.getLogger(__name__)
 # Track if observability has been initialized
 _observability_initialized = False
 
+# Flag data store of the SDK client configured here (read by the AI Config cache)
+_feature_store = None
+
 
 class EndedSpanFilter(logging.Filter):
     """Filter to suppress 'ended span' warnings from OpenTelemetry.
@@ -58,7 +61,7 @@ def initialize_observability(
     Returns:
         True if successfully initialized, False otherwise
     """
-    global _observability_initialized
+    global _observability_initialized, _feature_store
     
     if _observability_initialized:
         logger.info("✅ Observability already initialized")
@@ -81,6 +84,7 @@ def initialize_observability(
         try:
             import ldclient
             from ldclient.config import Config
+            from ldclient.feature_store import InMemoryFeatureStore
             from ldobserve import ObservabilityConfig, ObservabilityPlugin
             
         except ImportError as e:
@@ -96,8 +100,11 @@ def initialize_observability(
                 environment=environment,  # CRITICAL: Must match LaunchDarkly environment
             )
             
+            # An explicit in-memory store (the SDK default) so flag data can be read through the FeatureStore API
+            feature_store = InMemoryFeatureStore()
             config = Config(
                 sdk_key,
+                feature_store=feature_store,
                 plugins=[
                     ObservabilityPlugin(obs_config)
                 ]
@@ -105,6 +112,7 @@ def initialize_observability(
             
             # Initialize LaunchDarkly client
             ldclient.set_config(config)
+            _feature_store = feature_store
             
             # Wait for initialization
             import time
@@ -191,3 +199,8 @@ def initialize_observability(
 def is_observability_enabled() -> bool:
     """Check if observability has been successfully initialized."""
     return _observability_initialized
+
+
+def get_feature_store():
+    """Flag data store of the LaunchDarkly client configured by ``initialize_observability`` (None if it did not configure one)."""
+    return _feature_store
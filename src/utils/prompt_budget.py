@@ -0,0 +1,164 @@
+"""Token-budgeted prompt assembly for the RAG specialists.
+
+The specialists used to send every retrieved document plus a JSON dump of the
+whole user profile (~50 fields). ``assemble_prompt`` counts tokens locally and
+fills a per-node budget in priority order:
+
+1. instructions, the query and conversation history (always kept)
+2. retrieved documents, highest relevance first (the last one may be trimmed)
+3. the context keys the node needs, in the node's priority order
+
+Everything that does not fit is dropped and logged, so input tokens (and TTFT)
+stay bounded. The budget comes from the AI Config custom parameter
+``prompt_budget_tokens`` or PROMPT_BUDGET_TOKENS (default 6000; 0 disables).
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
+
+from opentelemetry import trace
+
+# A partially kept document must have at least this many tokens left
+_MIN_DOCUMENT_TOKENS = 64
+
+# Header line added to each document ("[Document n - Relevance: x]")
+_DOCUMENT_OVERHEAD_TOKENS = 12
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> Any:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Local token count (tiktoken cl100k when installed, else ~4 characters per token)."""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def prompt_budget_tokens(ld_config: dict[str, Any]) -> int:
+    """Input token budget for a node (custom prompt_budget_tokens, else PROMPT_BUDGET_TOKENS)."""
+    custom = ld_config.get("_custom") or ld_config.get("model", {}).get("custom") or {}
+    value = custom.get("prompt_budget_tokens")
+    if value is None:
+        value = os.getenv("PROMPT_BUDGET_TOKENS", "6000")
+    return int(value)
+
+
+def prompt_template_text(ld_config: dict[str, Any]) -> str:
+    """Instruction text of an AI Config (agent instructions or completion messages)."""
+    if "_instructions" in ld_config:
+        return ld_config.get("_instructions") or ""
+    return "\n".join(message.get("content", "") for message in ld_config.get("messages", []))
+
+
+@dataclass
+class AssembledPrompt:
+    """What fits in a node's prompt budget."""
+
+    budget_tokens: int
+    tokens: int = 0
+    documents: list[dict[str, Any]] = field(default_factory=list)
+    context_keys: Optional[list[str]] = None
+    dropped_documents: int = 0
+    trimmed_documents: int = 0
+    dropped_context_keys: list[str] = field(default_factory=list)
+
+
+def assemble_prompt(
+    budget_tokens: int,
+    required: list[str],
+    documents: list[dict[str, Any]],
+    context: dict[str, Any],
+    context_keys: list[str],
+) -> AssembledPrompt:
+    """Choose the documents and context keys that fit in the budget.
+
+    Args:
+        budget_tokens: Input token budget (0 or less keeps everything)
+        required: Texts that are always sent (instructions, query, history)
+        documents: Retrieved documents with "content" and "score"
+        context: User context available to the prompt
+        context_keys: Context keys the node needs, most important first
+
+    Returns:
+        AssembledPrompt with the kept documents (highest score first, possibly
+        one trimmed) and context keys; context_keys is None when unbudgeted
+    """
+    if budget_tokens <= 0:
+        return AssembledPrompt(budget_tokens=0, documents=list(documents))
+
+    assembled = AssembledPrompt(budget_tokens=budget_tokens)
+    used = sum(count_tokens(text) for text in required)
+
+    ranked = sorted(documents, key=lambda doc: doc.get("score", 0.0), reverse=True)
+    for doc in ranked:
+        remaining = budget_tokens - used - _DOCUMENT_OVERHEAD_TOKENS
+        cost = count_tokens(doc.get("content", ""))
+        if cost <= remaining:
+            assembled.documents.append(doc)
+            used += cost + _DOCUMENT_OVERHEAD_TOKENS
+        elif remaining >= _MIN_DOCUMENT_TOKENS and not assembled.trimmed_documents:
+            assembled.documents.append({**doc, "content": _truncate(doc.get("content", ""), remaining)})
+            assembled.trimmed_documents += 1
+            used += remaining + _DOCUMENT_OVERHEAD_TOKENS
+        else:
+            assembled.dropped_documents += 1
+
+    assembled.context_keys = []
+    for key in context_keys:
+        if context.get(key) in (None, "", [], {}):
+            continue
+        cost = count_tokens(f'"{key}": {json.dumps(context[key], default=str)},\n')
+        if used + cost <= budget_tokens:
+            assembled.context_keys.append(key)
+            used += cost
+        else:
+            assembled.dropped_context_keys.append(key)
+    assembled.dropped_context_keys += [key for key in context if key not in context_keys]
+
+    assembled.tokens = used
+    return assembled
+
+
+def record_prompt_budget(assembled: AssembledPrompt, node: str) -> None:
+    """Log what was dropped and set ``prompt.*`` attributes on the current span."""
+    if not assembled.budget_tokens:
+        return
+    span = trace.get_current_span()
+    if span and span.is_recording():
+        span.set_attribute("prompt.budget_tokens", assembled.budget_tokens)
+        span.set_attribute("prompt.tokens", assembled.tokens)
+        span.set_attribute("prompt.documents_kept", len(assembled.documents))
+        span.set_attribute("prompt.documents_dropped", assembled.dropped_documents)
+        span.set_attribute("prompt.documents_trimmed", assembled.trimmed_documents)
+        span.set_attribute("prompt.context_keys_dropped", len(assembled.dropped_context_keys))
+
+    print(
+        f"  ✂️  {node} prompt: ~{assembled.tokens}/{assembled.budget_tokens} tokens, "
+        f"{len(assembled.documents)} documents kept"
+        + (f" ({assembled.trimmed_documents} trimmed)" if assembled.trimmed_documents else "")
+        + (f", {assembled.dropped_documents} dropped" if assembled.dropped_documents else "")
+        + f", {len(assembled.context_keys or [])} context keys kept"
+    )
+    if assembled.dropped_context_keys:
+        print(f"      Dropped context keys: {', '.join(assembled.dropped_context_keys)}")
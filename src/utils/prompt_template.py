@@ -0,0 +1,63 @@
+"""Compiled prompt templates for AI Config instructions and messages.
+
+AI Config prompts use ``{{variable}}`` and ``{{ldctx.variable}}`` placeholders,
+filled from the request's context variables. Instead of scanning the whole
+prompt once per context variable, a template is tokenized once into literal
+text and variable slots, and every request renders it in a single pass.
+
+Compiled templates are cached by their text, so each variation of a config is
+tokenized once (a new variation, or instructions rendered differently for a
+context, is simply a new entry). Unknown placeholders are kept as written.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any
+
+_VARIABLE = re.compile(r"\{\{(ldctx\.)?(\w+)\}\}")
+_MISSING = object()
+
+
+class CompiledTemplate:
+    """A prompt template split into literal text and variable slots."""
+
+    __slots__ = ("source", "static_prefix_length", "_literals", "_slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        # Text before the first {{ (the cacheable static prefix of a system prompt)
+        index = source.find("{{")
+        self.static_prefix_length = len(source) if index < 0 else index
+
+        literals = []
+        slots = []
+        position = 0
+        for match in _VARIABLE.finditer(source):
+            literals.append(source[position:match.start()])
+            slots.append((match.group(2), match.group(0)))
+            position = match.end()
+        literals.append(source[position:])
+        self._literals = tuple(literals)
+        self._slots = tuple(slots)
+
+    def render(self, variables: dict[str, Any]) -> str:
+        """Fill the template's placeholders from ``variables`` in one pass."""
+        if not self._slots:
+            return self.source
+        parts = [self._literals[0]]
+        for (name, placeholder), literal in zip(self._slots, self._literals[1:]):
+            value = variables.get(name, _MISSING)
+            parts.append(placeholder if value is _MISSING else str(value))
+            parts.append(literal)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def compile_template(template: str) -> CompiledTemplate:
+    """Compiled form of a prompt template (cached by template text)."""
+    return CompiledTemplate(template)
+
+
+def render_template(template: str, variables: dict[str, Any]) -> str:
+    """Render a prompt template with context variables."""
+    return compile_template(template or "").render(variables)
@@ -0,0 +1,189 @@
+"""Exact-match model response cache (opt-in).
+
+Synthetic traffic and the test suites replay the same questions against the
+same plans, so identical model requests are common. When RESPONSE_CACHE is
+enabled, ModelInvoker.invoke/ainvoke look responses up by a hash of the model,
+its inference parameters and the rendered messages before calling the model.
+
+Two tiers:
+- an in-memory LRU with a TTL (per process)
+- an optional SQLite file (RESPONSE_CACHE_DB) shared by every process on the host
+
+A LaunchDarkly AI Config opts out with the custom parameter
+``response_cache`` = ``false``.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+# Per-call arguments that do not change the model output
+_IGNORED_CALL_KWARGS = {"timeout"}
+
+
+def response_cache_enabled() -> bool:
+    """Whether the response cache is on (RESPONSE_CACHE env var, default false)."""
+    return os.getenv("RESPONSE_CACHE", "false").lower() in ("1", "true", "yes")
+
+
+def response_cache_key(model: Any, messages: list[BaseMessage], call_kwargs: dict[str, Any]) -> str:
+    """Hash of everything that determines a model response.
+
+    Args:
+        model: The LangChain chat model
+        messages: Rendered messages sent to the model
+        call_kwargs: Per-call model arguments (timeouts are ignored)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    try:
+        params = dict(model._identifying_params)
+    except Exception:
+        params = {}
+    payload = {
+        "model_class": type(model).__name__,
+        "params": params,
+        "messages": [(message.type, message.content) for message in messages],
+        "call": {k: v for k, v in call_kwargs.items() if k not in _IGNORED_CALL_KWARGS},
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _serialize(message: Any) -> Optional[str]:
+    if not isinstance(message, AIMessage) or not isinstance(message.content, str):
+        return None
+    return json.dumps(
+        {
+            "content": message.content,
+            "response_metadata": message.response_metadata or {},
+            "usage_metadata": dict(message.usage_metadata) if message.usage_metadata else None,
+        },
+        default=str,
+    )
+
+
+def _deserialize(value: str) -> AIMessage:
+    data = json.loads(value)
+    # No model call was made: report zero usage, keep the original for reference
+    response_metadata = {
+        **data.get("response_metadata", {}),
+        "cache_hit": True,
+        "cached_usage": data.get("usage_metadata"),
+    }
+    response_metadata.pop("ttft_ms", None)
+    return AIMessage(
+        content=data["content"],
+        response_metadata=response_metadata,
+        usage_metadata={"input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
+    )
+
+
+class ResponseCache:
+    """In-memory LRU with TTL, backed by an optional SQLite file."""
+
+    def __init__(self, max_entries: int = 1000, ttl_s: float = 3600, db_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Responses kept in memory
+            ttl_s: Seconds a cached response stays valid
+            db_path: SQLite file shared across processes (None: memory only)
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.db_path = db_path
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "bytes_saved": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[AIMessage]:
+        """Cached response for a key, or None."""
+        now = time.time()
+        value = None
+        tier = None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    value, tier = entry[1], "memory_hits"
+                else:
+                    del self._memory[key]
+            if value is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    value, tier = row[0], "disk_hits"
+                    self._remember(key, row[1], value)
+
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats[tier] += 1
+            self._stats["bytes_saved"] += len(value.encode("utf-8"))
+        return _deserialize(value)
+
+    def put(self, key: str, response: Any) -> None:
+        """Store a model response (non-text responses are not cached)."""
+        value = _serialize(response)
+        if value is None:
+            return
+        expires_at = time.time() + self.ttl_s
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._stats["stores"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters, hit rate and bytes of responses served from the cache."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache (RESPONSE_CACHE_* env vars)."""
+    return ResponseCache(
+        max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+        ttl_s=float(os.getenv("RESPONSE_CACHE_TTL_S", "3600")),
+        db_path=os.getenv("RESPONSE_CACHE_DB") or None,
+    )
@@ -54,6 +54,7 @@ from src.utils.observability import initialize_observability
 initialize_observability(environment=os.getenv("LAUNCHDARKLY_ENVIRONMENT", "production"))
 
 # Import workflow and utilities
+from src.graph.state import get_rag_documents
 from src.graph.workflow import run_workflow
 from src.utils.user_profile import create_user_profile
 from src.evaluation.agent_evaluator import evaluate_agent_accuracy
@@ -151,7 +152,7 @@ class AgentEvaluationRunner:
             # Extract agent metrics
             target_agent_data = agent_data[specialist_key]
             agent_output = target_agent_data.get("response", "")
-            rag_documents = target_agent_data.get("rag_documents", [])
+            rag_documents = get_rag_documents(result, specialist_key)
             
             # Extract cost metrics (no jitter - actual metrics)
             duration_ms = target_agent_data.get("duration_ms", 0)
@@ -204,7 +205,8 @@ class AgentEvaluationRunner:
                 original_query=question_text,
                 rag_documents=rag_documents,
                 agent_output=agent_output,
-                user_context=user_context
+                user_context=user_context,
+                config_context=result.get("config_context"),
             )
             
             passed_str = "✅ PASS" if eval_result['passed'] else "❌ FAIL"
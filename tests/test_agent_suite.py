@@ -54,6 +54,7 @@ from src.utils.observability import initialize_observability
 initialize_observability(environment=os.getenv("LAUNCHDARKLY_ENVIRONMENT", "production"))
 
 # Import workflow and utilities (SAME as backend server)
+from src.graph.state import get_rag_documents
 from src.graph.workflow import run_workflow
 from src.utils.user_profile import create_user_profile
 import ldclient
@@ -223,7 +224,7 @@ class AgentTestRunner:
                 
                 target_agent_data = agent_data[target_key]
                 agent_output = target_agent_data.get("response", "")
-                rag_documents = target_agent_data.get("rag_documents", [])
+                rag_documents = get_rag_documents(result, target_key)
                 
                 # Extract cost metrics (no jitter - actual metrics)
                 agent_duration_ms = target_agent_data.get("duration_ms", 0)
@@ -277,11 +278,7 @@ class AgentTestRunner:
                         specialist_response = agent_data["scheduler_specialist"].get("response", "")
                     
                     # Get RAG documents from specialist for accuracy evaluation
-                    rag_documents = []
-                    if "policy_specialist" in agent_data:
-                        rag_documents = agent_data["policy_specialist"].get("rag_documents", [])
-                    elif "provider_specialist" in agent_data:
-                        rag_documents = agent_data["provider_specialist"].get("rag_documents", [])
+                    rag_documents = get_rag_documents(result)
                     
                     # Run brand voice evaluation (both accuracy and coherence)
                     from src.evaluation.judge import BrandVoiceEvaluator
@@ -386,7 +383,8 @@ class AgentTestRunner:
                     original_query=question_text,
                     rag_documents=rag_documents,
                     agent_output=agent_output,
-                    user_context=user_context
+                    user_context=user_context,
+                    config_context=result.get("config_context"),
                 )
                 
                 print(f"   📊 Agent Accuracy: {eval_result['score']:.2f} {'✅ PASS' if eval_result['passed'] else '❌ FAIL'}")
@@ -30,6 +30,7 @@ from src.utils.observability import initialize_observability
 initialize_observability(environment=os.getenv("LAUNCHDARKLY_ENVIRONMENT", "production"))
 
 # Import workflow
+from src.graph.state import get_rag_documents
 from src.graph.workflow import run_workflow
 from src.utils.user_profile import create_user_profile
 from src.evaluation.agent_evaluator import evaluate_agent_accuracy
@@ -81,7 +82,7 @@ async def test_agent(agent_name: str, question: str):
         # Extract metrics
         target_agent_data = agent_data[target_key]
         agent_output = target_agent_data.get("response", "")
-        rag_documents = target_agent_data.get("rag_documents", [])
+        rag_documents = get_rag_documents(result, target_key)
         
         # Extract cost metrics (no jitter - actual metrics)
         duration_ms = target_agent_data.get("duration_ms", 0)
@@ -110,7 +111,8 @@ async def test_agent(agent_name: str, question: str):
             original_query=question,
             rag_documents=rag_documents,
             agent_output=agent_output,
-            user_context=user_context
+            user_context=user_context,
+            config_context=result.get("config_context"),
         )
         
         passed = "✅ PASS" if eval_result['passed'] else "❌ FAIL"
@@ -0,0 +1,9 @@
+"""Shared setup for the offline unit tests (no LaunchDarkly or AWS credentials needed)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# src.graph must be imported before src.agents (the packages import each other)
+import src.graph  # noqa: F401
@@ -0,0 +1,193 @@
+"""Unit tests for the resolved AI Config cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import ai_config_cache
+from src.utils.ai_config_cache import AIConfigCache, cache_key_attributes
+
+
+def _flag(**fields) -> dict:
+    flag = {"key": "policy_agent", "variations": [{"instructions": "Answer policy questions."}], "fallthrough": {"variation": 0}}
+    flag.update(fields)
+    return flag
+
+
+def _attributes(flag, flags=None, segments=None):
+    flags = flags or {}
+    segments = segments or {}
+    return cache_key_attributes(flag, flags.get, segments.get)
+
+
+def _clause(attribute, op="in", values=("x",)):
+    return {"attribute": attribute, "op": op, "values": list(values)}
+
+
+def test_untargeted_flag_depends_on_nothing():
+    assert _attributes(_flag()) == ()
+
+
+def test_rule_clauses_targets_and_rollouts():
+    flag = _flag(
+        targets=[{"variation": 0, "values": ["user-1"]}],
+        rules=[
+            {"clauses": [_clause("coverage_type"), _clause("kind", values=["user"])], "variation": 0},
+            {"clauses": [_clause("/address/state")], "rollout": {"bucketBy": "policy_id", "variations": []}},
+        ],
+        fallthrough={"rollout": {"variations": []}},
+    )
+
+    assert _attributes(flag) == ("address", "coverage_type", "policy_id", "user_key")
+
+
+def test_segments_and_prerequisites_are_followed():
+    segments = {
+        "gold": {"rules": [{"clauses": [_clause("tier"), _clause(None, op="segmentMatch", values=["vip"])]}]},
+        "vip": {"included": ["user-9"]},
+    }
+    flags = {"plan_gate": _flag(key="plan_gate", rules=[{"clauses": [_clause("location")]}])}
+    flag = _flag(
+        rules=[{"clauses": [_clause(None, op="segmentMatch", values=["gold"])]}],
+        prerequisites=[{"key": "plan_gate", "variation": 0}],
+    )
+
+    assert _attributes(flag, flags, segments) == ("location", "tier", "user_key")
+
+
+@pytest.mark.parametrize(
+    "flag, flags, segments",
+    [
+        (None, {}, {}),
+        (_flag(rules=[{"clauses": [_clause(None, op="segmentMatch", values=["big"])]}]), {}, {"big": {"unbounded": True}}),
+        (_flag(rules=[{"clauses": [_clause(None, op="segmentMatch", values=["unknown"])]}]), {}, {}),
+        (_flag(prerequisites=[{"key": "missing"}]), {}, {}),
+        (_flag(variations=[{"instructions": "Profile: {{ldctx}}"}]), {}, {}),
+        (_flag(variations=[{"instructions": "{{>shared_partial}}"}]), {}, {}),
+    ],
+    ids=["unknown flag", "big segment", "unknown segment", "unknown prerequisite", "whole context", "partial"],
+)
+def test_uncacheable_flags(flag, flags, segments):
+    assert _attributes(flag, flags, segments) is None
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"trackEvents": True},
+        {"trackEventsFallthrough": True},
+        {"rules": [{"clauses": [_clause("tier")], "trackEvents": True}]},
+        {"fallthrough": {"rollout": {"kind": "experiment", "variations": []}}},
+    ],
+    ids=["trackEvents", "trackEventsFallthrough", "tracked rule", "experiment"],
+)
+def test_flags_with_tracked_evaluations_are_never_cached(fields):
+    assert _attributes(_flag(**fields)) is None
+
+
+def test_tracked_prerequisite_is_never_cached():
+    flags = {"gate": _flag(key="gate", trackEvents=True)}
+    assert _attributes(_flag(prerequisites=[{"key": "gate"}]), flags) is None
+
+
+def test_template_variables():
+    flag = _flag(
+        variations=[
+            {"instructions": "Hi {{ldctx.name}} ({{ ldctx.key }}). {{#history}}{{conversation_history}}{{/history}}"},
+            {"messages": [{"role": "system", "content": "{{{query}}} {{&plan.name}} {{! a comment }}"}]},
+        ]
+    )
+
+    assert _attributes(flag) == ("conversation_history", "history", "name", "plan", "query", "user_key")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [50.0]
+    monkeypatch.setattr(ai_config_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _key(cache, context, flag=None, calls=None):
+    def flag_data():
+        if calls is not None:
+            calls.append(1)
+        return flag if flag is not None else _flag(rules=[{"clauses": [_clause("coverage_type")]}])
+
+    return cache.key_for("policy_agent", context, flag_data, {}.get, {}.get)
+
+
+def test_key_uses_only_the_attributes_the_flag_reads():
+    cache = AIConfigCache()
+    calls = []
+    key = _key(cache, {"user_key": "a", "coverage_type": "HMO", "name": "A"}, calls=calls)
+
+    assert key == _key(cache, {"user_key": "b", "coverage_type": "HMO", "name": "B"}, calls=calls)
+    assert key != _key(cache, {"user_key": "a", "coverage_type": "PPO"}, calls=calls)
+    # Flag data is read once, then the derived attributes are reused
+    assert len(calls) == 1
+
+
+def test_missing_flag_is_looked_up_again():
+    cache = AIConfigCache()
+    calls = []
+    assert cache.key_for("new_agent", {}, lambda: calls.append(1), {}.get, {}.get) is None
+    assert cache.key_for("new_agent", {}, lambda: calls.append(1), {}.get, {}.get) is None
+    assert len(calls) == 2
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = AIConfigCache(ttl_s=30)
+    key = _key(cache, {"coverage_type": "HMO"})
+    cache.put(key, cache.generation("policy_agent"), {"model": {"name": "m"}}, ("v1",))
+
+    clock[0] += 29
+    assert cache.get(key) == ({"model": {"name": "m"}}, ("v1",))
+    clock[0] += 1
+    assert cache.get(key) is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = AIConfigCache(max_entries=2)
+    keys = [_key(cache, {"coverage_type": plan}) for plan in ("HMO", "PPO", "EPO")]
+    cache.put(keys[0], 0, {"plan": 0}, ())
+    cache.put(keys[1], 0, {"plan": 1}, ())
+    cache.get(keys[0])
+    cache.put(keys[2], 0, {"plan": 2}, ())
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+
+
+def test_invalidation_drops_entries_and_rederives_attributes(clock):
+    cache = AIConfigCache()
+    key = _key(cache, {"coverage_type": "HMO", "tier": "gold"})
+    cache.put(key, cache.generation("policy_agent"), {"v": 1}, ())
+
+    cache.invalidate("policy_agent")
+
+    assert cache.get(key) is None
+    retargeted = _flag(rules=[{"clauses": [_clause("tier")]}])
+    assert _key(cache, {"coverage_type": "HMO", "tier": "gold"}, flag=retargeted) == ("policy_agent", ("gold",))
+
+
+def test_put_after_a_concurrent_change_is_dropped(clock):
+    cache = AIConfigCache()
+    key = _key(cache, {"coverage_type": "HMO"})
+    generation = cache.generation("policy_agent")
+    # The flag changes while the lookup is evaluating it
+    cache.invalidate("policy_agent")
+    cache.put(key, generation, {"stale": True}, ())
+
+    assert cache.get(key) is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_clear_drops_everything(clock):
+    cache = AIConfigCache()
+    key = _key(cache, {"coverage_type": "HMO"})
+    generation = cache.generation("policy_agent")
+    cache.clear()
+    cache.put(key, generation, {"v": 1}, ())
+
+    assert cache.get(key) is None
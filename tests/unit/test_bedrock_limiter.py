@@ -0,0 +1,187 @@
+"""Unit tests for the Bedrock concurrency limiter and circuit breaker."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.utils import bedrock_limiter
+from src.utils.bedrock_limiter import BedrockCircuitOpen, BedrockGuard, BedrockOverloaded
+
+
+def _client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": "test"}}, "Converse")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the breaker cooldown."""
+    now = [100.0]
+    monkeypatch.setattr(bedrock_limiter, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def make_guard(monkeypatch):
+    def make(initial=4, max_queue=10, queue_timeout_s=0.05, failures=3, cooldown_s=10):
+        monkeypatch.setenv("BEDROCK_LIMIT_INITIAL", str(initial))
+        monkeypatch.setenv("BEDROCK_MAX_QUEUE", str(max_queue))
+        monkeypatch.setenv("BEDROCK_QUEUE_TIMEOUT_S", str(queue_timeout_s))
+        monkeypatch.setenv("BEDROCK_BREAKER_FAILURES", str(failures))
+        monkeypatch.setenv("BEDROCK_BREAKER_COOLDOWN_S", str(cooldown_s))
+        return BedrockGuard("test-model")
+
+    return make
+
+
+def _wait_until_queued(guard: BedrockGuard) -> None:
+    deadline = time.monotonic() + 2
+    while guard.stats()["queue_depth"] == 0:
+        assert time.monotonic() < deadline, "call was never queued"
+        time.sleep(0.001)
+
+
+def _finish(guard: BedrockGuard, outcome: str, calls: int = 1) -> None:
+    for _ in range(calls):
+        guard.acquire()
+        guard.release(outcome)
+
+
+def test_limit_grows_additively_on_success(make_guard):
+    guard = make_guard(initial=2)
+    _finish(guard, "success", calls=2)
+    assert guard.stats()["limit"] == 2
+    _finish(guard, "success")
+    assert guard.stats()["limit"] == 3
+
+
+def test_limit_halves_on_throttling_down_to_one(make_guard):
+    guard = make_guard(initial=16, failures=100)
+    _finish(guard, "throttled")
+    assert guard.stats()["limit"] == 8
+    _finish(guard, "throttled", calls=5)
+    assert guard.stats()["limit"] == 1
+    assert guard.stats()["throttled"] == 6
+
+
+def test_client_errors_do_not_change_the_limit(make_guard):
+    guard = make_guard(initial=4, failures=1)
+    _finish(guard, "error", calls=3)
+    stats = guard.stats()
+    assert (stats["limit"], stats["breaker_state"], stats["in_flight"]) == (4, "closed", 0)
+
+
+def test_calls_over_the_limit_wait_for_a_slot(make_guard):
+    guard = make_guard(initial=1, queue_timeout_s=5)
+    guard.acquire()
+    admitted = threading.Event()
+    waiter = threading.Thread(target=lambda: (guard.acquire(), admitted.set()))
+    waiter.start()
+    _wait_until_queued(guard)
+
+    assert not admitted.is_set()
+    guard.release("success")
+    waiter.join(timeout=1)
+    assert admitted.is_set()
+    assert guard.stats()["in_flight"] == 1
+
+
+def test_wait_timeout_sheds_the_call(make_guard):
+    guard = make_guard(initial=1, queue_timeout_s=0.01)
+    guard.acquire()
+    with pytest.raises(BedrockOverloaded):
+        guard.acquire()
+    stats = guard.stats()
+    assert (stats["shed"], stats["queue_depth"], stats["in_flight"]) == (1, 0, 1)
+
+
+def test_full_queue_sheds_immediately(make_guard):
+    guard = make_guard(initial=1, max_queue=0)
+    guard.acquire()
+    with pytest.raises(BedrockOverloaded, match="queue full"):
+        guard.acquire(timeout=30)
+
+
+def test_breaker_opens_after_consecutive_failures(make_guard, clock):
+    guard = make_guard(failures=3)
+    _finish(guard, "server_error", calls=2)
+    _finish(guard, "success")
+    _finish(guard, "server_error", calls=2)
+    assert guard.stats()["breaker_state"] == "closed"
+
+    _finish(guard, "throttled")
+    assert guard.stats()["breaker_state"] == "open"
+    with pytest.raises(BedrockCircuitOpen):
+        guard.acquire()
+
+
+def test_half_open_probe_closes_the_breaker(make_guard, clock):
+    guard = make_guard(failures=1, cooldown_s=10)
+    _finish(guard, "server_error")
+    clock[0] += 10
+
+    guard.acquire()
+    assert guard.stats()["breaker_state"] == "half_open"
+    with pytest.raises(BedrockCircuitOpen, match="probe in flight"):
+        guard.acquire()
+    guard.release("success")
+    assert guard.stats()["breaker_state"] == "closed"
+
+
+def test_failed_probe_reopens_the_breaker(make_guard, clock):
+    guard = make_guard(failures=5, cooldown_s=10)
+    _finish(guard, "server_error", calls=5)
+    clock[0] += 10
+
+    _finish(guard, "server_error")
+    assert guard.stats()["breaker_state"] == "open"
+    assert guard.stats()["breaker_opens"] == 2
+
+
+def test_opening_the_breaker_rejects_queued_calls(make_guard):
+    guard = make_guard(initial=1, failures=1, queue_timeout_s=5)
+    guard.acquire()
+    errors = []
+
+    def queued_call():
+        try:
+            guard.acquire()
+        except BedrockOverloaded as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=queued_call)
+    waiter.start()
+    _wait_until_queued(guard)
+    guard.release("server_error")
+    waiter.join(timeout=1)
+
+    assert len(errors) == 1 and isinstance(errors[0], BedrockCircuitOpen)
+
+
+def test_async_waiter_gets_the_released_slot(make_guard):
+    guard = make_guard(initial=1, queue_timeout_s=5)
+
+    async def scenario():
+        await guard.aacquire()
+        queued = asyncio.ensure_future(guard.aacquire())
+        await asyncio.sleep(0)
+        assert guard.stats()["queue_depth"] == 1
+        guard.release("success")
+        await asyncio.wait_for(queued, 1)
+
+    asyncio.run(scenario())
+    assert guard.stats()["in_flight"] == 1
+
+
+def test_slot_classifies_errors(make_guard):
+    guard = make_guard(initial=8, failures=100)
+    with pytest.raises(ClientError), guard.slot():
+        raise _client_error("ThrottlingException")
+    assert guard.stats()["limit"] == 4
+
+    assert BedrockGuard.classify(_client_error("ServiceUnavailableException")) == "server_error"
+    assert BedrockGuard.classify(_client_error("ValidationException")) == "error"
+    assert BedrockGuard.classify(GeneratorExit()) == "success"
@@ -0,0 +1,81 @@
+"""Unit tests for async Knowledge Base retrieval (against the local fake backend)."""
+
+import asyncio
+
+import pytest
+
+from src.tools import bedrock_rag
+from src.utils import aws_sso
+
+_LD_CONFIG = {"model": {"custom": {"awskbid": "KB-TEST"}}}
+
+
+@pytest.fixture(autouse=True)
+def fake_bedrock(monkeypatch):
+    monkeypatch.setenv("BEDROCK_FAKE", "true")
+    monkeypatch.setenv("FAKE_BEDROCK_RETRIEVE_MS", "5")
+    monkeypatch.setenv("FAKE_BEDROCK_SPIKE_RATE", "0")
+
+
+@pytest.fixture
+def no_blocking_retrieve(monkeypatch):
+    def retrieve(self, query, retrieval_config=None):
+        raise AssertionError("the blocking boto3 retrieve was called")
+
+    monkeypatch.setattr(bedrock_rag.BedrockKnowledgeBaseRetriever, "retrieve", retrieve)
+
+
+def test_policy_retrieval_is_awaited_on_the_event_loop(no_blocking_retrieve):
+    documents = asyncio.run(bedrock_rag.aretrieve_policy_documents("What is covered?", "POL-1", ld_config=_LD_CONFIG))
+
+    assert len(documents) == 5
+    assert all(doc["content"] for doc in documents)
+    assert documents[0]["location"]["s3Location"]["uri"].startswith("s3://fake-kb/KB-TEST/")
+
+
+def test_many_retrievals_share_one_event_loop(no_blocking_retrieve):
+    async def run_many():
+        return await asyncio.gather(
+            *(
+                bedrock_rag.aretrieve_provider_documents(f"cardiologist {i}", ld_config=_LD_CONFIG, timeout=5)
+                for i in range(100)
+            )
+        )
+
+    results = asyncio.run(run_many())
+
+    assert len(results) == 100
+    assert all(len(documents) == 5 for documents in results)
+
+
+def test_failed_retrieval_returns_no_documents(monkeypatch, no_blocking_retrieve):
+    async def broken(self, query, retrieval_config=None):
+        raise RuntimeError("KB unavailable")
+
+    monkeypatch.setattr(bedrock_rag.BedrockKnowledgeBaseRetriever, "aretrieve", broken)
+
+    assert asyncio.run(bedrock_rag.aretrieve_policy_documents("q", ld_config=_LD_CONFIG)) == []
+
+
+def test_falls_back_to_a_worker_thread_without_aiobotocore(monkeypatch):
+    monkeypatch.setattr(aws_sso, "async_bedrock_available", lambda: False)
+    threaded = []
+    real_to_thread = asyncio.to_thread
+
+    async def to_thread(fn, *args, **kwargs):
+        threaded.append(fn.__name__)
+        return await real_to_thread(fn, *args, **kwargs)
+
+    monkeypatch.setattr(bedrock_rag.asyncio, "to_thread", to_thread)
+
+    documents = asyncio.run(bedrock_rag.aretrieve_provider_documents("q", ld_config=_LD_CONFIG))
+
+    assert threaded == ["retrieve"]
+    assert len(documents) == 5
+
+
+def test_missing_kb_id_still_raises(monkeypatch):
+    monkeypatch.setattr(bedrock_rag, "POLICY_KB_ID", "")
+
+    with pytest.raises(RuntimeError, match="Policy Knowledge Base ID not configured"):
+        asyncio.run(bedrock_rag.aretrieve_policy_documents("q"))
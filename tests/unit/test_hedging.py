@@ -0,0 +1,112 @@
+"""Unit tests for hedged model requests."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.utils.hedging import HedgeOutcome, HedgePolicy, ainvoke_hedged, invoke_hedged
+
+
+class _Model:
+    """Answers after a fixed delay (or raises)."""
+
+    def __init__(self, delay_s: float, result: str = "", error: Exception | None = None):
+        self.delay_s = delay_s
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    def invoke(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.delay_s)
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay_s)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setenv("HEDGE_DEFAULT_DELAY_MS", "50")
+    monkeypatch.setenv("HEDGE_MIN_DELAY_MS", "10")
+    return HedgePolicy("test_agent", percentile=95)
+
+
+def _record(policy: HedgePolicy, latencies_ms) -> None:
+    for latency in latencies_ms:
+        policy.record(latency, HedgeOutcome())
+
+
+def test_default_delay_until_enough_samples(policy):
+    _record(policy, [100] * 19)
+    assert policy.delay_s() == pytest.approx(0.05)
+
+
+def test_delay_is_the_latency_percentile(policy):
+    _record(policy, range(1, 101))
+    assert policy.delay_s() == pytest.approx(0.096)
+
+    policy.percentile = 50
+    assert policy.delay_s() == pytest.approx(0.051)
+
+
+def test_delay_has_a_floor(policy):
+    _record(policy, [1] * 50)
+    assert policy.delay_s() == pytest.approx(0.01)
+
+
+def test_only_the_recent_window_counts(policy):
+    _record(policy, [5000] * 200)
+    _record(policy, [100] * 200)
+    assert policy.delay_s() == pytest.approx(0.1)
+
+
+def test_stats_report_hedge_and_win_rates(policy):
+    policy.record(10, HedgeOutcome())
+    policy.record(10, HedgeOutcome(hedged=True))
+    policy.record(10, HedgeOutcome(hedged=True, hedge_won=True))
+    policy.record_loser(type("Response", (), {"usage_metadata": {"input_tokens": 7, "output_tokens": 3}})())
+    policy.record_loser(None)
+
+    stats = policy.stats()
+
+    assert stats["hedge_rate"] == pytest.approx(2 / 3)
+    assert stats["win_rate"] == pytest.approx(0.5)
+    assert (stats["extra_input_tokens"], stats["extra_output_tokens"], stats["cancelled"]) == (7, 3, 1)
+
+
+def test_fast_primary_is_not_hedged(policy):
+    hedge = _Model(0, "hedge")
+    result, outcome = invoke_hedged(_Model(0, "primary"), hedge, [], {}, policy)
+
+    assert (result, outcome.hedged) == ("primary", False)
+    assert hedge.calls == []
+
+
+def test_slow_primary_loses_to_the_duplicate(policy):
+    hedge = _Model(0, "hedge")
+    result, outcome = invoke_hedged(_Model(0.5, "primary"), hedge, [], {"timeout": 10}, policy)
+
+    assert (result, outcome.hedged, outcome.hedge_won) == ("hedge", True, True)
+    # The duplicate only gets what is left of the caller's timeout
+    assert hedge.calls[0]["timeout"] < 10
+
+
+def test_failed_duplicate_falls_back_to_the_primary(policy):
+    result, outcome = invoke_hedged(_Model(0.1, "primary"), _Model(0, error=RuntimeError("throttled")), [], {}, policy)
+
+    assert (result, outcome.hedged, outcome.hedge_won) == ("primary", True, False)
+
+
+def test_async_slow_primary_loses_to_the_duplicate(policy):
+    result, outcome = asyncio.run(ainvoke_hedged(_Model(0.5, "primary"), _Model(0, "hedge"), [], {}, policy))
+
+    assert (result, outcome.hedge_won) == ("hedge", True)
+    assert policy.stats()["cancelled"] == 1
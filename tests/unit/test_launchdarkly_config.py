@@ -0,0 +1,177 @@
+"""Unit tests for single-evaluation AI Config resolution in LaunchDarklyClient."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import launchdarkly_config
+from src.utils.ai_config_cache import AIConfigCache
+from src.utils.launchdarkly_config import LaunchDarklyClient, get_ai_config_evaluation_stats
+
+_AGENT_VARIATION = {
+    "_ldMeta": {"enabled": True, "variationKey": "concise", "version": 7},
+    "instructions": "Help {{name}} with plan {{policy_id}} in {{ldctx.location}}.",
+    "model": {"name": "claude-haiku", "parameters": {"temperature": 0.2}, "custom": {"awskbid": "KB-1"}},
+    "provider": {"name": "bedrock"},
+}
+
+_COMPLETION_VARIATION = {
+    "_ldMeta": {"enabled": True, "variationKey": "brand-v2", "version": 3},
+    "messages": [{"role": "system", "content": "You speak for ToggleHealth to {{ldctx.key}}."}],
+    "model": {"name": "nova-pro", "parameters": {"maxTokens": 500}},
+    "provider": {"name": "bedrock"},
+}
+
+
+class _StubLDClient:
+    """Serves fixed variations and records every evaluation and tracked event."""
+
+    def __init__(self, variations):
+        self.variations = variations
+        self.variation_calls = []
+        self.tracked = []
+
+    def variation(self, key, context, default):
+        self.variation_calls.append(key)
+        return self.variations.get(key, default)
+
+    def track(self, event, context, data=None, metric_value=None):
+        self.tracked.append((event, data, metric_value))
+
+
+class _StubFeatureStore:
+    """Feature store holding one untargeted flag per config key."""
+
+    def get(self, kind, key, callback):
+        flag = {"key": key, "variations": [{}], "fallthrough": {"variation": 0}}
+        return callback(SimpleNamespace(to_json_dict=lambda: flag))
+
+
+def _client(variations, cache=None) -> LaunchDarklyClient:
+    client = LaunchDarklyClient.__new__(LaunchDarklyClient)
+    client.client = _StubLDClient(variations)
+    client.ai_client = object()
+    client._feature_store = _StubFeatureStore() if cache is not None else None
+    client._config_cache = cache
+    return client
+
+
+@pytest.fixture(autouse=True)
+def fresh_evaluation_stats(monkeypatch):
+    monkeypatch.setattr(launchdarkly_config, "_EVALUATION_STATS", {})
+
+
+def test_agent_config_comes_from_one_evaluation():
+    client = _client({"policy_agent": _AGENT_VARIATION})
+    context = {"user_key": "user-1", "name": "Sam", "policy_id": "POL-1", "location": "Boston"}
+
+    config, _, ld_context = client.get_ai_config("policy_agent", context)
+
+    assert client.client.variation_calls == ["policy_agent"]
+    assert config == {
+        "enabled": True,
+        "provider": "bedrock",
+        "_variation": "concise",
+        "model": {"name": "claude-haiku", "parameters": {"temperature": 0.2}, "custom": {"awskbid": "KB-1"}},
+        "_instructions": "Help Sam with plan POL-1 in Boston.",
+    }
+    assert ld_context.key == "user-1"
+
+
+def test_completion_config_renders_messages_with_the_ld_context():
+    client = _client({"brand_agent": _COMPLETION_VARIATION})
+
+    config, _, _ = client.get_ai_config("brand_agent", {"user_key": "user-2"})
+
+    assert client.client.variation_calls == ["brand_agent"]
+    assert config["messages"] == [{"role": "system", "content": "You speak for ToggleHealth to user-2."}]
+    assert config["model"] == {"name": "nova-pro", "parameters": {"maxTokens": 500}}
+    assert (config["provider"], config["_variation"], config["enabled"]) == ("bedrock", "brand-v2", True)
+
+
+def test_tracker_reports_the_evaluated_variation():
+    client = _client({"policy_agent": _AGENT_VARIATION})
+
+    _, tracker, _ = client.get_ai_config("policy_agent", {"user_key": "user-1"})
+    tracker.track_duration(120)
+
+    event, data, value = client.client.tracked[-1]
+    assert (event, value) == ("$ld:ai:duration:total", 120)
+    assert data == {
+        "variationKey": "concise",
+        "configKey": "policy_agent",
+        "version": 7,
+        "modelName": "claude-haiku",
+        "providerName": "bedrock",
+    }
+
+
+def test_missing_config_uses_the_default_fallback():
+    client = _client({})
+    default = {"model": {"name": "fallback-model"}, "provider": "bedrock", "enabled": True}
+
+    config, _, _ = client.get_ai_config("triage_agent", {"user_key": "user-1"}, default_config=default)
+
+    assert client.client.variation_calls == ["triage_agent"]
+    assert config["_variation"] == "default-fallback"
+    assert config["model"]["name"] == "fallback-model"
+
+
+def test_missing_config_without_a_default_fails():
+    client = _client({})
+
+    with pytest.raises(RuntimeError, match="'triage_agent' not found in LaunchDarkly"):
+        client.get_ai_config("triage_agent", {"user_key": "user-1"})
+
+
+@pytest.mark.parametrize(
+    "variation",
+    [
+        {**_AGENT_VARIATION, "instructions": "Help {{#name}}unclosed"},
+        {**_COMPLETION_VARIATION, "messages": [{"role": "system", "content": "{{/closed}}"}]},
+    ],
+)
+def test_malformed_template_fails_like_an_evaluation_error(variation):
+    client = _client({"policy_agent": variation})
+
+    with pytest.raises(RuntimeError, match="Failed to retrieve AI config 'policy_agent' from LaunchDarkly"):
+        client.get_ai_config("policy_agent", {"user_key": "user-1", "name": "Sam"})
+
+
+def test_failed_evaluation_raises_runtime_error():
+    client = _client({})
+
+    def broken(key, context, default):
+        raise ConnectionError("LaunchDarkly unreachable")
+
+    client.client.variation = broken
+
+    with pytest.raises(RuntimeError, match="LaunchDarkly unreachable"):
+        client.get_ai_config("policy_agent", {"user_key": "user-1"})
+
+
+def test_each_lookup_is_one_evaluation():
+    client = _client({"policy_agent": _AGENT_VARIATION, "brand_agent": _COMPLETION_VARIATION})
+
+    for _ in range(3):
+        client.get_ai_config("policy_agent", {"user_key": "user-1"})
+    client.get_ai_config("brand_agent", {"user_key": "user-1"})
+
+    assert len(client.client.variation_calls) == 4
+    stats = get_ai_config_evaluation_stats()
+    assert (stats["lookups"], stats["evaluations"], stats["evaluations_per_lookup"]) == (4, 4, 1.0)
+    assert stats["by_config"]["policy_agent"] == {"lookups": 3, "evaluations": 3}
+
+
+def test_cache_hits_skip_the_evaluation():
+    client = _client({"policy_agent": _AGENT_VARIATION}, cache=AIConfigCache())
+
+    first, _, _ = client.get_ai_config("policy_agent", {"user_key": "user-1"})
+    second, tracker, _ = client.get_ai_config("policy_agent", {"user_key": "user-2"})
+    tracker.track_duration(5)
+
+    assert client.client.variation_calls == ["policy_agent"]
+    assert second == first
+    assert client.client.tracked[-1][1]["variationKey"] == "concise"
+    stats = get_ai_config_evaluation_stats()
+    assert (stats["lookups"], stats["evaluations"]) == (2, 1)
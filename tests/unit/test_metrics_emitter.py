@@ -0,0 +1,127 @@
+"""Unit tests for the batched LaunchDarkly metrics emitter."""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from ldclient import Context
+
+from src.utils import metrics_emitter
+from src.utils.metrics_emitter import MetricsEmitter
+
+
+class _Client:
+    """Records the SDK calls the emitter makes."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.threads = set()
+        self.fail_on = fail_on
+
+    def track(self, event_name, context, data=None, metric_value=None):
+        if event_name == self.fail_on:
+            raise RuntimeError("boom")
+        self.threads.add(threading.current_thread().name)
+        self.calls.append(("track", event_name, context.key, metric_value))
+
+    def variation(self, key, context, default):
+        self.calls.append(("variation", key, context.key, default))
+        return default
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = _Client()
+    monkeypatch.setattr(metrics_emitter, "ldclient", SimpleNamespace(get=lambda: client))
+    monkeypatch.setenv("LD_METRICS_EMITTER", "true")
+    return client
+
+
+def _paused(emitter: MetricsEmitter, monkeypatch) -> MetricsEmitter:
+    """Keep the worker from starting so events stay queued."""
+    monkeypatch.setattr(emitter, "_start_worker", lambda: None)
+    return emitter
+
+
+def test_events_are_sent_by_the_worker(client):
+    emitter = MetricsEmitter(batch_size=2, flush_interval_s=0.01)
+    emitter.track("$ld:ai:duration:total", {"user_key": "u1", "name": "Sam"}, 1200)
+    emitter.variation("ai-correlation", {"user_key": "u1"}, False)
+    emitter.track("$ld:ai:tokens:costmanual", {"user_key": "u2"}, 0.4)
+
+    assert emitter.flush(timeout=2) is True
+    assert client.calls == [
+        ("track", "$ld:ai:duration:total", "u1", 1200),
+        ("variation", "ai-correlation", "u1", False),
+        ("track", "$ld:ai:tokens:costmanual", "u2", 0.4),
+    ]
+    assert client.threads == {"ld-metrics-emitter"}
+    stats = emitter.stats()
+    assert (stats["enqueued"], stats["dispatched"], stats["queue_depth"]) == (3, 3, 0)
+
+
+def test_drop_newest_rejects_events_over_the_limit(client, monkeypatch):
+    emitter = _paused(MetricsEmitter(max_queue=2, overflow="drop_newest"), monkeypatch)
+    for value in range(4):
+        emitter.track("metric", {"user_key": "u"}, value)
+
+    assert [event[3] for event in emitter._queue] == [0, 1]
+    assert emitter.stats()["dropped"] == 2
+
+
+def test_drop_oldest_evicts_queued_events(client, monkeypatch):
+    emitter = _paused(MetricsEmitter(max_queue=2, overflow="drop_oldest"), monkeypatch)
+    for value in range(4):
+        emitter.track("metric", {"user_key": "u"}, value)
+
+    assert [event[3] for event in emitter._queue] == [2, 3]
+    stats = emitter.stats()
+    assert (stats["dropped"], stats["max_queue_depth"]) == (2, 2)
+
+
+def test_flush_without_a_worker_reports_failure(client, monkeypatch):
+    emitter = _paused(MetricsEmitter(), monkeypatch)
+    emitter.track("metric", {"user_key": "u"}, 1)
+
+    assert emitter.flush(timeout=0.1) is False
+    emitter._queue.clear()
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError, match="LD_METRICS_OVERFLOW"):
+        MetricsEmitter(overflow="block")
+
+
+def test_disabled_emitter_sends_inline(client, monkeypatch):
+    monkeypatch.setenv("LD_METRICS_EMITTER", "false")
+    emitter = MetricsEmitter()
+    emitter.track("metric", {"user_key": "u"}, 1)
+
+    assert client.calls == [("track", "metric", "u", 1)]
+    assert emitter._worker is None
+
+
+def test_contexts_are_cached_per_user(client):
+    emitter = MetricsEmitter(max_contexts=2)
+    first = emitter._context({"user_key": "u1", "name": "Sam"})
+
+    assert emitter._context({"user_key": "u1", "name": "Sam", "location": "Boston"}) is first
+    assert emitter._context({"user_key": "u1", "name": "Alex"}) is not first
+    ld_context = Context.create("given")
+    assert emitter._context(ld_context) is ld_context
+
+    emitter._context({"user_key": "u2"})
+    assert ("u1", "Sam") not in emitter._contexts
+    assert emitter.stats()["context_cache_hits"] == 1
+
+
+def test_failed_dispatch_is_counted(monkeypatch):
+    client = _Client(fail_on="bad")
+    monkeypatch.setattr(metrics_emitter, "ldclient", SimpleNamespace(get=lambda: client))
+    monkeypatch.setenv("LD_METRICS_EMITTER", "false")
+    emitter = MetricsEmitter()
+    emitter.track("bad", {"user_key": "u"}, 1)
+    emitter.track("good", {"user_key": "u"}, 1)
+
+    stats = emitter.stats()
+    assert (stats["errors"], stats["dispatched"]) == (1, 1)
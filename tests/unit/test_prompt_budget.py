@@ -0,0 +1,84 @@
+"""Unit tests for token-budgeted prompt assembly."""
+
+import pytest
+
+from src.utils import prompt_budget
+from src.utils.prompt_budget import assemble_prompt, count_tokens, prompt_budget_tokens
+
+
+@pytest.fixture(autouse=True)
+def character_tokens(monkeypatch):
+    """Count ~4 characters per token so budgets do not depend on tiktoken being installed."""
+    monkeypatch.setattr(prompt_budget, "_encoding", lambda: None)
+
+
+def _doc(tokens: int, score: float, name: str) -> dict:
+    return {"content": name[0] * (tokens * 4), "score": score, "name": name}
+
+
+def test_zero_budget_keeps_everything():
+    docs = [_doc(1000, 0.5, "a"), _doc(1000, 0.9, "b")]
+    assembled = assemble_prompt(0, ["instructions"], docs, {"name": "Sam"}, ["name"])
+
+    assert assembled.documents == docs
+    assert assembled.context_keys is None
+
+
+def test_documents_fill_the_budget_by_relevance():
+    docs = [_doc(100, 0.2, "low"), _doc(100, 0.9, "high"), _doc(100, 0.5, "mid")]
+    assembled = assemble_prompt(300, ["x" * 400], docs, {}, [])
+
+    assert [doc["name"] for doc in assembled.documents] == ["high", "mid"]
+    assert assembled.trimmed_documents == 1
+    assert assembled.dropped_documents == 1
+    assert assembled.tokens <= 300
+
+
+def test_only_one_document_is_trimmed():
+    docs = [_doc(200, 0.9, "first"), _doc(200, 0.8, "second"), _doc(200, 0.7, "third")]
+    assembled = assemble_prompt(400, [], docs, {}, [])
+
+    first, second = assembled.documents
+    assert first["content"] == docs[0]["content"]
+    assert count_tokens(second["content"]) < 200
+    assert (assembled.trimmed_documents, assembled.dropped_documents) == (1, 1)
+
+
+def test_too_small_a_remainder_drops_the_document():
+    assembled = assemble_prompt(150, ["x" * 400], [_doc(100, 0.9, "doc")], {}, [])
+
+    assert assembled.documents == []
+    assert assembled.dropped_documents == 1
+
+
+def test_required_text_is_always_counted():
+    assembled = assemble_prompt(10, ["x" * 400], [_doc(5, 0.9, "doc")], {"name": "Sam"}, ["name"])
+
+    assert assembled.tokens == 100
+    assert assembled.documents == []
+    assert assembled.context_keys == []
+    assert assembled.dropped_context_keys == ["name"]
+
+
+def test_context_keys_follow_the_node_priority():
+    context = {"policy_id": "TH-1", "name": "Sam", "location": "", "notes": "n" * 400, "tier": "gold"}
+    assembled = assemble_prompt(40, [], [], context, ["policy_id", "location", "notes", "name"])
+
+    # Empty values are skipped, keys the node did not ask for are dropped
+    assert assembled.context_keys == ["policy_id", "name"]
+    assert assembled.dropped_context_keys == ["notes", "tier"]
+
+
+def test_budget_from_custom_parameter_or_env(monkeypatch):
+    monkeypatch.setenv("PROMPT_BUDGET_TOKENS", "4000")
+
+    assert prompt_budget_tokens({"_custom": {"prompt_budget_tokens": 2500}}) == 2500
+    assert prompt_budget_tokens({"model": {"custom": {"prompt_budget_tokens": "1200"}}}) == 1200
+    assert prompt_budget_tokens({}) == 4000
+
+
+def test_zero_custom_budget_disables_the_budget(monkeypatch):
+    monkeypatch.setenv("PROMPT_BUDGET_TOKENS", "4000")
+
+    assert prompt_budget_tokens({"model": {"custom": {"prompt_budget_tokens": 0}}}) == 0
+    assert prompt_budget_tokens({"_custom": {"prompt_budget_tokens": 0}}) == 0
@@ -0,0 +1,52 @@
+"""Unit tests for compiled prompt templates."""
+
+from src.utils.prompt_template import compile_template, render_template
+
+VARIABLES = {"name": "Sam Lee", "coverage_type": "Gold HMO", "query": "Is PT covered?", "visits": 20}
+
+
+def test_plain_and_ldctx_placeholders():
+    template = "Member {{ldctx.name}} on {{coverage_type}} asks: {{query}}"
+
+    assert render_template(template, VARIABLES) == "Member Sam Lee on Gold HMO asks: Is PT covered?"
+
+
+def test_unknown_placeholders_are_kept_as_written():
+    template = "{{ldctx.missing}} / {{missing}} / {{ name }} / {{#section}}"
+
+    assert render_template(template, VARIABLES) == template
+
+
+def test_values_are_stringified():
+    assert render_template("{{visits}} visits, {{flag}}", {"visits": 20, "flag": None}) == "20 visits, None"
+
+
+def test_repeated_placeholders_and_adjacent_slots():
+    assert render_template("{{name}}{{name}}|{{ldctx.name}}", VARIABLES) == "Sam LeeSam Lee|Sam Lee"
+
+
+def test_templates_without_placeholders_render_unchanged():
+    assert render_template("Static instructions.", VARIABLES) == "Static instructions."
+    assert render_template("", VARIABLES) == ""
+    assert render_template(None, VARIABLES) == ""
+
+
+def test_static_prefix_ends_at_the_first_placeholder():
+    assert compile_template("You are helpful. {{name}}").static_prefix_length == len("You are helpful. ")
+    assert compile_template("No variables").static_prefix_length == len("No variables")
+
+
+def test_compiled_templates_are_cached_by_text():
+    template = "Cached {{query}}"
+
+    assert compile_template(template) is compile_template("Cached " + "{{query}}")
+    assert compile_template(template).render(VARIABLES) == compile_template(template).render(dict(VARIABLES))
+
+
+def test_rendering_matches_per_variable_replacement():
+    template = "Hi {{ldctx.name}}, plan {{coverage_type}}.\n" * 3 + "Q: {{query}} {{unknown}}"
+    expected = template
+    for key, value in VARIABLES.items():
+        expected = expected.replace(f"{{{{{key}}}}}", str(value)).replace(f"{{{{ldctx.{key}}}}}", str(value))
+
+    assert render_template(template, VARIABLES) == expected
@@ -0,0 +1,114 @@
+"""Unit tests for the exact-match model response cache."""
+
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.utils import response_cache
+from src.utils.response_cache import ResponseCache, response_cache_key
+
+
+class _Model:
+    def __init__(self, **params):
+        self._identifying_params = params
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the response cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _response(content: str) -> AIMessage:
+    return AIMessage(
+        content=content,
+        response_metadata={"ttft_ms": 120, "model": "m"},
+        usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15},
+    )
+
+
+MESSAGES = [SystemMessage(content="You are helpful."), HumanMessage(content="Is PT covered?")]
+
+
+def test_key_is_stable_and_ignores_timeouts():
+    model = _Model(model_id="m", temperature=0)
+    key = response_cache_key(model, MESSAGES, {"max_tokens": 100})
+    assert key == response_cache_key(model, list(MESSAGES), {"max_tokens": 100, "timeout": 3.0})
+
+
+@pytest.mark.parametrize(
+    "model, messages, call_kwargs",
+    [
+        (_Model(model_id="m", temperature=0.7), MESSAGES, {"max_tokens": 100}),
+        (_Model(model_id="other", temperature=0), MESSAGES, {"max_tokens": 100}),
+        (_Model(model_id="m", temperature=0), MESSAGES[:1] + [HumanMessage(content="Is MRI covered?")], {"max_tokens": 100}),
+        (_Model(model_id="m", temperature=0), [HumanMessage(content="You are helpful.")] + MESSAGES[1:], {"max_tokens": 100}),
+        (_Model(model_id="m", temperature=0), MESSAGES, {"max_tokens": 200}),
+    ],
+)
+def test_key_changes_with_anything_that_changes_the_response(model, messages, call_kwargs):
+    base = response_cache_key(_Model(model_id="m", temperature=0), MESSAGES, {"max_tokens": 100})
+    assert response_cache_key(model, messages, call_kwargs) != base
+
+
+def test_hit_reports_zero_usage_and_keeps_the_original(clock):
+    cache = ResponseCache()
+    cache.put("k", _response("Yes, 20 visits a year."))
+
+    hit = cache.get("k")
+
+    assert hit.content == "Yes, 20 visits a year."
+    assert hit.usage_metadata == {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    assert hit.response_metadata["cache_hit"] is True
+    assert hit.response_metadata["cached_usage"]["output_tokens"] == 5
+    assert "ttft_ms" not in hit.response_metadata
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResponseCache(ttl_s=60)
+    cache.put("k", _response("answer"))
+
+    clock[0] += 59
+    assert cache.get("k") is not None
+    clock[0] += 2
+    assert cache.get("k") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", _response("a"))
+    cache.put("b", _response("b"))
+    cache.get("a")
+    cache.put("c", _response("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").content == "a"
+    assert cache.get("c").content == "c"
+
+
+def test_non_text_responses_are_not_stored(clock):
+    cache = ResponseCache()
+    cache.put("blocks", AIMessage(content=[{"type": "text", "text": "hi"}]))
+    cache.put("none", None)
+
+    assert cache.get("blocks") is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_sqlite_tier_is_shared_between_instances(clock, tmp_path):
+    db_path = str(tmp_path / "responses.db")
+    ResponseCache(db_path=db_path).put("k", _response("shared"))
+    other = ResponseCache(db_path=db_path)
+
+    assert other.get("k").content == "shared"
+    assert other.get("k") is not None
+    stats = other.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+    clock[0] += 3601
+    assert ResponseCache(db_path=db_path).get("k") is None
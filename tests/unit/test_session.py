@@ -0,0 +1,113 @@
+"""Unit tests for conversation sessions (history folding, token cap and RAG reuse)."""
+
+from src.graph import session as session_module
+from src.graph.session import (
+    ConversationSession,
+    approx_tokens,
+    cache_session_documents,
+    cached_session_documents,
+)
+
+_DOCS = [{"content": "Physical therapy is covered up to 20 visits per year.", "score": 0.8}]
+
+
+def _session_with_turns(count: int, text_chars: int = 400) -> ConversationSession:
+    session = ConversationSession("session-1")
+    for i in range(count):
+        session.record_turn(f"question {i} " + "q" * text_chars, f"answer {i} " + "a" * text_chars, "policy_question")
+    return session
+
+
+def test_turns_leaving_the_window_are_folded_into_the_summary():
+    session = _session_with_turns(session_module.SESSION_WINDOW_TURNS + 2)
+
+    assert session.turn_count == session_module.SESSION_WINDOW_TURNS + 2
+    assert [turn.user.split()[1] for turn in session.turns] == ["2", "3", "4"]
+    assert len(session.summary_lines) == 2
+    assert session.summary_lines[0].startswith("- (policy_question) question 0")
+
+
+def test_recent_turns_are_kept_before_the_summary():
+    context = _session_with_turns(5, text_chars=20).context()
+
+    assert context.index("Earlier in this conversation:") < context.index("Recent turns:")
+    assert "question 4" in context
+    assert "question 0" in context
+
+
+def test_prompt_history_stays_flat_as_the_conversation_grows():
+    sizes = [approx_tokens(_session_with_turns(turns).context()) for turns in (5, 20, 100)]
+
+    assert all(size <= session_module.SESSION_CONTEXT_MAX_TOKENS for size in sizes)
+    assert sizes[1] == sizes[2]
+
+
+def test_summary_lines_are_bounded():
+    session = _session_with_turns(200, text_chars=40)
+
+    assert 0 < len(session.summary_lines) < 20
+
+
+def test_tight_budget_drops_the_summary_first():
+    context = _session_with_turns(5, text_chars=20).context(max_tokens=60)
+
+    assert "Earlier in this conversation:" not in context
+    assert "question 4" in context
+
+
+def test_related_follow_up_reuses_documents():
+    state = {"session": ConversationSession("session-1")}
+    cache_session_documents(state, "policy", ("POL-1",), "Is physical therapy covered?", _DOCS)
+
+    follow_up = cached_session_documents(state, "policy", ("POL-1",), "How many physical therapy visits are covered?")
+
+    assert follow_up is _DOCS
+
+
+def test_short_follow_up_without_content_words_reuses_documents():
+    state = {"session": ConversationSession("session-1")}
+    cache_session_documents(state, "policy", ("POL-1",), "Is physical therapy covered?", _DOCS)
+
+    assert cached_session_documents(state, "policy", ("POL-1",), "And for them?") is _DOCS
+
+
+def test_unrelated_question_retrieves_again():
+    state = {"session": ConversationSession("session-1")}
+    cache_session_documents(state, "policy", ("POL-1",), "Is physical therapy covered?", _DOCS)
+
+    assert cached_session_documents(state, "policy", ("POL-1",), "What is my dental deductible?") is None
+
+
+def test_other_plan_or_filters_retrieve_again():
+    state = {"session": ConversationSession("session-1")}
+    cache_session_documents(state, "provider", ("POL-1", "cardiology", "Boston"), "cardiologist near me", _DOCS)
+
+    assert cached_session_documents(state, "provider", ("POL-2", "cardiology", "Boston"), "cardiologist near me") is None
+    assert cached_session_documents(state, "provider", ("POL-1", "cardiology", "Denver"), "cardiologist near me") is None
+    assert cached_session_documents(state, "policy", ("POL-1", "cardiology", "Boston"), "cardiologist near me") is None
+
+
+def test_reused_documents_stay_keyed_by_the_original_question():
+    state = {"session": ConversationSession("session-1")}
+    cache_session_documents(state, "policy", ("POL-1",), "Is physical therapy covered?", _DOCS)
+    reused = cached_session_documents(state, "policy", ("POL-1",), "Is physical therapy covered for my son?")
+    cache_session_documents(state, "policy", ("POL-1",), "Is physical therapy covered for my son?", reused)
+
+    assert cached_session_documents(state, "policy", ("POL-1",), "Does my son need therapy?") is None
+
+
+def test_zero_overlap_reuses_any_retrieval_for_the_plan(monkeypatch):
+    monkeypatch.setattr(session_module, "SESSION_RAG_REUSE_OVERLAP", 0.0)
+    state = {"session": ConversationSession("session-1")}
+    cache_session_documents(state, "policy", ("POL-1",), "Is physical therapy covered?", _DOCS)
+
+    assert cached_session_documents(state, "policy", ("POL-1",), "What is my dental deductible?") is _DOCS
+
+
+def test_requests_without_a_session_or_documents_cache_nothing():
+    session = ConversationSession("session-1")
+    cache_session_documents({"session": session}, "policy", ("POL-1",), "q", [])
+    cache_session_documents({}, "policy", ("POL-1",), "q", _DOCS)
+
+    assert not session.rag_cache
+    assert cached_session_documents({}, "policy", ("POL-1",), "q") is None
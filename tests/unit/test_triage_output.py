@@ -0,0 +1,172 @@
+"""Unit tests for structured, early-terminating triage output."""
+
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+from src.agents.triage_output import (
+    _JsonStream,
+    astream_json_object,
+    json_object_end,
+    parse_triage_output,
+    stream_json_object,
+)
+from src.utils import bedrock_llm
+from src.utils.bedrock_llm import forced_tool_choice_supported
+
+DECISION = '{"query_type": "policy_question", "confidence_score": 0.92}'
+
+
+@pytest.mark.parametrize(
+    "text, end",
+    [
+        (DECISION, len(DECISION)),
+        (DECISION + "\n\nThe member asks about coverage.", len(DECISION)),
+        ("Sure! " + DECISION, len("Sure! " + DECISION)),
+        ('{"a": {"b": [1, {"c": 2}]}} {"d": 3}', len('{"a": {"b": [1, {"c": 2}]}}')),
+        ('{"reasoning": "use } and { freely"}', len('{"reasoning": "use } and { freely"}')),
+        ('{"reasoning": "an escaped \\" quote }"}', len('{"reasoning": "an escaped \\" quote }"}')),
+        ('{"query_type": "policy_question", "confidence', None),
+        ("no json here }", None),
+        ("", None),
+    ],
+)
+def test_json_object_end(text, end):
+    assert json_object_end(text) == end
+
+
+class _Invoker:
+    """ModelInvoker stand-in streaming fixed chunks and recording how far it was read."""
+
+    def __init__(self, chunks, error=None, model_id="us.anthropic.claude-haiku-4-5-20251001-v1:0"):
+        self.chunks = chunks
+        self.error = error
+        self.model = type("Model", (), {"model_id": model_id})()
+        self.calls = []
+        self.read = 0
+        self.closed = 0
+
+    def stream(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        try:
+            if self.error and "json_schema" in kwargs:
+                raise self.error
+            for chunk in self.chunks:
+                self.read += 1
+                yield chunk
+        finally:
+            self.closed += 1
+
+    async def astream(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        try:
+            if self.error and "json_schema" in kwargs:
+                raise self.error
+            for chunk in self.chunks:
+                self.read += 1
+                yield chunk
+        finally:
+            self.closed += 1
+
+
+def _chunks(*parts, usage=None):
+    chunks = [AIMessageChunk(content=part) for part in parts]
+    if usage:
+        chunks.append(AIMessageChunk(content="", usage_metadata=usage))
+    return chunks
+
+
+MESSAGES = [HumanMessage(content="Does my plan cover physical therapy?")]
+
+
+def test_stream_stops_when_the_object_closes():
+    invoker = _Invoker(_chunks('{"query_type": "policy_', 'question", "confidence_score": 0.92}', " Trailing prose", " more"))
+
+    response = stream_json_object(invoker, MESSAGES, {})
+
+    assert response.content == DECISION
+    assert parse_triage_output(response.content)["query_type"] == "policy_question"
+    assert (invoker.read, invoker.closed) == (2, 1)
+    # Cut before the provider reported usage: tokens are estimated locally
+    assert response.response_metadata["early_stop"] is True
+    assert response.response_metadata["tokens_estimated"] is True
+    assert response.usage_metadata["output_tokens"] > 0
+
+
+def test_reported_usage_is_kept():
+    usage = {"input_tokens": 120, "output_tokens": 18, "total_tokens": 138}
+    collected = _JsonStream(MESSAGES)
+    for chunk in _chunks('{"query_type": "policy_question",', usage=usage):
+        collected.add(chunk)
+    assert collected.add(AIMessageChunk(content=' "confidence_score": 0.92}')) is True
+
+    message = collected.message()
+    assert message.usage_metadata == usage
+    assert message.response_metadata["tokens_estimated"] is False
+
+
+def test_unterminated_output_is_returned_whole():
+    invoker = _Invoker(_chunks('{"query_type": ', '"policy_question"'))
+
+    response = stream_json_object(invoker, MESSAGES, {})
+
+    assert response.content == '{"query_type": "policy_question"'
+    assert parse_triage_output(response.content) is None
+    assert response.response_metadata["early_stop"] is False
+
+
+def test_async_stream_stops_and_closes():
+    invoker = _Invoker(_chunks(DECISION, " trailing"))
+
+    response = asyncio.run(astream_json_object(invoker, MESSAGES, {}))
+
+    assert response.content == DECISION
+    assert (invoker.read, invoker.closed) == (1, 1)
+
+
+@pytest.fixture
+def rejected_models(monkeypatch):
+    monkeypatch.setattr(bedrock_llm, "_FORCED_TOOL_CHOICE_REJECTED", set())
+
+
+def _tool_choice_error():
+    return ClientError(
+        {"Error": {"Code": "ValidationException", "Message": "This model doesn't support the toolConfig.toolChoice.tool field."}},
+        "ConverseStream",
+    )
+
+
+def test_rejected_tool_choice_is_retried_without_the_schema(rejected_models):
+    invoker = _Invoker(_chunks(DECISION), error=_tool_choice_error(), model_id="anthropic.claude-3-haiku-20240307-v1:0")
+
+    response = stream_json_object(invoker, MESSAGES, {"json_schema": {"type": "object"}, "max_tokens": 200})
+
+    assert response.content == DECISION
+    assert invoker.calls == [{"json_schema": {"type": "object"}, "max_tokens": 200}, {"max_tokens": 200}]
+    assert invoker.closed == 2
+    assert not forced_tool_choice_supported("anthropic.claude-3-haiku-20240307-v1:0")
+
+
+def test_other_errors_are_not_retried(rejected_models):
+    error = ClientError({"Error": {"Code": "ThrottlingException", "Message": "Too many requests"}}, "ConverseStream")
+    invoker = _Invoker(_chunks(DECISION), error=error)
+
+    with pytest.raises(ClientError):
+        asyncio.run(astream_json_object(invoker, MESSAGES, {"json_schema": {}}))
+    assert len(invoker.calls) == 1
+
+
+@pytest.mark.parametrize(
+    "model_id, supported",
+    [
+        ("us.anthropic.claude-haiku-4-5-20251001-v1:0", True),
+        ("anthropic.claude-3-5-sonnet-20241022-v2:0", True),
+        ("amazon.nova-pro-v1:0", True),
+        ("meta.llama3-1-70b-instruct-v1:0", False),
+        ("amazon.titan-text-express-v1", False),
+    ],
+)
+def test_forced_tool_choice_model_families(rejected_models, model_id, supported):
+    assert forced_tool_choice_supported(model_id) is supported
@@ -0,0 +1,55 @@
+"""Unit tests for building the initial state of a workflow run."""
+
+import pytest
+from opentelemetry.trace import StatusCode
+
+from src.graph import workflow
+
+
+class _Span:
+    def __init__(self):
+        self.attributes = {}
+        self.status = None
+        self.exceptions = []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def set_status(self, status, description=None):
+        self.status = status
+
+    def record_exception(self, error):
+        self.exceptions.append(error)
+
+
+class _Prefetch:
+    def __init__(self):
+        self.finished = False
+
+    def finish(self):
+        self.finished = True
+        return {"rag.speculative.wasted": 2}
+
+
+class _BrokenStore:
+    def get(self, session_id):
+        raise RuntimeError("session store unavailable")
+
+
+def test_failed_setup_discards_speculative_retrieval(monkeypatch):
+    prefetch = _Prefetch()
+    monkeypatch.setattr(workflow, "speculative_rag_enabled", lambda value: True)
+    monkeypatch.setattr(workflow, "start_rag_prefetch", lambda *args: prefetch)
+    monkeypatch.setattr(workflow, "get_session_store", lambda: _BrokenStore())
+    span = _Span()
+
+    with pytest.raises(RuntimeError, match="session store unavailable"):
+        workflow._create_run_state(span, "hi", {}, None, None, None, None, True, True, None, "session-1")
+
+    assert prefetch.finished
+    assert span.attributes["rag.speculative.wasted"] == 2
+    assert span.status == StatusCode.ERROR
+    assert len(span.exceptions) == 1
@@ -35,7 +35,7 @@ import json
 from datetime import datetime
 
 # Import LLM-related modules AFTER observability setup
-from src.graph.workflow import run_workflow
+from src.graph.workflow import arun_workflow, astream_workflow
 from src.utils.user_profile import create_user_profile
 from src.utils.aws_token_monitor import AWSTokenMonitor
 from ldai.tracker import FeedbackKind
@@ -289,6 +289,8 @@ class ChatRequest(BaseModel):
     coverageType: Optional[str] = "Gold HMO"
     guardrailEnabled: Optional[bool] = True
     domain: Optional[str] = "togglehealth"
+    deadlineMs: Optional[int] = None  # Per-request time budget (default: WORKFLOW_DEADLINE_S)
+    sessionId: Optional[str] = None  # Continue a multi-turn conversation
 
 
 class ChatResponse(BaseModel):
@@ -334,14 +336,15 @@ async def chat_endpoint(request: ChatRequest) -> ChatResponse:
         request_id = str(uuid4())
         
         # Run workflow with request_id, evaluation store, tracker store, and guardrail setting
-        result = await asyncio.to_thread(
-            run_workflow,
+        result = await arun_workflow(
             user_message=request.userInput,
             user_context=user_context,
             request_id=request_id,
             evaluation_results_store=EVALUATION_RESULTS,
             brand_trackers_store=BRAND_TRACKERS,
-            guardrail_enabled=request.guardrailEnabled
+            guardrail_enabled=request.guardrailEnabled,
+            deadline_s=request.deadlineMs / 1000 if request.deadlineMs else None,
+            session_id=request.sessionId,
         )
         
         total_duration = int((time.time() - start_time) * 1000)  # ms
@@ -496,6 +499,28 @@ async def chat_endpoint(request: ChatRequest) -> ChatResponse:
         )
 
 
+# Status shown in the UI while each agent runs (streaming endpoint)
+STREAM_STATUS_MESSAGES = {
+    "policy_specialist": "Researching policy details...",
+    "provider_specialist": "Finding providers...",
+    "scheduler_specialist": "Checking availability...",
+    "brand_voice": "Putting an answer together...",
+}
+
+
+def _next_streamed_agent(finished_agent: str, update: Dict[str, Any]) -> Optional[str]:
+    """Name of the agent that runs after finished_agent (None if the run is ending)."""
+    if finished_agent == "triage":
+        return update.get("next_agent")
+    if finished_agent.endswith("_specialist"):
+        # The streaming endpoint never runs in evaluation mode, so brand voice follows
+        # unless the specialist already answered in fused brand voice mode
+        if update.get("agent_data", {}).get(finished_agent, {}).get("fused_brand_voice"):
+            return None
+        return "brand_voice"
+    return None
+
+
 @app.post("/api/chat/stream")
 async def chat_stream(request: ChatRequest):
     """
@@ -525,42 +550,33 @@ async def chat_stream(request: ChatRequest):
             # Send triage status
             yield f"data: {json.dumps({'type': 'status', 'agent': 'triage', 'message': 'Analyzing your question...'})}\n\n"
             
-            # Import and run the workflow to get to brand voice stage
-            # We'll need to modify the workflow to support streaming
-            # For now, run the full workflow and extract results
-            result = await asyncio.to_thread(
-                run_workflow,
+            # Run the workflow and forward real brand voice tokens as they arrive
+            result = {}
+            async for event in astream_workflow(
                 user_message=request.userInput,
                 user_context=user_context,
                 request_id=request_id,
                 evaluation_results_store=EVALUATION_RESULTS,
-                brand_trackers_store=BRAND_TRACKERS
-            )
+                brand_trackers_store=BRAND_TRACKERS,
+                deadline_s=request.deadlineMs / 1000 if request.deadlineMs else None,
+                session_id=request.sessionId,
+            ):
+                if event["type"] == "token":
+                    yield f"data: {json.dumps({'type': 'chunk', 'content': event['content']})}\n\n"
+                elif event["type"] == "reset":
+                    # A deadline fallback replaces the partially streamed reply
+                    yield f"data: {json.dumps({'type': 'reset'})}\n\n"
+                elif event["type"] == "node":
+                    # Announce the agent that runs next
+                    next_agent = _next_streamed_agent(event["agent"], event["update"])
+                    if next_agent in STREAM_STATUS_MESSAGES:
+                        yield f"data: {json.dumps({'type': 'status', 'agent': next_agent, 'message': STREAM_STATUS_MESSAGES[next_agent]})}\n\n"
+                elif event["type"] == "final":
+                    result = event["state"] or {}
             
-            # Send specialist status
             agent_data = result.get("agent_data", {})
-            if "policy_specialist" in agent_data:
-                yield f"data: {json.dumps({'type': 'status', 'agent': 'policy_specialist', 'message': 'Researching policy details...'})}\n\n"
-            elif "provider_specialist" in agent_data:
-                yield f"data: {json.dumps({'type': 'status', 'agent': 'provider_specialist', 'message': 'Finding providers...'})}\n\n"
-            elif "scheduler_specialist" in agent_data:
-                yield f"data: {json.dumps({'type': 'status', 'agent': 'scheduler_specialist', 'message': 'Checking availability...'})}\n\n"
-            
-            # Send brand voice status
-            yield f"data: {json.dumps({'type': 'status', 'agent': 'brand_voice', 'message': 'Putting an answer together...'})}\n\n"
-            
-            # For now, send the complete response
-            # TODO: Modify workflow to actually stream brand voice chunks
             final_response = result.get("final_response", "I'm sorry, I couldn't process your request.")
             
-            # Simulate streaming by breaking response into chunks
-            chunk_size = 10  # words per chunk
-            words = final_response.split()
-            for i in range(0, len(words), chunk_size):
-                chunk = " ".join(words[i:i+chunk_size]) + " "
-                yield f"data: {json.dumps({'type': 'chunk', 'content': chunk})}\n\n"
-                await asyncio.sleep(0.05)  # Small delay to simulate streaming
-            
             # Build metrics response
             query_type = result.get("query_type", "UNKNOWN")
             confidence = result.get("confidence_score", 0)
@@ -635,7 +651,7 @@ async def chat_stream(request: ChatRequest):
             logger.info(f"[{request_id}] Response generated: {len(final_response)} chars, {len(agent_flow)} agents, {total_duration}ms")
             
             # Send final event with metrics (including total_duration_ms)
-            yield f"data: {json.dumps({
+            complete_event = {
                 'type': 'complete',
                 'requestId': request_id,
                 'agentFlow': agent_flow,
@@ -646,7 +662,8 @@ async def chat_stream(request: ChatRequest):
                     'rag_enabled': any(a.get('rag_docs', 0) > 0 for a in agent_flow),
                     'total_duration_ms': total_duration
                 }
-            })}\n\n"
+            }
+            yield f"data: {json.dumps(complete_event)}\n\n"
             
         except Exception as e:
             error_message = str(e)